@@ -0,0 +1,282 @@
+import os
+import stat
+import time
+import errno
+import shutil
+import hashlib
+import tarfile
+import zipfile
+import tempfile
+from contextlib import contextmanager
+
+from core.detect import compile_ignore_dirs
+from core.document_cache import DocumentCache
+from core.file_parsers.registry import registry
+
+# 可直接扫描的归档格式, jar/war即zip
+ARCHIVE_EXTENSIONS = ('.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz', '.tar', '.zip', '.jar', '.war')
+# 候选文件之外, 解析时会按文件名查找的文件(lock文件、gradle的settings与版本目录等), 同样预先读入内存
+AUXILIARY_FILES = {'settings.gradle', 'settings.gradle.kts', 'gradle.properties', 'libs.versions.toml'}
+for _handler in registry.handlers:
+    AUXILIARY_FILES.update(file_name for file_name, _ in _handler.lock_files + _handler.build_lock_files)
+# 超过该大小的成员不预先读入, 在解析用到时才读取
+MAX_MEMBER_SIZE = 16 * 1024 * 1024
+COPY_BUFFER = 1024 * 1024
+
+
+def is_archive(path):
+    return path.lower().endswith(ARCHIVE_EXTENSIONS) and os.path.isfile(path)
+
+
+def archive_root_name(path):
+    file_name = os.path.basename(path)
+    for extension in ARCHIVE_EXTENSIONS:
+        if file_name.lower().endswith(extension):
+            return file_name[:-len(extension)]
+    return file_name
+
+
+def normalize_member_name(name):
+    """
+    The '/' separated relative path of an archive member name, None for names that would point outside the
+    archive (absolute paths, '..' components).
+    """
+    name = name.replace('\\', '/')
+    if name.startswith('/') or (len(name) > 1 and name[1] == ':'):
+        return None
+    parts = list()
+    for part in name.split('/'):
+        if part in ('', '.'):
+            continue
+        if part == '..':
+            return None
+        parts.append(part)
+    return '/'.join(parts)
+
+
+class ArchiveMember(object):
+    __slots__ = ('name', 'size', 'mtime_ns', 'mode', 'data')
+
+    def __init__(self, name, size, mtime_ns, mode):
+        self.name = name
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.mode = mode
+        self.data = None
+
+
+class ArchiveEntry(object):
+    """
+    A directory entry of an archive, with the os.DirEntry attributes used by detect.iter_candidate_files.
+    """
+    __slots__ = ('name', 'path', '_is_dir')
+
+    def __init__(self, name, path, is_dir):
+        self.name = name
+        self.path = path
+        self._is_dir = is_dir
+
+    def is_dir(self):
+        return self._is_dir
+
+    def is_file(self):
+        return not self._is_dir
+
+    def is_symlink(self):
+        return False
+
+
+class Archive(object):
+    """
+    Index of a tar (plain, gz, bz2, xz) or zip (jar, war) archive, read without extracting it. The project is the
+    content of the archive, or of its single top-level directory (e.g. 'package/' of an npm pack), and is exposed
+    under the virtual directory scan_dir = <archive path>/<root_name>, so that the member paths keep the file
+    names the parsers match on. Links and special files are left out.
+    With preload, the members that detect can match within search_depth (and the lock and other files the parsers
+    look up by name) are read into memory while indexing, other members only when they are read.
+    """
+    def __init__(self, path, search_depth=None, ignore_dirs=None, preload=True, max_member_size=MAX_MEMBER_SIZE):
+        self.path = os.path.abspath(path)
+        self.root_name = archive_root_name(self.path)
+        self.scan_dir = os.path.join(self.path, self.root_name)
+        self.is_zip = zipfile.is_zipfile(self.path)
+        self.max_member_size = max_member_size
+        # 相对路径 -> ArchiveMember, 目录的相对路径('' == 根目录) -> {名称: 是否为目录}
+        self.members = dict()
+        self.directories = {'': dict()}
+        self._prefix = ''
+        self._index()
+        if preload:
+            self._preload(search_depth=search_depth, ignore_pattern=compile_ignore_dirs(ignore_dirs))
+
+    def _iter_infos(self, archive):
+        # (成员名, 是否为目录, 是否为普通文件, 大小, mtime_ns, 权限, info)
+        if self.is_zip:
+            for info in archive.infolist():
+                mode = info.external_attr >> 16
+                is_link = stat.S_ISLNK(mode)
+                mtime_ns = int(time.mktime(info.date_time + (0, 0, -1)) * 1e9)
+                yield info.filename, info.is_dir(), not info.is_dir() and not is_link, info.file_size, mtime_ns, \
+                    stat.S_IMODE(mode), info
+        else:
+            for info in archive:
+                yield info.name, info.isdir(), info.isreg(), info.size, int(info.mtime * 1e9), info.mode, info
+
+    @contextmanager
+    def _open(self):
+        if self.is_zip:
+            with zipfile.ZipFile(self.path) as archive:
+                yield archive
+        else:
+            with tarfile.open(self.path, mode='r:*') as archive:
+                yield archive
+
+    def _index(self):
+        names = list()
+        with self._open() as archive:
+            for name, is_dir, is_file, size, mtime_ns, mode, _ in self._iter_infos(archive):
+                name = normalize_member_name(name)
+                if name and (is_dir or is_file):
+                    names.append((name, is_dir, size, mtime_ns, mode))
+        # 所有成员都在同一个顶层目录下时, 以该目录为项目根目录
+        top_names = set(name.split('/', 1)[0] for name, _, _, _, _ in names)
+        if len(top_names) == 1:
+            top_name = top_names.pop()
+            if not any(name == top_name and not is_dir for name, is_dir, _, _, _ in names):
+                self._prefix = top_name + '/'
+        for name, is_dir, size, mtime_ns, mode in names:
+            if self._prefix:
+                if not name.startswith(self._prefix):
+                    continue
+                name = name[len(self._prefix):]
+            parts = name.split('/')
+            for depth in range(0, len(parts) - 1):
+                self.directories.setdefault('/'.join(parts[:depth]), dict())[parts[depth]] = True
+                self.directories.setdefault('/'.join(parts[:depth + 1]), dict())
+            if is_dir:
+                self.directories.setdefault('/'.join(parts[:-1]), dict())[parts[-1]] = True
+                self.directories.setdefault(name, dict())
+            else:
+                self.directories.setdefault('/'.join(parts[:-1]), dict())[parts[-1]] = False
+                self.members[name] = ArchiveMember(name=name, size=size, mtime_ns=mtime_ns, mode=mode)
+
+    def _is_preloaded(self, name, search_depth, ignore_pattern):
+        parts = name.split('/')
+        if search_depth is not None and len(parts) - 1 > search_depth:
+            return False
+        if ignore_pattern and any(ignore_pattern.match(part) for part in parts[:-1]):
+            return False
+        parent_name = parts[-2] if len(parts) > 1 else self.root_name
+        return parts[-1] in AUXILIARY_FILES or bool(registry.match(file_name=parts[-1], parent_name=parent_name))
+
+    def _preload(self, search_depth, ignore_pattern):
+        wanted = set(name for name, member in self.members.items() if member.size <= self.max_member_size
+                     and self._is_preloaded(name, search_depth=search_depth, ignore_pattern=ignore_pattern))
+        if wanted:
+            self._read_members(wanted)
+
+    def _read_members(self, names):
+        # tar按顺序读取一遍, 不回退压缩流
+        with self._open() as archive:
+            for name, _, is_file, _, _, _, info in self._iter_infos(archive):
+                name = normalize_member_name(name)
+                if not (name and is_file and name.startswith(self._prefix)):
+                    continue
+                name = name[len(self._prefix):]
+                if name in names and self.members[name].data is None:
+                    if self.is_zip:
+                        self.members[name].data = archive.read(info)
+                    else:
+                        with archive.extractfile(info) as f:
+                            self.members[name].data = f.read()
+
+    def relative_path(self, filepath):
+        """
+        The member name of filepath under scan_dir, '' for scan_dir itself, None for paths outside the archive.
+        """
+        filepath = os.path.normpath(filepath)
+        if filepath == self.scan_dir:
+            return ''
+        if filepath.startswith(self.scan_dir + os.sep):
+            return filepath[len(self.scan_dir) + 1:].replace(os.sep, '/')
+        return None
+
+    def get_member(self, filepath):
+        name = self.relative_path(filepath)
+        return self.members.get(name) if name else None
+
+    def read(self, filepath):
+        member = self.get_member(filepath)
+        if member is None:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), filepath)
+        if member.data is None:
+            self._read_members({member.name})
+        return member.data
+
+    def list_directory(self, dir_absolute):
+        """
+        The entries of a directory of the archive, see detect.iter_candidate_files.
+        """
+        name = self.relative_path(dir_absolute)
+        if name is None or name not in self.directories:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), dir_absolute)
+        return [ArchiveEntry(name=entry_name, path=os.path.join(dir_absolute, entry_name), is_dir=is_dir)
+                for entry_name, is_dir in self.directories[name].items()]
+
+    def extract(self, target_dir):
+        """
+        Write the indexed members (without the top-level directory) under target_dir, for build mode.
+        """
+        for name in self.directories:
+            os.makedirs(os.path.join(target_dir, *name.split('/')), exist_ok=True)
+        with self._open() as archive:
+            for name, _, is_file, _, _, mode, info in self._iter_infos(archive):
+                name = normalize_member_name(name)
+                if not (name and is_file and name.startswith(self._prefix)) \
+                        or name[len(self._prefix):] not in self.members:
+                    continue
+                filepath = os.path.join(target_dir, *name[len(self._prefix):].split('/'))
+                source = archive.open(info) if self.is_zip else archive.extractfile(info)
+                with source, open(filepath, mode='wb') as f:
+                    shutil.copyfileobj(source, f, COPY_BUFFER)
+                # 保留可执行权限, e.g. gradlew, mvnw
+                if mode & 0o111:
+                    os.chmod(filepath, 0o755)
+
+
+class ArchiveDocumentCache(DocumentCache):
+    """
+    DocumentCache serving the files of an Archive from memory: the scan's readers see the members under
+    archive.scan_dir, and nothing outside it.
+    """
+    def __init__(self, archive, **kwargs):
+        super().__init__(**kwargs)
+        self.archive = archive
+
+    def is_file(self, filepath):
+        return self.archive.get_member(filepath) is not None
+
+    def stat(self, filepath):
+        member = self.archive.get_member(filepath)
+        if member is None:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), filepath)
+        return member.size, member.mtime_ns
+
+    def read_bytes(self, filepath):
+        return self.archive.read(filepath)
+
+    def compute_hash(self, filepath):
+        return hashlib.sha256(self.archive.read(filepath)).hexdigest()
+
+    @contextmanager
+    def local_path(self, filepath):
+        # 只接受文件路径的解析库: 将该成员写入临时目录, 保留文件名
+        data = self.archive.read(filepath)
+        temp_dir = tempfile.mkdtemp(prefix='archive_')
+        try:
+            path = os.path.join(temp_dir, os.path.basename(filepath))
+            with open(path, mode='wb') as f:
+                f.write(data)
+            yield path
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
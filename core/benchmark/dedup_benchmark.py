@@ -0,0 +1,80 @@
+import sys
+import random
+import argparse
+import timeit
+from functools import reduce
+
+sys.path.append('.')
+sys.path.append('..')
+from core.dedup import remove_duplicate_components
+
+
+def legacy_remove_duplicate_dict_items(data_list):
+    # the list-membership/reduce implementation previously shipped in core.util
+    run_function = lambda x, y: x if y in x else x + [y]
+    return reduce(run_function, [[], ] + data_list)
+
+
+def generate_dep_items(size, unique_ratio, seed=0):
+    rng = random.Random(seed)
+    unique_nums = max(1, int(size * unique_ratio))
+    pool = list()
+    for i in range(0, unique_nums):
+        temp = dict()
+        temp['type'] = 'maven' if i % 2 else 'npm'
+        temp['namespace'] = 'org.group{}'.format(i % 97) if i % 2 else ''
+        temp['name'] = 'component-{}'.format(i)
+        temp['version'] = '{}.{}.{}'.format(i % 7, i % 13, i % 31)
+        temp['language'] = 'Java' if i % 2 else 'Node JS'
+        pool.append(temp)
+    data_list = list(pool)
+    while len(data_list) < size:
+        # copies rather than references, as parsers emit fresh dicts per occurrence
+        data_list.append(dict(rng.choice(pool)))
+    rng.shuffle(data_list)
+    return data_list
+
+
+def run_benchmark(sizes, unique_ratio, repeat, legacy_limit):
+    result = list()
+    for size in sizes:
+        data_list = generate_dep_items(size=size, unique_ratio=unique_ratio)
+        new_time = min(timeit.repeat(lambda: remove_duplicate_components(data_list), number=1, repeat=repeat))
+        if size <= legacy_limit:
+            legacy_time = min(timeit.repeat(lambda: legacy_remove_duplicate_dict_items(data_list),
+                                            number=1, repeat=repeat))
+            if legacy_remove_duplicate_dict_items(data_list) != remove_duplicate_components(data_list):
+                raise AssertionError('dedup result mismatch at size {}'.format(size))
+        else:
+            legacy_time = None
+        result.append({
+            'size': size,
+            'unique': len(remove_duplicate_components(data_list)),
+            'legacy_seconds': legacy_time,
+            'indexed_seconds': new_time,
+            'speedup': legacy_time / new_time if legacy_time and new_time else None
+        })
+    return result
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-sizes', default='1000,10000,100000', required=False, type=str)
+    parser.add_argument('-unique_ratio', default=0.1, required=False, type=float)
+    parser.add_argument('-repeat', default=3, required=False, type=int)
+    parser.add_argument('-legacy_limit', default=100000, required=False, type=int)
+    args_cmd = parser.parse_args()
+
+    sizes = [int(size) for size in args_cmd.sizes.split(',') if size]
+    bench_result = run_benchmark(sizes=sizes, unique_ratio=args_cmd.unique_ratio, repeat=args_cmd.repeat,
+                                 legacy_limit=args_cmd.legacy_limit)
+    print('------------------------------------------------------------')
+    print('{:>8} {:>8} {:>14} {:>14} {:>10}'.format('size', 'unique', 'legacy(s)', 'indexed(s)', 'speedup'))
+    for item in bench_result:
+        print('{:>8} {:>8} {:>14} {:>14.6f} {:>10}'.format(
+            item['size'], item['unique'],
+            '{:.6f}'.format(item['legacy_seconds']) if item['legacy_seconds'] is not None else 'skipped',
+            item['indexed_seconds'],
+            '{:.1f}x'.format(item['speedup']) if item['speedup'] else '-'))
+    print('------------------------------------------------------------')
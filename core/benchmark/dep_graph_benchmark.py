@@ -0,0 +1,80 @@
+import sys
+import random
+import argparse
+import timeit
+
+sys.path.append('.')
+sys.path.append('..')
+from core.dep_graph import GraphBuilder, DependencyGraph, SCOPES
+
+
+def generate_dependency_list(size, direct_ratio, fan_out, seed=0):
+    # 节点按层生成, 每个节点依赖随机的后续节点, 模拟一个大型锁文件的依赖结构
+    rng = random.Random(seed)
+    builder = GraphBuilder()
+    for i in range(0, size):
+        temp = dict()
+        temp['type'] = 'npm'
+        temp['namespace'] = ''
+        temp['name'] = 'package-{}'.format(i)
+        temp['version'] = '{}.{}.{}'.format(i % 7, i % 13, i % 31)
+        temp['language'] = 'Node JS'
+        builder.add(temp, scope=SCOPES[i % len(SCOPES)])
+    direct_nums = max(1, int(size * direct_ratio))
+    for node in range(0, direct_nums):
+        builder.add_dependency(None, node)
+    for node in range(0, size - 1):
+        for _ in range(0, rng.randint(0, 2 * fan_out)):
+            builder.add_dependency(node, rng.randrange(max(node + 1, direct_nums), size))
+    return builder.result()
+
+
+def build_graph(dep_result):
+    graph = DependencyGraph()
+    for item in dep_result:
+        graph.add_node(item)
+    graph.add_fragment(items=dep_result, graph=dep_result.graph)
+    return graph.freeze()
+
+
+def run_benchmark(size, direct_ratio, fan_out, repeat, queries):
+    dep_result = generate_dependency_list(size=size, direct_ratio=direct_ratio, fan_out=fan_out)
+    graph = build_graph(dep_result)
+    rng = random.Random(1)
+    targets = [rng.randrange(size) for _ in range(0, queries)]
+    direct_nodes = [node for node in range(0, size) if graph.is_direct(node)]
+
+    timings = [
+        ('build+freeze', lambda: build_graph(dep_result), 1),
+        ('direct_dependents', lambda: [graph.direct_dependents(node) for node in targets], queries),
+        ('reachable_from', lambda: [graph.reachable_from([node]) for node in direct_nodes[:queries]], queries),
+        ('to_dict', lambda: graph.to_dict(), 1)
+    ]
+    result = list()
+    for name, function, count in timings:
+        result.append({
+            'operation': name,
+            'milliseconds': min(timeit.repeat(function, number=1, repeat=repeat)) * 1000 / count
+        })
+    return graph, result
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-size', default=50000, required=False, type=int)
+    parser.add_argument('-direct_ratio', default=0.01, required=False, type=float)
+    parser.add_argument('-fan_out', default=3, required=False, type=int)
+    parser.add_argument('-queries', default=20, required=False, type=int)
+    parser.add_argument('-repeat', default=3, required=False, type=int)
+    args_cmd = parser.parse_args()
+
+    dep_graph, bench_result = run_benchmark(size=args_cmd.size, direct_ratio=args_cmd.direct_ratio,
+                                            fan_out=args_cmd.fan_out, repeat=args_cmd.repeat,
+                                            queries=args_cmd.queries)
+    print('------------------------------------------------------------')
+    print('nodes: {}, edges: {}'.format(len(dep_graph), dep_graph.edge_count))
+    print('{:>20} {:>16}'.format('operation', 'ms (per query)'))
+    for item in bench_result:
+        print('{:>20} {:>16.2f}'.format(item['operation'], item['milliseconds']))
+    print('------------------------------------------------------------')
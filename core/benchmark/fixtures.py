@@ -0,0 +1,462 @@
+import os
+import sys
+import json
+import random
+
+sys.path.append('.')
+sys.path.append('..')
+from core.benchmark.yarn_lock_benchmark import generate_yarn_lock
+
+
+def version_of(i):
+    return '{}.{}.{}'.format(i % 7 + 1, i % 13, i % 31)
+
+
+def write_file(project_dir, file_name, content):
+    filepath = os.path.join(project_dir, file_name)
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    with open(filepath, mode='w', encoding='utf-8') as f:
+        f.write(content)
+    return filepath
+
+
+def random_dependencies(rng, i, size, fan_out=3):
+    # 依赖序号大于自身的包, 生成无环的依赖结构
+    if i + 1 >= size:
+        return list()
+    return sorted(set(rng.randrange(i + 1, size) for _ in range(0, rng.randint(0, fan_out))))
+
+
+def npm_name(i):
+    return '@scope{}/package-{}'.format(i % 50, i) if i % 4 == 0 else 'package-{}'.format(i)
+
+
+def generate_package_json(project_dir, size):
+    dependencies = dict((npm_name(i), '^' + version_of(i)) for i in range(0, min(size, 50)))
+    write_file(project_dir, 'package.json', json.dumps({'name': 'bench-app', 'version': '1.0.0',
+                                                        'dependencies': dependencies}, indent=2))
+
+
+def generate_package_lock_v1(project_dir, size, rng):
+    generate_package_json(project_dir, size)
+
+    def package(i, depth):
+        item = {
+            'version': version_of(i),
+            'resolved': 'https://registry.npmjs.org/{0}/-/{0}-{1}.tgz'.format(npm_name(i), version_of(i)),
+            'integrity': 'sha512-' + 'A' * 86 + '==',
+            'dev': i % 5 == 0
+        }
+        requires = random_dependencies(rng, i, size)
+        if requires:
+            item['requires'] = dict((npm_name(j), '^' + version_of(j)) for j in requires)
+        return item
+
+    dependencies = dict()
+    i = 0
+    while i < size:
+        item = package(i, 0)
+        dependencies[npm_name(i)] = item
+        i += 1
+        # 每10个包中有一个带嵌套的node_modules
+        if i % 10 == 0 and i < size:
+            item['dependencies'] = {npm_name(i): package(i, 1)}
+            i += 1
+    write_file(project_dir, 'package-lock.json', json.dumps({'name': 'bench-app', 'version': '1.0.0',
+                                                             'lockfileVersion': 1, 'requires': True,
+                                                             'dependencies': dependencies}, indent=2))
+
+
+def generate_package_lock_v2(project_dir, size, rng, lockfile_version=2):
+    generate_package_json(project_dir, size)
+    packages = {'': {'name': 'bench-app', 'version': '1.0.0',
+                     'dependencies': dict((npm_name(i), '^' + version_of(i)) for i in range(0, min(size, 50)))}}
+    dependencies = dict()
+    for i in range(0, size):
+        path = 'node_modules/' + npm_name(i)
+        # 每10个包中有一个嵌套在前一个包之下
+        if i % 10 == 9:
+            path = 'node_modules/' + npm_name(i - 1) + '/' + path
+        item = {
+            'version': version_of(i),
+            'resolved': 'https://registry.npmjs.org/{0}/-/{0}-{1}.tgz'.format(npm_name(i), version_of(i)),
+            'integrity': 'sha512-' + 'A' * 86 + '=='
+        }
+        if i % 5 == 0:
+            item['dev'] = True
+        requires = random_dependencies(rng, i, size)
+        if requires:
+            item['dependencies'] = dict((npm_name(j), '^' + version_of(j)) for j in requires)
+        packages[path] = item
+        if lockfile_version == 2:
+            dependencies[npm_name(i)] = {'version': version_of(i)}
+    data = {'name': 'bench-app', 'version': '1.0.0', 'lockfileVersion': lockfile_version, 'requires': True,
+            'packages': packages}
+    if lockfile_version == 2:
+        data['dependencies'] = dependencies
+    write_file(project_dir, 'package-lock.json', json.dumps(data, indent=2))
+
+
+def generate_package_lock_v3(project_dir, size, rng):
+    generate_package_lock_v2(project_dir, size, rng, lockfile_version=3)
+
+
+def generate_yarn_lock_v1(project_dir, size, rng):
+    generate_package_json(project_dir, size)
+    generate_yarn_lock(filepath=os.path.join(project_dir, 'yarn.lock'), size=size, seed=rng.randrange(1 << 16))
+
+
+def generate_yarn_lock_berry(project_dir, size, rng):
+    generate_package_json(project_dir, size)
+    generate_yarn_lock(filepath=os.path.join(project_dir, 'yarn.lock'), size=size, berry=True,
+                       seed=rng.randrange(1 << 16))
+
+
+def generate_pnpm_lock(project_dir, size, rng):
+    generate_package_json(project_dir, size)
+    lines = ['lockfileVersion: 5.4', '', 'specifiers:']
+    lines.extend("  '{}': ^{}".format(npm_name(i), version_of(i)) for i in range(0, min(size, 50)))
+    lines.extend(['', 'dependencies:'])
+    lines.extend("  '{}': {}".format(npm_name(i), version_of(i)) for i in range(0, min(size, 50)))
+    lines.extend(['', 'packages:', ''])
+    for i in range(0, size):
+        lines.append('  /{}/{}:'.format(npm_name(i), version_of(i)))
+        lines.append('    resolution: {{integrity: sha512-{}==}}'.format('A' * 86))
+        requires = random_dependencies(rng, i, size)
+        if requires:
+            lines.append('    dependencies:')
+            lines.extend("      '{}': {}".format(npm_name(j), version_of(j)) for j in requires)
+        lines.append('    dev: {}'.format('true' if i % 5 == 0 else 'false'))
+        lines.append('')
+    write_file(project_dir, 'pnpm-lock.yaml', '\n'.join(lines))
+
+
+def generate_go_sum(project_dir, size, rng):
+    lines = ['module example.com/bench', '', 'go 1.19', '', 'require (']
+    lines.extend('\tgithub.com/org{}/module-{} v{}'.format(i % 40, i, version_of(i)) for i in range(0, min(size, 50)))
+    lines.append(')')
+    write_file(project_dir, 'go.mod', '\n'.join(lines) + '\n')
+    lines = list()
+    for i in range(0, size):
+        module = 'github.com/org{}/module-{} v{}'.format(i % 40, i, version_of(i))
+        lines.append('{} h1:{}='.format(module, 'a' * 43))
+        lines.append('{}/go.mod h1:{}='.format(module, 'b' * 43))
+    write_file(project_dir, 'go.sum', '\n'.join(lines) + '\n')
+
+
+def generate_cargo_lock(project_dir, size, rng):
+    write_file(project_dir, 'Cargo.toml', '[package]\nname = "bench"\nversion = "0.1.0"\n\n[dependencies]\n'
+               + ''.join('crate-{} = "{}"\n'.format(i, version_of(i)) for i in range(0, min(size, 50))))
+    blocks = ['# This file is automatically @generated by Cargo.\nversion = 3\n']
+    for i in range(0, size):
+        block = '[[package]]\nname = "crate-{}"\nversion = "{}"\n'.format(i, version_of(i))
+        block += 'source = "registry+https://github.com/rust-lang/crates.io-index"\n'
+        block += 'checksum = "{:064x}"\n'.format(i)
+        requires = random_dependencies(rng, i, size)
+        if requires:
+            block += 'dependencies = [\n' + ''.join(' "crate-{}",\n'.format(j) for j in requires) + ']\n'
+        blocks.append(block)
+    write_file(project_dir, 'Cargo.lock', '\n'.join(blocks))
+
+
+def generate_gemfile_lock(project_dir, size, rng):
+    write_file(project_dir, 'Gemfile', "source 'https://rubygems.org'\n"
+               + ''.join("gem 'gem-{}', '~> {}'\n".format(i, version_of(i)) for i in range(0, min(size, 50))))
+    lines = ['GEM', '  remote: https://rubygems.org/', '  specs:']
+    for i in range(0, size):
+        lines.append('    gem-{} ({})'.format(i, version_of(i)))
+        lines.extend('      gem-{} (>= {})'.format(j, version_of(j)) for j in random_dependencies(rng, i, size))
+    lines.extend(['', 'PLATFORMS', '  ruby', '', 'DEPENDENCIES'])
+    lines.extend('  gem-{} (~> {})'.format(i, version_of(i)) for i in range(0, min(size, 50)))
+    lines.extend(['', 'BUNDLED WITH', '   2.3.26', ''])
+    write_file(project_dir, 'Gemfile.lock', '\n'.join(lines))
+
+
+def generate_poetry_lock(project_dir, size, rng):
+    write_file(project_dir, 'pyproject.toml', '[tool.poetry]\nname = "bench"\nversion = "0.1.0"\n\n'
+               '[tool.poetry.dependencies]\npython = "^3.8"\n'
+               + ''.join('dist-{} = "^{}"\n'.format(i, version_of(i)) for i in range(0, min(size, 50))))
+    blocks = list()
+    for i in range(0, size):
+        block = '[[package]]\nname = "dist-{}"\nversion = "{}"\ndescription = ""\n'.format(i, version_of(i))
+        block += 'category = "{}"\noptional = false\npython-versions = ">=3.7"\n'.format('dev' if i % 5 == 0
+                                                                                      else 'main')
+        requires = random_dependencies(rng, i, size)
+        if requires:
+            block += '\n[package.dependencies]\n' + ''.join('dist-{} = ">={}"\n'.format(j, version_of(j))
+                                                            for j in requires)
+        blocks.append(block)
+    blocks.append('[metadata]\nlock-version = "1.1"\npython-versions = "^3.8"\ncontent-hash = "{:064x}"\n'
+                  .format(size))
+    write_file(project_dir, 'poetry.lock', '\n'.join(blocks))
+
+
+def generate_pipfile_lock(project_dir, size, rng):
+    write_file(project_dir, 'Pipfile', '[packages]\n' + ''.join('dist-{} = "=={}"\n'.format(i, version_of(i))
+                                                                for i in range(0, min(size, 50))))
+    data = {'_meta': {'hash': {'sha256': '{:064x}'.format(size)}, 'pipfile-spec': 6}, 'default': dict(),
+            'develop': dict()}
+    for i in range(0, size):
+        data['develop' if i % 5 == 0 else 'default']['dist-{}'.format(i)] = {
+            'hashes': ['sha256:{:064x}'.format(i)],
+            'version': '=={}'.format(version_of(i))
+        }
+    write_file(project_dir, 'Pipfile.lock', json.dumps(data, indent=4))
+
+
+def generate_composer_lock(project_dir, size, rng):
+    write_file(project_dir, 'composer.json', json.dumps({'require': dict(
+        ('vendor{}/package-{}'.format(i % 30, i), '^' + version_of(i)) for i in range(0, min(size, 50)))}, indent=4))
+    packages = list()
+    for i in range(0, size):
+        packages.append({
+            'name': 'vendor{}/package-{}'.format(i % 30, i),
+            'version': 'v' + version_of(i),
+            'source': {'type': 'git', 'url': 'https://github.com/vendor/package-{}.git'.format(i),
+                       'reference': '{:040x}'.format(i)},
+            'require': dict(('vendor{}/package-{}'.format(j % 30, j), '^' + version_of(j))
+                            for j in random_dependencies(rng, i, size)),
+            'type': 'library'
+        })
+    data = {'content-hash': '{:032x}'.format(size),
+            'packages': [package for i, package in enumerate(packages) if i % 5],
+            'packages-dev': [package for i, package in enumerate(packages) if not i % 5]}
+    write_file(project_dir, 'composer.lock', json.dumps(data, indent=4))
+
+
+def generate_pubspec_lock(project_dir, size, rng):
+    write_file(project_dir, 'pubspec.yaml', 'name: bench\n\ndependencies:\n'
+               + ''.join('  package_{}: ^{}\n'.format(i, version_of(i)) for i in range(0, min(size, 50))))
+    lines = ['packages:']
+    for i in range(0, size):
+        kind = '"direct main"' if i < 50 else '"direct dev"' if i % 5 == 0 else 'transitive'
+        lines.extend(['  package_{}:'.format(i), '    dependency: {}'.format(kind), '    description:',
+                      '      name: package_{}'.format(i), '      url: "https://pub.dartlang.org"',
+                      '    source: hosted', '    version: "{}"'.format(version_of(i))])
+    lines.extend(['sdks:', '  dart: ">=2.12.0 <3.0.0"', ''])
+    write_file(project_dir, 'pubspec.lock', '\n'.join(lines))
+
+
+def generate_podfile_lock(project_dir, size, rng):
+    write_file(project_dir, 'Podfile', "platform :ios, '13.0'\n\ntarget 'Bench' do\n"
+               + ''.join("  pod 'Pod{}', '~> {}'\n".format(i, version_of(i)) for i in range(0, min(size, 50)))
+               + 'end\n')
+    lines = ['PODS:']
+    for i in range(0, size):
+        requires = random_dependencies(rng, i, size)
+        lines.append('  - Pod{} ({}){}'.format(i, version_of(i), ':' if requires else ''))
+        lines.extend('    - Pod{}'.format(j) for j in requires)
+    lines.extend(['', 'DEPENDENCIES:'])
+    lines.extend('  - Pod{} (~> {})'.format(i, version_of(i)) for i in range(0, min(size, 50)))
+    lines.extend(['', 'COCOAPODS: 1.11.3', ''])
+    write_file(project_dir, 'Podfile.lock', '\n'.join(lines))
+
+
+def generate_mix_lock(project_dir, size, rng):
+    write_file(project_dir, 'mix.exs', 'defmodule Bench.MixProject do\n  use Mix.Project\n\n  defp deps do\n    [\n'
+               + ',\n'.join('      {{:hex_{}, "~> {}"}}'.format(i, version_of(i)) for i in range(0, min(size, 50)))
+               + '\n    ]\n  end\nend\n')
+    lines = ['%{']
+    for i in range(0, size):
+        lines.append('  "hex_{0}": {{:hex, :hex_{0}, "{1}", "{2:064x}", [:mix], [], "hexpm", "{2:064x}"}},'
+                     .format(i, version_of(i), i))
+    lines.append('}')
+    write_file(project_dir, 'mix.lock', '\n'.join(lines) + '\n')
+
+
+def generate_conan_lock(project_dir, size, rng):
+    write_file(project_dir, 'conanfile.py', 'from conans import ConanFile\n\n\nclass BenchConan(ConanFile):\n'
+               '    requires = ()\n')
+    nodes = {'0': {'ref': 'bench/1.0', 'requires': [str(i + 1) for i in range(0, min(size, 50))]}}
+    for i in range(0, size):
+        nodes[str(i + 1)] = {'ref': 'lib{}/{}'.format(i, version_of(i)),
+                             'requires': [str(j + 1) for j in random_dependencies(rng, i, size)]}
+    write_file(project_dir, 'conan.lock', json.dumps({'graph_lock': {'nodes': nodes}, 'version': '0.4'}, indent=2))
+
+
+def generate_package_resolved(project_dir, size, rng):
+    write_file(project_dir, 'Package.swift', '// swift-tools-version:5.5\nimport PackageDescription\n')
+    pins = [{'identity': 'swift-package-{}'.format(i), 'kind': 'remoteSourceControl',
+             'location': 'https://github.com/org{}/swift-package-{}.git'.format(i % 20, i),
+             'state': {'revision': '{:040x}'.format(i), 'version': version_of(i)}} for i in range(0, size)]
+    write_file(project_dir, 'Package.resolved', json.dumps({'pins': pins, 'version': 2}, indent=2))
+
+
+def generate_gopkg_lock(project_dir, size, rng):
+    write_file(project_dir, 'Gopkg.lock', ''.join(
+        '[[projects]]\n  digest = "1:{0:040x}"\n  name = "github.com/org{1}/project-{2}"\n  packages = ["."]\n'
+        '  revision = "{0:040x}"\n  version = "v{3}"\n\n'.format(i, i % 40, i, version_of(i)) for i in range(0, size)))
+
+
+def generate_godeps_json(project_dir, size, rng):
+    write_file(project_dir, 'Godeps.json', json.dumps({
+        'ImportPath': 'example.com/bench', 'GoVersion': 'go1.19',
+        'Deps': [{'ImportPath': 'github.com/org{}/project-{}'.format(i % 40, i), 'Comment': 'v' + version_of(i),
+                  'Rev': '{:040x}'.format(i)} for i in range(0, size)]}, indent=2))
+
+
+def generate_requirements_txt(project_dir, size, rng):
+    operators = ['==', '>=', '~=', '<=']
+    write_file(project_dir, 'requirements.txt', ''.join(
+        'dist-{}{}{}\n'.format(i, operators[i % len(operators)], version_of(i)) for i in range(0, size)))
+
+
+def generate_environment_yml(project_dir, size, rng):
+    lines = ['name: bench', 'channels:', '  - conda-forge', 'dependencies:']
+    lines.extend('  - conda-{}={}'.format(i, version_of(i)) for i in range(0, size // 2))
+    lines.append('  - pip:')
+    lines.extend('    - dist-{}=={}'.format(i, version_of(i)) for i in range(size // 2, size))
+    write_file(project_dir, 'environment.yml', '\n'.join(lines) + '\n')
+
+
+def generate_packages_config(project_dir, size, rng):
+    write_file(project_dir, 'packages.config', '<?xml version="1.0" encoding="utf-8"?>\n<packages>\n' + ''.join(
+        '  <package id="Nuget.Package{}" version="{}" targetFramework="net48" />\n'.format(i, version_of(i))
+        for i in range(0, size)) + '</packages>\n')
+
+
+def generate_csproj(project_dir, size, rng):
+    write_file(project_dir, 'Bench.csproj', '<Project Sdk="Microsoft.NET.Sdk">\n  <ItemGroup>\n' + ''.join(
+        '    <PackageReference Include="Nuget.Package{}" Version="{}" />\n'.format(i, version_of(i))
+        for i in range(0, size)) + '  </ItemGroup>\n</Project>\n')
+
+
+def maven_dependency(i, version=True):
+    return ('<dependency><groupId>org.group{}</groupId><artifactId>artifact-{}</artifactId>{}</dependency>'
+            .format(i % 40, i, '<version>${{artifact-{}.version}}</version>'.format(i) if version else ''))
+
+
+def generate_pom_hierarchy(project_dir, size, rng):
+    # 父POM以属性与dependencyManagement管理版本, 各子模块引用其中的依赖
+    modules = max(1, size // 50)
+    header = '<project xmlns="http://maven.apache.org/POM/4.0.0"><modelVersion>4.0.0</modelVersion>'
+    properties = ''.join('<artifact-{0}.version>{1}</artifact-{0}.version>'.format(i, version_of(i))
+                         for i in range(0, size))
+    write_file(project_dir, 'pom.xml', header + '<groupId>com.bench</groupId><artifactId>parent</artifactId>'
+               '<version>1.0</version><packaging>pom</packaging>\n<modules>'
+               + ''.join('<module>module-{}</module>'.format(m) for m in range(0, modules)) + '</modules>\n'
+               '<properties>' + properties + '</properties>\n<dependencyManagement><dependencies>'
+               + '\n'.join(maven_dependency(i) for i in range(0, size)) + '</dependencies></dependencyManagement>'
+               '\n</project>\n')
+    for m in range(0, modules):
+        dependencies = sorted(set(rng.randrange(size) for _ in range(0, 50)))
+        write_file(project_dir, os.path.join('module-{}'.format(m), 'pom.xml'),
+                   header + '<parent><groupId>com.bench</groupId><artifactId>parent</artifactId><version>1.0</version>'
+                   '</parent><artifactId>module-{}</artifactId>\n<dependencies>'.format(m)
+                   + '\n'.join(maven_dependency(i, version=False) for i in dependencies)
+                   + '</dependencies>\n</project>\n')
+
+
+def generate_build_gradle(project_dir, size, rng):
+    configurations = ['implementation', 'api', 'testImplementation', 'runtimeOnly', 'compileOnly']
+    lines = ["plugins { id 'java' }", '', 'ext {', "    benchVersion = '1.0.0'", '}', '', 'dependencies {']
+    for i in range(0, size):
+        configuration = configurations[i % len(configurations)]
+        if i % 4 == 0:
+            lines.append("    {} group: 'org.group{}', name: 'artifact-{}', version: '{}'"
+                         .format(configuration, i % 40, i, version_of(i)))
+        elif i % 4 == 1:
+            lines.append('    {}("org.group{}:artifact-{}:{}")'.format(configuration, i % 40, i, version_of(i)))
+        elif i % 4 == 2:
+            lines.append('    {} "org.group{}:artifact-{}:$benchVersion"'.format(configuration, i % 40, i))
+        else:
+            lines.append("    {} 'org.group{}:artifact-{}:{}'".format(configuration, i % 40, i, version_of(i)))
+    lines.append('}')
+    write_file(project_dir, 'build.gradle', '\n'.join(lines) + '\n')
+
+
+def write_tree(lines, rng, size, markers, indent, node, depth, format_node, seen):
+    # markers: (子节点, 最后一个子节点, 每层缩进), 如maven的('+- ', '\\- ', '|  ')
+    marker, marker_last, step = markers
+    children = [j for j in random_dependencies(rng, node, size) if j not in seen][:3] if depth < 4 else list()
+    for index, child in enumerate(children):
+        seen.add(child)
+        lines.append(indent + (marker_last if index == len(children) - 1 else marker) + format_node(child))
+        write_tree(lines, rng, size, markers, indent + step, child, depth + 1, format_node, seen)
+
+
+def generate_maven_tree(project_dir, size, rng):
+    write_file(project_dir, 'pom.xml', '<project><modelVersion>4.0.0</modelVersion><groupId>com.bench</groupId>'
+                                       '<artifactId>bench</artifactId><version>1.0</version></project>\n')
+    lines = ['com.bench:bench:jar:1.0']
+    seen = set()
+    scopes = ['compile', 'runtime', 'test', 'provided']
+    for i in range(0, size):
+        if i in seen:
+            continue
+        seen.add(i)
+        lines.append('+- org.group{}:artifact-{}:jar:{}:{}'.format(i % 40, i, version_of(i), scopes[i % 4]))
+        write_tree(lines, rng, size, ('+- ', '\\- ', '|  '), '|  ', i, 1,
+                   lambda j: 'org.group{}:artifact-{}:jar:{}:{}'.format(j % 40, j, version_of(j), scopes[j % 4]),
+                   seen)
+    write_file(project_dir, 'maven_tree.txt', '\n'.join(lines) + '\n')
+
+
+def generate_gradle_tree(project_dir, size, rng):
+    generate_build_gradle(project_dir, min(size, 50), rng)
+    lines = list()
+    for configuration in ('compileClasspath', 'runtimeClasspath', 'testCompileClasspath'):
+        lines.append("{} - Compile classpath for source set 'main'.".format(configuration))
+        seen = set()
+        for i in range(0, size):
+            if i in seen:
+                continue
+            seen.add(i)
+            lines.append('+--- org.group{}:artifact-{}:{}'.format(i % 40, i, version_of(i)))
+            write_tree(lines, rng, size, ('+--- ', '\\--- ', '|    '), '|    ', i, 1,
+                       lambda j: 'org.group{}:artifact-{}:{}'.format(j % 40, j, version_of(j)), seen)
+        lines.append('')
+    write_file(project_dir, 'gradle_tree.txt', '\n'.join(lines) + '\n')
+
+
+# 名称: (生成函数, 是否按编译构建模式解析, 即解析构建脚本生成的依赖树文件)
+FIXTURES = {
+    'package-lock-v1': (generate_package_lock_v1, False),
+    'package-lock-v2': (generate_package_lock_v2, False),
+    'package-lock-v3': (generate_package_lock_v3, False),
+    'yarn-lock-v1': (generate_yarn_lock_v1, False),
+    'yarn-lock-berry': (generate_yarn_lock_berry, False),
+    'pnpm-lock': (generate_pnpm_lock, False),
+    'go-sum': (generate_go_sum, False),
+    'gopkg-lock': (generate_gopkg_lock, False),
+    'godeps-json': (generate_godeps_json, False),
+    'cargo-lock': (generate_cargo_lock, False),
+    'gemfile-lock': (generate_gemfile_lock, False),
+    'poetry-lock': (generate_poetry_lock, False),
+    'pipfile-lock': (generate_pipfile_lock, False),
+    'requirements-txt': (generate_requirements_txt, False),
+    'environment-yml': (generate_environment_yml, False),
+    'composer-lock': (generate_composer_lock, False),
+    'pubspec-lock': (generate_pubspec_lock, False),
+    'podfile-lock': (generate_podfile_lock, False),
+    'mix-lock': (generate_mix_lock, False),
+    'conan-lock': (generate_conan_lock, False),
+    'package-resolved': (generate_package_resolved, False),
+    'packages-config': (generate_packages_config, False),
+    'csproj': (generate_csproj, False),
+    'pom-hierarchy': (generate_pom_hierarchy, False),
+    'build-gradle': (generate_build_gradle, False),
+    'maven-tree': (generate_maven_tree, True),
+    'gradle-tree': (generate_gradle_tree, True)
+}
+
+
+def generate_fixture(name, project_dir, size, seed=0):
+    """
+    Write the synthetic project of fixture name, with about size components, into project_dir.
+    Returns whether it is parsed in build mode.
+    """
+    generator, is_build = FIXTURES[name]
+    os.makedirs(project_dir, exist_ok=True)
+    generator(project_dir, size, random.Random(seed))
+    return is_build
+
+
+def generate_monorepo(root_dir, size, names=None, seed=0):
+    """
+    A monorepo with one buildless project per fixture, each of about size components, under root_dir/<name>.
+    """
+    for name in names if names is not None else sorted(FIXTURES):
+        if not FIXTURES[name][1]:
+            generate_fixture(name=name, project_dir=os.path.join(root_dir, name), size=size, seed=seed)
+    return root_dir
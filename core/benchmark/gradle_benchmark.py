@@ -0,0 +1,386 @@
+import sys
+import random
+import argparse
+import tempfile
+import timeit
+import os
+
+from pygmars import Token
+from pygmars.parse import Parser
+from pygments import lex
+
+sys.path.append('.')
+sys.path.append('..')
+from core.benchmark.groovy_lexer import GroovyLexer
+from core.file_parsers.gradle_parser import parse_build_gradle_file, parse_version_str
+
+
+grammar = """
+    LIT-STRING: {<LITERAL-STRING-SINGLE|LITERAL-STRING-DOUBLE>}
+    PACKAGE-IDENTIFIER: {<OPERATOR> <TEXT>? <NAME-LABEL> <TEXT>? <LIT-STRING>}
+    DEPENDENCY-1: {<PACKAGE-IDENTIFIER>{3} <OPERATOR>}
+    DEPENDENCY-2: {<NAME> <TEXT> <LIT-STRING> <TEXT>}
+    DEPENDENCY-3: {<NAME> <TEXT>? <OPERATOR> <LIT-STRING> <OPERATOR>}
+    DEPENDENCY-4: {<NAME> <TEXT> <NAME-LABEL> <TEXT> <LIT-STRING> <PACKAGE-IDENTIFIER> <PACKAGE-IDENTIFIER> <OPERATOR>? <TEXT>}
+    DEPENDENCY-5: {<NAME> <TEXT> <NAME> <OPERATOR> <NAME-ATTRIBUTE>}
+    NESTED-DEPENDENCY-1: {<NAME> <OPERATOR> <DEPENDENCY-1>+ }
+"""
+
+
+def get_tokens(contents):
+    """
+    Yield tuples of (position, Token, value) from lexing a ``contents`` string.
+    """
+    for i, (token, value) in enumerate(lex(contents, GroovyLexer())):
+        yield i, token, value
+
+
+def get_pygmar_tokens(contents):
+    tokens = Token.from_pygments_tokens(get_tokens(contents))
+    for token in tokens:
+        if token.label == 'NAME' and token.value == 'dependencies':
+            token.label = 'DEPENDENCIES-START'
+        yield token
+
+
+def is_literal_string(string):
+    return string in ('LITERAL-STRING-SINGLE', 'LITERAL-STRING-DOUBLE')
+
+
+def remove_quotes(string):
+    """
+    Remove starting and ending quotes from ``string``.
+    If ``string`` has no starting or ending quotes, return ``string``.
+    """
+    quoted = lambda x: (
+        (x.startswith('"') and x.endswith('"'))
+        or (x.startswith("'") and x.endswith("'"))
+    )
+    if quoted:
+        return string[1:-1]
+    else:
+        return string
+
+
+def legacy_parse_build_gradle_file(filepath, logger):
+    # the pygments/pygmars implementation previously shipped in gradle_parser
+    """
+    Return dependency items based on parse tree.
+    """
+    dependencies = list()
+    in_dependency_block = False
+    brackets_counter = 0
+    first_bracket_seen = False
+
+    try:
+        with open(file=filepath, mode='r', encoding='utf-8') as file:
+            contents = file.read()
+
+        parser = Parser(grammar)
+        lexed_tokens = list(get_pygmar_tokens(contents))
+        parse_tree = parser.parse(lexed_tokens)
+
+    except Exception as e:
+        logger.error('Exception occurs when loading build.gradle file {}: {}'.format(filepath, str(e)))
+        return dependencies
+
+    if parse_tree:
+        # print(parse_tree)
+        for tree_node in parse_tree:
+            if tree_node.label == 'DEPENDENCIES-START':
+                in_dependency_block = True
+                continue
+
+            if in_dependency_block:
+                if tree_node.label.startswith('OPERATOR'):
+                    if tree_node.value == '{':
+                        if not first_bracket_seen:
+                            first_bracket_seen = True
+                        brackets_counter += 1
+                    elif tree_node.value == '}':
+                        brackets_counter -= 1
+
+                    if brackets_counter == 0 and first_bracket_seen:
+                        in_dependency_block = False
+                        continue
+
+                # NESTED DEPENDENCY 1
+                if tree_node.label == 'NESTED-DEPENDENCY-1':
+                    dependency = {}
+                    last_key = None
+                    for child_node in tree_node.leaves():
+                        if child_node.label == 'NAME-LABEL':
+                            value = child_node.value
+                            if value == 'group:':
+                                last_key = 'namespace'
+                            if value == 'name:':
+                                last_key = 'name'
+                            if value == 'version:':
+                                last_key = 'version'
+
+                        if is_literal_string(child_node.label):
+                            if last_key == 'version':
+                                try:
+                                    dependency[last_key] = parse_version_str(remove_quotes(child_node.value))
+                                except Exception as e:
+                                    logger.error(
+                                        'Exception occurs in function parse_version_str '
+                                        'when parsing build.gradle on {}: {}'.format(filepath, str(e)))
+                                    dependency[last_key] = ''
+                            else:
+                                dependency[last_key] = remove_quotes(child_node.value)
+
+                    if dependency and dependency['namespace']:
+                        dependency['name'] = dependency['namespace'] + '/' + dependency['name']
+                        dependency['type'] = 'maven'
+                        dependency['language'] = 'Java'
+                        dependencies.append(dependency)
+
+                # DEPENDENCY 1-5
+                if tree_node.label == 'DEPENDENCY-1':
+                    name_label_to_dep_field_name = {
+                        'group:': 'namespace',
+                        'name:': 'name',
+                        'version:': 'version'
+                    }
+                    dependency = {}
+                    last_key = None
+                    for child_node in tree_node.leaves():
+                        value = child_node.value
+                        if child_node.label == 'NAME-LABEL':
+                            last_key = name_label_to_dep_field_name.get(value, '')
+                        if is_literal_string(child_node.label):
+                            if last_key:
+                                if last_key == 'version':
+                                    try:
+                                        dependency[last_key] = parse_version_str(remove_quotes(value))
+                                    except Exception as e:
+                                        logger.error(
+                                            'Exception occurs in function parse_version_str '
+                                            'when parsing build.gradle on {}: {}'.format(filepath, str(e)))
+                                        dependency[last_key] = ''
+                                else:
+                                    dependency[last_key] = remove_quotes(value)
+
+                    if dependency and dependency['namespace']:
+                        dependency['name'] = dependency['namespace'] + '/' + dependency['name']
+                        dependency['type'] = 'maven'
+                        dependency['language'] = 'Java'
+                        dependencies.append(dependency)
+
+                if tree_node.label == 'DEPENDENCY-2':
+                    dependency = {}
+                    for child_node in tree_node.leaves():
+                        if is_literal_string(child_node.label):
+                            value = child_node.value
+                            value = remove_quotes(value)
+
+                            namespace = ''
+                            name = ''
+                            version = ''
+                            split_value = value.split(':')
+                            split_value_length = len(split_value)
+                            if split_value_length == 4:
+                                # We are assuming `value` is in the form of "namespace:name:version:module"
+                                # We are currently not reporting down to the module level
+                                namespace, name, version, _ = split_value
+                            if split_value_length == 3:
+                                # We are assuming `value` is in the form of "namespace:name:version"
+                                namespace, name, version = split_value
+                            if split_value_length == 2:
+                                # We are assuming `value` is in the form of "namespace:name"
+                                namespace, name = split_value
+
+                            dependency['namespace'] = namespace
+                            dependency['name'] = name
+                            try:
+                                dependency['version'] = parse_version_str(version)
+                            except Exception as e:
+                                logger.error(
+                                    'Exception occurs in function parse_version_str '
+                                    'when parsing build.gradle on {}: {}'.format(filepath, str(e)))
+                                dependency['version'] = ''
+
+                    if dependency and dependency['namespace']:
+                        if dependency['namespace'] == 'pypi':
+                            dependency['namespace'] = ''
+                            dependency['type'] = 'pypi'
+                            dependency['language'] = 'Python'
+                        else:
+                            dependency['name'] = dependency['namespace'] + '/' + dependency['name']
+                            dependency['type'] = 'maven'
+                            dependency['language'] = 'Java'
+                        dependencies.append(dependency)
+
+                if tree_node.label == 'DEPENDENCY-3':
+                    dependency = {}
+                    for child_node in tree_node.leaves():
+                        if is_literal_string(child_node.label):
+
+                            value = child_node.value
+                            value = remove_quotes(value)
+
+                            # We are assuming `value` is in the form of "namespace:name:version"
+                            split_dependency_string = value.split(':')
+                            length = len(split_dependency_string)
+                            if length == 3:
+                                namespace, name, version = split_dependency_string
+                                dependency['namespace'] = namespace
+                                dependency['name'] = name
+                                try:
+                                    dependency['version'] = parse_version_str(version)
+                                except Exception as e:
+                                    logger.error(
+                                        'Exception occurs in function parse_version_str '
+                                        'when parsing build.gradle on {}: {}'.format(filepath, str(e)))
+                                    dependency['version'] = ''
+                            elif length == 2:
+                                namespace, name = split_dependency_string
+                                dependency['namespace'] = namespace
+                                dependency['name'] = name
+                                dependency['version'] = ''
+
+                    if dependency and dependency['namespace']:
+                        if dependency['namespace'] == 'pypi':
+                            dependency['namespace'] = ''
+                            dependency['type'] = 'pypi'
+                            dependency['language'] = 'Python'
+                        else:
+                            dependency['name'] = dependency['namespace'] + '/' + dependency['name']
+                            dependency['type'] = 'maven'
+                            dependency['language'] = 'Java'
+                        dependencies.append(dependency)
+
+                if tree_node.label == 'DEPENDENCY-4':
+                    dependency = {}
+                    last_key = None
+                    for child_node in tree_node.leaves():
+                        if child_node.label == 'NAME-LABEL':
+                            value = child_node.value
+                            if value == 'group:':
+                                last_key = 'namespace'
+                            if value == 'name:':
+                                last_key = 'name'
+                            if value == 'version:':
+                                last_key = 'version'
+                        if is_literal_string(child_node.label):
+                            if last_key == 'version':
+                                try:
+                                    dependency[last_key] = parse_version_str(remove_quotes(child_node.value))
+                                except Exception as e:
+                                    logger.error(
+                                        'Exception occurs in function parse_version_str '
+                                        'when parsing build.gradle on {}: {}'.format(filepath, str(e)))
+                                    dependency[last_key] = ''
+                            else:
+                                dependency[last_key] = remove_quotes(child_node.value)
+
+                    if dependency and dependency['namespace']:
+                        dependency['name'] = dependency['namespace'] + '/' + dependency['name']
+                        dependency['type'] = 'maven'
+                        dependency['language'] = 'Java'
+                        dependencies.append(dependency)
+
+                # if tree_node.label == 'DEPENDENCY-5':
+                #     dependency = {}
+                #     for child_node in tree_node.leaves():
+                #         if child_node.label == 'NAME-ATTRIBUTE':
+                #             dependency['name'] = child_node.value
+                #
+                #     if dependency:
+                #         dependency['type'] = 'maven'
+                #         dependency['namespace'] = ''
+                #         dependency['version'] = ''
+                #         dependency['language'] = 'Java'
+                #         dependencies.append(dependency)
+
+    file.close()
+    return dependencies
+
+
+def generate_build_gradle(size, kotlin=False, seed=0):
+    # a module build script: plugin/android/task configuration around one dependencies block
+    rng = random.Random(seed)
+    lines = list()
+    if kotlin:
+        lines.extend(['plugins {', '    id("com.android.application")', '    kotlin("android")', '}', ''])
+    else:
+        lines.extend(["plugins {", "    id 'com.android.application'", "    id 'kotlin-android'", "}", ""])
+    for i in range(0, max(1, size // 10)):
+        lines.append('android {' if i == 0 else 'tasks.register("task{}") {{'.format(i))
+        lines.append('    // configuration block {}'.format(i))
+        lines.append('    compileSdk = 33')
+        lines.append('    defaultConfig {')
+        lines.append('        applicationId = "com.example.app{}"'.format(i))
+        lines.append('        minSdk = 21')
+        lines.append('        testInstrumentationRunner = "androidx.test.runner.AndroidJUnitRunner"')
+        lines.append('    }')
+        lines.append('}')
+    lines.append('dependencies {')
+    configurations = ['implementation', 'api', 'testImplementation', 'runtimeOnly', 'compileOnly']
+    for i in range(0, size):
+        configuration = configurations[i % len(configurations)]
+        coordinate = 'com.example.group{}:artifact-{}:{}.{}.{}'.format(i % 40, i, i % 5, i % 11, i % 7)
+        form = rng.randrange(4)
+        if kotlin or form == 0:
+            lines.append('    {}("{}")'.format(configuration, coordinate))
+        elif form == 1:
+            lines.append("    {} '{}'".format(configuration, coordinate))
+        elif form == 2:
+            lines.append('    {} "{}"'.format(configuration, coordinate))
+        else:
+            group, name, version = coordinate.split(':')
+            lines.append("    {} group: '{}', name: '{}', version: '{}'".format(configuration, group, name, version))
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+
+class NullLogger(object):
+
+    def error(self, message):
+        print(message)
+
+
+def run_benchmark(size, repeat):
+    result = list()
+    for kotlin in (False, True):
+        file_name = 'build.gradle.kts' if kotlin else 'build.gradle'
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filepath = os.path.join(temp_dir, file_name)
+            with open(filepath, mode='w', encoding='utf-8') as f:
+                f.write(generate_build_gradle(size=size, kotlin=kotlin))
+            logger = NullLogger()
+            legacy_result = legacy_parse_build_gradle_file(filepath=filepath, logger=logger)
+            dep_result = parse_build_gradle_file(filepath=filepath, logger=logger)
+            if dep_result != legacy_result:
+                raise AssertionError('{} result mismatch: {} != {}'.format(file_name, len(dep_result),
+                                                                           len(legacy_result)))
+            timings = [
+                ('pygments', lambda: legacy_parse_build_gradle_file(filepath=filepath, logger=logger)),
+                ('scanner', lambda: parse_build_gradle_file(filepath=filepath, logger=logger))
+            ]
+            for parser_name, function in timings:
+                result.append({
+                    'file': file_name,
+                    'size_kb': os.path.getsize(filepath) / 1024,
+                    'parser': parser_name,
+                    'seconds': min(timeit.repeat(function, number=1, repeat=repeat)),
+                    'components': len(dep_result)
+                })
+    return result
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-size', default=500, required=False, type=int)
+    parser.add_argument('-repeat', default=3, required=False, type=int)
+    args_cmd = parser.parse_args()
+
+    bench_result = run_benchmark(size=args_cmd.size, repeat=args_cmd.repeat)
+    print('------------------------------------------------------------')
+    print('{:>18} {:>10} {:>10} {:>10} {:>12}'.format('file', 'size(KB)', 'parser', 'seconds', 'components'))
+    for item in bench_result:
+        print('{:>18} {:>10.0f} {:>10} {:>10.4f} {:>12}'.format(item['file'], item['size_kb'], item['parser'],
+                                                               item['seconds'], item['components']))
+    print('------------------------------------------------------------')
@@ -0,0 +1,96 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+# 扫描目录(core)
+CORE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 解析模块依赖的较重的第三方库
+HEAVY_MODULES = ['pygments', 'pygmars', 'pip_requirements_parser', 'packaging', 'dparse2', 'toml', 'yaml', 'chardet']
+
+EAGER_IMPORT = '''
+import importlib
+from core.file_parsers.registry import registry
+for module_name in registry.parser_modules:
+    importlib.import_module(module_name)
+'''
+SCAN_PROJECT = '''
+import logging
+logging.disable(logging.INFO)
+from scan import scan_api
+scan_api(check_dir={check_dir!r}, output_dir={output_dir!r}, use_cache=False)
+'''
+
+
+def generate_projects(root_dir):
+    projects = {
+        'go': {'go.mod': 'module example.com/app\n\ngo 1.19\n\nrequire github.com/pkg/errors v0.9.1\n'},
+        'npm': {'package.json': '{"name": "app", "version": "1.0.0", "dependencies": {"left-pad": "1.3.0"}}\n'},
+        'pypi': {'requirements.txt': 'requests==2.28.1\nclick>=8.0\n'}
+    }
+    for name, files in projects.items():
+        os.makedirs(os.path.join(root_dir, name))
+        for file_name, content in files.items():
+            with open(os.path.join(root_dir, name, file_name), mode='w', encoding='utf-8') as f:
+                f.write(content)
+    return sorted(projects)
+
+
+def run_importtime(code):
+    """
+    Run code in a fresh interpreter under -X importtime, return (wall seconds, import seconds, loaded modules).
+    importlib.import_module, used for the parser modules, is not timed by -X importtime (the imports it triggers
+    are), so the loaded modules are read from sys.modules.
+    """
+    code = 'import sys; sys.path.append(".."); ' + code + '\nprint("\\n".join(sys.modules))'
+    command = [sys.executable, '-X', 'importtime', '-c', code]
+    start_time = time.perf_counter()
+    process = subprocess.run(command, cwd=CORE_DIR, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                             universal_newlines=True, check=True)
+    wall_time = time.perf_counter() - start_time
+    import_time = 0
+    for line in process.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if line.startswith('import time:') and 'self [us]' not in line:
+            import_time += int(line[len('import time:'):].split('|')[0])
+    return wall_time, import_time / 1000000, set(process.stdout.splitlines())
+
+
+def run_benchmark(repeat):
+    result = list()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        scenarios = [('import scan', 'import scan'), ('import scan + all parsers', 'import scan\n' + EAGER_IMPORT)]
+        for name in generate_projects(temp_dir):
+            code = SCAN_PROJECT.format(check_dir=os.path.join(temp_dir, name),
+                                       output_dir=os.path.join(temp_dir, 'output'))
+            scenarios.append(('scan {} project'.format(name), code))
+
+        for scenario, code in scenarios:
+            runs = [run_importtime(code) for _ in range(0, repeat)]
+            modules = runs[0][2]
+            result.append({
+                'scenario': scenario,
+                'wall_seconds': min(wall_time for wall_time, _, _ in runs),
+                'import_seconds': min(import_time for _, import_time, _ in runs),
+                'modules': len(modules),
+                'heavy': [module for module in HEAVY_MODULES if module in modules]
+            })
+    return result
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-repeat', default=5, required=False, type=int)
+    args_cmd = parser.parse_args()
+
+    bench_result = run_benchmark(repeat=args_cmd.repeat)
+    print('------------------------------------------------------------')
+    print('{:>26} {:>8} {:>10} {:>8}  {}'.format('scenario', 'wall(s)', 'import(s)', 'modules', 'heavy modules'))
+    for item in bench_result:
+        print('{:>26} {:>8.3f} {:>10.3f} {:>8}  {}'.format(item['scenario'], item['wall_seconds'],
+                                                           item['import_seconds'], item['modules'],
+                                                           ', '.join(item['heavy'])))
+    print('------------------------------------------------------------')
@@ -0,0 +1,211 @@
+import os
+import gc
+import sys
+import json
+import time
+import timeit
+import logging
+import argparse
+import platform
+import tempfile
+import tracemalloc
+
+sys.path.append('.')
+sys.path.append('..')
+from log import Logger
+from detect import construct_candidate_file_list
+from core.document_cache import DocumentCache
+from core.dep_graph import DependencyGraph
+from core.file_parsers.file_parsers import parse_config_files
+from core.file_parsers.registry import registry
+from core.benchmark.fixtures import FIXTURES, generate_fixture, generate_monorepo
+
+# 相对基线的耗时或内存增长超过该比例时视为性能退化
+DEFAULT_THRESHOLD = 0.2
+# 短于该秒数的耗时差异视为测量噪声
+NOISE_SECONDS = 0.005
+
+
+def get_dir_size(dir_path):
+    total = 0
+    for root, _, files in os.walk(dir_path):
+        for file_name in files:
+            total += os.path.getsize(os.path.join(root, file_name))
+    return total
+
+
+def measure_peak(function):
+    # tracemalloc单独运行一次, 不影响耗时的测量
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_fixture(name, project_dir, size, repeat):
+    is_build = generate_fixture(name=name, project_dir=project_dir, size=size)
+    root_name = os.path.split(project_dir)[-1]
+    logger = Logger(cmd_level=logging.CRITICAL, file_level=logging.ERROR)
+    search_result = construct_candidate_file_list(scan_dir=project_dir, root_name=root_name, search_depth=3,
+                                                  logger=logger)
+    build_result = [{'build_type': build_type, 'build_status': 'success'} for build_type in registry.build_types]
+
+    def parse():
+        parse_result = parse_config_files(scan_dir=project_dir, root_name=root_name, is_skip=False,
+                                          is_build=is_build, build_result=build_result if is_build else None,
+                                          search_result=search_result, logger=logger,
+                                          document_cache=DocumentCache(), dep_graph=DependencyGraph())
+        return sum(len(dep_result) for dep_result in parse_result.values())
+
+    # 首次运行导入解析模块, 不计入
+    components = parse()
+    seconds = min(timeit.repeat(parse, number=1, repeat=repeat))
+    return {
+        'fixture': name,
+        'files': len(search_result),
+        'bytes': get_dir_size(project_dir),
+        'components': components,
+        'seconds': seconds,
+        'peak_bytes': measure_peak(parse),
+        # 生成的文件应能被完整解析
+        'errors': len(logger.pop_diagnostics())
+    }
+
+
+def bench_scan(root_dir, size, workers, repeat, names=None):
+    from scan import scan_api
+    generate_monorepo(root_dir=os.path.join(root_dir, 'monorepo'), size=size, names=names)
+    output_dir = os.path.join(root_dir, 'output')
+
+    def scan():
+        return scan_api(check_dir=os.path.join(root_dir, 'monorepo'), output_dir=output_dir, workers=workers,
+                        use_cache=False, with_timing=True)
+
+    logging.disable(logging.INFO)
+    try:
+        runs = list()
+        for _ in range(0, repeat):
+            start_time = time.perf_counter()
+            success, result, message, timing = scan()
+            runs.append((time.perf_counter() - start_time, success, len(result), timing))
+        # 进程池中的解析不在tracemalloc的统计范围内
+        peak_bytes = measure_peak(scan) if workers <= 1 else None
+    finally:
+        logging.disable(logging.NOTSET)
+    seconds, success, components, timing = min(runs, key=lambda run: run[0])
+    return {
+        'fixture': 'scan_api',
+        'files': len(timing['files']),
+        'bytes': get_dir_size(os.path.join(root_dir, 'monorepo')),
+        'components': components,
+        'seconds': seconds,
+        'peak_bytes': peak_bytes,
+        'errors': 0 if success else 1,
+        'stages': dict((stage['stage'], stage['wall_seconds']) for stage in timing['stages'])
+    }
+
+
+def run_benchmark(size, scan_size, workers, repeat, names):
+    result = list()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name in names:
+            result.append(bench_fixture(name=name, project_dir=os.path.join(temp_dir, name), size=size,
+                                        repeat=repeat))
+        if scan_size:
+            result.append(bench_scan(root_dir=temp_dir, size=scan_size, workers=workers, repeat=repeat,
+                                     names=[name for name in names if not FIXTURES[name][1]]))
+    return result
+
+
+def compare_with_baseline(bench_result, baseline, threshold):
+    """
+    Mark each result against the baseline run: the seconds and peak memory ratios, 'regression' when one of them
+    grew by more than threshold (and, for the time, by more than NOISE_SECONDS), 'changed' when the number of
+    components differs.
+    """
+    baseline_result = dict((item['fixture'], item) for item in baseline['result'])
+    regressions = 0
+    for item in bench_result:
+        previous = baseline_result.get(item['fixture'])
+        item['status'] = 'new'
+        if previous is None:
+            continue
+        item['seconds_ratio'] = item['seconds'] / previous['seconds'] if previous['seconds'] else None
+        item['peak_ratio'] = item['peak_bytes'] / previous['peak_bytes'] \
+            if item['peak_bytes'] and previous['peak_bytes'] else None
+        item['status'] = 'ok'
+        if item['components'] != previous['components']:
+            item['status'] = 'changed'
+        slower = item['seconds_ratio'] is not None and item['seconds_ratio'] > 1 + threshold \
+            and item['seconds'] - previous['seconds'] > NOISE_SECONDS
+        if slower or (item['peak_ratio'] is not None and item['peak_ratio'] > 1 + threshold):
+            item['status'] = 'regression'
+            regressions += 1
+    return regressions
+
+
+def format_ratio(ratio):
+    return '{:.2f}x'.format(ratio) if ratio is not None else '-'
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-size', default=5000, required=False, type=int)
+    parser.add_argument('-scan_size', default=500, required=False, type=int)
+    parser.add_argument('-workers', default=1, required=False, type=int)
+    parser.add_argument('-repeat', default=3, required=False, type=int)
+    parser.add_argument('-fixtures', default=None, required=False, type=str)
+    parser.add_argument('-save', default=None, required=False, type=str)
+    parser.add_argument('-baseline', default=None, required=False, type=str)
+    parser.add_argument('-threshold', default=DEFAULT_THRESHOLD, required=False, type=float)
+    args_cmd = parser.parse_args()
+
+    fixture_names = sorted(FIXTURES)
+    if args_cmd.fixtures:
+        fixture_names = [name.strip() for name in args_cmd.fixtures.split(',') if name.strip()]
+        unknown = [name for name in fixture_names if name not in FIXTURES]
+        if unknown:
+            parser.error('unknown fixtures: {}, available: {}'.format(', '.join(unknown), ', '.join(sorted(FIXTURES))))
+
+    bench_result = run_benchmark(size=args_cmd.size, scan_size=args_cmd.scan_size, workers=args_cmd.workers,
+                                 repeat=args_cmd.repeat, names=fixture_names)
+    meta = {'size': args_cmd.size, 'scan_size': args_cmd.scan_size, 'workers': args_cmd.workers,
+            'python': platform.python_version(), 'machine': platform.machine()}
+    regression_nums = 0
+    if args_cmd.baseline:
+        with open(args_cmd.baseline, mode='r', encoding='utf-8') as f:
+            baseline_data = json.load(f)
+        if baseline_data['meta'] != meta:
+            print('[WARN] baseline was run with {}, current run: {}'.format(baseline_data['meta'], meta))
+        regression_nums = compare_with_baseline(bench_result=bench_result, baseline=baseline_data,
+                                                threshold=args_cmd.threshold)
+    if args_cmd.save:
+        with open(args_cmd.save, mode='w', encoding='utf-8') as f:
+            f.write(json.dumps({'meta': meta, 'result': bench_result}, indent=4))
+
+    print('------------------------------------------------------------')
+    print('{} components per fixture, {} per scan_api project'.format(args_cmd.size, args_cmd.scan_size))
+    print('{:>18} {:>6} {:>9} {:>11} {:>9} {:>9} {:>9} {:>7}'.format(
+        'fixture', 'files', 'size(MB)', 'components', 'seconds', 'MB/s', 'peak(MB)', 'errors')
+        + ('  {:>8} {:>8}  {}'.format('time', 'memory', 'status') if args_cmd.baseline else ''))
+    for item in bench_result:
+        peak = '{:.1f}'.format(item['peak_bytes'] / 1024 / 1024) if item['peak_bytes'] is not None else '-'
+        line = '{:>18} {:>6} {:>9.2f} {:>11} {:>9.3f} {:>9.2f} {:>9} {:>7}'.format(
+            item['fixture'], item['files'], item['bytes'] / 1024 / 1024, item['components'], item['seconds'],
+            item['bytes'] / 1024 / 1024 / item['seconds'] if item['seconds'] else 0, peak, item['errors'])
+        if args_cmd.baseline:
+            line += '  {:>8} {:>8}  {}'.format(format_ratio(item.get('seconds_ratio')),
+                                               format_ratio(item.get('peak_ratio')), item['status'])
+        print(line)
+    for item in bench_result:
+        if 'stages' in item:
+            print('scan_api stages: ' + ', '.join('{} {:.3f}s'.format(stage, seconds)
+                                                  for stage, seconds in item['stages'].items()))
+    print('------------------------------------------------------------')
+    if regression_nums:
+        print('{} regressions above {:.0%}'.format(regression_nums, args_cmd.threshold))
+        sys.exit(1)
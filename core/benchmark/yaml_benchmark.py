@@ -0,0 +1,117 @@
+import sys
+import random
+import argparse
+import timeit
+
+import yaml
+
+sys.path.append('.')
+sys.path.append('..')
+from core.yaml_loader import HAS_LIBYAML, load_yaml
+
+
+def generate_pnpm_lock(size, seed=0):
+    rng = random.Random(seed)
+    lines = ['lockfileVersion: 5.4', '', 'importers:', '']
+    for i in range(0, max(1, size // 20)):
+        lines.append('  packages/app-{}:'.format(i))
+        lines.append('    specifiers:')
+        for j in range(0, 20):
+            lines.append('      dep-{}: ^1.{}.0'.format(rng.randrange(size), j))
+        lines.append('    dependencies:')
+        for j in range(0, 20):
+            lines.append('      dep-{}: 1.{}.0'.format(rng.randrange(size), j))
+    lines.extend(['', 'packages:', ''])
+    for i in range(0, size):
+        lines.append('  /dep-{0}/1.{1}.0:'.format(i, i % 20))
+        lines.append('    resolution: {{integrity: sha512-{}==}}'.format('A' * 86))
+        lines.append('    engines: {node: \'>=12\'}')
+        lines.append('    dependencies:')
+        for _ in range(0, rng.randint(0, 4)):
+            lines.append('      dep-{}: 1.0.0'.format(rng.randrange(size)))
+        if i % 3 == 0:
+            lines.append('    dev: true')
+        else:
+            lines.append('    dev: false')
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def generate_pubspec_lock(size):
+    lines = ['# Generated by pub', '# See https://dart.dev/tools/pub/glossary#lockfile', 'packages:']
+    for i in range(0, size):
+        lines.append('  package_{}:'.format(i))
+        lines.append('    dependency: {}'.format('"direct main"' if i % 4 == 0 else 'transitive'))
+        lines.append('    description:')
+        lines.append('      name: package_{}'.format(i))
+        lines.append('      url: "https://pub.dartlang.org"')
+        lines.append('    source: hosted')
+        lines.append('    version: "1.{}.{}"'.format(i % 10, i % 7))
+    lines.extend(['sdks:', '  dart: ">=2.17.0 <3.0.0"', '  flutter: ">=3.0.0"'])
+    return '\n'.join(lines)
+
+
+def generate_podfile_lock(size, seed=0):
+    rng = random.Random(seed)
+    lines = ['PODS:']
+    for i in range(0, size):
+        lines.append('  - Pod{} (1.{}.0):'.format(i, i % 9))
+        for _ in range(0, rng.randint(0, 3)):
+            lines.append('    - Pod{} (~> 1.0)'.format(rng.randrange(size)))
+    lines.append('')
+    lines.append('DEPENDENCIES:')
+    for i in range(0, size, 5):
+        lines.append('  - Pod{}'.format(i))
+    lines.append('')
+    lines.append('SPEC CHECKSUMS:')
+    for i in range(0, size):
+        lines.append('  Pod{}: {:040x}'.format(i, i))
+    lines.extend(['', 'PODFILE CHECKSUM: {:040x}'.format(size), '', 'COCOAPODS: 1.11.3'])
+    return '\n'.join(lines)
+
+
+FIXTURES = [
+    # (name, generator, top level keys consumed by the parser)
+    ('pnpm-lock.yaml', generate_pnpm_lock, ('packages',)),
+    ('pubspec.lock', generate_pubspec_lock, ('packages',)),
+    ('Podfile.lock', generate_podfile_lock, ('PODS',)),
+]
+
+
+def run_benchmark(size, repeat):
+    result = list()
+    for file_name, generator, keys in FIXTURES:
+        text = generator(size)
+        legacy_data = yaml.load(text, yaml.SafeLoader)
+        if load_yaml(text, keys=keys)[keys[0]] != legacy_data[keys[0]]:
+            raise AssertionError('{} loaded section mismatch'.format(file_name))
+        timings = [
+            ('SafeLoader', lambda: yaml.load(text, yaml.SafeLoader)),
+            ('load_yaml', lambda: load_yaml(text)),
+            ('load_yaml+keys', lambda: load_yaml(text, keys=keys))
+        ]
+        for loader_name, function in timings:
+            result.append({
+                'file': file_name,
+                'size_kb': len(text) / 1024,
+                'loader': loader_name,
+                'seconds': min(timeit.repeat(function, number=1, repeat=repeat))
+            })
+    return result
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-size', default=20000, required=False, type=int)
+    parser.add_argument('-repeat', default=3, required=False, type=int)
+    args_cmd = parser.parse_args()
+
+    bench_result = run_benchmark(size=args_cmd.size, repeat=args_cmd.repeat)
+    print('------------------------------------------------------------')
+    print('libyaml: {}'.format(HAS_LIBYAML))
+    print('{:>16} {:>10} {:>16} {:>10}'.format('file', 'size(KB)', 'loader', 'seconds'))
+    for item in bench_result:
+        print('{:>16} {:>10.0f} {:>16} {:>10.3f}'.format(item['file'], item['size_kb'], item['loader'],
+                                                         item['seconds']))
+    print('------------------------------------------------------------')
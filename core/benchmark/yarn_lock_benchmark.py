@@ -0,0 +1,149 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import resource
+import multiprocessing
+
+sys.path.append('.')
+sys.path.append('..')
+from core.dedup import remove_duplicate_components
+from core.file_parsers.yarn_lock_parser import parse_yarn_lock_file
+
+
+def legacy_parse_yarn_lock_file(filepath, logger):
+    # the readlines()/per-block list implementation previously shipped in yarn_lock_parser
+    dependencies = list()
+    try:
+        with open(file=filepath, mode='r', encoding='utf-8') as file:
+            lines = file.readlines()
+    except Exception as e:
+        logger.error('Exception occurs when loading yarn.lock file {}: {}'.format(filepath, str(e)))
+        return dependencies
+
+    item = list()
+    for line in lines:
+        if line != '\n':
+            item.append(line.strip())
+        else:
+            if item:
+                temp = dict()
+                temp['type'] = 'npm'
+                temp['namespace'] = ''
+                temp['name'] = ''
+                temp['version'] = ''
+                temp['language'] = 'Node JS'
+                for text in item:
+                    if text.endswith(':') and text != 'dependencies:':
+                        split_text = text.split(',')[0].split('@')
+                        if len(split_text) > 2:
+                            temp['name'] = '@' + split_text[1]
+                        else:
+                            temp['name'] = split_text[0].strip('"')
+                    elif 'version' in text:
+                        temp['version'] = text.split(' ')[-1].strip('"')
+                if temp['name'] and temp['version']:
+                    dependencies.append(temp)
+            item = list()
+    return remove_duplicate_components(data_list=dependencies)
+
+
+def generate_yarn_lock(filepath, size, berry=False, seed=0):
+    rng = random.Random(seed)
+    with open(filepath, mode='w', encoding='utf-8') as f:
+        if berry:
+            f.write('# This file is generated by running "yarn install" inside your project.\n\n'
+                    '__metadata:\n  version: 6\n  cacheKey: 8\n\n')
+        else:
+            f.write('# THIS IS AN AUTOGENERATED FILE. DO NOT EDIT THIS FILE DIRECTLY.\n# yarn lockfile v1\n\n\n')
+        for i in range(0, size):
+            name = '@scope{}/package-{}'.format(i % 50, i) if i % 3 == 0 else 'package-{}'.format(i)
+            version = '{}.{}.{}'.format(i % 5, i % 17, i % 29)
+            ranges = ['^{}'.format(version), '~{}'.format(version)][:rng.randint(1, 2)]
+            dependencies = ['package-{}'.format(rng.randrange(size)) for _ in range(rng.randint(0, 4))]
+            if berry:
+                f.write('"{}":\n'.format(', '.join('{}@npm:{}'.format(name, r) for r in ranges)))
+                f.write('  version: {}\n'.format(version))
+                f.write('  resolution: "{}@npm:{}"\n'.format(name, version))
+                if dependencies:
+                    f.write('  dependencies:\n')
+                    for dependency in dependencies:
+                        f.write('    {}: ^1.0.0\n'.format(dependency))
+                f.write('  checksum: {:064x}\n  languageName: node\n  linkType: hard\n\n'.format(i))
+            else:
+                f.write('{}:\n'.format(', '.join('"{}@{}"'.format(name, r) for r in ranges)))
+                f.write('  version "{}"\n'.format(version))
+                f.write('  resolved "https://registry.yarnpkg.com/{0}/-/{0}-{1}.tgz#{2:040x}"\n'
+                        .format(name, version, i))
+                f.write('  integrity sha512-{}==\n'.format('A' * 86))
+                if dependencies:
+                    f.write('  dependencies:\n')
+                    for dependency in dependencies:
+                        f.write('    {} "^1.0.0"\n'.format(dependency))
+                f.write('\n')
+
+
+class NullLogger(object):
+
+    def error(self, message):
+        print(message)
+
+
+def measure(function_name, filepath, queue):
+    # runs in a fresh spawned interpreter, so ru_maxrss is the peak of this parser alone
+    function = parse_yarn_lock_file if function_name == 'streaming' else legacy_parse_yarn_lock_file
+    start = time.perf_counter()
+    dep_result = function(filepath=filepath, logger=NullLogger())
+    seconds = time.perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((seconds, peak_rss, len(dep_result)))
+
+
+def run_measure(function_name, filepath):
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=measure, args=(function_name, filepath, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def run_benchmark(size, berry, repeat):
+    fd, filepath = tempfile.mkstemp(suffix='.lock')
+    os.close(fd)
+    try:
+        generate_yarn_lock(filepath=filepath, size=size, berry=berry)
+        result = list()
+        for function_name in ('legacy', 'streaming'):
+            runs = [run_measure(function_name=function_name, filepath=filepath) for _ in range(0, repeat)]
+            result.append({
+                'parser': function_name,
+                'seconds': min(run[0] for run in runs),
+                'peak_rss_kb': min(run[1] for run in runs),
+                'components': runs[0][2]
+            })
+        return os.path.getsize(filepath), result
+    finally:
+        os.remove(filepath)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-size', default=100000, required=False, type=int)
+    parser.add_argument('-berry', default=False, required=False, action='store_true')
+    parser.add_argument('-repeat', default=3, required=False, type=int)
+    args_cmd = parser.parse_args()
+
+    file_size, bench_result = run_benchmark(size=args_cmd.size, berry=args_cmd.berry, repeat=args_cmd.repeat)
+    print('------------------------------------------------------------')
+    print('{} entries, {} format, {:.1f} MB'.format(args_cmd.size, 'berry' if args_cmd.berry else 'v1',
+                                                     file_size / 1024 / 1024))
+    print('{:>10} {:>12} {:>14} {:>12}'.format('parser', 'seconds', 'peak rss(MB)', 'components'))
+    for item in bench_result:
+        print('{:>10} {:>12.3f} {:>14.1f} {:>12}'.format(item['parser'], item['seconds'],
+                                                         item['peak_rss_kb'] / 1024, item['components']))
+    print('------------------------------------------------------------')
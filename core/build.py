@@ -1,105 +1,245 @@
 import os
+import time
 import shutil
-import json
+import signal
+import threading
 import subprocess
 
 from config import Config as cf
-from util import is_build_gradle_file, check_pubspec_type, config_stack_programs_location
-
-with open(os.path.join(cf.executables, 'mapper.json'), mode='r', encoding='utf-8') as f:
-    mapper = json.load(f)
-
-
-def get_key(mapper_dict, value):
-    return [k for k, v in mapper_dict.items() if value in v]
-
-
-def bash_builder(item, executable_name, logger):
-
-    bash_dir = os.path.join(cf.executables, executable_name, 'scripts.sh')
-    command_dir = os.path.split(item['file_path_absolute'])[0]
-    build_file = item['file_name']
-
-    if os.path.exists(bash_dir) and os.path.exists(command_dir):
-        command = 'bash ' + bash_dir + ' ' + command_dir
+from util import check_pubspec_type, config_stack_programs_location
+from core.file_parsers.registry import registry
+
+# 共享同一工具缓存的构建脚本不能并发执行, e.g. two Gradle builds sharing ~/.gradle
+BUILD_TOOL_CACHE = {
+    'Cargo': 'cargo',
+    'Composer': 'composer',
+    'Conan': 'conan',
+    'Cpan_Cli': 'cpanm',
+    'Dart_Pub': 'pub',
+    'Gemlock': 'bundler',
+    'Go_Mod_Cli': 'go',
+    'Gradle': 'gradle',
+    'Leiningen': 'maven',
+    'Maven_Pom': 'maven',
+    'Mix': 'hex',
+    'NPM_Cli': 'npm',
+    'Rebar': 'rebar3',
+    'Sbt': 'ivy',
+    'Stack': 'stack',
+    'Swift': 'swiftpm'
+}
+POLL_INTERVAL = 0.2
+KILL_GRACE_PERIOD = 5
+# 本进程内各扫描(如并发的scan_api线程)正在使用的构建目录与工具缓存
+_busy_resources = set()
+_busy_lock = threading.Lock()
+
+
+def acquire_resources(resources):
+    with _busy_lock:
+        if _busy_resources.intersection(resources):
+            return False
+        _busy_resources.update(resources)
+        return True
+
+
+def release_resources(resources):
+    with _busy_lock:
+        _busy_resources.difference_update(resources)
+
+
+class BuildJob(object):
+    def __init__(self, item, executable_name, scan_dir):
+        self.item = item
+        self.executable_name = executable_name
+        self.build_type = executable_name.split(os.sep)[0]
+        self.scan_dir = scan_dir
+        self.bash_dir = os.path.join(cf.executables, executable_name, 'scripts.sh')
+        self.command_dir = os.path.split(item['file_path_absolute'])[0]
+        self.process = None
+        self.start_time = None
+        self.build_data = None
+
+    @property
+    def resources(self):
+        resources = ['dir:' + self.command_dir, 'cache:' + BUILD_TOOL_CACHE.get(self.build_type, self.build_type)]
+        if self.build_type == 'Stack':
+            # all Stack builds share the ghc_programs directory under scan_dir
+            resources.append('dir:' + os.path.join(self.scan_dir, 'ghc_programs'))
+        return resources
+
+    def start(self, logger):
+        self.start_time = time.time()
+        if not (os.path.exists(self.bash_dir) and os.path.exists(self.command_dir)):
+            logger.error('Subprocess failure: {} build script does not exist on {}'.format(self.executable_name,
+                                                                                          self.bash_dir))
+            self.finish(build_status='failure')
+            return False
+
+        if self.build_type == 'Stack':
+            ghc_location = os.path.join(self.scan_dir, 'ghc_programs')
+            if not os.path.exists(ghc_location):
+                os.makedirs(ghc_location)
+
+        command = 'bash ' + self.bash_dir + ' ' + self.command_dir
         command_params = command.split()
+        # 独立进程组, 超时时可以结束构建脚本派生的所有子进程
+        self.process = subprocess.Popen(command_params, shell=False, start_new_session=True)
+        return True
 
-        p = subprocess.Popen(command_params, shell=False)
-        p.communicate()
-        returncode = p.returncode
-        if returncode == 0:
-            build_status = 'success'
-        else:
-            build_status = 'failure'
-            logger.error('Subprocess failure: {} build script execution failed on {}'.format(executable_name,
-                                                                                       item['file_path_absolute']))
-    else:
-        build_status = 'failure'
-        logger.error('Subprocess failure: {} build script does not exist on {}'.format(executable_name, bash_dir))
-
-    build_data = {
-        'build_dir': command_dir,
-        'build_file': build_file,
-        'build_type': executable_name,
-        'build_status': build_status
-    }
-    return build_data
-
-
-def build_with_scripts(scan_dir, search_result, logger):
+    def kill(self):
+        try:
+            os.killpg(self.process.pid, signal.SIGTERM)
+            try:
+                self.process.wait(timeout=KILL_GRACE_PERIOD)
+            except subprocess.TimeoutExpired:
+                os.killpg(self.process.pid, signal.SIGKILL)
+                self.process.wait()
+        except ProcessLookupError:
+            pass
+
+    def finish(self, build_status):
+        self.build_data = {
+            'build_dir': self.command_dir,
+            'build_file': self.item['file_name'],
+            'build_type': self.executable_name,
+            'build_status': build_status,
+            'build_time': round(time.time() - self.start_time, 3)
+        }
+
+        if self.build_type == 'Leiningen':
+            pom_file = os.path.join(self.command_dir, 'pom.xml')
+            if os.path.exists(pom_file):
+                os.remove(pom_file)
+        elif self.build_type == 'Stack':
+            ghc_location = os.path.join(self.scan_dir, 'ghc_programs')
+            if os.path.exists(ghc_location):
+                shutil.rmtree(ghc_location)
+
+
+def construct_build_job(scan_dir, item, logger, document_cache=None, directory_index=None):
+
+    handler = registry.match_path(item['file_path_absolute'])
+    if not (handler and handler.build_executable):
+        return None
+
+    executable_name = handler.build_executable
+    if executable_name == 'Dart_Pub':
+        pubspec_type = check_pubspec_type(filepath=item['file_path_absolute'], logger=logger,
+                                          document_cache=document_cache)
+        executable_name = os.path.join(executable_name, pubspec_type)
+    elif executable_name == 'Go_Mod_Cli':
+        sum_file = os.path.join(os.path.split(item['file_path_absolute'])[0], 'go.sum')
+        if not (directory_index.is_file(sum_file) if directory_index is not None else os.path.exists(sum_file)):
+            logger.warn('Subprocess failure: Go_Mod_Cli build script can not be executed: missing go.sum '
+                        'file on: {}'.format(os.path.split(item['file_path_absolute'])[0]))
+            return None
+    elif executable_name == 'Stack':
+        # config project stack.yaml
+        ghc_location = os.path.join(scan_dir, 'ghc_programs')
+        if not config_stack_programs_location(filepath=item['file_path_absolute'], ghc_location=ghc_location,
+                                              logger=logger, document_cache=document_cache):
+            return None
+    return BuildJob(item=item, executable_name=executable_name, scan_dir=scan_dir)
+
+
+def run_build_jobs(build_jobs, workers, timeout, logger):
+    """
+    Run build jobs with at most ``workers`` scripts at a time.
+    Jobs sharing a build directory or a tool cache never run concurrently, also across the scans running in this
+    process, and a job running longer than ``timeout`` seconds has its process group killed.
+    """
+    pending = list(build_jobs)
+    running = list()
+    workers = max(1, workers)
+    try:
+        run_pending_jobs(pending=pending, running=running, workers=workers, timeout=timeout, logger=logger)
+    finally:
+        # 扫描被中断(e.g. SystemExit)时, 先结束仍在运行的构建脚本再释放其占用的资源
+        for job in running:
+            if job.process.poll() is None:
+                job.kill()
+            release_resources(job.resources)
+    return build_jobs
+
+
+def run_pending_jobs(pending, running, workers, timeout, logger):
+    while pending or running:
+        # start every pending job whose resources are free, in search_result order
+        for job in list(pending):
+            if len(running) >= workers:
+                break
+            if not acquire_resources(job.resources):
+                continue
+            pending.remove(job)
+            try:
+                if job.start(logger=logger):
+                    running.append(job)
+                else:
+                    release_resources(job.resources)
+            except Exception as e:
+                release_resources(job.resources)
+                logger.error('Exception occurs in function build_with_scripts when executing build script on {}: {}'
+                             .format(job.item['file_path_absolute'], str(e)))
+                job.finish(build_status='failure')
+
+        time.sleep(POLL_INTERVAL)
+
+        for job in list(running):
+            returncode = job.process.poll()
+            if returncode is None:
+                if not (timeout and time.time() - job.start_time > timeout):
+                    continue
+                job.kill()
+                build_status = 'failure'
+                logger.error('Subprocess failure: {} build script timed out after {}s on {}'
+                             .format(job.executable_name, timeout, job.item['file_path_absolute']))
+            elif returncode == 0:
+                build_status = 'success'
+            else:
+                build_status = 'failure'
+                logger.error('Subprocess failure: {} build script execution failed on {}'
+                             .format(job.executable_name, job.item['file_path_absolute']))
+
+            running.remove(job)
+            release_resources(job.resources)
+            try:
+                job.finish(build_status=build_status)
+            except Exception as e:
+                logger.error('Exception occurs in function build_with_scripts when cleaning up build script on {}: {}'
+                             .format(job.item['file_path_absolute'], str(e)))
+
+
+def build_with_scripts(scan_dir, search_result, logger, workers=1, timeout=None, document_cache=None,
+                       directory_index=None):
 
     build_result = list()
+    build_jobs = list()
 
     for item in search_result:
         try:
-            build_data = dict()
-            candidate_keys = get_key(mapper_dict=mapper, value=item['file_name'])
-            if candidate_keys:
-                executable_name = candidate_keys[0]
-                if candidate_keys[0] == 'Dart_Pub':
-                    pubspec_type = check_pubspec_type(filepath=item['file_path_absolute'], logger=logger)
-                    executable_name = os.path.join(executable_name, pubspec_type)
-                elif candidate_keys[0] == 'Go_Mod_Cli':
-                    sum_file = os.path.join(os.path.split(item['file_path_absolute'])[0], 'go.sum')
-                    if not os.path.exists(sum_file):
-                        logger.warn('Subprocess failure: Go_Mod_Cli build script can not be executed: missing go.sum '
-                                    'file on: {}'.format(os.path.split(item['file_path_absolute'])[0]))
-                        continue
-                elif candidate_keys[0] == 'Stack':
-                    # make directory
-                    ghc_location = os.path.join(scan_dir, 'ghc_programs')
-                    if not os.path.exists(ghc_location):
-                        os.makedirs(ghc_location)
-                    # config project stack.yaml
-                    if not config_stack_programs_location(filepath=item['file_path_absolute'], ghc_location=ghc_location,
-                                                          logger=logger):
-                        continue
-                build_data = bash_builder(item=item, executable_name=executable_name, logger=logger)
-            elif is_build_gradle_file(filepath=item['file_path_absolute']):
-                build_data = bash_builder(item=item, executable_name='Gradle', logger=logger)
-
-            if build_data:
-                # logger.info('------------------------------')
-                # logger.info('Build directory: ' + build_data['build_dir'])
-                # logger.info('Build file: ' + build_data['build_file'])
-                # logger.info('Build type: ' + build_data['build_type'])
-                # logger.info('Build status: ' + build_data['build_status'])
-                # logger.info('------------------------------')
-                build_result.append(build_data)
-
-                if build_data['build_type'] == 'Leiningen':
-                    pom_file = os.path.join(os.path.split(item['file_path_absolute'])[0], 'pom.xml')
-                    if os.path.exists(pom_file):
-                        os.remove(pom_file)
-                elif build_data['build_type'] == 'Stack':
-                    ghc_location = os.path.join(scan_dir, 'ghc_programs')
-                    if os.path.exists(ghc_location):
-                        shutil.rmtree(ghc_location)
+            build_job = construct_build_job(scan_dir=scan_dir, item=item, logger=logger,
+                                            document_cache=document_cache, directory_index=directory_index)
+            if build_job:
+                build_jobs.append(build_job)
         except Exception as e:
             logger.error('Exception occurs in function build_with_scripts when executing build script on {}: {}'
                          .format(item['file_path_absolute'], str(e)))
             continue
 
+    try:
+        run_build_jobs(build_jobs=build_jobs, workers=workers, timeout=timeout, logger=logger)
+    except BaseException:
+        # 扫描被中断(如守护进程取消任务)时, 结束仍在运行的构建脚本
+        for build_job in build_jobs:
+            if build_job.process is not None and build_job.process.poll() is None:
+                build_job.kill()
+        raise
+
+    for build_job in build_jobs:
+        if build_job.build_data:
+            build_result.append(build_job.build_data)
+
     return build_result
 
 
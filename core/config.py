@@ -1,13 +1,16 @@
 import os
 import sys
+from collections import namedtuple
 
 # 根目录
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-# 配置文件列表
-CANDIDATE_FILE_LIST = ['Cargo.toml', 'Cartfile', 'Podfile', 'composer.json', 'conanfile.py', 'Makefile.PL', 'Build.PL',
-                       'cpanfile', 'DESCRIPTION', 'pubspec.yaml', 'Gopkg.lock', 'Gemfile', 'Godeps.json', 'go.mod',
-                       'project.clj', 'pom.xml', 'mix.exs', 'package.json', 'packages.config', 'packrat.lock',
-                       'Pipfile', 'setup.py', 'pyproject.toml', 'rebar.config', 'build.sbt', 'stack.yaml', 'Package.swift']
+# 检测阶段不进入的目录(glob): 版本控制目录与依赖/构建输出目录
+IGNORE_DIRS = ['.git', '.hg', '.svn', 'node_modules', 'bower_components', 'vendor', 'target', 'build', '.gradle',
+               '__pycache__', '.venv']
+# 单次扫描的参数, 见ScanOptions
+SCAN_OPTION_FIELDS = ('is_build', 'is_skip', 'search_depth', 'is_output', 'output_dir', 'workers', 'build_workers',
+                      'build_timeout', 'ignore_dirs', 'use_cache', 'baseline', 'log_to_file', 'timing_summary',
+                      'output_format', 'maven_repo')
 
 
 class Config(object):
@@ -17,14 +20,46 @@ class Config(object):
     temp_dir = os.path.join(BASE_DIR, 'temp_dir')
     executables = os.path.join(BASE_DIR, 'core', 'executables')
     file_parsers = os.path.join(BASE_DIR, 'core', 'file_parsers')
+    cache_dir = os.path.join(BASE_DIR, 'cache_dir')
+    daemon_socket = os.path.join(BASE_DIR, 'scan_daemon.sock')
 
     is_build = False
     is_skip = False
     search_depth = 3
     is_output = False
     output_dir = '../check_result'
+    workers = 1
+    build_workers = 1
+    build_timeout = 3600
+    ignore_dirs = IGNORE_DIRS
+    use_cache = True
+    cache_max_size = 512 * 1024 * 1024
+    cache_max_age = 7 * 24 * 3600
+    baseline = None
+    log_to_file = False
+    timing_summary = False
+    output_format = 'json'
+    # 本地Maven仓库(~/.m2/repository布局), 设置后不构建即可解析pom.xml的传递依赖
+    maven_repo = None
+
+
+class ScanOptions(namedtuple('ScanOptions', SCAN_OPTION_FIELDS,
+                             defaults=tuple(getattr(Config, field) for field in SCAN_OPTION_FIELDS))):
+    """
+    Immutable options of one scan, defaulting to the Config values. scan_api builds one per call and the scan only
+    reads it, instead of writing the options onto Config, so that scans running concurrently in one process
+    (threads, asyncio executors) never see each other's settings. _replace() derives modified options.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def create(cls, **options):
+        # ignore_dirs为None时使用默认的忽略目录, 转为tuple使其同样不可修改
+        ignore_dirs = options.get('ignore_dirs')
+        options['ignore_dirs'] = tuple(ignore_dirs if ignore_dirs is not None else IGNORE_DIRS)
+        return cls(**options)
 
 
 if __name__ == "__main__":
     print(sys.platform)
-    print(len(CANDIDATE_FILE_LIST))
+    print(Config.scanning_dir)
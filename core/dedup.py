@@ -0,0 +1,98 @@
+COMPONENT_FIELDS = ('type', 'namespace', 'name', 'version', 'language')
+
+
+def component_key(item):
+    """
+    Return the canonical, hashable identity of a dependency item:
+    a (type, namespace, name, version, language) tuple.
+    """
+    key = tuple(item.get(field) for field in COMPONENT_FIELDS)
+    try:
+        hash(key)
+    except TypeError:
+        # some parsers may leave a list/dict value behind, fall back to its repr
+        key = tuple(repr(value) for value in key)
+    return key
+
+
+class ComponentIndex(object):
+    """
+    Insertion-ordered set of dependency items keyed on component_key.
+    Lookups and inserts are O(1), so merging n items costs O(n).
+    """
+    def __init__(self, data_list=None):
+        self._items = dict()
+        if data_list:
+            self.extend(data_list)
+
+    def add(self, item):
+        key = component_key(item)
+        if key in self._items:
+            return False
+        self._items[key] = item
+        return True
+
+    def extend(self, data_list):
+        for item in data_list:
+            self.add(item)
+
+    def items(self):
+        return list(self._items.values())
+
+    def __contains__(self, item):
+        return component_key(item) in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items.values())
+
+
+def remove_duplicate_components(data_list):
+    """
+    Remove duplicate dependency items while keeping the first occurrence of each in order.
+    """
+    if not data_list:
+        return list()
+    return ComponentIndex(data_list).items()
+
+
+def compute_component_delta(old_data_list, new_data_list):
+    """
+    Components added and removed between two dependency lists. An add and a remove of the same
+    (type, namespace, name, language) with one version each are reported as a single version change.
+    """
+    old_index = ComponentIndex(old_data_list)
+    new_index = ComponentIndex(new_data_list)
+    added = [item for item in new_index if item not in old_index]
+    removed = [item for item in old_index if item not in new_index]
+
+    version_position = COMPONENT_FIELDS.index('version')
+
+    def package_key(item):
+        key = component_key(item)
+        return key[:version_position] + key[version_position + 1:]
+
+    added_by_package = dict()
+    for item in added:
+        added_by_package.setdefault(package_key(item), list()).append(item)
+    removed_by_package = dict()
+    for item in removed:
+        removed_by_package.setdefault(package_key(item), list()).append(item)
+
+    changed = list()
+    changed_packages = set()
+    for key, removed_items in removed_by_package.items():
+        added_items = added_by_package.get(key, list())
+        if len(removed_items) == 1 and len(added_items) == 1:
+            item = dict(added_items[0])
+            item['old_version'] = removed_items[0].get('version')
+            changed.append(item)
+            changed_packages.add(key)
+
+    return {
+        'added': [item for item in added if package_key(item) not in changed_packages],
+        'removed': [item for item in removed if package_key(item) not in changed_packages],
+        'changed': changed
+    }
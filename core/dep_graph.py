@@ -0,0 +1,271 @@
+from array import array
+
+from core.dedup import component_key
+
+# 作用域按优先级排列, 同一组件经多条路径引入时取优先级最高的
+SCOPES = ('compile', 'runtime', 'test', 'dev')
+SCOPE_ALIASES = {
+    'provided': 'compile',
+    'system': 'compile',
+    'import': 'compile',
+    'compileClasspath': 'compile',
+    'runtimeClasspath': 'runtime',
+    'testCompileClasspath': 'test',
+    'testRuntimeClasspath': 'test',
+    'development': 'dev'
+}
+SCOPE_INDEX = dict((scope, index) for index, scope in enumerate(SCOPES))
+
+# DependencyGraph.state的取值
+UNKNOWN = 0
+TRANSITIVE = 1
+DIRECT = 2
+ROOT = 3
+
+
+def normalize_scope(scope):
+    """
+    Map a package manager scope (maven scope, gradle configuration, ...) onto SCOPES, None if unknown.
+    """
+    if not scope:
+        return None
+    scope = SCOPE_ALIASES.get(scope, scope)
+    return scope if scope in SCOPE_INDEX else None
+
+
+class DependencyList(list):
+    """
+    The flat component list of a parser, carrying the dependency structure read from the file as ``graph``:
+    {'direct': [i, ...], 'roots': [i, ...], 'edges': [[parent, child], ...], 'scopes': [scope or None, ...]},
+    i being indices into the list. roots are components of the scanned project itself, e.g. workspace crates.
+    Consumers that only need the components use it as a plain list.
+    """
+    def __init__(self, items=(), graph=None):
+        list.__init__(self, items)
+        self.graph = graph
+
+
+class GraphBuilder(object):
+    """
+    Builds the DependencyList of one parsed file: components are interned on component_key, so that each one is
+    listed once, at its first occurrence, whichever path of the file reaches it.
+    """
+    def __init__(self):
+        self.index = dict()
+        self.items = list()
+        self.scopes = list()
+        self.direct = dict()
+        self.roots = dict()
+        self.edges = dict()
+
+    def add(self, item, scope=None):
+        """
+        Intern item and return its index. The highest priority scope given for a component is kept.
+        """
+        key = component_key(item)
+        node = self.index.get(key)
+        if node is None:
+            node = len(self.items)
+            self.index[key] = node
+            self.items.append(item)
+            self.scopes.append(normalize_scope(scope))
+        else:
+            scope = normalize_scope(scope)
+            if scope and (self.scopes[node] is None or SCOPE_INDEX[scope] < SCOPE_INDEX[self.scopes[node]]):
+                self.scopes[node] = scope
+        return node
+
+    def find(self, item):
+        return self.index.get(component_key(item))
+
+    def add_dependency(self, parent, child):
+        """
+        Record that parent depends on child; parent None means child is a direct dependency of the project.
+        """
+        if parent is None:
+            self.direct[child] = None
+        elif parent != child:
+            self.edges[(parent, child)] = None
+
+    def add_root(self, node):
+        self.roots[node] = None
+
+    def result(self):
+        return DependencyList(self.items, graph={
+            'direct': list(self.direct),
+            'roots': list(self.roots),
+            'edges': [list(edge) for edge in self.edges],
+            'scopes': self.scopes
+        })
+
+
+class DependencyGraph(object):
+    """
+    The dependency graph of a scan. Node ids are interned ints: node i is the i-th component of the scan's flat
+    dep_result. Edges are stored as adjacency arrays, forward and reverse (offsets into a targets array), once
+    ``freeze`` has been called. Each node records:
+
+    state:  ROOT (part of the scanned project), DIRECT, TRANSITIVE, or UNKNOWN when no parsed file recorded
+            any structure for it (e.g. a component only declared in a flat manifest)
+    scope:  index into SCOPES, -1 if unknown
+    depth:  shortest distance from the project, 1 for direct dependencies, -1 if not reachable
+    """
+    def __init__(self):
+        self.ids = dict()
+        self.state = bytearray()
+        self.scope = array('b')
+        self.depth = array('i')
+        self._sources = array('i')
+        self._targets = array('i')
+        self.offsets = None
+        self.targets = None
+        self.reverse_offsets = None
+        self.reverse_targets = None
+
+    def __len__(self):
+        return len(self.state)
+
+    @property
+    def edge_count(self):
+        return len(self.targets) if self.targets is not None else 0
+
+    def add_node(self, item):
+        key = component_key(item)
+        node = self.ids.get(key)
+        if node is None:
+            node = len(self.state)
+            self.ids[key] = node
+            self.state.append(UNKNOWN)
+            self.scope.append(-1)
+            self.depth.append(-1)
+        return node
+
+    def node_id(self, item):
+        return self.ids.get(component_key(item))
+
+    def add_fragment(self, items, graph):
+        """
+        Merge the graph of one parsed file, see DependencyList, items being its component list.
+        """
+        nodes = [self.add_node(item) for item in items]
+        for index, node in enumerate(nodes):
+            if self.state[node] == UNKNOWN:
+                self.state[node] = TRANSITIVE
+            scope = graph['scopes'][index] if index < len(graph['scopes']) else None
+            if scope in SCOPE_INDEX and (self.scope[node] == -1 or SCOPE_INDEX[scope] < self.scope[node]):
+                self.scope[node] = SCOPE_INDEX[scope]
+        for index in graph['direct']:
+            if self.state[nodes[index]] != ROOT:
+                self.state[nodes[index]] = DIRECT
+        for index in graph['roots']:
+            self.state[nodes[index]] = ROOT
+        for parent, child in graph['edges']:
+            self._sources.append(nodes[parent])
+            self._targets.append(nodes[child])
+            # 项目自身(如工作区内的crate)的依赖为直接依赖
+            if self.state[nodes[parent]] == ROOT and self.state[nodes[child]] == TRANSITIVE:
+                self.state[nodes[child]] = DIRECT
+
+    @staticmethod
+    def _compress(count, sources, targets):
+        # 计数排序构造邻接数组: offsets[n]:offsets[n + 1]为节点n的邻居
+        offsets = array('i', bytes(4 * (count + 1)))
+        for source in sources:
+            offsets[source + 1] += 1
+        for node in range(0, count):
+            offsets[node + 1] += offsets[node]
+        position = array('i', offsets[:-1])
+        compressed = array('i', bytes(4 * len(targets)))
+        for source, target in zip(sources, targets):
+            compressed[position[source]] = target
+            position[source] += 1
+        return offsets, compressed
+
+    def freeze(self):
+        """
+        Build the adjacency arrays (duplicate edges dropped) and compute node depths.
+        """
+        edges = dict.fromkeys(zip(self._sources, self._targets))
+        sources = array('i', (source for source, _ in edges))
+        targets = array('i', (target for _, target in edges))
+        count = len(self.state)
+        self.offsets, self.targets = self._compress(count, sources, targets)
+        self.reverse_offsets, self.reverse_targets = self._compress(count, targets, sources)
+        self._sources = array('i')
+        self._targets = array('i')
+
+        # 从项目自身(深度0)与直接依赖(深度1)出发按层遍历, 取最短深度
+        depth = self.depth
+        for node in range(0, count):
+            depth[node] = 0 if self.state[node] == ROOT else -1
+        frontier = list()
+        for node in range(0, count):
+            if self.state[node] == DIRECT:
+                depth[node] = 1
+                frontier.append(node)
+        level = 1
+        while frontier:
+            level += 1
+            next_frontier = list()
+            for node in frontier:
+                for target in self.dependencies_of(node):
+                    if depth[target] == -1:
+                        depth[target] = level
+                        next_frontier.append(target)
+            frontier = next_frontier
+        return self
+
+    def dependencies_of(self, node):
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def dependents_of(self, node):
+        return self.reverse_targets[self.reverse_offsets[node]:self.reverse_offsets[node + 1]]
+
+    def _traverse(self, nodes, offsets, targets):
+        visited = bytearray(len(self.state))
+        stack = list(nodes)
+        for node in stack:
+            visited[node] = 1
+        while stack:
+            node = stack.pop()
+            for target in targets[offsets[node]:offsets[node + 1]]:
+                if not visited[target]:
+                    visited[target] = 1
+                    stack.append(target)
+        return visited
+
+    def reachable_from(self, nodes):
+        """
+        Ids of the nodes reachable from nodes (included), in id order.
+        """
+        visited = self._traverse(nodes, self.offsets, self.targets)
+        return [node for node in range(0, len(visited)) if visited[node]]
+
+    def direct_dependents(self, node):
+        """
+        Ids of the direct dependencies pulling node in (node itself if it is direct), in id order.
+        """
+        visited = self._traverse([node], self.reverse_offsets, self.reverse_targets)
+        state = self.state
+        return [node for node in range(0, len(visited)) if visited[node] and state[node] == DIRECT]
+
+    def is_direct(self, node):
+        if self.state[node] == UNKNOWN:
+            return None
+        return self.state[node] == DIRECT
+
+    def to_dict(self):
+        """
+        JSON form written next to dep_result: per node arrays aligned with dep_result, and the forward
+        adjacency arrays, the dependencies of node n being targets[offsets[n]:offsets[n + 1]].
+        """
+        return {
+            'nodes': len(self.state),
+            'edges': self.edge_count,
+            'direct': [self.is_direct(node) for node in range(0, len(self.state))],
+            'root': [state == ROOT for state in self.state],
+            'scope': [SCOPES[scope] if scope >= 0 else None for scope in self.scope],
+            'depth': [depth if depth >= 0 else None for depth in self.depth],
+            'offsets': list(self.offsets) if self.offsets is not None else list(),
+            'targets': list(self.targets) if self.targets is not None else list()
+        }
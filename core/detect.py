@@ -1,67 +1,152 @@
 import os
 
-from config import CANDIDATE_FILE_LIST
-from util import is_podspec_file, is_gemspec_file, is_build_gradle_file, is_package_file, is_project_file, \
-    is_requirements_file, is_environment_file, is_dependencies_scala_file
-
-
-def construct_candidate_file_list(scan_dir, root_name, search_depth, logger):
-
-    result_file_list = list()
-
-    try:
-        _list = os.walk(scan_dir)
-    except Exception as e:
-        logger.error('Exception occurs in function construct_candidate_file_list when traversing scan_dir {}: {}'
-                     .format(scan_dir, str(e)))
-        return result_file_list
-
-    if _list:
-        for root, _, files in _list:
-            for file in files:
-                try:
-                    file_type = file
-                    filepath_absolute = os.path.join(root, file)
-
-                    # system specific: Linux -> '/'
-                    # TODO: cannot handle Windows -> '\\'
-                    filepath_relative = os.sep + str(os.path.join(root_name,
-                                                                  filepath_absolute.split(root_name + os.sep, 1)[-1]))
-                    file_depth = len(os.path.split(filepath_relative)[0].split(os.sep)) - 2
-
-                    if ((file_type in CANDIDATE_FILE_LIST)
-                        or is_podspec_file(filepath_absolute)
-                        or is_gemspec_file(filepath_absolute)
-                        or is_build_gradle_file(filepath_absolute)
-                        or is_package_file(filepath_absolute)
-                        or is_project_file(filepath_absolute)
-                        or is_requirements_file(filepath_absolute) or is_environment_file(filepath_absolute)
-                        or is_dependencies_scala_file(filepath_absolute)) \
-                            and (file_depth <= search_depth):
-                        item = dict()
-                        item['file_name'] = file_type
-                        item['file_path_absolute'] = filepath_absolute
-                        item['file_path_relative'] = filepath_relative
-                        item['file_depth'] = file_depth
-                        result_file_list.append(item)
-                except Exception as e:
-                    logger.error('Exception occurs in function construct_candidate_file_list '
-                                 'when adding candidate file {}: {}'.format(os.path.join(root, file), str(e)))
+from core.file_parsers.registry import registry, compile_globs
+
+
+def compile_ignore_dirs(ignore_dirs):
+    if not ignore_dirs:
+        return None
+    return compile_globs(ignore_dirs)
+
+
+def scan_directory(dir_absolute):
+    with os.scandir(dir_absolute) as it:
+        return list(it)
+
+
+class DirectoryIndex(object):
+    """
+    File names of the directories listed by the detect walk, so that the later stages find the sibling lock files
+    and build outputs of a candidate file without a stat call per name. A directory the walk did not list is
+    listed once, on its first lookup; clear() drops the listings after the build scripts changed the tree.
+    """
+    def __init__(self, list_directory=scan_directory):
+        self.list_directory = list_directory
+        self.directories = dict()
+        self.lookups = 0
+        self.listings = 0
+
+    def add(self, dir_absolute, file_names):
+        self.directories[dir_absolute] = frozenset(file_names)
+        self.listings += 1
+
+    def is_file(self, filepath):
+        dir_absolute, file_name = os.path.split(os.path.abspath(filepath))
+        file_names = self.directories.get(dir_absolute)
+        if file_names is None:
+            try:
+                file_names = [entry.name for entry in self.list_directory(dir_absolute) if entry.is_file()]
+            except OSError:
+                file_names = ()
+            self.add(dir_absolute, file_names)
+        self.lookups += 1
+        return file_name in file_names
+
+    def clear(self):
+        self.directories.clear()
+
+    @property
+    def stats(self):
+        return {
+            'directories': len(self.directories),
+            'lookups': self.lookups,
+            'listings': self.listings
+        }
+
+    def pop_stats(self):
+        stats = self.stats
+        self.lookups = 0
+        self.listings = 0
+        return stats
+
+    def merge_stats(self, stats):
+        if stats:
+            self.lookups += stats['lookups']
+            self.listings += stats['listings']
+
+
+def iter_candidate_files(scan_dir, root_name, search_depth, logger, ignore_dirs=None, list_directory=scan_directory,
+                         directory_index=None):
+    """
+    Yield candidate config file items under scan_dir in os.walk (top-down) order.
+    Directories deeper than search_depth or matching one of the ignore_dirs globs are never listed.
+    list_directory(dir_absolute) returns the entries of a directory (os.DirEntry alike: name, path, is_dir(),
+    is_file(), is_symlink()) and raises OSError when it cannot be listed, e.g. core.archive.Archive.list_directory.
+    The file names of each listed directory are added to directory_index (see DirectoryIndex) when given.
+    """
+    ignore_pattern = compile_ignore_dirs(ignore_dirs)
+    # (absolute dir, relative dir, depth of the files in it), depth 0 == files in scan_dir
+    stack = [(scan_dir, os.sep + root_name, 0)]
+
+    while stack:
+        dir_absolute, dir_relative, file_depth = stack.pop()
+        try:
+            entries = list_directory(dir_absolute)
+        except OSError as e:
+            if dir_absolute == scan_dir:
+                logger.error('Exception occurs in function construct_candidate_file_list when traversing scan_dir {}: '
+                             '{}'.format(scan_dir, str(e)))
+            else:
+                logger.debug('Skip unreadable directory {}: {}'.format(dir_absolute, str(e)))
+            continue
+
+        sub_dirs = list()
+        file_names = list()
+        parent_name = os.path.split(dir_absolute)[-1]
+        for entry in entries:
+            try:
+                # symlinked directories are listed but not followed, like os.walk
+                if entry.is_dir():
+                    if file_depth < search_depth and not entry.is_symlink() \
+                            and not (ignore_pattern and ignore_pattern.match(entry.name)):
+                        sub_dirs.append(entry)
                     continue
+                # scandir已取得文件类型, 除符号链接外不再stat
+                if directory_index is not None and entry.is_file():
+                    file_names.append(entry.name)
+                if registry.match(file_name=entry.name, parent_name=parent_name):
+                    item = dict()
+                    item['file_name'] = entry.name
+                    item['file_path_absolute'] = entry.path
+                    item['file_path_relative'] = dir_relative + os.sep + entry.name
+                    item['file_depth'] = file_depth
+                    yield item
+            except Exception as e:
+                logger.error('Exception occurs in function construct_candidate_file_list '
+                             'when adding candidate file {}: {}'.format(entry.path, str(e)))
+                continue
+
+        if directory_index is not None:
+            directory_index.add(dir_absolute, file_names)
+        for entry in reversed(sub_dirs):
+            stack.append((entry.path, dir_relative + os.sep + entry.name, file_depth + 1))
+
 
-    return result_file_list
+def construct_candidate_file_list(scan_dir, root_name, search_depth, logger, ignore_dirs=None, stream=False,
+                                  list_directory=scan_directory, directory_index=None):
+    """
+    Collect the candidate config files of scan_dir, or return them as a generator when stream is True.
+    """
+    candidate_files = iter_candidate_files(scan_dir=scan_dir, root_name=root_name, search_depth=search_depth,
+                                           logger=logger, ignore_dirs=ignore_dirs, list_directory=list_directory,
+                                           directory_index=directory_index)
+    if stream:
+        return candidate_files
+    return list(candidate_files)
 
 
 if __name__ == "__main__":
 
     import logging
     from core.log import Logger
+    from core.config import Config
 
     log = Logger(path='../log_dir/scala_projects.log', cmd_level=logging.INFO, file_level=logging.ERROR)
 
     scan_dir = '/Users/rongdang/Desktop/sca-2.0/extracted_folder/scala/scalacheck'
     root_name = os.path.split(scan_dir)[-1]
-    result = construct_candidate_file_list(scan_dir=scan_dir, root_name=root_name, search_depth=0, logger=log)
+    result = construct_candidate_file_list(scan_dir=scan_dir, root_name=root_name, search_depth=0, logger=log,
+                                           ignore_dirs=Config.ignore_dirs)
     if result:
         print(len(result))
         for item in result:
@@ -0,0 +1,249 @@
+import io
+import os
+import json
+import hashlib
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+
+
+def decode_text(data):
+    # 与open(mode='r', encoding='utf-8')一致: 通用换行符
+    return data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+
+
+def decode_toml(data):
+    # toml与yaml只在扫描到对应格式的文件时导入
+    import toml
+
+    return toml.loads(decode_text(data))
+
+
+def decode_yaml(data, keys=None):
+    from core.yaml_loader import load_yaml
+
+    return load_yaml(text=decode_text(data), keys=keys)
+
+
+def hash_file(filepath, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(filepath, mode='rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+DECODERS = {
+    'bytes': bytes,
+    'text': decode_text,
+    'lines': lambda data: io.StringIO(decode_text(data)).readlines(),
+    'json': lambda data: json.loads(decode_text(data)),
+    'toml': decode_toml,
+    'xml': lambda data: ET.ElementTree(ET.fromstring(data)),
+}
+
+
+class DocumentEntry(object):
+
+    def __init__(self, signature, data=None):
+        self.signature = signature
+        # data为None: 只记录了文件的摘要, 内容未保留
+        self.data = data
+        self.digest = None
+        self.documents = dict()
+
+
+class DocumentCache(object):
+    """
+    Scan-scoped cache of config file contents keyed by path and (size, mtime_ns): the raw bytes are read once
+    and each decoded form (text, lines, JSON, YAML, TOML, XML) is built once, then shared by the detect, build
+    and parse stages. Decoded objects are shared between callers and must be treated as read-only.
+    Files larger than max_file_size, or beyond max_size bytes in total, are decoded but not retained.
+    The file system accesses of the scan's readers (is_file, stat, read_bytes, hash, local_path) go through the
+    cache too, so that a subclass can serve files from elsewhere, see core.archive.ArchiveDocumentCache.
+    """
+    def __init__(self, max_file_size=16 * 1024 * 1024, max_size=256 * 1024 * 1024):
+        self.max_file_size = max_file_size
+        self.max_size = max_size
+        self.size = 0
+        self.entries = dict()
+        self.hits = 0
+        self.misses = 0
+        self.reads = 0
+        # 文件系统的stat调用次数(is_file与stat)
+        self.stat_calls = 0
+
+    def is_file(self, filepath):
+        self.stat_calls += 1
+        return os.path.isfile(filepath)
+
+    def stat(self, filepath):
+        """
+        (size, mtime_ns) of filepath, raises OSError when it does not exist.
+        """
+        self.stat_calls += 1
+        stat = os.stat(filepath)
+        return stat.st_size, stat.st_mtime_ns
+
+    def file_size(self, filepath):
+        """
+        Size of filepath, from the cached entry when it was already read.
+        """
+        entry = self.entries.get(os.path.abspath(filepath))
+        if entry is not None:
+            return entry.signature[0]
+        return self.stat(filepath)[0]
+
+    def read_bytes(self, filepath):
+        with open(filepath, mode='rb') as f:
+            return f.read()
+
+    def compute_hash(self, filepath):
+        return hash_file(filepath)
+
+    def hash(self, filepath):
+        """
+        sha256 of filepath, computed once per (size, mtime_ns). Files within max_file_size are hashed from the
+        cached bytes, so that hashing a file and then parsing it reads it only once.
+        """
+        filepath = os.path.abspath(filepath)
+        signature = self.stat(filepath)
+        entry = self.entries.get(filepath)
+        if entry is not None and entry.signature == signature and entry.digest is not None:
+            return entry.digest
+        if signature[0] <= self.max_file_size:
+            digest = hashlib.sha256(self._get_entry(filepath, signature=signature).data).hexdigest()
+        else:
+            digest = self.compute_hash(filepath)
+        entry = self.entries.get(filepath)
+        if entry is None or entry.signature != signature:
+            # 内容未保留(超出大小限制): 只记录摘要
+            self.invalidate(filepath)
+            entry = DocumentEntry(signature=signature)
+            self.entries[filepath] = entry
+        entry.digest = digest
+        return digest
+
+    @contextmanager
+    def local_path(self, filepath):
+        """
+        A path of filepath on the local file system, for readers that only take a path (e.g. gemfileparser).
+        """
+        yield filepath
+
+    def _get_entry(self, filepath, signature=None):
+        if signature is None:
+            signature = self.stat(filepath)
+        entry = self.entries.get(filepath)
+        if entry is not None and entry.signature != signature:
+            self.invalidate(filepath)
+            entry = None
+        if entry is not None and entry.data is not None:
+            return entry
+        data = self.read_bytes(filepath)
+        self.reads += 1
+        if len(data) > self.max_file_size or self.size + len(data) > self.max_size:
+            # 不保留的内容只用于本次解码, 已记录的摘要仍有效
+            return DocumentEntry(signature=signature, data=data)
+        if entry is None:
+            entry = DocumentEntry(signature=signature)
+            self.entries[filepath] = entry
+        entry.data = data
+        self.size += len(data)
+        return entry
+
+    def get(self, filepath, kind, decoder):
+        """
+        The document of filepath decoded by decoder(bytes), cached under kind. Read and decode errors propagate
+        to the caller, as with a plain open() and load, and are not cached.
+        """
+        filepath = os.path.abspath(filepath)
+        entry = self._get_entry(filepath)
+        if kind in entry.documents:
+            self.hits += 1
+            return entry.documents[kind]
+        self.misses += 1
+        document = decoder(entry.data)
+        entry.documents[kind] = document
+        return document
+
+    def load(self, filepath, kind, keys=None):
+        """
+        filepath decoded as kind: 'bytes', 'text', 'lines', 'json', 'toml', 'xml' or 'yaml'
+        (keys: top level keys to load, see yaml_loader.load_yaml).
+        """
+        if kind == 'yaml':
+            keys = tuple(keys) if keys else None
+            return self.get(filepath=filepath, kind=(kind, keys), decoder=lambda data: decode_yaml(data, keys=keys))
+        return self.get(filepath=filepath, kind=kind, decoder=DECODERS[kind])
+
+    def invalidate(self, filepath):
+        entry = self.entries.pop(os.path.abspath(filepath), None)
+        if entry is not None and entry.data is not None:
+            self.size -= len(entry.data)
+
+    @property
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'reads': self.reads,
+            'stat_calls': self.stat_calls,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def pop_stats(self):
+        stats = self.stats
+        self.hits = 0
+        self.misses = 0
+        self.reads = 0
+        self.stat_calls = 0
+        return stats
+
+    def merge_stats(self, stats):
+        if stats:
+            self.hits += stats['hits']
+            self.misses += stats['misses']
+            self.reads += stats['reads']
+            self.stat_calls += stats['stat_calls']
+
+
+def is_file(filepath, document_cache=None):
+    if document_cache is not None:
+        return document_cache.is_file(filepath)
+    return os.path.isfile(filepath)
+
+
+@contextmanager
+def local_path(filepath, document_cache=None):
+    """
+    A path of filepath on the local file system, see DocumentCache.local_path.
+    """
+    if document_cache is None:
+        yield filepath
+    else:
+        with document_cache.local_path(filepath) as path:
+            yield path
+
+
+def open_document(filepath, document_cache=None, binary=False):
+    """
+    filepath as a file object through document_cache, like open(filepath, mode='r', encoding='utf-8')
+    (mode='rb' when binary).
+    """
+    if binary:
+        return io.BytesIO(load_document(filepath=filepath, kind='bytes', document_cache=document_cache))
+    return io.StringIO(load_document(filepath=filepath, kind='text', document_cache=document_cache))
+
+
+def load_document(filepath, kind, document_cache=None, keys=None):
+    """
+    Load filepath as kind through document_cache, or straight from disk when no cache is given.
+    """
+    if document_cache is not None:
+        return document_cache.load(filepath=filepath, kind=kind, keys=keys)
+    with open(filepath, mode='rb') as f:
+        data = f.read()
+    if kind == 'yaml':
+        return decode_yaml(data, keys=keys)
+    return DECODERS[kind](data)
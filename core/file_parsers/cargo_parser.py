@@ -1,4 +1,5 @@
-import toml
+from core.document_cache import load_document
+from core.dep_graph import GraphBuilder
 
 
 def is_cargo_lock(filepath):
@@ -89,19 +90,17 @@ def parse_version_str(version_str):
     return version_str
 
 
-def parse_cargo_toml(filepath, logger):
+def parse_cargo_toml(filepath, logger, document_cache=None):
 
     dependencies = list()
 
     try:
-        with open(file=filepath, mode='r', encoding='utf-8') as file:
-            content = toml.load(f=file)
+        content = load_document(filepath=filepath, kind='toml', document_cache=document_cache)
     except Exception as e:
         logger.error('Exception occurs when loading Cargo.toml file {}: {}'.format(filepath, str(e)))
         return dependencies
 
     if not content:
-        file.close()
         return dependencies
 
     # add dependencies
@@ -154,27 +153,25 @@ def parse_cargo_toml(filepath, logger):
     except KeyError:
         pass
 
-    file.close()
     return dependencies
 
 
-def parse_cargo_lock(filepath, logger):
+def parse_cargo_lock(filepath, logger, document_cache=None):
 
-    dependencies = list()
+    builder = GraphBuilder()
 
     try:
-        with open(file=filepath, mode='r', encoding='utf-8') as file:
-            content = toml.load(f=file)
+        content = load_document(filepath=filepath, kind='toml', document_cache=document_cache)
     except Exception as e:
         logger.error('Exception occurs when loading Cargo.lock file {}: {}'.format(filepath, str(e)))
-        return dependencies
+        return builder.result()
 
     if not content:
-        file.close()
-        return dependencies
+        return builder.result()
 
     try:
         packages = content['package']
+        nodes = list()
         for package in packages:
             temp = dict()
             temp['type'] = 'cargo'
@@ -192,20 +189,39 @@ def parse_cargo_lock(filepath, logger):
             temp['language'] = 'Rust'
 
             if temp['name'] and temp['version']:
-                dependencies.append(temp)
+                nodes.append((package, builder.add(temp)))
+
+        # 依赖边: dependencies的元素为"name", "name version"或"name version (source)"
+        nodes_by_name = dict()
+        nodes_by_version = dict()
+        for package, node in nodes:
+            nodes_by_name.setdefault(package['name'], list()).append(node)
+            nodes_by_version[(package['name'], package['version'])] = node
+        for package, node in nodes:
+            # 没有source的包是工作区内的本地crate
+            if 'source' not in package:
+                builder.add_root(node)
+            for dependency in package.get('dependencies', list()):
+                fields = dependency.split(' ')
+                if len(fields) >= 2:
+                    child = nodes_by_version.get((fields[0], fields[1]))
+                else:
+                    candidates = nodes_by_name.get(fields[0], list())
+                    child = candidates[0] if len(candidates) == 1 else None
+                if child is not None:
+                    builder.add_dependency(node, child)
     except KeyError:
         pass
 
-    file.close()
-    return dependencies
+    return builder.result()
 
 
-def parse_cargo_files(filepath, logger):
+def parse_cargo_files(filepath, logger, document_cache=None):
 
     if is_cargo_lock(filepath=filepath):
-        dep_result = parse_cargo_lock(filepath=filepath, logger=logger)
+        dep_result = parse_cargo_lock(filepath=filepath, logger=logger, document_cache=document_cache)
     else:
-        dep_result = parse_cargo_toml(filepath=filepath, logger=logger)
+        dep_result = parse_cargo_toml(filepath=filepath, logger=logger, document_cache=document_cache)
 
     return dep_result
 
@@ -1,3 +1,5 @@
+from core.document_cache import open_document
+
 
 def is_cartfile_resolved(filepath):
     if filepath.endswith('Cartfile.resolved'):
@@ -39,13 +41,13 @@ def parse_version_str(version):
     return version
 
 
-def parse_cartfile(filepath, logger):
+def parse_cartfile(filepath, logger, document_cache=None):
 
     dependencies = list()
     urls = ['https://', 'http://', 'git://', 'git@', 'ssh://']
 
     try:
-        with open(file=filepath, mode='r', encoding='utf-8') as file:
+        with open_document(filepath=filepath, document_cache=document_cache) as file:
             lines = file.readlines()
     except Exception as e:
         logger.error('Exception occurs when loading Cartfile {}: {}'.format(filepath, str(e)))
@@ -127,13 +129,13 @@ def parse_cartfile(filepath, logger):
     return dependencies
 
 
-def parse_cartfile_resolved(filepath, logger):
+def parse_cartfile_resolved(filepath, logger, document_cache=None):
 
     dependencies = list()
     urls = ['https://', 'http://', 'git://', 'git@', 'ssh://']
 
     try:
-        with open(file=filepath, mode='r', encoding='utf-8') as file:
+        with open_document(filepath=filepath, document_cache=document_cache) as file:
             lines = file.readlines()
     except Exception as e:
         logger.error('Exception occurs when loading Cartfile.resolved file {}: {}'.format(filepath, str(e)))
@@ -205,12 +207,12 @@ def parse_cartfile_resolved(filepath, logger):
     return dependencies
 
 
-def parse_carthage_files(filepath, logger):
+def parse_carthage_files(filepath, logger, document_cache=None):
 
     if is_cartfile_resolved(filepath=filepath):
-        dependencies = parse_cartfile_resolved(filepath=filepath, logger=logger)
+        dependencies = parse_cartfile_resolved(filepath=filepath, logger=logger, document_cache=document_cache)
     else:
-        dependencies = parse_cartfile(filepath=filepath, logger=logger)
+        dependencies = parse_cartfile(filepath=filepath, logger=logger, document_cache=document_cache)
 
     return dependencies
 
@@ -1,10 +1,10 @@
 import re
 import io
 import csv
-import yaml
-from yaml.loader import SafeLoader
 from gemfileparser import GemfileParser
 
+from core.document_cache import load_document, local_path, open_document
+
 
 def is_cocoa_lock(filepath):
     if filepath.endswith('Podfile.lock'):
@@ -49,12 +49,13 @@ def parse_version_list(requirement):
     return ' && '.join(requirement)
 
 
-def parse_podspec(filepath, logger):
+def parse_podspec(filepath, logger, document_cache=None):
 
     dependencies = list()
 
     try:
-        parser = GemfileParser(filepath=filepath)
+        with local_path(filepath=filepath, document_cache=document_cache) as path:
+            parser = GemfileParser(filepath=path)
     except Exception as e:
         logger.error('Exception occurs when loading podspec file {}: {}'.format(filepath, str(e)))
         return dependencies
@@ -83,7 +84,7 @@ def parse_podspec(filepath, logger):
     return dependencies
 
 
-def parse_podfile(filepath, logger):
+def parse_podfile(filepath, logger, document_cache=None):
 
     dependencies = list()
     github_url_pattern = r':git\s*=>\s*\'(?P<github_url>.+?)\''
@@ -92,7 +93,7 @@ def parse_podfile(filepath, logger):
     requirement_pattern = r'(?P<requirement>([>|<|=|~>|\d]+[ ]*[0-9\.\w]+[ ,]*)+)'
 
     try:
-        with open(file=filepath, mode='r', encoding='utf-8') as file:
+        with open_document(filepath=filepath, document_cache=document_cache) as file:
             lines = file.readlines()
     except Exception as e:
         logger.error('Exception occurs when loading Podfile {}: {}'.format(filepath, str(e)))
@@ -199,13 +200,12 @@ def parse_pod_dep(pod):
     return temp
 
 
-def parse_podfile_lock(filepath, logger):
+def parse_podfile_lock(filepath, logger, document_cache=None):
 
     dependencies = list()
 
     try:
-        with open(file=filepath, mode='r', encoding='utf-8') as file:
-            data = yaml.load(file.read(), SafeLoader)
+        data = load_document(filepath=filepath, kind='yaml', document_cache=document_cache, keys=('PODS',))
     except Exception as e:
         logger.error('Exception occurs when loading Podfile.lock file {}: {}'.format(filepath, str(e)))
         return dependencies
@@ -223,16 +223,15 @@ def parse_podfile_lock(filepath, logger):
     except KeyError:
         pass
 
-    file.close()
     return dependencies
 
 
-def parse_cocoa_files(filepath, logger):
+def parse_cocoa_files(filepath, logger, document_cache=None):
 
     if is_cocoa_lock(filepath=filepath):
-        dep_result = parse_podfile_lock(filepath=filepath, logger=logger)
+        dep_result = parse_podfile_lock(filepath=filepath, logger=logger, document_cache=document_cache)
     else:
-        dep_result = parse_podfile(filepath=filepath, logger=logger)
+        dep_result = parse_podfile(filepath=filepath, logger=logger, document_cache=document_cache)
 
     return dep_result
 
@@ -190,9 +190,9 @@ def parse_version_str(version_str):
     return version_str
 
 
-def parse_composer_json(filepath, is_skip, logger):
+def parse_composer_json(filepath, is_skip, logger, document_cache=None):
 
-    json_result = read_json_file(filepath=filepath, logger=logger)
+    json_result = read_json_file(filepath=filepath, logger=logger, document_cache=document_cache)
     dependencies = list()
 
     if json_result:
@@ -250,9 +250,9 @@ def parse_composer_json(filepath, is_skip, logger):
     return dependencies
 
 
-def parse_composer_lock(filepath, is_skip, logger):
+def parse_composer_lock(filepath, is_skip, logger, document_cache=None):
 
-    json_result = read_json_file(filepath=filepath, logger=logger)
+    json_result = read_json_file(filepath=filepath, logger=logger, document_cache=document_cache)
     dependencies = list()
 
     if json_result:
@@ -297,12 +297,14 @@ def parse_composer_lock(filepath, is_skip, logger):
     return dependencies
 
 
-def parse_composer_files(filepath, is_skip, logger):
+def parse_composer_files(filepath, is_skip, logger, document_cache=None):
 
     if is_composer_lock(filepath=filepath):
-        dependencies = parse_composer_lock(filepath=filepath, is_skip=is_skip, logger=logger)
+        dependencies = parse_composer_lock(filepath=filepath, is_skip=is_skip, logger=logger,
+                                           document_cache=document_cache)
     else:
-        dependencies = parse_composer_json(filepath=filepath, is_skip=is_skip, logger=logger)
+        dependencies = parse_composer_json(filepath=filepath, is_skip=is_skip, logger=logger,
+                                           document_cache=document_cache)
 
     return dependencies
 
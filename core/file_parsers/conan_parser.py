@@ -1,9 +1,9 @@
 from core.util import read_json_file, read_temp_json_file
 
 
-def parse_conan_lock(filepath, logger):
+def parse_conan_lock(filepath, logger, document_cache=None):
 
-    json_result = read_json_file(filepath=filepath, logger=logger)
+    json_result = read_json_file(filepath=filepath, logger=logger, document_cache=document_cache)
     dependencies = list()
 
     if json_result:
@@ -7,6 +7,9 @@ from packaging.utils import canonicalize_name
 
 from dparse2.dependencies import Dependency, DependencyFile
 
+from core.yaml_loader import load_yaml
+from core.document_cache import open_document
+
 default_library_names = (
     'ca-certificates',
     'certifi',
@@ -101,7 +104,7 @@ class CondaYMLParser(Parser):
 
     def parse(self):
         try:
-            data = yaml.safe_load(self.obj.content) or {}
+            data = load_yaml(self.obj.content) or {}
             if isinstance(data, dict):
                 dependencies = data.get("dependencies") or []
                 for dep in dependencies:
@@ -137,12 +140,12 @@ def parse_func(content, file_name=None, path=None, parser=None):
     return dep_file.parse()
 
 
-def parse_environment_file(filepath, logger):
+def parse_environment_file(filepath, logger, document_cache=None):
 
     dependencies = list()
 
     try:
-        with open(file=filepath, mode='r', encoding='utf-8') as file:
+        with open_document(filepath=filepath, document_cache=document_cache) as file:
             content = file.read()
         dep_file = parse_func(content=content, file_name='conda.yml', parser=CondaYMLParser)
     except Exception as e:
@@ -1,4 +1,5 @@
-from core.util import remove_duplicate_dict_items
+from core.dedup import remove_duplicate_components
+from core.document_cache import open_document
 
 
 def parse_version_str(version):
@@ -11,12 +12,12 @@ def parse_version_str(version):
     return version
 
 
-def parse_cpanfile(filepath, logger):
+def parse_cpanfile(filepath, logger, document_cache=None):
 
     dependencies = list()
 
     try:
-        with open(file=filepath, mode='r', encoding='utf-8') as file:
+        with open_document(filepath=filepath, document_cache=document_cache) as file:
             lines = file.readlines()
     except Exception as e:
         logger.error('Exception occurs when loading cpanfile {}: {}'.format(filepath, str(e)))
@@ -55,7 +56,7 @@ def parse_cpanfile(filepath, logger):
                 continue
             temp['language'] = 'Perl'
             dependencies.append(temp)
-    dependencies = remove_duplicate_dict_items(data_list=dependencies)
+    dependencies = remove_duplicate_components(data_list=dependencies)
 
     file.close()
     return dependencies
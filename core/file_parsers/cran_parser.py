@@ -1,8 +1,8 @@
 import json
-import yaml
-from yaml.loader import SafeLoader
 
-from core.util import remove_duplicate_dict_items
+from core.dedup import remove_duplicate_components
+from core.yaml_loader import load_yaml
+from core.document_cache import open_document
 
 
 def extract_cran_dependencies(yaml_data):
@@ -61,7 +61,7 @@ def extract_cran_dependencies(yaml_data):
     return dependencies
 
 
-def parse_cran_description(filepath, logger):
+def parse_cran_description(filepath, logger, document_cache=None):
     """
     Parse a CRAN DESCRIPTION file as YAML and return a list of dependencies.
     """
@@ -69,7 +69,7 @@ def parse_cran_description(filepath, logger):
     dependencies = list()
 
     try:
-        with open(filepath, mode='r', encoding='utf-8') as file:
+        with open_document(filepath=filepath, document_cache=document_cache) as file:
             lines = file.readlines()
     except Exception as e:
         logger.error('Exception occurs when loading DESCRIPTION file {}: {}'.format(filepath, str(e)))
@@ -83,7 +83,7 @@ def parse_cran_description(filepath, logger):
         yaml_lines.append(line)
 
     try:
-        data = yaml.load('\n'.join(yaml_lines), SafeLoader)
+        data = load_yaml('\n'.join(yaml_lines))
         dependencies = extract_cran_dependencies(yaml_data=data)
     except Exception as e:
         logger.error('Exception occurs in function parse_cran_description when constructing yaml data '
@@ -93,18 +93,18 @@ def parse_cran_description(filepath, logger):
     return dependencies
 
 
-def parse_cran_lock(filepath, logger):
+def parse_cran_lock(filepath, logger, document_cache=None):
 
     dependencies = list()
 
     try:
         # 如果是json文件，获取packages列表及第一层传递依赖
-        with open(filepath, mode='r', encoding='utf-8') as json_file:
+        with open_document(filepath=filepath, document_cache=document_cache) as json_file:
             json_data = json.load(json_file)
     except Exception:
         try:
             # 如果不是json文件
-            with open(filepath, mode='r', encoding='utf-8') as lock_file:
+            with open_document(filepath=filepath, document_cache=document_cache) as lock_file:
                 lines = lock_file.readlines()
         except Exception as e:
             logger.error('Exception occurs when loading packrat.lock file {}: {}'.format(filepath, str(e)))
@@ -141,7 +141,7 @@ def parse_cran_lock(filepath, logger):
                 temp['language'] = 'R'
                 dependencies.append(temp)
         lock_file.close()
-        dependencies = remove_duplicate_dict_items(data_list=dependencies)
+        dependencies = remove_duplicate_components(data_list=dependencies)
         return dependencies
 
     try:
@@ -166,18 +166,18 @@ def parse_cran_lock(filepath, logger):
     except KeyError:
         pass
     json_file.close()
-    dependencies = remove_duplicate_dict_items(data_list=dependencies)
+    dependencies = remove_duplicate_components(data_list=dependencies)
     return dependencies
 
 
-def parse_cran_files(filepath, logger):
+def parse_cran_files(filepath, logger, document_cache=None):
 
     dependencies = list()
 
     if filepath.endswith('DESCRIPTION'):
-        dependencies = parse_cran_description(filepath=filepath, logger=logger)
+        dependencies = parse_cran_description(filepath=filepath, logger=logger, document_cache=document_cache)
     elif filepath.endswith('packrat.lock'):
-        dependencies = parse_cran_lock(filepath=filepath, logger=logger)
+        dependencies = parse_cran_lock(filepath=filepath, logger=logger, document_cache=document_cache)
 
     return dependencies
 
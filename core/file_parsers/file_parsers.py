@@ -1,762 +1,355 @@
 import sys
 import os
-import json
+import time
+from concurrent.futures import ProcessPoolExecutor
 
 sys.path.append('.')
 sys.path.append('..')
-from core.config import Config as cf
-from core.util import remove_duplicate_dict_items
-from core.util import is_podspec_file, is_gemspec_file, is_build_gradle_file, is_package_file, is_project_file, \
-    is_requirements_file, is_environment_file, is_dependencies_scala_file
-from core.file_parsers.cargo_parser import parse_cargo_files
-from core.file_parsers.carthage_parser import parse_carthage_files
-from core.file_parsers.cocoapods_parser import parse_podspec, parse_cocoa_files
-from core.file_parsers.composer_parser import parse_composer_files
-from core.file_parsers.conan_parser import parse_conan_lock
-from core.file_parsers.conda_parser import parse_environment_file
-from core.file_parsers.cpan_parser import parse_cpanfile, parse_cpandeps
-from core.file_parsers.cran_parser import parse_cran_files
-from core.file_parsers.gemfile_lock_parser import parse_gemfile_lock_file
-from core.file_parsers.go_dep_parser import parse_godep_file, parse_dep_file
-from core.file_parsers.go_mod_parser import parse_gomod_files
-from core.file_parsers.go_mod_list_parser import parse_gomod_list_file
-from core.file_parsers.gradle_parser import parse_build_gradle_file, parse_gradle_tree_file
-from core.file_parsers.leiningen_parser import parse_project_clj_file, parse_lein_tree_file
-from core.file_parsers.maven_pom_parser import parse_maven_pom_file
-from core.file_parsers.maven_tree_parser import parse_maven_tree_file
-from core.file_parsers.mix_parser import parse_mix_files
-from core.file_parsers.npm_package_parser import parse_package_json_file
-from core.file_parsers.npm_lock_parser import parse_lock_json_file
-from core.file_parsers.nuget_parser import parse_nuget_files
-from core.file_parsers.pip_parser import parse_pip_files
-from core.file_parsers.pipenv_parser import parse_pipenv_files
-from core.file_parsers.pnpm_lock_parser import parse_pnpm_lock_file
-from core.file_parsers.poetry_parser import parse_poetry_files
-from core.file_parsers.pub_parser import parse_pubspec_files
-from core.file_parsers.rebar_parser import parse_rebar_config_file, parse_rebar_tree_file
-from core.file_parsers.rubygem_parser import parse_rubygem_files
-from core.file_parsers.sbt_parser import parse_scala_version, parse_build_config_files, \
-    construct_tree_file_list, parse_tree_json_file
-from core.file_parsers.stack_parser import parse_stack_files, parse_stack_json_file
-from core.file_parsers.swift_parser import parse_swift_files
-from core.file_parsers.yarn_lock_parser import parse_yarn_lock_file
-
-
-with open(os.path.join(cf.file_parsers, 'mapper.json'), mode='r', encoding='utf-8') as f:
-    mapper = json.load(f)
-
-
-def get_key(mapper_dict, value):
-    return [k for k, v in mapper_dict.items() if value in v]
+from core.dedup import remove_duplicate_components
+from core.document_cache import is_file
+from core.file_parsers.registry import registry, ParserSpec
+from core.file_parsers.incremental import fingerprint_file_item, fingerprint_matches
+from core.timing import ScanTimer, cpu_time
 
 
 def update_build_result_by_type(build_result, build_result_by_type):
     if build_result:
         for build_info in build_result:
-            if build_info['build_type'] == 'Cpan_Cli' and build_info['build_status'] == 'success' \
-                    and build_result_by_type['Cpan_Cli'] == 'failure':
-                build_result_by_type.update({'Cpan_Cli': 'success'})
-                continue
-            elif build_info['build_type'] == 'Go_Mod_Cli' and build_info['build_status'] == 'success' \
-                    and build_result_by_type['Go_Mod_Cli'] == 'failure':
-                build_result_by_type.update({'Go_Mod_Cli': 'success'})
-                continue
-            elif build_info['build_type'] == 'Gradle' and build_info['build_status'] == 'success' \
-                    and build_result_by_type['Gradle'] == 'failure':
-                build_result_by_type.update({'Gradle': 'success'})
-                continue
-            elif build_info['build_type'] == 'Leiningen' and build_info['build_status'] == 'success' \
-                    and build_result_by_type['Leiningen'] == 'failure':
-                build_result_by_type.update({'Leiningen': 'success'})
-                continue
-            elif build_info['build_type'] == 'Maven_Pom' and build_info['build_status'] == 'success' \
-                    and build_result_by_type['Maven_Pom'] == 'failure':
-                build_result_by_type.update({'Maven_Pom': 'success'})
-                continue
-            elif build_info['build_type'] == 'Rebar' and build_info['build_status'] == 'success' \
-                    and build_result_by_type['Rebar'] == 'failure':
-                build_result_by_type.update({'Rebar': 'success'})
-                continue
-            elif build_info['build_type'] == 'Stack' and build_info['build_status'] == 'success' \
-                    and build_result_by_type['Stack'] == 'failure':
-                build_result_by_type.update({'Stack': 'success'})
-                continue
+            if build_info['build_type'] in build_result_by_type and build_info['build_status'] == 'success':
+                build_result_by_type[build_info['build_type']] = 'success'
     return build_result_by_type
 
 
-def parse_config_files(scan_dir, root_name, is_skip, is_build, build_result, search_result, logger):
+RESULT_TYPES = ['cargo_result', 'cocoa_result', 'composer_result', 'conan_result', 'cpan_result', 'cran_result',
+                'gem_result', 'go_result', 'hackage_result', 'hex_result', 'lein_result', 'maven_result', 'npm_result',
+                'nuget_result', 'pub_result', 'pypi_result', 'swift_result']
+# file_result中解析函数返回的依赖结构, 见core.dep_graph.DependencyList
+GRAPH_KEY = 'dep_graph'
+# 需由本次扫描预先生成的解析参数, 与解析函数一样在检测到使用它的文件时才导入所在模块
+SCALA_VERSION = ParserSpec('sbt_parser.parse_scala_version')
+POM_CACHE = ParserSpec('maven_pom_parser.PomModelCache')
+
+
+def get_detected_options(search_result):
+    """
+    The names of the scan options taken by the parsers of the candidate files in search_result.
+    """
+    options = set()
+    for file_item in search_result:
+        handler = registry.match_path(file_item['file_path_absolute'])
+        if handler is None:
+            continue
+        parser_specs = [handler.manifest_parser] + [parser_spec for _, parser_spec in handler.lock_files]
+        parser_specs += [parser_spec for _, parser_spec in handler.build_lock_files]
+        options.update(option for parser_spec in parser_specs if parser_spec for option in parser_spec.options)
+    return options
+
+
+def run_parser(parser_spec, filepath, context, logger):
+    logger = logger.bind(file=filepath)
+    # 实际解析的文件(锁文件、依赖树文件或配置文件本身), 见profile_config_file
+    parsed_files = context.get('parsed_files')
+    if parsed_files is not None:
+        parsed_files.append(filepath)
+    parse_cache = context.get('parse_cache')
+    if parse_cache:
+        return parse_cache.parse(parser_spec=parser_spec, filepath=filepath, context=context, logger=logger)
+    return parser_spec(filepath=filepath, context=context, logger=logger)
+
+
+def sibling_exists(filepath, context):
+    # 由检测阶段的目录索引回答, 不再对每个锁文件名stat, 见detect.DirectoryIndex
+    directory_index = context.get('directory_index')
+    if directory_index is not None:
+        return directory_index.is_file(filepath)
+    return is_file(filepath, document_cache=context.get('document_cache'))
+
+
+def parse_handler_files(handler, is_build, build_result_by_type, context, file_item, logger):
+    file_dir = os.path.split(file_item['file_path_absolute'])[0]
+    lock_files = handler.lock_files
 
-    build_result_by_type = {
-        'Cpan_Cli': 'failure',
-        'Go_Mod_Cli': 'failure',
-        'Gradle': 'failure',
-        'Leiningen': 'failure',
-        'Maven_Pom': 'failure',
-        'Rebar': 'failure',
-        'Stack': 'failure'
+    # 编译构建模式: 优先解析构建脚本生成的依赖树文件
+    if is_build:
+        if handler.build_hook:
+            dep_result = handler.build_hook(handler=handler, file_item=file_item, context=context, logger=logger)
+            if dep_result is not None:
+                return dep_result
+        if handler.build_type and build_result_by_type.get(handler.build_type) == 'success':
+            if handler.build_artifact:
+                artifact_name, artifact_parser = handler.build_artifact
+                artifact_file = os.path.join(file_dir, artifact_name)
+                if sibling_exists(artifact_file, context=context):
+                    logger.info('[+] Start parsing {}: {}'.format(artifact_name, artifact_file))
+                    return run_parser(parser_spec=artifact_parser, filepath=artifact_file, context=context,
+                                      logger=logger)
+            return None
+        lock_files = handler.build_lock_files
+
+    for lock_name, lock_parser in lock_files:
+        lock_file = os.path.join(file_dir, lock_name)
+        if sibling_exists(lock_file, context=context):
+            if lock_parser is None:
+                return None
+            logger.info('[+] Start parsing {}: {}'.format(lock_name, lock_file))
+            return run_parser(parser_spec=lock_parser, filepath=lock_file, context=context, logger=logger)
+
+    if handler.manifest_parser is None:
+        return None
+    logger.info('[+] Start parsing {}: {}'.format(handler.label, file_item['file_path_relative']))
+    return run_parser(parser_spec=handler.manifest_parser, filepath=file_item['file_path_absolute'], context=context,
+                      logger=logger)
+
+
+def parse_config_file(context, is_build, build_result_by_type, file_item, logger):
+
+    file_result = dict()
+    for result_type in RESULT_TYPES:
+        file_result[result_type] = list()
+
+    handler = registry.match_path(file_item['file_path_absolute'])
+    if handler is None:
+        return file_result
+
+    # 解析过程中的诊断信息记录所属的解析器与文件
+    logger = logger.bind(parser=handler.name, file=file_item['file_path_absolute'])
+    dep_result = parse_handler_files(handler=handler, is_build=is_build, build_result_by_type=build_result_by_type,
+                                     context=context, file_item=file_item, logger=logger)
+    if dep_result:
+        file_result[handler.result_type].extend(dep_result)
+        graph = getattr(dep_result, 'graph', None)
+        if graph:
+            file_result[GRAPH_KEY] = dict(graph, result_type=handler.result_type)
+
+    return file_result
+
+
+def get_file_size(filepath, document_cache=None):
+    try:
+        if document_cache is not None:
+            return document_cache.file_size(filepath)
+        return os.path.getsize(filepath)
+    except OSError:
+        return 0
+
+
+def profile_config_file(context, is_build, build_result_by_type, file_item, logger):
+    """
+    parse_config_file, also returning the cost of the file: its parser, wall and CPU seconds, the bytes of the
+    files actually parsed, the number of components emitted and whether the result came from the parse cache.
+    """
+    handler = registry.match_path(file_item['file_path_absolute'])
+    context = dict(context, parsed_files=list())
+    parse_cache = context.get('parse_cache')
+    cache_stats = (parse_cache.hits, parse_cache.misses) if parse_cache else None
+    wall_start, cpu_start = time.perf_counter(), cpu_time()
+    file_result = parse_config_file(context=context, is_build=is_build, build_result_by_type=build_result_by_type,
+                                    file_item=file_item, logger=logger)
+    cache_hit = None
+    if parse_cache and (parse_cache.hits, parse_cache.misses) != cache_stats:
+        cache_hit = parse_cache.misses == cache_stats[1]
+    profile = {
+        'file_path_relative': file_item['file_path_relative'],
+        'parser': handler.name if handler else None,
+        'wall_seconds': round(time.perf_counter() - wall_start, 6),
+        'cpu_seconds': round(cpu_time() - cpu_start, 6),
+        'bytes': sum(get_file_size(filepath, document_cache=context.get('document_cache'))
+                     for filepath in context['parsed_files']),
+        'components': sum(len(file_result[result_type]) for result_type in RESULT_TYPES),
+        'cache_hit': cache_hit
     }
+    return file_result, profile
+
+
+# per-process context of the parsing pool, set once by init_parse_worker instead of pickling it with every task
+parse_worker_context = dict()
+
+
+def init_parse_worker(context):
+    parse_worker_context.update(context)
+    # fork方式创建的进程继承了主进程已记录的诊断信息, 丢弃以免重复合并
+    context['logger'].pop_diagnostics()
+
+
+def parse_config_file_by_index(index):
+    context = parse_worker_context
+    file_result, profile = profile_config_file(context=context['context'], is_build=context['is_build'],
+                                               build_result_by_type=context['build_result_by_type'],
+                                               file_item=context['context']['search_result'][index],
+                                               logger=context['logger'])
+    # 各进程的缓存命中数与诊断信息随结果返回, 由主进程汇总
+    parse_cache = context['context']['parse_cache']
+    document_cache = context['context']['document_cache']
+    directory_index = context['context']['directory_index']
+    maven_resolver = context['context']['maven_resolver']
+    return file_result, profile, parse_cache.pop_stats() if parse_cache else None, \
+        document_cache.pop_stats() if document_cache else None, \
+        directory_index.pop_stats() if directory_index else None, \
+        maven_resolver.pop_stats() if maven_resolver else None, context['logger'].pop_diagnostics()
+
+
+def restore_file_result(file_record):
+    file_result = dict()
+    for result_type in RESULT_TYPES:
+        file_result[result_type] = list(file_record['file_result'].get(result_type, list()))
+    if file_record['file_result'].get(GRAPH_KEY):
+        file_result[GRAPH_KEY] = file_record['file_result'][GRAPH_KEY]
+    return file_result
+
+
+def build_dep_graph(dep_graph, parse_result, file_results):
+    """
+    Fill dep_graph with the components of parse_result, interned in the order of the scan's flat dep_result
+    (see util.parse_check_result), and merge the structure recorded for each parsed file.
+    """
+    for result_type in RESULT_TYPES:
+        for item in parse_result.get(result_type, list()):
+            dep_graph.add_node(item)
+    for file_result in file_results:
+        if file_result is not None and file_result.get(GRAPH_KEY):
+            graph = file_result[GRAPH_KEY]
+            dep_graph.add_fragment(items=file_result[graph['result_type']], graph=graph)
+    return dep_graph.freeze()
+
+
+def parse_config_files(scan_dir, root_name, is_skip, is_build, build_result, search_result, logger, workers=1,
+                       parse_cache=None, baseline=None, file_records=None, document_cache=None, dep_graph=None,
+                       timer=None, directory_index=None, maven_resolver=None):
+    """
+    Parse the candidate files of search_result into one deduplicated component list per result type.
+    document_cache (see core.document_cache) shares file contents already read by earlier stages of the scan,
+    directory_index (see detect.DirectoryIndex) the directory listings of the detect stage, used to find the lock
+    files and build outputs next to each candidate file. With a maven_resolver (see maven_resolver.MavenResolver),
+    the pom.xml files are resolved transitively against its local Maven repository.
+    With a baseline (see incremental.load_baseline), files whose fingerprint is unchanged reuse their baseline
+    result instead of being parsed again. When file_records is a list, one record per candidate file
+    (fingerprint, per-file result, whether it was reused) is appended to it. When dep_graph is a
+    core.dep_graph.DependencyGraph, it is filled with the components and the dependency structure of the scan.
+    When timer is a core.timing.ScanTimer, the sub-stages and the cost of each parsed file are recorded in it.
+    """
+    timer = timer if timer is not None else ScanTimer()
+    build_result_by_type = dict((build_type, 'failure') for build_type in registry.build_types)
     parse_result = dict()
-    cargo_result = list()
-    cocoa_result = list()
-    composer_result = list()
-    conan_result = list()
-    cpan_result = list()
-    cran_result = list()
-    gem_result = list()
-    go_result = list()
-    hackage_result = list()
-    hex_result = list()
-    lein_result = list()
-    maven_result = list()
-    npm_result = list()
-    nuget_result = list()
-    pub_result = list()
-    pypi_result = list()
-    swift_result = list()
-
-    scala_version = parse_scala_version(search_result, logger)
-    # 非编译构建模式
-    if not is_build:
-        for file_item in search_result:
-            try:
-                candidate_keys = get_key(mapper_dict=mapper, value=file_item['file_name'])
-                if candidate_keys:
-                    if candidate_keys[0] == 'Cargo':
-                        lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'Cargo.lock')
-                        if not os.path.exists(lock_file):
-                            logger.info('[+] Start parsing Cargo.toml: ' + file_item['file_path_relative'])
-                            dep_result = parse_cargo_files(filepath=file_item['file_path_absolute'], logger=logger)
-                            cargo_result.extend(dep_result)
-                        else:
-                            logger.info('[+] Start parsing Cargo.lock: ' + lock_file)
-                            dep_result = parse_cargo_files(filepath=lock_file, logger=logger)
-                            cargo_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Carthage':
-                        lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'Cartfile.resolved')
-                        if not os.path.exists(lock_file):
-                            logger.info('[+] Start parsing Cartfile: ' + file_item['file_path_relative'])
-                            dep_result = parse_carthage_files(filepath=file_item['file_path_absolute'], logger=logger)
-                            cocoa_result.extend(dep_result)
-                        else:
-                            logger.info('[+] Start parsing Cartfile.resolved: ' + lock_file)
-                            dep_result = parse_carthage_files(filepath=lock_file, logger=logger)
-                            cocoa_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Cocoapods':
-                        lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'Podfile.lock')
-                        if not os.path.exists(lock_file):
-                            logger.info('[+] Start parsing Podfile: ' + file_item['file_path_relative'])
-                            dep_result = parse_cocoa_files(filepath=file_item['file_path_absolute'], logger=logger)
-                            cocoa_result.extend(dep_result)
-                        else:
-                            logger.info('[+] Start parsing Podfile.lock: ' + lock_file)
-                            dep_result = parse_cocoa_files(filepath=lock_file, logger=logger)
-                            cocoa_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Composer':
-                        lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'composer.lock')
-                        if not os.path.exists(lock_file):
-                            logger.info('[+] Start parsing composer.json: ' + file_item['file_path_relative'])
-                            dep_result = parse_composer_files(filepath=file_item['file_path_absolute'], is_skip=is_skip,
-                                                              logger=logger)
-                            composer_result.extend(dep_result)
-                        else:
-                            logger.info('[+] Start parsing composer.lock: ' + lock_file)
-                            dep_result = parse_composer_files(filepath=lock_file, is_skip=is_skip, logger=logger)
-                            composer_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Conan':
-                        lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'conan.lock')
-                        if os.path.exists(lock_file):
-                            logger.info('[+] Start parsing conan.lock: ' + lock_file)
-                            dep_result = parse_conan_lock(filepath=lock_file, logger=logger)
-                            conan_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Cpan_Deps':
-                        logger.info('[+] Start parsing cpanfile: ' + file_item['file_path_relative'])
-                        dep_result = parse_cpanfile(filepath=file_item['file_path_absolute'], logger=logger)
-                        cpan_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Cran_Deps':
-                        logger.info('[+] Start parsing DESCRIPTION: ' + file_item['file_path_relative'])
-                        dep_result = parse_cran_files(filepath=file_item['file_path_absolute'], logger=logger)
-                        cran_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Dart_Pub':
-                        lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'pubspec.lock')
-                        if not os.path.exists(lock_file):
-                            logger.info('[+] Start parsing pubspec.yaml: ' + file_item['file_path_relative'])
-                            dep_result = parse_pubspec_files(filepath=file_item['file_path_absolute'], is_skip=is_skip,
-                                                             logger=logger)
-                            pub_result.extend(dep_result)
-                        else:
-                            logger.info('[+] Start parsing pubspec.lock: ' + lock_file)
-                            dep_result = parse_pubspec_files(filepath=lock_file, is_skip=is_skip, logger=logger)
-                            pub_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Dep':
-                        logger.info('[+] Start parsing Gopkg.lock: ' + file_item['file_path_relative'])
-                        dep_result = parse_dep_file(filepath=file_item['file_path_absolute'], logger=logger)
-                        go_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Gemlock':
-                        lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'Gemfile.lock')
-                        if not os.path.exists(lock_file):
-                            logger.info('[+] Start parsing Gemfile: ' + file_item['file_path_relative'])
-                            dep_result = parse_rubygem_files(filepath=file_item['file_path_absolute'], logger=logger)
-                            gem_result.extend(dep_result)
-                        else:
-                            logger.info('[+] Start parsing Gemfile.lock: ' + lock_file)
-                            dep_result = parse_gemfile_lock_file(filepath=lock_file, root_name=root_name, logger=logger)
-                            gem_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Go_Dep':
-                        logger.info('[+] Start parsing Godeps.json: ' + file_item['file_path_relative'])
-                        dep_result = parse_godep_file(filepath=file_item['file_path_absolute'], logger=logger)
-                        go_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Go_Mod_Cli':
-                        sum_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'go.sum')
-                        if not os.path.exists(sum_file):
-                            logger.info('[+] Start parsing go.mod: ' + file_item['file_path_relative'])
-                            dep_result = parse_gomod_files(filepath=file_item['file_path_absolute'], logger=logger)
-                            go_result.extend(dep_result)
-                        else:
-                            logger.info('[+] Start parsing go.sum: ' + sum_file)
-                            dep_result = parse_gomod_files(filepath=sum_file, logger=logger)
-                            go_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Leiningen':
-                        logger.info('[+] Start parsing project.clj: ' + file_item['file_path_relative'])
-                        dep_result = parse_project_clj_file(filepath=file_item['file_path_absolute'], logger=logger)
-                        lein_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Maven_Pom':
-                        logger.info('[+] Start parsing pom.xml: ' + file_item['file_path_relative'])
-                        dep_result = parse_maven_pom_file(filepath=file_item['file_path_absolute'],
-                                                          search_result=search_result, logger=logger)
-                        maven_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Mix':
-                        lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'mix.lock')
-                        if not os.path.exists(lock_file):
-                            logger.info('[+] Start parsing mix.exs: ' + file_item['file_path_relative'])
-                            dep_result = parse_mix_files(filepath=file_item['file_path_absolute'], logger=logger)
-                            hex_result.extend(dep_result)
-                        else:
-                            logger.info('[+] Start parsing mix.lock: ' + lock_file)
-                            dep_result = parse_mix_files(filepath=lock_file, logger=logger)
-                            hex_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'NPM_Cli':
-                        package_lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0],
-                                                         'package-lock.json')
-                        shrinkwrap_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0],
-                                                       'npm-shrinkwrap.json')
-                        yarn_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'yarn.lock')
-                        pnpm_lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0],
-                                                      'pnpm-lock.yaml')
-                        if os.path.exists(shrinkwrap_file) or os.path.exists(package_lock_file):
-                            if os.path.exists(shrinkwrap_file):
-                                logger.info('[+] Start parsing npm-shrinkwrap.json: ' + shrinkwrap_file)
-                                dep_result = parse_lock_json_file(filepath=shrinkwrap_file, is_skip=is_skip,
-                                                                  logger=logger)
-                                npm_result.extend(dep_result)
-                                continue
-                            elif os.path.exists(package_lock_file):
-                                logger.info('[+] Start parsing package-lock.json: ' + package_lock_file)
-                                dep_result = parse_lock_json_file(filepath=package_lock_file, is_skip=is_skip,
-                                                                  logger=logger)
-                                npm_result.extend(dep_result)
-                                continue
-                        elif os.path.exists(yarn_file):
-                            logger.info('[+] Start parsing yarn.lock: ' + yarn_file)
-                            dep_result = parse_yarn_lock_file(filepath=yarn_file, logger=logger)
-                            npm_result.extend(dep_result)
-                            continue
-                        elif os.path.exists(pnpm_lock_file):
-                            logger.info('[+] Start parsing pnpm-lock.yaml: ' + pnpm_lock_file)
-                            dep_result = parse_pnpm_lock_file(filepath=pnpm_lock_file, is_skip=is_skip, logger=logger)
-                            npm_result.extend(dep_result)
-                            continue
-                        else:
-                            logger.info('[+] Start parsing package.json: ' + file_item['file_path_relative'])
-                            dep_result = parse_package_json_file(filepath=file_item['file_path_absolute'],
-                                                                 is_skip=is_skip, logger=logger)
-                            npm_result.extend(dep_result)
-                            continue
-                    elif candidate_keys[0] == 'Nugetconf':
-                        logger.info('[+] Start parsing packages.config: ' + file_item['file_path_relative'])
-                        dep_result = parse_nuget_files(filepath=file_item['file_path_absolute'], logger=logger)
-                        nuget_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Packrat_Lock':
-                        logger.info('[+] Start parsing packrat.lock: ' + file_item['file_path_relative'])
-                        dep_result = parse_cran_files(filepath=file_item['file_path_absolute'], logger=logger)
-                        cran_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Pip_Env':
-                        lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'Pipfile.lock')
-                        if not os.path.exists(lock_file):
-                            logger.info('[+] Start parsing Pipfile: ' + file_item['file_path_relative'])
-                            dep_result = parse_pipenv_files(filepath=file_item['file_path_absolute'], logger=logger)
-                            pypi_result.extend(dep_result)
-                        else:
-                            logger.info('[+] Start parsing Pipfile.lock: ' + lock_file)
-                            dep_result = parse_pipenv_files(filepath=lock_file, logger=logger)
-                            pypi_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Pip_Inspector':
-                        logger.info('[+] Start parsing setup.py: ' + file_item['file_path_relative'])
-                        dep_result = parse_pip_files(filepath=file_item['file_path_absolute'], logger=logger)
-                        pypi_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Poetry':
-                        lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'poetry.lock')
-                        if not os.path.exists(lock_file):
-                            logger.info('[+] Start parsing pyproject.toml: ' + file_item['file_path_relative'])
-                            dep_result = parse_poetry_files(filepath=file_item['file_path_absolute'], logger=logger)
-                            pypi_result.extend(dep_result)
-                        else:
-                            logger.info('[+] Start parsing poetry.lock: ' + lock_file)
-                            dep_result = parse_poetry_files(filepath=lock_file, logger=logger)
-                            pypi_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Rebar':
-                        logger.info('[+] Start parsing rebar.config: ' + file_item['file_path_relative'])
-                        dep_result = parse_rebar_config_file(filepath=file_item['file_path_absolute'], logger=logger)
-                        hex_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Sbt':
-                        logger.info('[+] Start parsing build.sbt: ' + file_item['file_path_relative'])
-                        dep_result = parse_build_config_files(filepath=file_item['file_path_absolute'],
-                                                              scala_version=scala_version, logger=logger)
-                        maven_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Swift':
-                        lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'Package.resolved')
-                        if not os.path.exists(lock_file):
-                            logger.info('[+] Start parsing Package.swift: ' + file_item['file_path_relative'])
-                            dep_result = parse_swift_files(filepath=file_item['file_path_absolute'], logger=logger)
-                            swift_result.extend(dep_result)
-                        else:
-                            logger.info('[+] Start parsing Package.resolved: ' + lock_file)
-                            dep_result = parse_swift_files(filepath=lock_file, logger=logger)
-                            swift_result.extend(dep_result)
-                        continue
-                elif is_podspec_file(filepath=file_item['file_path_absolute']):
-                    lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'Podfile.lock')
-                    if not os.path.exists(lock_file):
-                        logger.info('[+] Start parsing .podspec: ' + file_item['file_path_relative'])
-                        dep_result = parse_podspec(filepath=file_item['file_path_absolute'], logger=logger)
-                        cocoa_result.extend(dep_result)
-                    continue
-                elif is_gemspec_file(filepath=file_item['file_path_absolute']):
-                    lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'Gemfile.lock')
-                    if not os.path.exists(lock_file):
-                        logger.info('[+] Start parsing .gemspec: ' + file_item['file_path_relative'])
-                        dep_result = parse_rubygem_files(filepath=file_item['file_path_absolute'], logger=logger)
-                        gem_result.extend(dep_result)
-                    continue
-                elif is_build_gradle_file(filepath=file_item['file_path_absolute']):
-                    logger.info('[+] Start parsing build.gradle: ' + file_item['file_path_relative'])
-                    dep_result = parse_build_gradle_file(filepath=file_item['file_path_absolute'], logger=logger)
-                    maven_result.extend(dep_result)
-                    continue
-                elif is_package_file(filepath=file_item['file_path_absolute']):
-                    logger.info('[+] Start parsing package.yaml or *.cabal: ' + file_item['file_path_relative'])
-                    dep_result = parse_stack_files(filepath=file_item['file_path_absolute'], logger=logger)
-                    hackage_result.extend(dep_result)
-                    continue
-                elif is_project_file(filepath=file_item['file_path_absolute']):
-                    config_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'packages.config')
-                    if not os.path.exists(config_file):
-                        logger.info('[+] Start parsing .csproj or .nuspec: ' + file_item['file_path_relative'])
-                        dep_result = parse_nuget_files(filepath=file_item['file_path_absolute'], logger=logger)
-                        nuget_result.extend(dep_result)
-                    continue
-                elif is_requirements_file(filepath=file_item['file_path_absolute']):
-                    logger.info('[+] Start parsing requirements.txt: ' + file_item['file_path_relative'])
-                    dep_result = parse_pip_files(filepath=file_item['file_path_absolute'], logger=logger)
-                    pypi_result.extend(dep_result)
-                    continue
-                elif is_environment_file(filepath=file_item['file_path_absolute']):
-                    logger.info('[+] Start parsing environment.yml: ' + file_item['file_path_relative'])
-                    dep_result = parse_environment_file(filepath=file_item['file_path_absolute'], logger=logger)
-                    pypi_result.extend(dep_result)
-                    continue
-                elif is_dependencies_scala_file(filepath=file_item['file_path_absolute']):
-                    logger.info('[+] Start parsing dependencies.scala: ' + file_item['file_path_relative'])
-                    dep_result = parse_build_config_files(filepath=file_item['file_path_absolute'],
-                                                          scala_version=scala_version, logger=logger)
-                    maven_result.extend(dep_result)
-                    continue
-            except Exception as e:
-                logger.error('Exception occurs when parsing config file {}: {}'.format(file_item['file_path_absolute'],
-                                                                                       str(e)))
-                continue
+    merge_result = dict()
+    for result_type in RESULT_TYPES:
+        merge_result[result_type] = list()
 
-    # 编译构建模式
-    else:
+    # 本次扫描的解析上下文, 各解析函数按ParserSpec声明的参数名取用
+    detected_options = get_detected_options(search_result)
+    context = {
+        'scan_dir': scan_dir,
+        'root_name': root_name,
+        'is_skip': is_skip,
+        'search_result': search_result,
+        'scala_version': SCALA_VERSION.function(search_result, logger, document_cache=document_cache)
+        if 'scala_version' in detected_options else '',
+        'pom_cache': POM_CACHE.function(document_cache=document_cache) if 'pom_cache' in detected_options else None,
+        'parse_cache': parse_cache,
+        'document_cache': document_cache,
+        'directory_index': directory_index,
+        'maven_resolver': maven_resolver
+    }
+    if is_build:
         build_result_by_type = update_build_result_by_type(build_result=build_result,
                                                            build_result_by_type=build_result_by_type)
 
-        for file_item in search_result:
-            try:
-                candidate_keys = get_key(mapper_dict=mapper, value=file_item['file_name'])
-                if candidate_keys:
-                    if candidate_keys[0] == 'Cargo':
-                        lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'Cargo.lock')
-                        if not os.path.exists(lock_file):
-                            logger.info('[+] Start parsing Cargo.toml: ' + file_item['file_path_relative'])
-                            dep_result = parse_cargo_files(filepath=file_item['file_path_absolute'], logger=logger)
-                            cargo_result.extend(dep_result)
-                        else:
-                            logger.info('[+] Start parsing Cargo.lock: ' + lock_file)
-                            dep_result = parse_cargo_files(filepath=lock_file, logger=logger)
-                            cargo_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Carthage':
-                        lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'Cartfile.resolved')
-                        if not os.path.exists(lock_file):
-                            logger.info('[+] Start parsing Cartfile: ' + file_item['file_path_relative'])
-                            dep_result = parse_carthage_files(filepath=file_item['file_path_absolute'], logger=logger)
-                            cocoa_result.extend(dep_result)
-                        else:
-                            logger.info('[+] Start parsing Cartfile.resolved: ' + lock_file)
-                            dep_result = parse_carthage_files(filepath=lock_file, logger=logger)
-                            cocoa_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Cocoapods':
-                        lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'Podfile.lock')
-                        if not os.path.exists(lock_file):
-                            logger.info('[+] Start parsing Podfile: ' + file_item['file_path_relative'])
-                            dep_result = parse_cocoa_files(filepath=file_item['file_path_absolute'], logger=logger)
-                            cocoa_result.extend(dep_result)
-                        else:
-                            logger.info('[+] Start parsing Podfile.lock: ' + lock_file)
-                            dep_result = parse_cocoa_files(filepath=lock_file, logger=logger)
-                            cocoa_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Composer':
-                        lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'composer.lock')
-                        if not os.path.exists(lock_file):
-                            logger.info('[+] Start parsing composer.json: ' + file_item['file_path_relative'])
-                            dep_result = parse_composer_files(filepath=file_item['file_path_absolute'], is_skip=is_skip,
-                                                              logger=logger)
-                            composer_result.extend(dep_result)
-                        else:
-                            logger.info('[+] Start parsing composer.lock: ' + lock_file)
-                            dep_result = parse_composer_files(filepath=lock_file, is_skip=is_skip, logger=logger)
-                            composer_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Conan':
-                        lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'conan.lock')
-                        if os.path.exists(lock_file):
-                            logger.info('[+] Start parsing conan.lock: ' + lock_file)
-                            dep_result = parse_conan_lock(filepath=lock_file, logger=logger)
-                            conan_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Cpan_Cli':
-                        if build_result_by_type['Cpan_Cli'] == 'success':
-                            dep_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'cpan_deps.txt')
-                            if os.path.exists(dep_file):
-                                logger.info('[+] Start parsing cpan_deps.txt: ' + dep_file)
-                                dep_result = parse_cpandeps(filepath=dep_file, logger=logger)
-                                cpan_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Cpan_Deps':
-                        if build_result_by_type['Cpan_Cli'] == 'failure':
-                            logger.info('[+] Start parsing cpanfile: ' + file_item['file_path_relative'])
-                            dep_result = parse_cpanfile(filepath=file_item['file_path_absolute'], logger=logger)
-                            cpan_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Cran_Deps':
-                        logger.info('[+] Start parsing DESCRIPTION: ' + file_item['file_path_relative'])
-                        dep_result = parse_cran_files(filepath=file_item['file_path_absolute'], logger=logger)
-                        cran_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Dart_Pub':
-                        lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'pubspec.lock')
-                        if not os.path.exists(lock_file):
-                            logger.info('[+] Start parsing pubspec.yaml: ' + file_item['file_path_relative'])
-                            dep_result = parse_pubspec_files(filepath=file_item['file_path_absolute'], is_skip=is_skip,
-                                                             logger=logger)
-                            pub_result.extend(dep_result)
-                        else:
-                            logger.info('[+] Start parsing pubspec.lock: ' + lock_file)
-                            dep_result = parse_pubspec_files(filepath=lock_file, is_skip=is_skip, logger=logger)
-                            pub_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Dep':
-                        logger.info('[+] Start parsing Gopkg.lock: ' + file_item['file_path_relative'])
-                        dep_result = parse_dep_file(filepath=file_item['file_path_absolute'], logger=logger)
-                        go_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Gemlock':
-                        lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'Gemfile.lock')
-                        if not os.path.exists(lock_file):
-                            logger.info('[+] Start parsing Gemfile: ' + file_item['file_path_relative'])
-                            dep_result = parse_rubygem_files(filepath=file_item['file_path_absolute'], logger=logger)
-                            gem_result.extend(dep_result)
-                        else:
-                            logger.info('[+] Start parsing Gemfile.lock: ' + lock_file)
-                            dep_result = parse_gemfile_lock_file(filepath=lock_file, root_name=root_name, logger=logger)
-                            gem_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Go_Dep':
-                        logger.info('[+] Start parsing Godeps.json: ' + file_item['file_path_relative'])
-                        dep_result = parse_godep_file(filepath=file_item['file_path_absolute'], logger=logger)
-                        go_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Go_Mod_Cli':
-                        if build_result_by_type['Go_Mod_Cli'] == 'success':
-                            list_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0],
-                                                     'gomod_list.txt')
-                            if os.path.exists(list_file):
-                                logger.info('[+] Starting parsing gomod_list.txt: ' + list_file)
-                                dep_result = parse_gomod_list_file(filepath=list_file, logger=logger)
-                                go_result.extend(dep_result)
-                        else:
-                            sum_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'go.sum')
-                            if not os.path.exists(sum_file):
-                                logger.info('[+] Start parsing go.mod: ' + file_item['file_path_relative'])
-                                dep_result = parse_gomod_files(filepath=file_item['file_path_absolute'], logger=logger)
-                                go_result.extend(dep_result)
-                            else:
-                                logger.info('[+] Start parsing go.sum: ' + sum_file)
-                                dep_result = parse_gomod_files(filepath=sum_file, logger=logger)
-                                go_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Leiningen':
-                        if build_result_by_type['Leiningen'] == 'success':
-                            tree_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'lein_maven_tree.txt')
-                            if os.path.exists(tree_file):
-                                logger.info('[+] Starting parsing lein_maven_tree.txt: ' + tree_file)
-                                dep_result = parse_lein_tree_file(filepath=tree_file, logger=logger)
-                                lein_result.extend(dep_result)
-                        else:
-                            logger.info('[+] Start parsing project.clj: ' + file_item['file_path_relative'])
-                            dep_result = parse_project_clj_file(filepath=file_item['file_path_absolute'], logger=logger)
-                            lein_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Maven_Pom':
-                        if build_result_by_type['Maven_Pom'] == 'success':
-                            tree_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'maven_tree.txt')
-                            if os.path.exists(tree_file):
-                                logger.info('[+] Starting parsing maven_tree.txt: ' + tree_file)
-                                dep_result = parse_maven_tree_file(filepath=tree_file, logger=logger)
-                                maven_result.extend(dep_result)
-                        else:
-                            logger.info('[+] Start parsing pom.xml: ' + file_item['file_path_relative'])
-                            dep_result = parse_maven_pom_file(filepath=file_item['file_path_absolute'],
-                                                              search_result=search_result, logger=logger)
-                            maven_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Mix':
-                        lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'mix.lock')
-                        if not os.path.exists(lock_file):
-                            logger.info('[+] Start parsing mix.exs: ' + file_item['file_path_relative'])
-                            dep_result = parse_mix_files(filepath=file_item['file_path_absolute'], logger=logger)
-                            hex_result.extend(dep_result)
-                        else:
-                            logger.info('[+] Start parsing mix.lock: ' + lock_file)
-                            dep_result = parse_mix_files(filepath=lock_file, logger=logger)
-                            hex_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'NPM_Cli':
-                        lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'package-lock.json')
-                        if os.path.exists(lock_file):
-                            logger.info('[+] Start parsing package-lock.json: ' + lock_file)
-                            dep_result = parse_lock_json_file(filepath=lock_file, is_skip=is_skip, logger=logger)
-                            npm_result.extend(dep_result)
-                            continue
-                        else:
-                            yarn_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'yarn.lock')
-                            pnpm_lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0],
-                                                          'pnpm-lock.yaml')
-                            if os.path.exists(yarn_file):
-                                logger.info('[+] Start parsing yarn.lock: ' + yarn_file)
-                                dep_result = parse_yarn_lock_file(filepath=yarn_file, logger=logger)
-                                npm_result.extend(dep_result)
-                                continue
-                            elif os.path.exists(pnpm_lock_file):
-                                logger.info('[+] Start parsing pnpm-lock.yaml: ' + pnpm_lock_file)
-                                dep_result = parse_pnpm_lock_file(filepath=pnpm_lock_file, is_skip=is_skip,
-                                                                  logger=logger)
-                                npm_result.extend(dep_result)
-                                continue
-                            else:
-                                logger.info('[+] Start parsing package.json: ' + file_item['file_path_relative'])
-                                dep_result = parse_package_json_file(filepath=file_item['file_path_absolute'],
-                                                                     is_skip=is_skip, logger=logger)
-                                npm_result.extend(dep_result)
-                                continue
-                    elif candidate_keys[0] == 'Nugetconf':
-                        logger.info('[+] Start parsing packages.config: ' + file_item['file_path_relative'])
-                        dep_result = parse_nuget_files(filepath=file_item['file_path_absolute'], logger=logger)
-                        nuget_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Packrat_Lock':
-                        logger.info('[+] Start parsing packrat.lock: ' + file_item['file_path_relative'])
-                        dep_result = parse_cran_files(filepath=file_item['file_path_absolute'], logger=logger)
-                        cran_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Pip_Env':
-                        lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'Pipfile.lock')
-                        if not os.path.exists(lock_file):
-                            logger.info('[+] Start parsing Pipfile: ' + file_item['file_path_relative'])
-                            dep_result = parse_pipenv_files(filepath=file_item['file_path_absolute'], logger=logger)
-                            pypi_result.extend(dep_result)
-                        else:
-                            logger.info('[+] Start parsing Pipfile.lock: ' + lock_file)
-                            dep_result = parse_pipenv_files(filepath=lock_file, logger=logger)
-                            pypi_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Pip_Inspector':
-                        logger.info('[+] Start parsing setup.py: ' + file_item['file_path_relative'])
-                        dep_result = parse_pip_files(filepath=file_item['file_path_absolute'], logger=logger)
-                        pypi_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Poetry':
-                        lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'poetry.lock')
-                        if not os.path.exists(lock_file):
-                            logger.info('[+] Start parsing pyproject.toml: ' + file_item['file_path_relative'])
-                            dep_result = parse_poetry_files(filepath=file_item['file_path_absolute'], logger=logger)
-                            pypi_result.extend(dep_result)
-                        else:
-                            logger.info('[+] Start parsing poetry.lock: ' + lock_file)
-                            dep_result = parse_poetry_files(filepath=lock_file, logger=logger)
-                            pypi_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Rebar':
-                        if build_result_by_type['Rebar'] == 'success':
-                            tree_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'rebar_tree.txt')
-                            if os.path.exists(tree_file):
-                                logger.info('[+] Starting parsing rebar_tree.txt: ' + tree_file)
-                                dep_result = parse_rebar_tree_file(filepath=tree_file, logger=logger)
-                                hex_result.extend(dep_result)
-                        else:
-                            logger.info('[+] Start parsing rebar.config: ' + file_item['file_path_relative'])
-                            dep_result = parse_rebar_config_file(filepath=file_item['file_path_absolute'],
-                                                                 logger=logger)
-                            hex_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Sbt':
-                        filepath_list = construct_tree_file_list(scan_dir=scan_dir)
-                        if filepath_list:
-                            dep_result = parse_tree_json_file(root_name=root_name, filepath_list=filepath_list,
-                                                              logger=logger)
-                            maven_result.extend(dep_result)
-                        else:
-                            logger.info('[+] Start parsing build.sbt: ' + file_item['file_path_relative'])
-                            dep_result = parse_build_config_files(filepath=file_item['file_path_absolute'],
-                                                                  scala_version=scala_version, logger=logger)
-                            maven_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Stack':
-                        if build_result_by_type['Stack'] == 'success':
-                            json_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'stack_deps.json')
-                            if os.path.exists(json_file):
-                                logger.info('[+] Starting parsing stack_deps.json: ' + json_file)
-                                dep_result = parse_stack_json_file(filepath=json_file, logger=logger)
-                                hackage_result.extend(dep_result)
-                        continue
-                    elif candidate_keys[0] == 'Swift':
-                        lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'Package.resolved')
-                        if not os.path.exists(lock_file):
-                            logger.info('[+] Start parsing Package.swift: ' + file_item['file_path_relative'])
-                            dep_result = parse_swift_files(filepath=file_item['file_path_absolute'], logger=logger)
-                            swift_result.extend(dep_result)
-                        else:
-                            logger.info('[+] Start parsing Package.resolved: ' + lock_file)
-                            dep_result = parse_swift_files(filepath=lock_file, logger=logger)
-                            swift_result.extend(dep_result)
-                        continue
-                elif is_podspec_file(filepath=file_item['file_path_absolute']):
-                    lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'Podfile.lock')
-                    if not os.path.exists(lock_file):
-                        logger.info('[+] Start parsing .podspec: ' + file_item['file_path_relative'])
-                        dep_result = parse_podspec(filepath=file_item['file_path_absolute'], logger=logger)
-                        cocoa_result.extend(dep_result)
+    # 文件结果按search_result顺序合并, 保证并行模式下的输出顺序与串行模式一致
+    file_results = [None] * len(search_result)
+    fingerprints = [None] * len(search_result)
+    if baseline or file_records is not None:
+        with timer.stage('parse.fingerprint'):
+            baseline_files = baseline['file_results'] if baseline else dict()
+            for index, file_item in enumerate(search_result):
+                file_record = baseline_files.get(file_item['file_path_relative'])
+                previous = file_record['fingerprint'] if file_record else None
+                try:
+                    fingerprints[index] = fingerprint_file_item(
+                        handler=registry.match_path(file_item['file_path_absolute']), file_item=file_item,
+                        context=context, is_build=is_build, previous=previous)
+                except Exception as e:
+                    logger.warn('Exception occurs when fingerprinting config file {}: {}'
+                                .format(file_item['file_path_absolute'], str(e)), file=file_item['file_path_absolute'])
                     continue
-                elif is_gemspec_file(filepath=file_item['file_path_absolute']):
-                    lock_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'Gemfile.lock')
-                    if not os.path.exists(lock_file):
-                        logger.info('[+] Start parsing .gemspec: ' + file_item['file_path_relative'])
-                        dep_result = parse_rubygem_files(filepath=file_item['file_path_absolute'], logger=logger)
-                        gem_result.extend(dep_result)
-                    continue
-                elif is_build_gradle_file(filepath=file_item['file_path_absolute']):
-                    if build_result_by_type['Gradle'] == 'success':
-                        tree_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'gradle_tree.txt')
-                        if os.path.exists(tree_file):
-                            logger.info('[+] Start parsing gradle_tree.txt: ' + tree_file)
-                            dep_result = parse_gradle_tree_file(filepath=tree_file, logger=logger)
-                            maven_result.extend(dep_result)
-                    else:
-                        logger.info('[+] Start parsing build.gradle: ' + file_item['file_path_relative'])
-                        dep_result = parse_build_gradle_file(filepath=file_item['file_path_absolute'], logger=logger)
-                        maven_result.extend(dep_result)
-                    continue
-                elif is_package_file(filepath=file_item['file_path_absolute']):
-                    if build_result_by_type['Stack'] == 'failure':
-                        logger.info('[+] Start parsing package.yaml or *.cabal: ' + file_item['file_path_relative'])
-                        dep_result = parse_stack_files(filepath=file_item['file_path_absolute'], logger=logger)
-                        hackage_result.extend(dep_result)
-                    continue
-                elif is_project_file(filepath=file_item['file_path_absolute']):
-                    config_file = os.path.join(os.path.split(file_item['file_path_absolute'])[0], 'packages.config')
-                    if not os.path.exists(config_file):
-                        logger.info('[+] Start parsing .csproj or .nuspec: ' + file_item['file_path_relative'])
-                        dep_result = parse_nuget_files(filepath=file_item['file_path_absolute'], logger=logger)
-                        nuget_result.extend(dep_result)
-                    continue
-                elif is_requirements_file(filepath=file_item['file_path_absolute']):
-                    logger.info('[+] Start parsing requirements.txt: ' + file_item['file_path_relative'])
-                    dep_result = parse_pip_files(filepath=file_item['file_path_absolute'], logger=logger)
-                    pypi_result.extend(dep_result)
-                    continue
-                elif is_environment_file(filepath=file_item['file_path_absolute']):
-                    logger.info('[+] Start parsing environment.yml: ' + file_item['file_path_relative'])
-                    dep_result = parse_environment_file(filepath=file_item['file_path_absolute'], logger=logger)
-                    pypi_result.extend(dep_result)
-                    continue
-                elif is_dependencies_scala_file(filepath=file_item['file_path_absolute']):
-                    # TODO: 能否少获取一次tree_file_list
-                    filepath_list = construct_tree_file_list(scan_dir=scan_dir)
-                    if not filepath_list:
-                        logger.info('[+] Start parsing dependencies.scala: ' + file_item['file_path_relative'])
-                        dep_result = parse_build_config_files(filepath=file_item['file_path_absolute'],
-                                                              scala_version=scala_version, logger=logger)
-                        maven_result.extend(dep_result)
+                if file_record and file_record['file_result'] is not None \
+                        and fingerprint_matches(previous=previous, current=fingerprints[index]):
+                    file_results[index] = restore_file_result(file_record)
+    reused = [file_result is not None for file_result in file_results]
+    pending = [index for index in range(0, len(search_result)) if not reused[index]]
+    timer.set_counts('baseline', {'reused': len(search_result) - len(pending)} if baseline else None)
+
+    with timer.stage('parse.files'):
+        if workers and workers > 1 and len(pending) > 1:
+            worker_context = {
+                'context': context,
+                'is_build': is_build,
+                'build_result_by_type': build_result_by_type,
+                'logger': logger
+            }
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_parse_worker,
+                                     initargs=(worker_context,)) as executor:
+                futures = [executor.submit(parse_config_file_by_index, index) for index in pending]
+                for index, future in zip(pending, futures):
+                    try:
+                        file_results[index], profile, cache_stats, document_stats, index_stats, resolver_stats, \
+                            diagnostics = future.result()
+                        timer.add_file(profile)
+                        logger.merge_diagnostics(diagnostics)
+                        if parse_cache:
+                            parse_cache.merge_stats(cache_stats)
+                        if document_cache:
+                            document_cache.merge_stats(document_stats)
+                        if directory_index:
+                            directory_index.merge_stats(index_stats)
+                        if maven_resolver:
+                            maven_resolver.merge_stats(resolver_stats)
+                    except Exception as e:
+                        logger.error('Exception occurs when parsing config file {}: {}'
+                                     .format(search_result[index]['file_path_absolute'], str(e)),
+                                     file=search_result[index]['file_path_absolute'])
+                        continue
+        else:
+            for index in pending:
+                file_item = search_result[index]
+                try:
+                    file_results[index], profile = profile_config_file(context=context, is_build=is_build,
+                                                                       build_result_by_type=build_result_by_type,
+                                                                       file_item=file_item, logger=logger)
+                    timer.add_file(profile)
+                except Exception as e:
+                    logger.error('Exception occurs when parsing config file {}: {}'
+                                 .format(file_item['file_path_absolute'], str(e)), file=file_item['file_path_absolute'])
                     continue
-            except Exception as e:
-                logger.error('Exception occurs when parsing config file {}: {}'.format(file_item['file_path_absolute'],
-                                                                                       str(e)))
+
+    if file_records is not None:
+        for index, file_item in enumerate(search_result):
+            file_result = file_results[index]
+            file_records.append({
+                'file_path_relative': file_item['file_path_relative'],
+                'fingerprint': fingerprints[index],
+                'reused': reused[index],
+                'file_result': dict((result_type, dep_result) for result_type, dep_result in file_result.items()
+                                    if dep_result) if file_result is not None else None
+            })
+
+    with timer.stage('parse.dedup'):
+        for file_result in file_results:
+            if file_result is None:
                 continue
+            for result_type in RESULT_TYPES:
+                merge_result[result_type].extend(file_result[result_type])
 
-    try:
-        parse_result['cargo_result'] = remove_duplicate_dict_items(data_list=cargo_result)
-        parse_result['cocoa_result'] = remove_duplicate_dict_items(data_list=cocoa_result)
-        parse_result['composer_result'] = remove_duplicate_dict_items(data_list=composer_result)
-        parse_result['conan_result'] = remove_duplicate_dict_items(data_list=conan_result)
-        parse_result['cpan_result'] = remove_duplicate_dict_items(data_list=cpan_result)
-        parse_result['cran_result'] = remove_duplicate_dict_items(data_list=cran_result)
-        parse_result['gem_result'] = remove_duplicate_dict_items(data_list=gem_result)
-        parse_result['go_result'] = remove_duplicate_dict_items(data_list=go_result)
-        parse_result['hackage_result'] = remove_duplicate_dict_items(data_list=hackage_result)
-        parse_result['hex_result'] = remove_duplicate_dict_items(data_list=hex_result)
-        parse_result['lein_result'] = remove_duplicate_dict_items(data_list=lein_result)
-        parse_result['maven_result'] = remove_duplicate_dict_items(data_list=maven_result)
-        parse_result['npm_result'] = remove_duplicate_dict_items(data_list=npm_result)
-        parse_result['nuget_result'] = remove_duplicate_dict_items(data_list=nuget_result)
-        parse_result['pub_result'] = remove_duplicate_dict_items(data_list=pub_result)
-        parse_result['pypi_result'] = remove_duplicate_dict_items(data_list=pypi_result)
-        parse_result['swift_result'] = remove_duplicate_dict_items(data_list=swift_result)
-    except Exception as e:
-        logger.error('Exception occurs in function remove_duplicate_dict_items when adding dep_items to parse_result: '
-                     '{}'.format(str(e)))
+        try:
+            for result_type in RESULT_TYPES:
+                parse_result[result_type] = remove_duplicate_components(data_list=merge_result[result_type])
+        except Exception as e:
+            logger.error('Exception occurs in function remove_duplicate_components when adding dep_items to '
+                         'parse_result: {}'.format(str(e)))
+
+    if dep_graph is not None:
+        with timer.stage('parse.graph'):
+            try:
+                build_dep_graph(dep_graph=dep_graph, parse_result=parse_result, file_results=file_results)
+            except Exception as e:
+                logger.error('Exception occurs when building the dependency graph: {}'.format(str(e)))
 
     return parse_result
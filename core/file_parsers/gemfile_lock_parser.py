@@ -1,6 +1,6 @@
 import re
 from core.file_parsers.gemfile_lock_utils import unicode_text_lines
-from core.util import remove_duplicate_dict_items
+from core.dep_graph import GraphBuilder
 
 
 OPTIONS = re.compile(r'^  (?P<key>[a-z]+): (?P<value>.*)$').match
@@ -143,7 +143,7 @@ class GemfileLock:
     The parser uses a simple state machine, switching states based on sections headings.
     The result is a tree of Gems objects stored in self.dependencies.
     """
-    def __init__(self, lockfile):
+    def __init__(self, lockfile, document_cache=None):
         self.lockfile = lockfile
 
         # map of a line start string to the next parsing state function
@@ -169,7 +169,7 @@ class GemfileLock:
         self.reset_state()
 
         # parse proper
-        for line in unicode_text_lines(lockfile):
+        for line in unicode_text_lines(lockfile, document_cache=document_cache):
             line = line.rstrip()
 
             # reset state
@@ -300,39 +300,44 @@ class GemfileLock:
         self.platforms.append(plat.strip())
 
 
-def parse_gemfile_lock_file(filepath, root_name, logger):
+def construct_dep_item(gem):
+    temp = dict()
+    temp['type'] = 'gem'
+    temp['namespace'] = ''
+    temp['name'] = gem.name
+    temp['version'] = gem.version if gem.version else ''
+    temp['language'] = 'Ruby'
+    return temp
 
-    dependencies = list()
+
+def parse_gemfile_lock_file(filepath, root_name, logger, document_cache=None):
+
+    builder = GraphBuilder()
 
     try:
-        gemfile_lock = GemfileLock(lockfile=filepath)
+        gemfile_lock = GemfileLock(lockfile=filepath, document_cache=document_cache)
     except Exception as e:
         logger.error('Exception occurs when loading Gemfile.lock file {}: {}'.format(filepath, str(e)))
-        return dependencies
+        return builder.result()
 
+    nodes = dict()
     for _, gem in gemfile_lock.all_gems.items():
         if gem.name != root_name:
-            temp = dict()
-            temp['type'] = 'gem'
-            temp['namespace'] = ''
-            temp['name'] = gem.name
-            temp['version'] = gem.version if gem.version else ''
-            temp['language'] = 'Ruby'
-            dependencies.append(temp)
+            nodes[gem.name] = builder.add(construct_dep_item(gem))
 
     for _, gem in gemfile_lock.all_gems.items():
         for _dep_name, dep in gem.dependencies.items():
             if dep.name != root_name:
-                temp = dict()
-                temp['type'] = 'gem'
-                temp['namespace'] = ''
-                temp['name'] = dep.name
-                temp['version'] = dep.version if dep.version else ''
-                temp['language'] = 'Ruby'
-                dependencies.append(temp)
-
-    dependencies = remove_duplicate_dict_items(data_list=dependencies)
-    return dependencies
+                node = builder.add(construct_dep_item(dep))
+                # gemspec项目自身(PATH中的root_name)的依赖为直接依赖
+                builder.add_dependency(nodes.get(gem.name), node)
+
+    # DEPENDENCIES: Gemfile中声明的直接依赖
+    for name in gemfile_lock.dependency_tree:
+        if name in nodes:
+            builder.add_dependency(None, nodes[name])
+
+    return builder.result()
 
 
 if __name__ == "__main__":
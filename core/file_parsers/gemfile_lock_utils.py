@@ -4,6 +4,8 @@ import string
 import unicodedata
 import chardet
 
+from core.document_cache import open_document
+
 
 MIN_LEN = 4
 MIN_LEN_STR = b'4'
@@ -166,12 +168,12 @@ def remove_verbatim_cr_lf_tab_chars(s):
     return s.replace('\\r', ' ').replace('\\n', ' ').replace('\\t', ' ')
 
 
-def unicode_text_lines(location):
+def unicode_text_lines(location, document_cache=None):
     """
     Return an iterable over unicode text lines from a file at `location` if it
     contains text. Open the file as binary with universal new lines then try to
     decode each line as Unicode.
     """
-    with open(location, 'rb') as f:
+    with open_document(filepath=location, document_cache=document_cache, binary=True) as f:
         for line in f.read().splitlines(True):
             yield remove_verbatim_cr_lf_tab_chars(as_unicode(line))
@@ -1,13 +1,14 @@
 import toml
 from core.util import read_json_file
+from core.document_cache import open_document
 
 
-def parse_dep_file(filepath, logger):
+def parse_dep_file(filepath, logger, document_cache=None):
 
     dependencies = list()
 
     try:
-        with open(file=filepath, mode='r', encoding='utf-8') as file:
+        with open_document(filepath=filepath, document_cache=document_cache) as file:
             content = toml.load(f=file)
     except Exception as e:
         logger.error('Exception occurs when loading Gopkg.lock file {}: {}'.format(filepath, str(e)))
@@ -53,9 +54,9 @@ def parse_dep_file(filepath, logger):
     return dependencies
 
 
-def parse_godep_file(filepath, logger):
+def parse_godep_file(filepath, logger, document_cache=None):
 
-    json_result = read_json_file(filepath, logger)
+    json_result = read_json_file(filepath=filepath, logger=logger, document_cache=document_cache)
     dependencies = list()
 
     if json_result:
@@ -1,5 +1,5 @@
-import io
 import re
+from core.document_cache import open_document
 
 
 def is_gosum(filepath):
@@ -88,14 +88,14 @@ parse_dep_link = re.compile(
 ).match
 
 
-def parse_gomod(filepath, logger):
+def parse_gomod(filepath, logger, document_cache=None):
     """
     Return a dictionary containing all the important go.mod file data.
     """
     dependencies = list()
 
     try:
-        with io.open(filepath, encoding='utf-8', closefd=True) as data:
+        with open_document(filepath=filepath, document_cache=document_cache) as data:
             lines = data.readlines()
     except Exception as e:
         logger.error('Exception occurs when loading go.mod file {}: {}'.format(filepath, str(e)))
@@ -180,14 +180,14 @@ get_dependency = re.compile(
 ).match
 
 
-def parse_gosum(filepath, logger):
+def parse_gosum(filepath, logger, document_cache=None):
     """
     Return a list of GoSum from parsing the go.sum file at `location`.
     """
     dependencies = list()
 
     try:
-        with io.open(filepath, encoding='utf-8', closefd=True) as data:
+        with open_document(filepath=filepath, document_cache=document_cache) as data:
             lines = data.readlines()
     except Exception as e:
         logger.error('Exception occurs when loading go.sum file {}: {}'.format(filepath, str(e)))
@@ -214,12 +214,12 @@ def parse_gosum(filepath, logger):
     return dependencies
 
 
-def parse_gomod_files(filepath, logger):
+def parse_gomod_files(filepath, logger, document_cache=None):
 
     if is_gosum(filepath=filepath):
-        dependencies = parse_gosum(filepath=filepath, logger=logger)
+        dependencies = parse_gosum(filepath=filepath, logger=logger, document_cache=document_cache)
     else:
-        dependencies = parse_gomod(filepath=filepath, logger=logger)
+        dependencies = parse_gomod(filepath=filepath, logger=logger, document_cache=document_cache)
 
     return dependencies
 
@@ -6,59 +6,61 @@
 # See https://github.com/nexB/scancode-toolkit for support or download.
 # See https://aboutcode.org for more information about nexB OSS projects.
 #
-from pygmars import Token
-from pygmars.parse import Parser
-from pygments import lex
-
-from core.file_parsers.groovy_lexer import GroovyLexer
-from core.util import remove_duplicate_dict_items
-
-
-grammar = """
-    LIT-STRING: {<LITERAL-STRING-SINGLE|LITERAL-STRING-DOUBLE>}
-    PACKAGE-IDENTIFIER: {<OPERATOR> <TEXT>? <NAME-LABEL> <TEXT>? <LIT-STRING>}
-    DEPENDENCY-1: {<PACKAGE-IDENTIFIER>{3} <OPERATOR>}
-    DEPENDENCY-2: {<NAME> <TEXT> <LIT-STRING> <TEXT>}
-    DEPENDENCY-3: {<NAME> <TEXT>? <OPERATOR> <LIT-STRING> <OPERATOR>}
-    DEPENDENCY-4: {<NAME> <TEXT> <NAME-LABEL> <TEXT> <LIT-STRING> <PACKAGE-IDENTIFIER> <PACKAGE-IDENTIFIER> <OPERATOR>? <TEXT>}
-    DEPENDENCY-5: {<NAME> <TEXT> <NAME> <OPERATOR> <NAME-ATTRIBUTE>}
-    NESTED-DEPENDENCY-1: {<NAME> <OPERATOR> <DEPENDENCY-1>+ }
-"""
-
-
-def get_tokens(contents):
-    """
-    Yield tuples of (position, Token, value) from lexing a ``contents`` string.
-    """
-    for i, (token, value) in enumerate(lex(contents, GroovyLexer())):
-        yield i, token, value
-
-
-def get_pygmar_tokens(contents):
-    tokens = Token.from_pygments_tokens(get_tokens(contents))
-    for token in tokens:
-        if token.label == 'NAME' and token.value == 'dependencies':
-            token.label = 'DEPENDENCIES-START'
-        yield token
-
-
-def is_literal_string(string):
-    return string in ('LITERAL-STRING-SINGLE', 'LITERAL-STRING-DOUBLE')
-
-
-def remove_quotes(string):
-    """
-    Remove starting and ending quotes from ``string``.
-    If ``string`` has no starting or ending quotes, return ``string``.
-    """
-    quoted = lambda x: (
-        (x.startswith('"') and x.endswith('"'))
-        or (x.startswith("'") and x.endswith("'"))
-    )
-    if quoted:
-        return string[1:-1]
-    else:
-        return string
+import os
+import re
+
+from core.document_cache import is_file, load_document
+from core.dep_graph import GraphBuilder
+from core.file_parsers.maven_tree_parser import get_tree_parent
+
+
+STRING = r'"""(?:\\.|[^\\])*?"""|\'\'\'(?:\\.|[^\\])*?\'\'\'|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\''
+COMMENT = r'//[^\n]*|/\*.*?\*/'
+# 块外的扫描只跳过注释与字符串, 找到dependencies块的起点; 块内才分词
+BLOCK_START = re.compile(COMMENT + '|' + STRING + r'|(?P<block>(?<![\w.$])dependencies\s*\{)', re.S)
+TOKEN = re.compile(r'(?P<space>[ \t\r\f]+|\\\n|' + COMMENT + r')|(?P<newline>[\n;])|(?P<string>' + STRING + r')'
+                   r'|(?P<name>[A-Za-z_$][\w$]*(?:\.[A-Za-z_$][\w$]*)*)|(?P<number>\d[\w.]*)|(?P<operator>.)', re.S)
+SCRIPT_STRING = re.compile('(' + STRING + ')|' + COMMENT, re.S)
+
+# 构建脚本中的变量定义: ext { x = '1' } / ext.x = '1' / def x = '1' / val x = "1"
+ASSIGNMENT = re.compile(r'(?<![\w$])([A-Za-z_]\w*)\s*=\s*(' + STRING + ')')
+# extra["x"] = "1" / extra.set("x", "1") / set('x', '1')
+EXTRA_ASSIGNMENT = re.compile(r'(?:\bextra\.set|\bextra|\bset)\s*[(\[]\s*(' + STRING + r')\s*(?:,|\]\s*=)\s*'
+                              r'(' + STRING + ')')
+# val x by extra("1")
+DELEGATED_EXTRA = re.compile(r'\bval\s+([A-Za-z_]\w*)\s+by\s+extra\s*\(\s*(' + STRING + ')')
+# ext.versions = [guava: '31.1-jre', junit: '4.13.2'], 以versions.guava引用
+MAP_ASSIGNMENT = re.compile(r'(?<![\w$])([A-Za-z_]\w*)\s*=\s*\[([^\]]*)\]')
+MAP_ENTRY = re.compile(r'([A-Za-z_]\w*|' + STRING + r')\s*:\s*(' + STRING + ')')
+INTERPOLATION = re.compile(r'\$\{\s*([^}]*?)\s*\}|\$([A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*)')
+PROPERTY_PREFIX = re.compile(r'(?:(?:rootProject|project)\.)?(?:(?:ext|extra)\.)?')
+PROPERTY_LINE = re.compile(r'([^=:\s]+)\s*[=:\s]\s*(.*)')
+
+SETTINGS_FILES = ('settings.gradle', 'settings.gradle.kts')
+MAX_PROJECT_DEPTH = 8
+CATALOG_PREFIX = 'libs.'
+MAP_FIELDS = {'group': 'namespace', 'name': 'name', 'version': 'version'}
+# 参数不是外部依赖坐标的函数
+SKIPPED_FUNCTIONS = ('project', 'files', 'fileTree', 'gradleApi', 'localGroovy', 'gradleTestKit')
+PROPERTY_ACCESSORS = ('extra', 'rootProject.extra', 'project.extra', 'property', 'findProperty',
+                      'project.property', 'project.findProperty')
+KEYWORDS = ('if', 'else', 'for', 'while', 'switch', 'when', 'try', 'catch', 'finally', 'return', 'def', 'val', 'var')
+
+OPEN_PAREN = ('operator', '(')
+CLOSE_PAREN = ('operator', ')')
+COMMA = ('operator', ',')
+PLUS = ('operator', '+')
+COLON = ('operator', ':')
+EQUALS = ('operator', '=')
+# 行尾为这些符号时语句在下一行继续
+CONTINUATIONS = (COMMA, PLUS, COLON, EQUALS, OPEN_PAREN, ('operator', '.'), ('operator', '['))
+VALUE_KINDS = ('string', 'name', 'number')
+
+
+def unquote(string):
+    if string.startswith(('"""', "'''")):
+        return string[3:-3]
+    return string[1:-1]
 
 
 def parse_version_str(version_str):
@@ -76,238 +78,461 @@ def parse_version_str(version_str):
     return version_str
 
 
-def parse_build_gradle_file(filepath, logger):
+def construct_dep_item(namespace, name, version, filepath, logger):
+    temp = dict()
+    temp['namespace'] = namespace
+    temp['name'] = name
+    try:
+        temp['version'] = parse_version_str(version)
+    except Exception as e:
+        logger.error('Exception occurs in function parse_version_str '
+                     'when parsing build.gradle on {}: {}'.format(filepath, str(e)))
+        temp['version'] = ''
+    if namespace == 'pypi':
+        temp['namespace'] = ''
+        temp['type'] = 'pypi'
+        temp['language'] = 'Python'
+    else:
+        temp['name'] = namespace + '/' + name
+        temp['type'] = 'maven'
+        temp['language'] = 'Java'
+    return temp
+
+
+def split_coordinate(coordinate):
     """
-    Return dependency items based on parse tree.
+       desc: 拆分依赖坐标, 'g:n', 'g:n:v', 'g:n:v:classifier', 'g:n:v@aar' -> (namespace, name, version)
+       return: 不是依赖坐标时返回None
     """
-    dependencies = list()
-    in_dependency_block = False
-    brackets_counter = 0
-    first_bracket_seen = False
+    split_value = coordinate.split(':')
+    if len(split_value) not in (2, 3, 4) or not split_value[0]:
+        return None
+    if len(split_value) == 2:
+        return split_value[0], split_value[1].split('@')[0], ''
+    # 4段时为"namespace:name:version:classifier", 不报告classifier
+    return split_value[0], split_value[1], split_value[2].split('@')[0]
 
-    try:
-        with open(file=filepath, mode='r', encoding='utf-8') as file:
-            contents = file.read()
 
-        parser = Parser(grammar)
-        lexed_tokens = list(get_pygmar_tokens(contents))
-        parse_tree = parser.parse(lexed_tokens)
+def skip_parentheses(tokens, index):
+    """
+    tokens[index] is an opening parenthesis, return the index after its closing one.
+    """
+    depth = 0
+    while index < len(tokens):
+        if tokens[index] == OPEN_PAREN:
+            depth += 1
+        elif tokens[index] == CLOSE_PAREN:
+            depth -= 1
+            if depth == 0:
+                return index + 1
+        index += 1
+    return index
+
+
+def skip_block(tokens, index):
+    """
+    tokens[index] follows an opening brace, return the index after its closing one.
+    """
+    depth = 1
+    while index < len(tokens):
+        kind, value = tokens[index]
+        index += 1
+        if kind == 'operator':
+            if value == '{':
+                depth += 1
+            elif value == '}':
+                depth -= 1
+                if depth == 0:
+                    break
+    return index
+
+
+def tokenize_block(text, pos):
+    """
+       desc: 从'{'之后的位置pos开始分词, 直到与之匹配的'}'; 跳过空白与注释
+       return: (tokens, end), tokens为(kind, value)列表, 不含匹配的'}', end为'}'之后的位置
+    """
+    tokens = list()
+    depth = 1
+    for match in TOKEN.finditer(text, pos):
+        kind = match.lastgroup
+        if kind == 'space':
+            continue
+        value = match.group()
+        if kind == 'operator':
+            if value == '{':
+                depth += 1
+            elif value == '}':
+                depth -= 1
+                if depth == 0:
+                    return tokens, match.end()
+        tokens.append((kind, value))
+    return tokens, len(text)
+
+
+def iter_dependency_blocks(text):
+    """
+    Yield the tokens of each dependencies { ... } block of a build script. The text outside the blocks is only
+    scanned for comments and strings, so that braces and 'dependencies' inside them are ignored.
+    """
+    pos = 0
+    while True:
+        match = BLOCK_START.search(text, pos)
+        if match is None:
+            return
+        if match.lastgroup == 'block':
+            tokens, pos = tokenize_block(text=text, pos=match.end())
+            yield tokens
+        else:
+            pos = match.end()
+
 
-    except Exception as e:
-        logger.error('Exception occurs when loading build.gradle file {}: {}'.format(filepath, str(e)))
-        return dependencies
+def get_catalog_version(version, versions):
+    # version = "1.0" / version.ref = "x" / version = { strictly = "1.0" }
+    if isinstance(version, dict) and 'ref' in version:
+        version = versions.get(version['ref'], '')
+    if isinstance(version, dict):
+        version = version.get('strictly') or version.get('require') or version.get('prefer') or ''
+    return version if isinstance(version, str) else ''
 
-    if parse_tree:
-        # print(parse_tree)
-        for tree_node in parse_tree:
-            if tree_node.label == 'DEPENDENCIES-START':
-                in_dependency_block = True
+
+def load_version_catalog(filepath, document_cache=None):
+    """
+       desc: 解析版本目录gradle/libs.versions.toml
+       return: {访问器: [依赖坐标]}, e.g. {'libs.androidx.core.ktx': ['androidx.core:core-ktx:1.9.0'],
+               'libs.bundles.network': ['com.squareup.okhttp3:okhttp:4.10.0', ...]}
+    """
+    data = load_document(filepath=filepath, kind='toml', document_cache=document_cache)
+    versions = data.get('versions', dict())
+    libraries = dict()
+    for alias, library in data.get('libraries', dict()).items():
+        if isinstance(library, str):
+            libraries[alias] = library
+            continue
+        module = library.get('module')
+        if not module and library.get('group') and library.get('name'):
+            module = library['group'] + ':' + library['name']
+        if module:
+            version = get_catalog_version(version=library.get('version', ''), versions=versions)
+            libraries[alias] = module + ':' + version if version else module
+
+    # 别名中的'-', '_', '.'在访问器中均为'.'
+    catalog = dict()
+    for alias, coordinate in libraries.items():
+        catalog[CATALOG_PREFIX + re.sub(r'[-_.]', '.', alias)] = [coordinate]
+    for alias, members in data.get('bundles', dict()).items():
+        catalog[CATALOG_PREFIX + 'bundles.' + re.sub(r'[-_.]', '.', alias)] = \
+            [libraries[member] for member in members if member in libraries]
+    return catalog
+
+
+class GradleScript(object):
+    """
+    A build script and the values its dependency declarations may refer to, each collected on first use:
+    the ext/extra/val properties of the script, gradle.properties of the project directories up to the root
+    project (the one holding settings.gradle), and the gradle/libs.versions.toml version catalog.
+    """
+    def __init__(self, filepath, text, logger, document_cache=None):
+        self.filepath = filepath
+        self.text = text
+        self.logger = logger
+        self.document_cache = document_cache
+        self._project_dirs = None
+        self._properties = None
+        self._catalog = None
+
+    @property
+    def project_dirs(self):
+        # 构建脚本所在目录及其上层直到根项目目录, 未找到settings.gradle时只有脚本所在目录
+        if self._project_dirs is None:
+            project_dir = os.path.dirname(os.path.abspath(self.filepath))
+            project_dirs = list()
+            for _ in range(0, MAX_PROJECT_DEPTH):
+                project_dirs.append(project_dir)
+                if any(is_file(os.path.join(project_dir, name), document_cache=self.document_cache)
+                       for name in SETTINGS_FILES):
+                    break
+                parent_dir = os.path.dirname(project_dir)
+                if parent_dir == project_dir:
+                    project_dirs = project_dirs[:1]
+                    break
+                project_dir = parent_dir
+            else:
+                project_dirs = project_dirs[:1]
+            self._project_dirs = project_dirs
+        return self._project_dirs
+
+    @property
+    def properties(self):
+        if self._properties is None:
+            self._properties = dict()
+            # 子项目的gradle.properties覆盖根项目的, 脚本中的定义优先
+            for project_dir in reversed(self.project_dirs):
+                self.load_gradle_properties(os.path.join(project_dir, 'gradle.properties'))
+            self.collect_script_properties()
+        return self._properties
+
+    @property
+    def catalog(self):
+        if self._catalog is None:
+            self._catalog = dict()
+            for project_dir in self.project_dirs:
+                catalog_file = os.path.join(project_dir, 'gradle', 'libs.versions.toml')
+                if not is_file(catalog_file, document_cache=self.document_cache):
+                    continue
+                try:
+                    self._catalog = load_version_catalog(filepath=catalog_file, document_cache=self.document_cache)
+                except Exception as e:
+                    self.logger.error('Exception occurs when loading libs.versions.toml file {}: {}'
+                                      .format(catalog_file, str(e)))
+                break
+        return self._catalog
+
+    def load_gradle_properties(self, filepath):
+        if not is_file(filepath, document_cache=self.document_cache):
+            return
+        try:
+            lines = load_document(filepath=filepath, kind='lines', document_cache=self.document_cache)
+        except Exception as e:
+            self.logger.error('Exception occurs when loading gradle.properties file {}: {}'.format(filepath, str(e)))
+            return
+        for line in lines:
+            line = line.strip()
+            if not line or line[0] in '#!':
+                continue
+            match = PROPERTY_LINE.match(line)
+            if match:
+                self._properties[match.group(1)] = (match.group(2).strip(), False)
+
+    def collect_script_properties(self):
+        # 去掉注释, 保留字符串; 按出现顺序赋值, 后定义的覆盖先定义的
+        text = SCRIPT_STRING.sub(lambda match: match.group(1) or '', self.text)
+        assignments = list()
+        for match in ASSIGNMENT.finditer(text):
+            # 跳过具名参数: implementation(group = "g", ...)
+            index = match.start() - 1
+            while index >= 0 and text[index] in ' \t':
+                index -= 1
+            if index < 0 or text[index] not in '(,':
+                assignments.append((match.start(), match.group(1), match.group(2)))
+        for match in EXTRA_ASSIGNMENT.finditer(text):
+            assignments.append((match.start(), unquote(match.group(1)), match.group(2)))
+        for match in DELEGATED_EXTRA.finditer(text):
+            assignments.append((match.start(), match.group(1), match.group(2)))
+        for match in MAP_ASSIGNMENT.finditer(text):
+            for entry in MAP_ENTRY.finditer(match.group(2)):
+                key = entry.group(1)
+                if key[0] in '"\'':
+                    key = unquote(key)
+                assignments.append((match.start(), match.group(1) + '.' + key, entry.group(2)))
+        for _, name, string in sorted(assignments, key=lambda item: item[0]):
+            # Groovy中只有双引号字符串支持${}插值
+            self._properties[name] = (unquote(string), string.startswith('"'))
+
+    def lookup(self, name, resolving=()):
+        """
+        The value of property name (rootProject.ext.x, project.x, extra.x or x), None if it is not defined.
+        """
+        name = PROPERTY_PREFIX.sub('', name, count=1)
+        item = self.properties.get(name)
+        if item is None or name in resolving:
+            return None
+        value, is_template = item
+        if is_template:
+            value = self.interpolate(value, resolving=resolving + (name,))
+        return value
+
+    def interpolate(self, text, resolving=()):
+        # "$name" / "${name}", 未定义的变量保持原样
+        if '$' not in text:
+            return text
+
+        def replace(match):
+            value = self.lookup(match.group(1) or match.group(2), resolving=resolving)
+            return match.group() if value is None else value
+
+        return INTERPOLATION.sub(replace, text)
+
+    def string_value(self, string):
+        if string.startswith('"'):
+            return self.interpolate(unquote(string))
+        return unquote(string)
+
+    def evaluate(self, statement, index):
+        """
+        Evaluate the string concatenation starting at statement[index], e.g. "g:n:$v" or 'g:n:' + v.
+        Return (text, index after the expression); text is None for a single undefined property.
+        """
+        parts = list()
+        undefined = 0
+        length = len(statement)
+        while index < length:
+            kind, value = statement[index]
+            if kind == 'string':
+                parts.append(self.string_value(value))
+            elif kind == 'number':
+                parts.append(value)
+            elif kind == 'name':
+                # extra["x"] / property("x")
+                if value in PROPERTY_ACCESSORS and index + 3 < length and statement[index + 2][0] == 'string' \
+                        and statement[index + 1][1] in '([' and statement[index + 3][1] in ')]':
+                    value = unquote(statement[index + 2][1])
+                    index += 3
+                resolved = self.lookup(value)
+                if resolved is None:
+                    undefined += 1
+                    resolved = '$' + value
+                parts.append(resolved)
+            else:
+                break
+            index += 1
+            if index + 1 < length and statement[index] == PLUS and statement[index + 1][0] in VALUE_KINDS:
+                index += 1
                 continue
+            break
+        if not parts or (len(parts) == 1 and undefined):
+            return None, index
+        return ''.join(parts), index
+
+    def extract_dependencies(self, statement):
+        """
+           desc: 提取一条依赖声明语句中的依赖, 支持以下形式及其Kotlin DSL写法:
+                 implementation 'g:n:v' / implementation("g:n:v") / implementation platform("g:n:v")
+                 implementation group: 'g', name: 'n', version: 'v' / implementation(group = "g", name = "n")
+                 implementation libs.guava / implementation(libs.bundles.network) / implementation(kotlin("stdlib"))
+                 字符串中的$var, ${var}与'g:n:' + var中的变量按ext/extra/gradle.properties替换
+           params: statement: 语句的token列表, 第一个token为配置名
+           return: 依赖列表
+        """
+        dependencies = list()
+        if len(statement) < 2 or statement[0][0] != 'name' or statement[0][1] in KEYWORDS:
+            return dependencies
+
+        coordinates = list()
+        fields_list = list()
+        fields = dict()
+        depth = 0
+        index = 1
+        length = len(statement)
+        while index < length:
+            kind, value = statement[index]
+            following = statement[index + 1] if index + 1 < length else None
+            if kind == 'operator':
+                if value in '([':
+                    depth += 1
+                elif value in ')]':
+                    depth -= 1
+                elif value == '=' and depth <= 0:
+                    # 赋值语句, 不是依赖声明
+                    return dependencies
+                index += 1
+            elif kind == 'name' and (following == COLON or (following == EQUALS and depth > 0)):
+                # group: 'g' / group = "g"
+                text, index = self.evaluate(statement, index + 2)
+                field = MAP_FIELDS.get(value)
+                if field:
+                    if field in fields:
+                        fields_list.append(fields)
+                        fields = dict()
+                    fields[field] = text if text else ''
+            elif kind == 'name' and following == OPEN_PAREN:
+                if value in SKIPPED_FUNCTIONS:
+                    index = skip_parentheses(statement, index + 1)
+                elif value == 'kotlin':
+                    # kotlin("stdlib") / kotlin("stdlib", "1.8.0")
+                    end = skip_parentheses(statement, index + 1)
+                    arguments = [self.evaluate(statement, i)[0] for i in range(index + 2, end - 1)
+                                 if statement[i - 1] in (OPEN_PAREN, COMMA)]
+                    if arguments and arguments[0]:
+                        coordinates.append('org.jetbrains.kotlin:kotlin-' + arguments[0]
+                                           + (':' + arguments[1] if len(arguments) > 1 and arguments[1] else ''))
+                    index = end
+                else:
+                    # platform(...), enforcedPlatform(...), testFixtures(...)
+                    index += 1
+            elif kind == 'name' and value.startswith(CATALOG_PREFIX):
+                coordinates.extend(self.catalog.get(value, ()))
+                index += 1
+            else:
+                text, next_index = self.evaluate(statement, index)
+                if text:
+                    coordinates.append(text)
+                index = max(next_index, index + 1)
+        if fields:
+            fields_list.append(fields)
+
+        for coordinate in coordinates:
+            split_value = split_coordinate(coordinate)
+            if split_value:
+                namespace, name, version = split_value
+                dependencies.append(construct_dep_item(namespace=namespace, name=name, version=version,
+                                                       filepath=self.filepath, logger=self.logger))
+        for fields in fields_list:
+            if fields.get('namespace') and fields.get('name'):
+                dependencies.append(construct_dep_item(namespace=fields['namespace'], name=fields['name'],
+                                                       version=fields.get('version', ''),
+                                                       filepath=self.filepath, logger=self.logger))
+        return dependencies
 
-            if in_dependency_block:
-                if tree_node.label.startswith('OPERATOR'):
-                    if tree_node.value == '{':
-                        if not first_bracket_seen:
-                            first_bracket_seen = True
-                        brackets_counter += 1
-                    elif tree_node.value == '}':
-                        brackets_counter -= 1
-
-                    if brackets_counter == 0 and first_bracket_seen:
-                        in_dependency_block = False
-                        continue
 
-                # NESTED DEPENDENCY 1
-                if tree_node.label == 'NESTED-DEPENDENCY-1':
-                    dependency = {}
-                    last_key = None
-                    for child_node in tree_node.leaves():
-                        if child_node.label == 'NAME-LABEL':
-                            value = child_node.value
-                            if value == 'group:':
-                                last_key = 'namespace'
-                            if value == 'name:':
-                                last_key = 'name'
-                            if value == 'version:':
-                                last_key = 'version'
-
-                        if is_literal_string(child_node.label):
-                            if last_key == 'version':
-                                try:
-                                    dependency[last_key] = parse_version_str(remove_quotes(child_node.value))
-                                except Exception as e:
-                                    logger.error(
-                                        'Exception occurs in function parse_version_str '
-                                        'when parsing build.gradle on {}: {}'.format(filepath, str(e)))
-                                    dependency[last_key] = ''
-                            else:
-                                dependency[last_key] = remove_quotes(child_node.value)
-
-                    if dependency and dependency['namespace']:
-                        dependency['name'] = dependency['namespace'] + '/' + dependency['name']
-                        dependency['type'] = 'maven'
-                        dependency['language'] = 'Java'
-                        dependencies.append(dependency)
-
-                # DEPENDENCY 1-5
-                if tree_node.label == 'DEPENDENCY-1':
-                    name_label_to_dep_field_name = {
-                        'group:': 'namespace',
-                        'name:': 'name',
-                        'version:': 'version'
-                    }
-                    dependency = {}
-                    last_key = None
-                    for child_node in tree_node.leaves():
-                        value = child_node.value
-                        if child_node.label == 'NAME-LABEL':
-                            last_key = name_label_to_dep_field_name.get(value, '')
-                        if is_literal_string(child_node.label):
-                            if last_key:
-                                if last_key == 'version':
-                                    try:
-                                        dependency[last_key] = parse_version_str(remove_quotes(value))
-                                    except Exception as e:
-                                        logger.error(
-                                            'Exception occurs in function parse_version_str '
-                                            'when parsing build.gradle on {}: {}'.format(filepath, str(e)))
-                                        dependency[last_key] = ''
-                                else:
-                                    dependency[last_key] = remove_quotes(value)
-
-                    if dependency and dependency['namespace']:
-                        dependency['name'] = dependency['namespace'] + '/' + dependency['name']
-                        dependency['type'] = 'maven'
-                        dependency['language'] = 'Java'
-                        dependencies.append(dependency)
-
-                if tree_node.label == 'DEPENDENCY-2':
-                    dependency = {}
-                    for child_node in tree_node.leaves():
-                        if is_literal_string(child_node.label):
-                            value = child_node.value
-                            value = remove_quotes(value)
-
-                            namespace = ''
-                            name = ''
-                            version = ''
-                            split_value = value.split(':')
-                            split_value_length = len(split_value)
-                            if split_value_length == 4:
-                                # We are assuming `value` is in the form of "namespace:name:version:module"
-                                # We are currently not reporting down to the module level
-                                namespace, name, version, _ = split_value
-                            if split_value_length == 3:
-                                # We are assuming `value` is in the form of "namespace:name:version"
-                                namespace, name, version = split_value
-                            if split_value_length == 2:
-                                # We are assuming `value` is in the form of "namespace:name"
-                                namespace, name = split_value
-
-                            dependency['namespace'] = namespace
-                            dependency['name'] = name
-                            try:
-                                dependency['version'] = parse_version_str(version)
-                            except Exception as e:
-                                logger.error(
-                                    'Exception occurs in function parse_version_str '
-                                    'when parsing build.gradle on {}: {}'.format(filepath, str(e)))
-                                dependency['version'] = ''
-
-                    if dependency and dependency['namespace']:
-                        if dependency['namespace'] == 'pypi':
-                            dependency['namespace'] = ''
-                            dependency['type'] = 'pypi'
-                            dependency['language'] = 'Python'
-                        else:
-                            dependency['name'] = dependency['namespace'] + '/' + dependency['name']
-                            dependency['type'] = 'maven'
-                            dependency['language'] = 'Java'
-                        dependencies.append(dependency)
-
-                if tree_node.label == 'DEPENDENCY-3':
-                    dependency = {}
-                    for child_node in tree_node.leaves():
-                        if is_literal_string(child_node.label):
-
-                            value = child_node.value
-                            value = remove_quotes(value)
-
-                            # We are assuming `value` is in the form of "namespace:name:version"
-                            split_dependency_string = value.split(':')
-                            length = len(split_dependency_string)
-                            if length == 3:
-                                namespace, name, version = split_dependency_string
-                                dependency['namespace'] = namespace
-                                dependency['name'] = name
-                                try:
-                                    dependency['version'] = parse_version_str(version)
-                                except Exception as e:
-                                    logger.error(
-                                        'Exception occurs in function parse_version_str '
-                                        'when parsing build.gradle on {}: {}'.format(filepath, str(e)))
-                                    dependency['version'] = ''
-                            elif length == 2:
-                                namespace, name = split_dependency_string
-                                dependency['namespace'] = namespace
-                                dependency['name'] = name
-                                dependency['version'] = ''
-
-                    if dependency and dependency['namespace']:
-                        if dependency['namespace'] == 'pypi':
-                            dependency['namespace'] = ''
-                            dependency['type'] = 'pypi'
-                            dependency['language'] = 'Python'
-                        else:
-                            dependency['name'] = dependency['namespace'] + '/' + dependency['name']
-                            dependency['type'] = 'maven'
-                            dependency['language'] = 'Java'
-                        dependencies.append(dependency)
-
-                if tree_node.label == 'DEPENDENCY-4':
-                    dependency = {}
-                    last_key = None
-                    for child_node in tree_node.leaves():
-                        if child_node.label == 'NAME-LABEL':
-                            value = child_node.value
-                            if value == 'group:':
-                                last_key = 'namespace'
-                            if value == 'name:':
-                                last_key = 'name'
-                            if value == 'version:':
-                                last_key = 'version'
-                        if is_literal_string(child_node.label):
-                            if last_key == 'version':
-                                try:
-                                    dependency[last_key] = parse_version_str(remove_quotes(child_node.value))
-                                except Exception as e:
-                                    logger.error(
-                                        'Exception occurs in function parse_version_str '
-                                        'when parsing build.gradle on {}: {}'.format(filepath, str(e)))
-                                    dependency[last_key] = ''
-                            else:
-                                dependency[last_key] = remove_quotes(child_node.value)
-
-                    if dependency and dependency['namespace']:
-                        dependency['name'] = dependency['namespace'] + '/' + dependency['name']
-                        dependency['type'] = 'maven'
-                        dependency['language'] = 'Java'
-                        dependencies.append(dependency)
-
-                # if tree_node.label == 'DEPENDENCY-5':
-                #     dependency = {}
-                #     for child_node in tree_node.leaves():
-                #         if child_node.label == 'NAME-ATTRIBUTE':
-                #             dependency['name'] = child_node.value
-                #
-                #     if dependency:
-                #         dependency['type'] = 'maven'
-                #         dependency['namespace'] = ''
-                #         dependency['version'] = ''
-                #         dependency['language'] = 'Java'
-                #         dependencies.append(dependency)
+def parse_block(tokens, index, script, dependencies):
+    """
+       desc: 逐条解析块内的语句, 直到与之匹配的'}'; 语句后的'{ }'若跟在依赖声明之后则是其配置闭包
+             (exclude, because等), 直接跳过, 否则按嵌套块解析(constraints { }, if (...) { }等)
+       params: tokens: 块的token列表; index: 块内第一个token的下标
+       return: 块结束后的下标
+    """
+    statement = list()
+    depth = 0
+    length = len(tokens)
+    while index < length:
+        token = tokens[index]
+        kind, value = token
+        index += 1
+        if kind == 'newline':
+            if depth <= 0 and statement and statement[-1] not in CONTINUATIONS:
+                dependencies.extend(script.extract_dependencies(statement))
+                statement = list()
+            continue
+        if kind == 'operator':
+            if value == '{':
+                items = script.extract_dependencies(statement)
+                if items:
+                    dependencies.extend(items)
+                    index = skip_block(tokens, index)
+                else:
+                    index = parse_block(tokens=tokens, index=index, script=script, dependencies=dependencies)
+                statement = list()
+                depth = 0
+                continue
+            if value == '}':
+                break
+            if value in '([':
+                depth += 1
+            elif value in ')]':
+                depth -= 1
+        statement.append(token)
+    dependencies.extend(script.extract_dependencies(statement))
+    return index
+
+
+def parse_build_gradle_file(filepath, logger, document_cache=None):
+    """
+       desc: 解析build.gradle与build.gradle.kts, 只对dependencies { ... }块分词, 块外只扫描注释与字符串;
+             变量与版本目录在首次被依赖声明引用时才加载
+       params: filepath: 构建脚本路径; document_cache: 扫描级的文档缓存
+       return: 依赖列表
+    """
+    dependencies = list()
+
+    try:
+        text = load_document(filepath=filepath, kind='text', document_cache=document_cache)
+        script = GradleScript(filepath=filepath, text=text, logger=logger, document_cache=document_cache)
+        for tokens in iter_dependency_blocks(text):
+            parse_block(tokens=tokens, index=0, script=script, dependencies=dependencies)
+    except Exception as e:
+        logger.error('Exception occurs when loading build.gradle file {}: {}'.format(filepath, str(e)))
 
-    file.close()
     return dependencies
 
 
@@ -345,7 +570,7 @@ def get_dependency_tree(filepath, logger):
 
 def parse_gradle_tree_file(filepath, logger):
 
-    dependencies = list()
+    builder = GraphBuilder()
 
     result = get_dependency_tree(filepath=filepath, logger=logger)
     if result:
@@ -356,34 +581,41 @@ def parse_gradle_tree_file(filepath, logger):
                     or item['config'].startswith('runtimeClasspath') \
                     or item['config'].startswith('testCompileClasspath') \
                     or item['config'].startswith('testRuntimeClasspath'):
-                deps = item['tree']
-                for dep in deps:
-                    if '+---' in dep or '\\---' in dep:
-                        if '+---' in dep and not dep.endswith('(*)'):
-                            dep_info_str = dep.split('+---')[-1].strip('(c)').strip('(n)').strip()
-                            dep_info = dep_info_str.split(':')
-                            if len(dep_info) >= 3:
-                                temp = dict()
-                                temp['type'] = 'maven'
-                                temp['namespace'] = dep_info[0]
-                                temp['name'] = dep_info[0] + '/' + dep_info[1]
-                                temp['version'] = dep_info[-1].split('->')[-1].strip()
-                                temp['language'] = 'Java'
-                                dependencies.append(temp)
-                        elif '\\---' in dep and not dep.endswith('(*)'):
-                            dep_info_str = dep.split('\\---')[-1].strip('(c)').strip('(n)').strip()
-                            dep_info = dep_info_str.split(':')
-                            if len(dep_info) >= 3:
-                                temp = dict()
-                                temp['type'] = 'maven'
-                                temp['namespace'] = dep_info[0]
-                                temp['name'] = dep_info[0] + '/' + dep_info[1]
-                                temp['version'] = dep_info[-1].split('->')[-1].strip()
-                                temp['language'] = 'Java'
-                                dependencies.append(temp)
-
-    dependencies = remove_duplicate_dict_items(data_list=dependencies)
-    return dependencies
+                configuration = item['config'].split(' ')[0]
+                stack = list()
+                for dep in item['tree']:
+                    marker = '+---' if '+---' in dep else '\\---' if '\\---' in dep else None
+                    if marker is None:
+                        continue
+                    position = dep.rfind(marker)
+                    parent = get_tree_parent(stack=stack, position=position)
+                    # '(*)': 前面已展开过的子树, 只记录依赖边
+                    is_repeated = dep.endswith('(*)')
+                    dep_info_str = dep.split(marker)[-1]
+                    if is_repeated:
+                        dep_info_str = dep_info_str[:-len('(*)')].rstrip()
+                    dep_info_str = dep_info_str.strip('(c)').strip('(n)').strip()
+                    dep_info = dep_info_str.split(':')
+                    if len(dep_info) < 3:
+                        # project :core等本地模块, 其依赖挂在上一层节点下
+                        stack.append((position, parent))
+                        continue
+                    temp = dict()
+                    temp['type'] = 'maven'
+                    temp['namespace'] = dep_info[0]
+                    temp['name'] = dep_info[0] + '/' + dep_info[1]
+                    temp['version'] = dep_info[-1].split('->')[-1].strip()
+                    temp['language'] = 'Java'
+                    if is_repeated:
+                        node = builder.find(temp)
+                        if node is not None:
+                            builder.add_dependency(parent, node)
+                        continue
+                    node = builder.add(temp, scope=configuration)
+                    builder.add_dependency(parent, node)
+                    stack.append((position, node))
+
+    return builder.result()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,149 @@
+import os
+
+from core.file_parsers.parse_cache import hash_file
+from core.result_writers import load_result
+
+
+def get_input_file_names(handler, is_build):
+    """
+    Sibling file names whose presence or content can change the result of a candidate file handled by handler.
+    """
+    file_names = list()
+    lock_files = handler.build_lock_files if is_build else handler.lock_files
+    for lock_name, _ in lock_files:
+        file_names.append(lock_name)
+    if is_build and handler.build_artifact:
+        file_names.append(handler.build_artifact[0])
+    return file_names
+
+
+def get_parser_specs(handler, is_build):
+    parser_specs = [handler.manifest_parser]
+    parser_specs.extend(lock_parser for _, lock_parser in handler.lock_files)
+    if is_build:
+        parser_specs.extend(lock_parser for _, lock_parser in handler.build_lock_files)
+        if handler.build_artifact:
+            parser_specs.append(handler.build_artifact[1])
+    return [parser_spec for parser_spec in parser_specs if parser_spec is not None]
+
+
+def stat_input_file(filepath, previous=None, document_cache=None):
+    """
+    [size, mtime_ns, sha256] of filepath, None if it does not exist.
+    The hash is copied from previous when size and mtime are unchanged.
+    """
+    try:
+        if document_cache is not None:
+            size, mtime = document_cache.stat(filepath)
+        else:
+            stat = os.stat(filepath)
+            size, mtime = stat.st_size, stat.st_mtime_ns
+    except OSError:
+        return None
+    if previous and previous[0] == size and previous[1] == mtime:
+        return [size, mtime, previous[2]]
+    return [size, mtime, document_cache.hash(filepath) if document_cache is not None else hash_file(filepath)]
+
+
+def fingerprint_file_item(handler, file_item, context, is_build, previous=None):
+    """
+       desc: 计算候选配置文件的指纹: 候选文件及其锁文件/构建产物的[size, mtime_ns, sha256], 以及解析参数
+       params: handler: ParserHandler, 候选文件的解析器;
+               previous: dict, 上一次扫描的指纹, size与mtime未变化的文件沿用其hash
+       return: fingerprint: dict, 结果依赖其它文件(如pom.xml的parent)或构建钩子时返回None
+    """
+    if handler is None or (is_build and handler.build_hook):
+        return None
+
+    options = dict()
+    for parser_spec in get_parser_specs(handler=handler, is_build=is_build):
+        if not parser_spec.cacheable:
+            return None
+        for option in parser_spec.options:
+            options[option] = context[option]
+
+    previous_files = previous['files'] if previous else dict()
+    file_dir = os.path.split(file_item['file_path_absolute'])[0]
+    files = dict()
+    document_cache = context.get('document_cache')
+    files[file_item['file_name']] = stat_input_file(filepath=file_item['file_path_absolute'],
+                                                    previous=previous_files.get(file_item['file_name']),
+                                                    document_cache=document_cache)
+    directory_index = context.get('directory_index')
+    for file_name in get_input_file_names(handler=handler, is_build=is_build):
+        filepath = os.path.join(file_dir, file_name)
+        # 目录索引中不存在的锁文件不再stat
+        if directory_index is not None and not directory_index.is_file(filepath):
+            files[file_name] = None
+            continue
+        files[file_name] = stat_input_file(filepath=filepath, previous=previous_files.get(file_name),
+                                           document_cache=document_cache)
+    return {'options': options, 'files': files}
+
+
+def fingerprint_matches(previous, current):
+    if not previous or not current:
+        return False
+    if previous['options'] != current['options'] or set(previous['files']) != set(current['files']):
+        return False
+    for file_name, current_stat in current['files'].items():
+        previous_stat = previous['files'][file_name]
+        if previous_stat is None or current_stat is None:
+            if previous_stat is not current_stat:
+                return False
+        elif previous_stat[2] != current_stat[2]:
+            return False
+    return True
+
+
+def load_baseline(baseline_path, logger):
+    """
+       desc: 加载上一次扫描写出的结果文件, 用于增量扫描
+       return: baseline: dict, {'dep_result': list, 'file_results': {file_path_relative: file_record}},
+               结果文件不存在或缺少file_results时返回None
+    """
+    try:
+        # json或ndjson格式的结果文件
+        data = load_result(baseline_path)
+    except Exception as e:
+        logger.warn('Exception occurs when loading baseline result file {}: {}, fall back to a full scan'
+                    .format(baseline_path, str(e)))
+        return None
+
+    if not isinstance(data, dict) or 'file_results' not in data:
+        logger.warn('Baseline result file {} has no file_results, fall back to a full scan'.format(baseline_path))
+        return None
+
+    baseline = {
+        'dep_result': data.get('dep_result', list()),
+        'file_results': dict()
+    }
+    for file_record in data['file_results']:
+        baseline['file_results'][file_record['file_path_relative']] = file_record
+    return baseline
+
+
+def get_file_delta(baseline, file_records):
+    """
+    Candidate files added, removed and changed relative to the baseline scan. Files without a fingerprint
+    (e.g. pom.xml, whose result depends on other poms) are re-parsed on every scan and listed as reparsed.
+    """
+    current_paths = set(file_record['file_path_relative'] for file_record in file_records)
+    baseline_paths = baseline['file_results'] if baseline else dict()
+    file_delta = {
+        'added': list(),
+        'removed': sorted(path for path in baseline_paths if path not in current_paths),
+        'changed': list(),
+        'reparsed': list(),
+        'unchanged': 0
+    }
+    for file_record in file_records:
+        if file_record['file_path_relative'] not in baseline_paths:
+            file_delta['added'].append(file_record['file_path_relative'])
+        elif file_record['reused']:
+            file_delta['unchanged'] += 1
+        elif file_record['fingerprint'] is None:
+            file_delta['reparsed'].append(file_record['file_path_relative'])
+        else:
+            file_delta['changed'].append(file_record['file_path_relative'])
+    return file_delta
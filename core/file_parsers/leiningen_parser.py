@@ -1,8 +1,9 @@
 import re
 from core.file_parsers.maven_tree_parser import parse_maven_tree_file
+from core.document_cache import open_document
 
 
-def parse_project_clj_file(filepath, logger):
+def parse_project_clj_file(filepath, logger, document_cache=None):
 
     dependencies = list()
     is_dependency_block = False
@@ -10,7 +11,7 @@ def parse_project_clj_file(filepath, logger):
     dep_item_pattern = r'\[(?P<dep_item>.*?)\]'
 
     try:
-        with open(file=filepath, mode='r', encoding='utf-8') as file:
+        with open_document(filepath=filepath, document_cache=document_cache) as file:
             lines = file.readlines()
     except Exception as e:
         logger.error('Exception occurs when loading project.clj file {}: {}'.format(filepath, str(e)))
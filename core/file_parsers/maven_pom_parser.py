@@ -3,7 +3,11 @@ import os
 import xml
 import xml.etree.ElementTree as ET
 
+from core.document_cache import is_file
+
 namespace = '{http://maven.apache.org/POM/4.0.0}'
+# 无法加载的pom的属性表, 只读
+EMPTY_PROPERTIES = dict()
 
 
 def parse_version_str(version):
@@ -55,13 +59,16 @@ def parse_version_str(version):
         return version
 
 
-def get_pom_file_tree(filepath, logger):
+def get_pom_file_tree(filepath, logger, document_cache=None):
     """
        desc: 获取当前pom文件的element tree
-       params: filepath: str, 当前pom文件所在路径
+       params: filepath: str, 当前pom文件所在路径;
+               document_cache: DocumentCache, 本次扫描的文档缓存, 可选
        return: tree: ElementTree, pom文件加载后的返回值
     """
     try:
+        if document_cache is not None:
+            return document_cache.load(filepath=filepath, kind='xml')
         tree = ET.ElementTree(file=filepath)
         return tree
     except Exception as e:
@@ -91,79 +98,229 @@ def get_parent_filepath(tree, current_filepath):
     return parent_filepath
 
 
-def get_property_by_tag(filepath, tag, logger):
+def get_search_tag(tag):
+    search_tag = tag.strip('$').strip('{').strip('}')
+    return search_tag.split('project.')[-1]
+
+
+def get_dependency_management(tree):
+    dependencyManagement = tree.find('./' + namespace + 'dependencyManagement')
+    if isinstance(dependencyManagement, xml.etree.ElementTree.Element):
+        return dependencyManagement
+    return None
+
+
+def get_project_gav(tree):
+    """
+       desc: 获取当前pom ElementTree的G(groupId)A(artifactId)V(version)三元组, groupId与version缺省时继承自parent
+       return: (groupId, artifactId, version), 缺少对应标签时返回None
+    """
+    parent_node = tree.find('./' + namespace + 'parent')
+    prefix = './' + namespace + 'parent' + '/' if isinstance(parent_node, xml.etree.ElementTree.Element) else './'
+    groupid_node = tree.find(prefix + namespace + 'groupId')
+    version_node = tree.find(prefix + namespace + 'version')
+    artifactid_node = tree.find('./' + namespace + 'artifactId')
+    if groupid_node is None or version_node is None or artifactid_node is None:
+        return None
+    return groupid_node.text, artifactid_node.text, version_node.text
+
+
+class PomModel(object):
+    """
+    One parsed pom.xml: its ElementTree plus the lookup tables derived from it.
+    """
+    def __init__(self, filepath, tree):
+        self.filepath = filepath
+        self.tree = tree
+        self.parent_filepath = get_parent_filepath(tree=tree, current_filepath=filepath) if tree else ''
+        self.dependency_management = get_dependency_management(tree) if tree else None
+        self._tags = None
+        self._managed_versions = None
+        # effective property map, computed on the first lookup
+        self.properties = None
+
+    @property
+    def tags(self):
+        """
+        Text of the first element of each tag in document order, the root excluded,
+        i.e. what tree.find('.//' + tag) returns.
+        """
+        if self._tags is None:
+            self._tags = dict()
+            root = self.tree.getroot()
+            for elem in root.iter():
+                if elem is not root and elem.tag not in self._tags:
+                    self._tags[elem.tag] = elem.text
+        return self._tags
+
+    @property
+    def managed_versions(self):
+        """
+        (groupId, artifactId) -> raw version text of the dependencyManagement entries, first entry wins.
+        A version only counts once the groupId and artifactId of its entry have been seen.
+        """
+        if self._managed_versions is None:
+            self._managed_versions = dict()
+            if self.dependency_management is not None:
+                for dependencies in self.dependency_management:
+                    for dependency in dependencies:
+                        groupids = list()
+                        artifactids = list()
+                        for child in dependency:
+                            key = child.tag.split(namespace)[-1]
+                            if key == 'groupId':
+                                groupids.append(child.text)
+                            elif key == 'artifactId':
+                                artifactids.append(child.text)
+                            elif key == 'version':
+                                for groupid in groupids:
+                                    for artifactid in artifactids:
+                                        self._managed_versions.setdefault((groupid, artifactid), child.text)
+        return self._managed_versions
+
+
+class PomModelCache(object):
+    """
+    Per-scan cache of pom.xml models keyed by path, each pom is read (and its effective property map built) once
+    per scan. Property and managed version lookups walk the parent chain through cached models instead of
+    re-parsing every pom on each lookup.
+    """
+    def __init__(self, document_cache=None):
+        self.models = dict()
+        self.document_cache = document_cache
+        self._search_result = None
+        self._import_index = None
+
+    def exists(self, filepath):
+        return is_file(filepath, document_cache=self.document_cache)
+
+    def get_model(self, filepath, logger):
+        model = self.models.get(filepath)
+        if model is None:
+            tree = get_pom_file_tree(filepath=filepath, logger=logger, document_cache=self.document_cache)
+            model = PomModel(filepath=filepath, tree=tree)
+            self.models[filepath] = model
+        return model
+
+    def get_tree(self, filepath, logger):
+        return self.get_model(filepath=filepath, logger=logger).tree
+
+    def get_parent_model(self, model, logger):
+        if model.parent_filepath and self.exists(model.parent_filepath):
+            return self.get_model(filepath=model.parent_filepath, logger=logger)
+        return None
+
+    def get_properties(self, filepath, logger, visiting=()):
+        """
+        Effective property map of a pom: its own first element per tag over the inherited parent map,
+        built once and shared by every later lookup.
+        """
+        model = self.get_model(filepath=filepath, logger=logger)
+        if model.tree is None:
+            return EMPTY_PROPERTIES
+
+        if model.properties is None:
+            properties = dict()
+            parent_model = self.get_parent_model(model=model, logger=logger)
+            if parent_model and parent_model.filepath not in visiting:
+                properties.update(self.get_properties(filepath=parent_model.filepath, logger=logger,
+                                                      visiting=visiting + (filepath,)))
+            properties.update(model.tags)
+            model.properties = properties
+        return model.properties
+
+    def get_property(self, filepath, tag, logger):
+        return self.get_properties(filepath=filepath, logger=logger).get(namespace + get_search_tag(tag), '')
+
+    def resolve_version(self, filepath, value, logger):
+        if not value.startswith('$'):
+            try:
+                return parse_version_str(version=value)
+            except Exception as e:
+                logger.error('Exception occurs in function parse_version_str '
+                             'when parsing pom.xml on {}: {}'.format(filepath, str(e)))
+                return ''
+        return self.get_property(filepath=filepath, tag=value, logger=logger)
+
+    def get_inherited_version(self, filepath, groupid, artifactid, logger, visiting=()):
+        """
+        Version managed by the nearest pom with a dependencyManagement section, starting at filepath.
+        """
+        model = self.get_model(filepath=filepath, logger=logger)
+        if model.tree is None:
+            return ''
+        if model.dependency_management is not None:
+            value = model.managed_versions.get((groupid, artifactid))
+            if value is None:
+                return ''
+            return self.resolve_version(filepath=filepath, value=value, logger=logger)
+
+        parent_model = self.get_parent_model(model=model, logger=logger)
+        if parent_model and parent_model.filepath not in visiting:
+            return self.get_inherited_version(filepath=parent_model.filepath, groupid=groupid, artifactid=artifactid,
+                                              logger=logger, visiting=visiting + (filepath,))
+        return ''
+
+    def get_import_index(self, search_result, logger):
+        """
+        Project GAV -> [(position in search_result, filepath)] of the pom.xml files in search_result.
+        """
+        if self._import_index is None or self._search_result is not search_result:
+            self._import_index = dict()
+            self._search_result = search_result
+            for position, file_item in enumerate(search_result):
+                if file_item['file_name'] != 'pom.xml':
+                    continue
+                tree = self.get_tree(filepath=file_item['file_path_absolute'], logger=logger)
+                project_gav = get_project_gav(tree) if tree else None
+                if project_gav:
+                    self._import_index.setdefault(project_gav, list()).append(
+                        (position, file_item['file_path_absolute']))
+        return self._import_index
+
+    def get_imported_version(self, search_result, gav_result, groupid, artifactid, logger):
+        """
+        Version managed by the first imported pom (in search_result order) that manages groupid:artifactid.
+        """
+        import_index = self.get_import_index(search_result=search_result, logger=logger)
+        candidates = set()
+        for gav in gav_result:
+            candidates.update(import_index.get((gav['groupId'], gav['artifactId'], gav['version']), ()))
+
+        for _, filepath in sorted(candidates):
+            model = self.get_model(filepath=filepath, logger=logger)
+            if model.tree is None or model.dependency_management is None:
+                continue
+            value = model.managed_versions.get((groupid, artifactid))
+            if value is not None:
+                return self.resolve_version(filepath=filepath, value=value, logger=logger)
+        return ''
+
+
+def get_property_by_tag(filepath, tag, logger, pom_cache=None):
     """
        desc: 递归寻找tag=${search_tag}对应的属性标签的值
        params: filepath: str, 当前pom文件所在路径;
-               tag: str, 需要寻找的属性标签
+               tag: str, 需要寻找的属性标签;
+               pom_cache: PomModelCache, 本次扫描的pom缓存
        return: property_value: str 属性标签的值
     """
-    search_tag = tag.strip('$').strip('{').strip('}')
-    search_tag = search_tag.split('project.')[-1]
-    property_value = ''
-
-    tree = get_pom_file_tree(filepath=filepath, logger=logger)
-    if tree:
-        node = tree.find('.//' + namespace + search_tag)
-        if isinstance(node, xml.etree.ElementTree.Element):
-            property_value = node.text
-            return property_value
-        else:
-            parent_filepath = get_parent_filepath(tree=tree, current_filepath=filepath)
-            if parent_filepath and os.path.exists(parent_filepath):
-                property_value = get_property_by_tag(filepath=parent_filepath, tag=tag, logger=logger)
+    pom_cache = pom_cache if pom_cache else PomModelCache()
+    return pom_cache.get_property(filepath=filepath, tag=tag, logger=logger)
 
-    return property_value
 
-
-def get_version_by_inherit_pom_file(parent_filepath, groupid, artifactid, logger):
+def get_version_by_inherit_pom_file(parent_filepath, groupid, artifactid, logger, pom_cache=None):
     """
        desc: 递归寻找groupid, artifactid对应的项目版本号version
        params: filepath: str, 当前pom文件所在路径;
                groupid: str, 项目groupid的值;
-               artifactid: str, 项目artifactid的值
+               artifactid: str, 项目artifactid的值;
+               pom_cache: PomModelCache, 本次扫描的pom缓存
        return: version: str, 项目版本号
     """
-    version = ''
-
-    parent_tree = get_pom_file_tree(filepath=parent_filepath, logger=logger)
-    if parent_tree:
-        dependencyManagement = parent_tree.find('./' + namespace + 'dependencyManagement')
-        if isinstance(dependencyManagement, xml.etree.ElementTree.Element):
-            for dependencies in dependencyManagement:
-                for dependency in dependencies:
-                    temp = dict()
-                    temp['groupId'] = ''
-                    temp['artifactId'] = ''
-
-                    for child in dependency:
-                        key = child.tag.split(namespace)[-1]
-                        value = child.text
-                        # 没有考虑groupId, artifactId的值以$开头的情况
-                        if key == 'groupId' and value == groupid:
-                            temp['groupId'] = groupid
-                            continue
-                        elif key == 'artifactId' and value == artifactid:
-                            temp['artifactId'] = artifactid
-                            continue
-                        elif key == 'version' and temp['groupId'] and temp['artifactId']:
-                            if not value.startswith('$'):
-                                try:
-                                    version = parse_version_str(version=value)
-                                except Exception as e:
-                                    logger.error('Exception occurs in function parse_version_str '
-                                                 'when parsing pom.xml on {}: {}'.format(parent_filepath, str(e)))
-                                    version = ''
-                            else:
-                                version = get_property_by_tag(filepath=parent_filepath, tag=value, logger=logger)
-                            return version
-        else:
-            parent_filepath = get_parent_filepath(tree=parent_tree, current_filepath=parent_filepath)
-            if parent_filepath and os.path.exists(parent_filepath):
-                version = get_version_by_inherit_pom_file(parent_filepath=parent_filepath,
-                                                          groupid=groupid, artifactid=artifactid, logger=logger)
-
-    return version
+    pom_cache = pom_cache if pom_cache else PomModelCache()
+    return pom_cache.get_inherited_version(filepath=parent_filepath, groupid=groupid, artifactid=artifactid,
+                                           logger=logger)
 
 
 def get_import_pom_file_gav(tree):
@@ -215,72 +372,33 @@ def get_import_pom_file_gav(tree):
     return gav_result
 
 
-def get_version_by_import_pom_file(search_result, gav_result, groupid, artifactid, logger):
+def get_version_by_import_pom_file(search_result, gav_result, groupid, artifactid, logger, pom_cache=None):
     """
        desc: 遍历寻找groupid, artifactid对应的项目的版本号version
        params: search_result: list, 项目的配置文件四元组列表;
                gav_result: list, 当前pom ElementTree import的pom文件GAV三元组列表;
                groupid: str, 项目groupid的值;
-               artifactid: str, 项目artifactid的值
+               artifactid: str, 项目artifactid的值;
+               pom_cache: PomModelCache, 本次扫描的pom缓存
        return: version: str, 项目版本号
     """
-    version = ''
-
-    for file_item in search_result:
-        if file_item['file_name'] == 'pom.xml':
-            tree = get_pom_file_tree(filepath=file_item['file_path_absolute'], logger=logger)
-            if tree:
-                project_gav = dict()
-                parent_node = tree.find('./' + namespace + 'parent')
-                if isinstance(parent_node, xml.etree.ElementTree.Element):
-                    project_gav['groupId'] = tree.find('./' + namespace + 'parent' + '/' + namespace + 'groupId').text
-                    project_gav['version'] = tree.find('./' + namespace + 'parent' + '/' + namespace + 'version').text
-                else:
-                    project_gav['groupId'] = tree.find('./' + namespace + 'groupId').text
-                    project_gav['version'] = tree.find('./' + namespace + 'version').text
-                project_gav['artifactId'] = tree.find('./' + namespace + 'artifactId').text
-
-                if project_gav in gav_result:
-                    dependencyManagement = tree.find('./' + namespace + 'dependencyManagement')
-                    if isinstance(dependencyManagement, xml.etree.ElementTree.Element):
-                        for dependencies in dependencyManagement:
-                            for dependency in dependencies:
-                                temp = dict()
-                                temp['groupId'] = ''
-                                temp['artifactId'] = ''
-
-                                for child in dependency:
-                                    key = child.tag.split(namespace)[-1]
-                                    value = child.text
-                                    # 没有考虑groupId, artifactId的值以$开头的情况
-                                    if key == 'groupId' and value == groupid:
-                                        temp['groupId'] = groupid
-                                        continue
-                                    elif key == 'artifactId' and value == artifactid:
-                                        temp['artifactId'] = artifactid
-                                        continue
-                                    elif key == 'version' and temp['groupId'] and temp['artifactId']:
-                                        if not value.startswith('$'):
-                                            try:
-                                                version = parse_version_str(version=value)
-                                            except Exception as e:
-                                                logger.error('Exception occurs in function parse_version_str '
-                                                             'when parsing pom.xml on {}: {}'.format(
-                                                              file_item['file_path_absolute'], str(e)))
-                                                version = ''
-                                        else:
-                                            version = get_property_by_tag(filepath=file_item['file_path_absolute'],
-                                                                          tag=value, logger=logger)
-                                        return version
-
-    return version
-
-
-def parse_maven_pom_file(filepath, search_result, logger):
+    pom_cache = pom_cache if pom_cache else PomModelCache()
+    return pom_cache.get_imported_version(search_result=search_result, gav_result=gav_result, groupid=groupid,
+                                          artifactid=artifactid, logger=logger)
+
+
+def parse_maven_pom_file(filepath, search_result, logger, pom_cache=None, maven_resolver=None):
+    """
+       desc: 解析pom.xml的直接依赖; 给定maven_resolver时, 另从本地Maven仓库解析传递依赖
+       params: maven_resolver: MavenResolver, 见maven_resolver.MavenResolver, 可选
+       return: dep_result: list, 给定maven_resolver时为带依赖结构的DependencyList
+    """
 
     dep_result = list()
+    pom_cache = pom_cache if pom_cache else PomModelCache()
+    gav_result = None
 
-    tree = get_pom_file_tree(filepath=filepath, logger=logger)
+    tree = pom_cache.get_tree(filepath=filepath, logger=logger)
     if tree:
         dependencies = tree.find('./' + namespace + 'dependencies')
         if isinstance(dependencies, xml.etree.ElementTree.Element):
@@ -303,7 +421,8 @@ def parse_maven_pom_file(filepath, search_result, logger):
                             for i in range(0, len(namespace_str)):
                                 if namespace_str[i].startswith('{') and namespace_str[i].startswith('}'):
                                     namespace_str[i] = get_property_by_tag(filepath=filepath, tag=namespace_str[i],
-                                                                           logger=logger).strip('\n').strip()
+                                                                           logger=logger,
+                                                                           pom_cache=pom_cache).strip('\n').strip()
                             item['namespace'] = ''.join(namespace_str)
                         continue
                     elif key == 'artifactId':
@@ -314,7 +433,8 @@ def parse_maven_pom_file(filepath, search_result, logger):
                             for i in range(0, len(name_str)):
                                 if name_str[i].startswith('{') and name_str[i].endswith('}'):
                                     name_str[i] = get_property_by_tag(filepath=filepath, tag=name_str[i],
-                                                                      logger=logger).strip('\n').strip()
+                                                                      logger=logger,
+                                                                      pom_cache=pom_cache).strip('\n').strip()
                             item['name'] = ''.join(name_str)
                         continue
                     elif key == 'version':
@@ -330,30 +450,42 @@ def parse_maven_pom_file(filepath, search_result, logger):
                             for i in range(0, len(version_str)):
                                 if version_str[i].startswith('{') and version_str[i].endswith('}'):
                                     version_str[i] = get_property_by_tag(filepath=filepath, tag=version_str[i],
-                                                                         logger=logger).strip('\n').strip()
+                                                                         logger=logger,
+                                                                         pom_cache=pom_cache).strip('\n').strip()
                             item['version'] = ''.join(version_str)
 
                 if item['namespace'] and item['name'] and not item['version']:
                     # 获取当前pom文件的dependencyManagement标签中的import pom文件GAV三元组列表
-                    gav_result = get_import_pom_file_gav(tree=tree)
+                    if gav_result is None:
+                        gav_result = get_import_pom_file_gav(tree=tree)
                     if gav_result:
                         # 根据import pom文件获取依赖版本号
                         item['version'] = get_version_by_import_pom_file(search_result=search_result,
                                                                          gav_result=gav_result,
                                                                          groupid=item['namespace'],
-                                                                         artifactid=item['name'], logger=logger)
+                                                                         artifactid=item['name'], logger=logger,
+                                                                         pom_cache=pom_cache)
                     # 根据pom文件继承关系获取依赖版本号
                     if not item['version']:
-                        parent_filepath = get_parent_filepath(tree=tree, current_filepath=filepath)
-                        if parent_filepath and os.path.exists(parent_filepath):
+                        parent_filepath = pom_cache.get_model(filepath=filepath, logger=logger).parent_filepath
+                        if parent_filepath and pom_cache.exists(parent_filepath):
                             item['version'] = get_version_by_inherit_pom_file(parent_filepath=parent_filepath,
                                                                               groupid=item['namespace'],
-                                                                              artifactid=item['name'], logger=logger)
+                                                                              artifactid=item['name'], logger=logger,
+                                                                              pom_cache=pom_cache)
 
                 if item['namespace'] and item['name']:
                     item['name'] = item['namespace'] + '/' + item['name']
                     dep_result.append(item)
 
+    if tree and maven_resolver is not None:
+        from core.file_parsers.maven_resolver import add_resolved_dependencies
+        try:
+            nodes = maven_resolver.resolve(filepath=filepath, logger=logger, document_cache=pom_cache.document_cache)
+            return add_resolved_dependencies(dep_result=dep_result, nodes=nodes, logger=logger)
+        except Exception as e:
+            logger.error('Exception occurs when resolving transitive dependencies of pom.xml file {}: {}'
+                         .format(filepath, str(e)))
     return dep_result
 
 
@@ -0,0 +1,463 @@
+import os
+import re
+import json
+import hashlib
+import tempfile
+from collections import deque
+import xml.etree.ElementTree as ET
+
+from core.dep_graph import GraphBuilder
+from core.document_cache import is_file, load_document
+
+INDEX_FORMAT_VERSION = 1
+PROPERTY = re.compile(r'\$\{([^}]+)\}')
+MAX_INTERPOLATION = 8
+# 依赖的作用域在传递后的作用域(Maven的依赖作用域表), 缺少的组合不传递, 可选依赖不传递
+SCOPE_TRANSITIONS = {
+    'compile': {'compile': 'compile', 'runtime': 'runtime'},
+    'provided': {'compile': 'provided', 'runtime': 'provided'},
+    'runtime': {'compile': 'runtime', 'runtime': 'runtime'},
+    'test': {'compile': 'test', 'runtime': 'test'},
+    'system': {}
+}
+# ComparableVersion的简化: 数字段按数值比较, 限定符按下表排序, 未知限定符排在正式版本之后
+QUALIFIERS = {'alpha': 0, 'a': 0, 'beta': 1, 'b': 1, 'milestone': 2, 'm': 2, 'rc': 3, 'cr': 3, 'snapshot': 4}
+RELEASE = (0, 5, '')
+RELEASE_QUALIFIERS = ('ga', 'final', 'release')
+VERSION_RANGE = re.compile(r'([\[(])([^\])]*)([\])])')
+
+
+def version_key(version):
+    items = list()
+    for token in re.findall(r'\d+|[a-z]+', version.lower()):
+        if token.isdigit():
+            items.append((1, int(token), ''))
+        elif token not in RELEASE_QUALIFIERS:
+            items.append((0, QUALIFIERS.get(token, 6), token))
+    while items and items[-1] == (1, 0, ''):
+        items.pop()
+    items.append(RELEASE)
+    return items
+
+
+def parse_version_ranges(version):
+    """
+    [(lower, lower inclusive, upper, upper inclusive)] of a Maven version range, e.g. '[1.0,2.0)', None when
+    version is a plain (soft) version.
+    """
+    ranges = list()
+    for lower_bound, inner, upper_bound in VERSION_RANGE.findall(version or ''):
+        bounds = [bound.strip() for bound in inner.split(',')]
+        if len(bounds) == 1:
+            ranges.append((bounds[0], True, bounds[0], True))
+        else:
+            ranges.append((bounds[0] or None, lower_bound == '[', bounds[-1] or None, upper_bound == ']'))
+    return ranges or None
+
+
+def in_version_ranges(version, ranges):
+    key = version_key(version)
+    for lower, lower_inclusive, upper, upper_inclusive in ranges:
+        if lower is not None and (key < version_key(lower) or (key == version_key(lower) and not lower_inclusive)):
+            continue
+        if upper is not None and (key > version_key(upper) or (key == version_key(upper) and not upper_inclusive)):
+            continue
+        return True
+    return False
+
+
+def read_pom(data):
+    """
+       desc: 读取pom文件中依赖解析所需的内容, 属性引用不展开
+       params: data: bytes, pom文件内容
+       return: pom: dict, {'groupId', 'artifactId', 'version', 'parent': {groupId, artifactId, version, relativePath}
+               or None, 'properties': {name: value}, 'management': [dependency], 'dependencies': [dependency]},
+               dependency: {groupId, artifactId, version, type, classifier, scope, optional, exclusions: [[g, a]]}
+    """
+    root = ET.fromstring(data)
+    namespace = root.tag[:root.tag.index('}') + 1] if root.tag.startswith('{') else ''
+
+    def text(elem, path):
+        node = elem.find('/'.join(namespace + tag for tag in path.split('/')))
+        return node.text.strip() if node is not None and node.text else None
+
+    def dependencies(elem, path):
+        result = list()
+        node = elem.find('/'.join(namespace + tag for tag in path.split('/')))
+        for dependency in node if node is not None else ():
+            exclusions = list()
+            for exclusion in dependency.iterfind(namespace + 'exclusions/' + namespace + 'exclusion'):
+                exclusions.append([text(exclusion, 'groupId') or '*', text(exclusion, 'artifactId') or '*'])
+            result.append({
+                'groupId': text(dependency, 'groupId'),
+                'artifactId': text(dependency, 'artifactId'),
+                'version': text(dependency, 'version'),
+                'type': text(dependency, 'type') or 'jar',
+                'classifier': text(dependency, 'classifier') or '',
+                'scope': text(dependency, 'scope'),
+                'optional': (text(dependency, 'optional') or '').lower() == 'true',
+                'exclusions': exclusions
+            })
+        return result
+
+    parent = None
+    if root.find(namespace + 'parent') is not None:
+        parent = {
+            'groupId': text(root, 'parent/groupId'),
+            'artifactId': text(root, 'parent/artifactId'),
+            'version': text(root, 'parent/version'),
+            'relativePath': text(root, 'parent/relativePath')
+        }
+    properties = dict()
+    node = root.find(namespace + 'properties')
+    for child in node if node is not None else ():
+        properties[child.tag[len(namespace):]] = (child.text or '').strip()
+    return {
+        'groupId': text(root, 'groupId'),
+        'artifactId': text(root, 'artifactId'),
+        'version': text(root, 'version'),
+        'parent': parent,
+        'properties': properties,
+        'management': dependencies(root, 'dependencyManagement/dependencies'),
+        'dependencies': dependencies(root, 'dependencies')
+    }
+
+
+class PomIndex(object):
+    """
+    Persistent index of the POMs read from a local repository: the content read_pom extracts from each POM is
+    stored under cache_dir as one JSON entry, keyed by the POM's path, size and mtime, so that later resolutions
+    (by any process) read the entry instead of parsing the XML. Entries use the parse cache layout and are evicted
+    with it (see parse_cache.ParseCache.evict); without cache_dir the index only lives in memory.
+    """
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir
+        self.poms = dict()
+        self.hits = 0
+        self.misses = 0
+        self.writable = cache_dir is not None
+
+    def entry_path(self, filepath, stat):
+        key_data = ['maven_pom', INDEX_FORMAT_VERSION, filepath, stat.st_size, stat.st_mtime_ns]
+        key = hashlib.sha256(json.dumps(key_data).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], key + '.json')
+
+    def get(self, filepath):
+        """
+        The read_pom content of filepath, None when it does not exist or cannot be parsed.
+        """
+        if filepath in self.poms:
+            return self.poms[filepath]
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            self.poms[filepath] = None
+            return None
+        entry_path = self.entry_path(filepath, stat) if self.cache_dir else None
+        if entry_path:
+            try:
+                with open(entry_path, mode='r', encoding='utf-8') as f:
+                    self.poms[filepath] = json.load(f)
+                os.utime(entry_path)
+                self.hits += 1
+                return self.poms[filepath]
+            except (OSError, ValueError):
+                pass
+        self.misses += 1
+        try:
+            with open(filepath, mode='rb') as f:
+                pom = read_pom(f.read())
+        except (OSError, ET.ParseError):
+            pom = None
+        self.poms[filepath] = pom
+        if entry_path and self.writable:
+            self.put(entry_path, pom)
+        return pom
+
+    def put(self, entry_path, pom):
+        entry_dir = os.path.split(entry_path)[0]
+        try:
+            os.makedirs(entry_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=entry_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, mode='w', encoding='utf-8') as f:
+                    json.dump(pom, f)
+                os.replace(temp_path, entry_path)
+            except Exception:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        except OSError:
+            # e.g. a read-only cache_dir, keep resolving without writing
+            self.writable = False
+
+
+class MavenModel(object):
+    """
+    Effective model of a POM: the groupId, artifactId and version, the properties, the dependencyManagement
+    entries (BOM imports merged in) and the dependencies, inherited from the parent chain and interpolated.
+    """
+    def __init__(self, gav, properties, management, dependencies):
+        self.gav = gav
+        self.properties = properties
+        self.management = management
+        self.dependencies = dependencies
+
+
+def dependency_key(dependency):
+    return dependency['groupId'], dependency['artifactId'], dependency['type'], dependency['classifier']
+
+
+def is_excluded(groupid, artifactid, exclusions):
+    for exclusion_groupid, exclusion_artifactid in exclusions:
+        if exclusion_groupid in ('*', groupid) and exclusion_artifactid in ('*', artifactid):
+            return True
+    return False
+
+
+class MavenResolver(object):
+    """
+    Buildless transitive resolution of the dependencies of a pom.xml against a local Maven repository
+    (~/.m2/repository layout, or a mirror of it), without invoking Maven: nearest-wins mediation (the version
+    first reached at the lowest depth, in declaration order), exclusions, scope propagation (test, provided and
+    optional dependencies are not transitive), parent inheritance, property interpolation, dependencyManagement
+    of the project overriding transitive versions and scopes, and BOM imports (scope import).
+    Profiles, relocations and version ranges other than picking the highest matching version in the repository
+    are not handled. POMs missing from the repository end the branch and are counted in stats.
+    """
+    def __init__(self, repo, cache_dir=None):
+        self.repo = os.path.abspath(os.path.expanduser(repo))
+        self.cache_dir = cache_dir
+        self.index = PomIndex(cache_dir=cache_dir)
+        self.models = dict()
+        self.missing = set()
+
+    def __getstate__(self):
+        # 传给解析进程时只传参数, 各进程使用自己的内存缓存与同一个持久索引
+        return {'repo': self.repo, 'cache_dir': self.cache_dir}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @property
+    def stats(self):
+        return {'index_hits': self.index.hits, 'index_misses': self.index.misses, 'models': len(self.models),
+                'missing': len(self.missing)}
+
+    def pop_stats(self):
+        stats = self.stats
+        self.index.hits = 0
+        self.index.misses = 0
+        return stats
+
+    def merge_stats(self, stats):
+        if stats:
+            self.index.hits += stats['index_hits']
+            self.index.misses += stats['index_misses']
+
+    def pom_path(self, groupid, artifactid, version):
+        return os.path.join(self.repo, *groupid.split('.'), artifactid, version,
+                            '{}-{}.pom'.format(artifactid, version))
+
+    def select_version(self, groupid, artifactid, version):
+        """
+        The version to load: version itself, or for a range the highest version in the repository within it.
+        """
+        ranges = parse_version_ranges(version)
+        if ranges is None:
+            return version
+        try:
+            versions = os.listdir(os.path.join(self.repo, *groupid.split('.'), artifactid))
+        except OSError:
+            return None
+        versions = [candidate for candidate in versions if in_version_ranges(candidate, ranges)]
+        return max(versions, key=version_key) if versions else None
+
+    def get_model(self, groupid, artifactid, version, logger, visiting=()):
+        gav = (groupid, artifactid, version)
+        if gav not in self.models:
+            pom = self.index.get(self.pom_path(groupid, artifactid, version))
+            if pom is None:
+                self.missing.add(gav)
+                logger.debug('POM of {}:{}:{} not found in local repository {}'.format(groupid, artifactid, version,
+                                                                                      self.repo))
+                self.models[gav] = None
+            elif gav in visiting:
+                return None
+            else:
+                self.models[gav] = self.build_model(pom=pom, parent_model=self.get_repo_parent(pom, logger, visiting
+                                                                                               + (gav,)),
+                                                    logger=logger, visiting=visiting + (gav,))
+        return self.models[gav]
+
+    def get_repo_parent(self, pom, logger, visiting):
+        parent = pom['parent']
+        if parent and parent['groupId'] and parent['artifactId'] and parent['version']:
+            return self.get_model(parent['groupId'], parent['artifactId'], parent['version'], logger=logger,
+                                  visiting=visiting)
+        return None
+
+    def build_model(self, pom, parent_model, logger, visiting):
+        parent = pom['parent'] or dict()
+        groupid = pom['groupId'] or parent.get('groupId') or ''
+        version = pom['version'] or parent.get('version') or ''
+        properties = dict(parent_model.properties) if parent_model else dict()
+        properties.update(pom['properties'])
+        for prefix in ('project.', 'pom.', ''):
+            properties[prefix + 'groupId'] = groupid
+            properties[prefix + 'artifactId'] = pom['artifactId'] or ''
+            properties[prefix + 'version'] = version
+        properties['project.parent.groupId'] = parent.get('groupId') or ''
+        properties['project.parent.version'] = parent.get('version') or ''
+
+        def interpolate(value):
+            for _ in range(0, MAX_INTERPOLATION):
+                if not value or '${' not in value:
+                    break
+                value = PROPERTY.sub(lambda match: properties.get(match.group(1), match.group(0)), value)
+            return value
+
+        def interpolate_dependency(dependency):
+            return dict(dependency, groupId=interpolate(dependency['groupId']),
+                        artifactId=interpolate(dependency['artifactId']), version=interpolate(dependency['version']),
+                        type=interpolate(dependency['type']), classifier=interpolate(dependency['classifier']),
+                        scope=interpolate(dependency['scope']))
+
+        # 继承的dependencyManagement被本pom的同名条目覆盖, 导入的BOM只补充尚未管理的条目
+        management = dict(parent_model.management) if parent_model else dict()
+        imports = list()
+        for dependency in pom['management']:
+            dependency = interpolate_dependency(dependency)
+            if dependency['scope'] == 'import' and dependency['type'] == 'pom':
+                imports.append(dependency)
+            else:
+                management[dependency_key(dependency)] = dependency
+        for dependency in imports:
+            version = self.select_version(dependency['groupId'], dependency['artifactId'], dependency['version'])
+            bom_model = self.get_model(dependency['groupId'], dependency['artifactId'], version, logger=logger,
+                                       visiting=visiting) if version else None
+            if bom_model:
+                for key, managed in bom_model.management.items():
+                    management.setdefault(key, managed)
+
+        dependencies = dict((dependency_key(dependency), dependency)
+                            for dependency in (parent_model.dependencies if parent_model else ()))
+        for dependency in pom['dependencies']:
+            dependency = interpolate_dependency(dependency)
+            managed = management.get(dependency_key(dependency))
+            if managed:
+                dependency['version'] = dependency['version'] or managed['version']
+                dependency['scope'] = dependency['scope'] or managed['scope']
+                dependency['exclusions'] = dependency['exclusions'] + managed['exclusions']
+            dependency['scope'] = dependency['scope'] or 'compile'
+            dependencies[dependency_key(dependency)] = dependency
+        return MavenModel(gav=(groupid, pom['artifactId'], version), properties=properties, management=management,
+                          dependencies=list(dependencies.values()))
+
+    def get_project_model(self, filepath, logger, document_cache=None, visiting=()):
+        """
+        Effective model of a pom.xml of the scanned project, its parent read from relativePath (default
+        ../pom.xml) when that file is the declared parent, from the repository otherwise.
+        """
+        pom = read_pom(load_document(filepath=filepath, kind='bytes', document_cache=document_cache))
+        parent = pom['parent']
+        parent_model = None
+        if parent:
+            relative_path = parent['relativePath'] if parent['relativePath'] is not None else '../pom.xml'
+            parent_filepath = os.path.normpath(os.path.join(os.path.dirname(filepath), relative_path)) \
+                if relative_path else ''
+            if parent_filepath and not parent_filepath.endswith('.xml'):
+                parent_filepath = os.path.join(parent_filepath, 'pom.xml')
+            if parent_filepath and parent_filepath not in visiting \
+                    and is_file(parent_filepath, document_cache=document_cache):
+                try:
+                    parent_model = self.get_project_model(filepath=parent_filepath, logger=logger,
+                                                          document_cache=document_cache,
+                                                          visiting=visiting + (filepath,))
+                except (OSError, ET.ParseError):
+                    parent_model = None
+                if parent_model and parent_model.gav[:2] != (parent['groupId'], parent['artifactId']):
+                    parent_model = None
+            if parent_model is None:
+                parent_model = self.get_repo_parent(pom, logger=logger, visiting=())
+        return self.build_model(pom=pom, parent_model=parent_model, logger=logger, visiting=())
+
+    def resolve(self, filepath, logger, document_cache=None):
+        """
+           desc: 解析pom.xml的传递依赖: 按层遍历, 每个groupId:artifactId取最先(最浅)到达的版本
+           return: nodes: list, [(groupId, artifactId, version, scope, parent index or None)], 按遍历顺序,
+                   直接依赖在前
+        """
+        project = self.get_project_model(filepath=filepath, logger=logger, document_cache=document_cache)
+        nodes = list()
+        resolved = dict()
+        queue = deque((dependency, None, dependency['scope'], tuple()) for dependency in project.dependencies)
+        while queue:
+            dependency, parent, scope, exclusions = queue.popleft()
+            groupid, artifactid = dependency['groupId'], dependency['artifactId']
+            if not groupid or not artifactid or '${' in groupid + artifactid:
+                continue
+            if (groupid, artifactid) in resolved:
+                # 已由更近的路径确定版本
+                if parent is not None:
+                    nodes.append((groupid, artifactid, None, None, parent, resolved[(groupid, artifactid)]))
+                continue
+            version = dependency['version']
+            if parent is not None:
+                # 项目的dependencyManagement决定传递依赖的版本与作用域
+                managed = project.management.get(dependency_key(dependency))
+                if managed:
+                    version = managed['version'] or version
+                    scope = SCOPE_TRANSITIONS.get(nodes[parent][3], dict()).get(managed['scope'] or 'compile',
+                                                                               scope)
+            selected = self.select_version(groupid, artifactid, version) if version and '${' not in version \
+                else None
+            node = len(nodes)
+            resolved[(groupid, artifactid)] = node
+            nodes.append((groupid, artifactid, selected or version, scope, parent, node))
+            model = self.get_model(groupid, artifactid, selected, logger=logger) if selected else None
+            if model is None:
+                continue
+            child_exclusions = exclusions + tuple(tuple(exclusion) for exclusion in dependency['exclusions'])
+            for child in model.dependencies:
+                child_scope = SCOPE_TRANSITIONS.get(scope, dict()).get(child['scope'])
+                if child_scope is None or child['optional'] \
+                        or is_excluded(child['groupId'], child['artifactId'], child_exclusions):
+                    continue
+                queue.append((child, node, child_scope, child_exclusions))
+        return nodes
+
+
+def add_resolved_dependencies(dep_result, nodes, logger):
+    """
+       desc: 将MavenResolver.resolve的结果与pom.xml的直接依赖合并为带依赖结构的DependencyList
+       params: dep_result: list, parse_maven_pom_file解析出的直接依赖;
+               nodes: list, MavenResolver.resolve的返回值
+    """
+    builder = GraphBuilder()
+    direct = dict()
+    for item in dep_result:
+        direct.setdefault(item['name'], item)
+    graph_nodes = dict()
+    for position, (groupid, artifactid, version, scope, parent, target) in enumerate(nodes):
+        if target != position:
+            # 被更近的路径覆盖的依赖, 指向最终选定的版本
+            if parent in graph_nodes and target in graph_nodes:
+                builder.add_dependency(graph_nodes[parent], graph_nodes[target])
+            continue
+        name = groupid + '/' + artifactid
+        if parent is None and name in direct:
+            item = direct[name]
+            if not item['version'] and version:
+                item['version'] = version
+        else:
+            item = {'type': 'maven', 'namespace': groupid, 'name': name, 'version': version or '',
+                    'language': 'Java'}
+        graph_nodes[target] = builder.add(item, scope=scope)
+        builder.add_dependency(graph_nodes.get(parent), graph_nodes[target])
+    for item in dep_result:
+        # 直接依赖中解析器未能处理的条目(e.g. 属性未展开的groupId)
+        if builder.find(item) is None:
+            builder.add_dependency(None, builder.add(item))
+    logger.debug('Resolved {} Maven dependencies'.format(len(builder.items)))
+    return builder.result()
@@ -1,45 +1,52 @@
-from core.util import remove_duplicate_dict_items
+from core.dep_graph import GraphBuilder
+
+
+def get_tree_parent(stack, position):
+    """
+       desc: 依赖树中位于position列的节点的父节点; stack为[(列, 节点)], 弹出同层及更深层的节点
+       return: 父节点, None表示直接依赖
+    """
+    while stack and stack[-1][0] >= position:
+        stack.pop()
+    return stack[-1][1] if stack else None
 
 
 def parse_maven_tree_file(filepath, logger):
 
-    dependencies = list()
+    builder = GraphBuilder()
 
     try:
         with open(file=filepath, mode='r', encoding='utf-8') as file:
             lines = file.readlines()
     except Exception as e:
         logger.error('Exception occurs when loading maven_tree.txt file {}: {}'.format(filepath, str(e)))
-        return dependencies
+        return builder.result()
 
+    # 每行依赖的列位置即其层级, 不含树形符号的行(模块根节点, 日志)开始一棵新树
+    stack = list()
     for line in lines:
-        if '+-' or '\\-' in line:
-            if '+-' in line:
-                dep_info_str = line.split('+-')[-1].strip()
-                dep_info = dep_info_str.split(':')[:-1]
-                if len(dep_info) >= 3:
-                    temp = dict()
-                    temp['type'] = 'maven'
-                    temp['namespace'] = dep_info[0]
-                    temp['name'] = dep_info[0] + '/' + dep_info[1]
-                    temp['version'] = dep_info[-1]
-                    temp['language'] = 'Java'
-                    dependencies.append(temp)
-            elif '\\-' in line:
-                dep_info_str = line.split('\\-')[-1].strip()
-                dep_info = dep_info_str.split(':')[:-1]
-                if len(dep_info) >= 3:
-                    temp = dict()
-                    temp['type'] = 'maven'
-                    temp['namespace'] = dep_info[0]
-                    temp['name'] = dep_info[0] + '/' + dep_info[1]
-                    temp['version'] = dep_info[-1]
-                    temp['language'] = 'Java'
-                    dependencies.append(temp)
-    dependencies = remove_duplicate_dict_items(data_list=dependencies)
-
-    file.close()
-    return dependencies
+        marker = '+-' if '+-' in line else '\\-' if '\\-' in line else None
+        if marker is None:
+            stack = list()
+            continue
+        position = line.rfind(marker)
+        dep_info_str = line.split(marker)[-1].strip()
+        dep_info = dep_info_str.split(':')[:-1]
+        parent = get_tree_parent(stack=stack, position=position)
+        if len(dep_info) >= 3:
+            temp = dict()
+            temp['type'] = 'maven'
+            temp['namespace'] = dep_info[0]
+            temp['name'] = dep_info[0] + '/' + dep_info[1]
+            temp['version'] = dep_info[-1]
+            temp['language'] = 'Java'
+            # groupId:artifactId:type[:classifier]:version:scope, e.g. 'compile (optional)'
+            scope = dep_info_str.split(':')[-1].split(' ')[0]
+            node = builder.add(temp, scope=scope)
+            builder.add_dependency(parent, node)
+            stack.append((position, node))
+
+    return builder.result()
 
 
 if __name__ == "__main__":
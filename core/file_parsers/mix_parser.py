@@ -1,4 +1,5 @@
 import re
+from core.document_cache import open_document
 
 
 def is_mix_lock(filepath):
@@ -56,7 +57,7 @@ def parse_version_str(version_str):
     return version_str
 
 
-def parse_mix_exs(filepath, logger):
+def parse_mix_exs(filepath, logger, document_cache=None):
 
     dependencies = list()
     dep_block_pattern = r'defp deps do[\s\n]*?\[[\s\n]*?(?P<dep_block>(.|\n)*?)\][\s\n]*?end'
@@ -65,7 +66,7 @@ def parse_mix_exs(filepath, logger):
     version_str_pattern = r'(tag|ref|branch)?:"(?P<version_str>[0-9.]+)"'
 
     try:
-        with open(file=filepath, mode='r', encoding='utf-8') as file:
+        with open_document(filepath=filepath, document_cache=document_cache) as file:
             data = file.read()
     except Exception as e:
         logger.error('Exception occurs when loading mix.exs file {}: {}'.format(filepath, str(e)))
@@ -117,13 +118,13 @@ def parse_mix_exs(filepath, logger):
     return dependencies
 
 
-def parse_mix_lock(filepath, logger):
+def parse_mix_lock(filepath, logger, document_cache=None):
 
     dependencies = list()
     version_pattern = r'(tag|branch)?:\s*?"(?P<version>.+)"'
 
     try:
-        with open(file=filepath, mode='r', encoding='utf-8') as file:
+        with open_document(filepath=filepath, document_cache=document_cache) as file:
             lines = file.readlines()
     except Exception as e:
         logger.error('Exception occurs when loading mix.lock file {}: {}'.format(filepath, str(e)))
@@ -164,12 +165,12 @@ def parse_mix_lock(filepath, logger):
     return dependencies
 
 
-def parse_mix_files(filepath, logger):
+def parse_mix_files(filepath, logger, document_cache=None):
 
     if is_mix_lock(filepath):
-        dependencies = parse_mix_lock(filepath=filepath, logger=logger)
+        dependencies = parse_mix_lock(filepath=filepath, logger=logger, document_cache=document_cache)
     else:
-        dependencies = parse_mix_exs(filepath=filepath, logger=logger)
+        dependencies = parse_mix_exs(filepath=filepath, logger=logger, document_cache=document_cache)
 
     return dependencies
 
@@ -1,71 +1,173 @@
 import re
-from core.util import read_json_file
-from core.util import remove_duplicate_dict_items
-
-
-def parse_lock_json_file(filepath, is_skip, logger):
-
-    json_result = read_json_file(filepath=filepath, logger=logger)
-    pattern = re.compile(r'[A-Za-z]', re.S)
-    dep_result = list()
-    dev_result = list()
-
-    if json_result:
-        # 添加子依赖
-        try:
-            for dep_obj, dep_info in json_result['dependencies'].items():
-                temp = dict()
-                temp['type'] = 'npm'
-                temp['namespace'] = ''
-                temp['name'] = dep_obj
-                temp['version'] = dep_info['version']
-                temp['language'] = 'Node JS'
-                try:
-                    dev = dep_info['dev']
-                except KeyError:
-                    dev = False
-                if not len(re.findall(pattern, temp['version'].split('-')[0])):
-                    if not dev:
-                        dep_result.append(temp)
-                    else:
-                        dev_result.append(temp)
-
-                # 添加子依赖的依赖
-                try:
-                    dependencies = dep_info['dependencies']
-                    for sub_obj, sub_info in dependencies.items():
-                        temp = dict()
-                        temp['type'] = 'npm'
-                        temp['namespace'] = ''
-                        temp['name'] = sub_obj
-                        temp['version'] = sub_info['version']
-                        temp['language'] = 'Node JS'
-                        try:
-                            dev = sub_info['dev']
-                        except KeyError:
-                            dev = False
-                        if not len(re.findall(pattern, temp['version'].split('-')[0])):
-                            if not dev:
-                                dep_result.append(temp)
-                            else:
-                                dev_result.append(temp)
-                except KeyError:
-                    pass
-
-        except KeyError:
-            pass
-
-        # add devDependencies
-        if not is_skip and dev_result:
-            dep_result.extend(dev_result)
-
-        # 结果去重
-        dep_result = remove_duplicate_dict_items(data_list=dep_result)
-
-    else:
-        logger.error('Exception occurs when loading NPM lock json file!')
-
-    return dep_result
+from core.dep_graph import GraphBuilder
+from core.json_stream import JsonTokenizer
+from core.document_cache import open_document
+
+# 版本号('-'之前的部分)中含字母的依赖不是registry包, e.g. git/file/alias引用
+NON_REGISTRY_VERSION = re.compile(r'[A-Za-z]', re.S)
+NODE_MODULES = 'node_modules/'
+
+
+def construct_dep_item(name, version):
+    temp = dict()
+    temp['type'] = 'npm'
+    temp['namespace'] = ''
+    temp['name'] = name
+    temp['version'] = version
+    temp['language'] = 'Node JS'
+    return temp
+
+
+def is_registry_version(version):
+    return isinstance(version, str) and not NON_REGISTRY_VERSION.search(version.split('-')[0])
+
+
+def construct_package(path, version=None, dev=False, requires=()):
+    # requires只保留依赖的包名, 不保留版本范围
+    temp = dict()
+    temp['path'] = path
+    temp['version'] = version
+    temp['dev'] = dev
+    temp['requires'] = tuple(requires)
+    return temp
+
+
+def iter_v1_dependencies(tokenizer, parent_path=''):
+    """
+       desc: 流式遍历lockfileVersion 1的dependencies对象, 任意深度的嵌套子依赖依次产出, 父依赖先于其子依赖;
+             嵌套路径按v2格式表示, e.g. 'node_modules/a/node_modules/b'
+       return: package生成器, 见construct_package; 产出后仍会补全其字段, 需在遍历结束后读取
+    """
+    for name in tokenizer.iter_object():
+        package = construct_package(path=parent_path + NODE_MODULES + name)
+        emitted = False
+        for key in tokenizer.iter_object():
+            if key == 'version':
+                package['version'] = tokenizer.read_value()
+            elif key == 'dev':
+                package['dev'] = tokenizer.read_value() is True
+            elif key == 'requires':
+                requires = tokenizer.read_value()
+                package['requires'] = tuple(requires) if isinstance(requires, dict) else ()
+            elif key == 'dependencies':
+                if package['version'] is not None:
+                    emitted = True
+                    yield package
+                for sub_package in iter_v1_dependencies(tokenizer, parent_path=package['path'] + '/'):
+                    yield sub_package
+            else:
+                tokenizer.skip_value()
+        if not emitted and package['version'] is not None:
+            yield package
+
+
+def iter_v2_packages(tokenizer):
+    """
+       desc: 流式遍历lockfileVersion 2/3的packages对象, 键为node_modules路径, 每个包对象单独解码
+       return: package生成器, 见construct_package; 包括根项目("")与workspace本地包, 其version为None
+    """
+    for path in tokenizer.iter_object():
+        package_info = tokenizer.read_value()
+        if not isinstance(package_info, dict):
+            continue
+        requires = dict()
+        for key in ('dependencies', 'optionalDependencies', 'peerDependencies', 'devDependencies'):
+            if isinstance(package_info.get(key), dict):
+                requires.update(dict.fromkeys(package_info[key]))
+        # "" 为根项目, 不含node_modules/的路径为workspace本地包
+        if NODE_MODULES not in path or package_info.get('link'):
+            yield construct_package(path=path, requires=requires)
+            continue
+        yield construct_package(path=path, version=package_info.get('version'),
+                                dev=package_info.get('dev') is True, requires=requires)
+
+
+def iter_lock_json_packages(tokenizer):
+    """
+    Every package of a package-lock.json / npm-shrinkwrap.json, see construct_package.
+    The v2/v3 packages layout is used when present, the v1 dependencies layout otherwise.
+    """
+    has_packages = False
+    for key in tokenizer.iter_object():
+        if key == 'packages':
+            has_packages = True
+            for package in iter_v2_packages(tokenizer):
+                yield package
+        elif key == 'dependencies' and not has_packages:
+            for package in iter_v1_dependencies(tokenizer):
+                yield package
+        else:
+            tokenizer.skip_value()
+
+
+def resolve_package(paths, path, name):
+    """
+       desc: 按Node的模块查找规则解析path处的包所依赖的name: 先找自身的node_modules, 再逐级向上
+       params: paths: set, lock文件中所有包的路径
+       return: 被依赖包的路径, 未安装时返回None
+    """
+    base = path
+    while True:
+        candidate = (base + '/' if base else '') + NODE_MODULES + name
+        if candidate in paths:
+            return candidate
+        if not base:
+            return None
+        index = base.rfind('/' + NODE_MODULES)
+        base = base[:index] if index >= 0 else ''
+
+
+def parse_lock_json_file(filepath, is_skip, logger, document_cache=None):
+
+    packages = dict()
+
+    try:
+        with open_document(filepath=filepath, document_cache=document_cache) as f:
+            for package in iter_lock_json_packages(JsonTokenizer(f)):
+                packages[package['path']] = package
+    except Exception as e:
+        logger.error('Exception occurs when loading NPM lock json file {}: {}'.format(filepath, str(e)))
+
+    # 先添加dependencies, 再添加devDependencies中未出现过的包
+    builder = GraphBuilder()
+    nodes = dict()
+    for dev in (False, True):
+        if dev and is_skip:
+            break
+        for path, package in packages.items():
+            if package['dev'] == dev and package['version'] is not None and is_registry_version(package['version']):
+                item = construct_dep_item(name=path.rsplit(NODE_MODULES, 1)[-1], version=package['version'])
+                nodes[path] = builder.add(item, scope='dev' if dev else 'runtime')
+
+    # 依赖边: 根项目与workspace本地包的依赖为直接依赖
+    # 按模块查找规则解析依赖需要所有包的路径, 各包的记录在其依赖边解析后即丢弃
+    paths = set(packages)
+    required = set()
+    for path in list(packages):
+        package = packages.pop(path)
+        for name in package['requires']:
+            target = resolve_package(paths=paths, path=path, name=name)
+            if target is None:
+                continue
+            required.add(target)
+            if target not in nodes:
+                continue
+            if NODE_MODULES not in path:
+                builder.add_dependency(None, nodes[target])
+            elif path in nodes:
+                builder.add_dependency(nodes[path], nodes[target])
+    # lockfileVersion 1不记录根项目的依赖: 未被任何包依赖的顶层包视为直接依赖,
+    # 缺少requires字段时, 嵌套安装的包视为其所在包的依赖
+    if '' not in paths:
+        for path, node in nodes.items():
+            if path in required:
+                continue
+            if path.count(NODE_MODULES) == 1:
+                builder.add_dependency(None, node)
+            elif path[:path.rfind('/' + NODE_MODULES)] in nodes:
+                builder.add_dependency(nodes[path[:path.rfind('/' + NODE_MODULES)]], node)
+
+    return builder.result()
 
 
 if __name__ == "__main__":
@@ -194,9 +194,9 @@ def parse_version_str(version_str):
     return version_str
 
 
-def parse_package_json_file(filepath, is_skip, logger):
+def parse_package_json_file(filepath, is_skip, logger, document_cache=None):
 
-    json_result = read_json_file(filepath=filepath, logger=logger)
+    json_result = read_json_file(filepath=filepath, logger=logger, document_cache=document_cache)
     pattern = re.compile(r'[A-Za-z]', re.S)
     dependencies = list()
 
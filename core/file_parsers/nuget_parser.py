@@ -1,6 +1,8 @@
 import xml
 import xml.etree.ElementTree as ET
 
+from core.document_cache import open_document
+
 
 def parse_version_str(version):
     if version.startswith('[') and version.endswith(']'):
@@ -65,11 +67,12 @@ def parse_version_str(version):
         return version
 
 
-def get_xmlns(filepath, logger):
+def get_xmlns(filepath, logger, document_cache=None):
 
     xmlns = ''
     try:
-        for evt, elem in ET.iterparse(filepath, ('start-ns', 'end-ns')):
+        for evt, elem in ET.iterparse(open_document(filepath=filepath, document_cache=document_cache, binary=True),
+                                    ('start-ns', 'end-ns')):
             if evt == 'start-ns':
                 try:
                     xmlns = elem[1]
@@ -83,25 +86,25 @@ def get_xmlns(filepath, logger):
     return xmlns
 
 
-def get_xml_file_tree(filepath, logger):
+def get_xml_file_tree(filepath, logger, document_cache=None):
     """
        desc: 获取当前xml文件的element tree
        params: filepath: str, 当前xml文件所在路径
        return: tree: ElementTree, xml文件加载后的返回值
     """
     try:
-        tree = ET.ElementTree(file=filepath)
+        tree = ET.ElementTree(file=open_document(filepath=filepath, document_cache=document_cache, binary=True))
         return tree
     except Exception as e:
         logger.error('Exception occurs when loading c# XML config file {}: {}'.format(filepath, str(e)))
         return None
 
 
-def parse_packages_config_file(filepath, logger):
+def parse_packages_config_file(filepath, logger, document_cache=None):
 
     dependencies = list()
 
-    tree = get_xml_file_tree(filepath=filepath, logger=logger)
+    tree = get_xml_file_tree(filepath=filepath, logger=logger, document_cache=document_cache)
     if tree:
         root = tree.getroot()
         if isinstance(root, xml.etree.ElementTree.Element):
@@ -127,14 +130,14 @@ def parse_packages_config_file(filepath, logger):
     return dependencies
 
 
-def parse_nuspec_file(filepath, logger):
+def parse_nuspec_file(filepath, logger, document_cache=None):
 
     dependencies = list()
 
-    tree = get_xml_file_tree(filepath=filepath, logger=logger)
+    tree = get_xml_file_tree(filepath=filepath, logger=logger, document_cache=document_cache)
     if tree:
         # 获取package的name, version
-        nuspec_namespace = get_xmlns(filepath=filepath, logger=logger)
+        nuspec_namespace = get_xmlns(filepath=filepath, logger=logger, document_cache=document_cache)
         if nuspec_namespace:
             nuspec_namespace = '{' + nuspec_namespace + '}'
             package_id = tree.find(path='./' + nuspec_namespace + 'metadata' + '/' + nuspec_namespace + 'id')
@@ -186,14 +189,14 @@ def parse_nuspec_file(filepath, logger):
     return dependencies
 
 
-def parse_csproj_file(filepath, logger):
+def parse_csproj_file(filepath, logger, document_cache=None):
 
     dependencies = list()
 
-    tree = get_xml_file_tree(filepath=filepath, logger=logger)
+    tree = get_xml_file_tree(filepath=filepath, logger=logger, document_cache=document_cache)
     if tree:
         # 获取PackageReference列表
-        csproj_namespace = get_xmlns(filepath=filepath, logger=logger)
+        csproj_namespace = get_xmlns(filepath=filepath, logger=logger, document_cache=document_cache)
         if csproj_namespace:
             csproj_namespace = '{' + csproj_namespace + '}'
             node_list = tree.findall(path='.//' + csproj_namespace + 'PackageReference')
@@ -237,16 +240,16 @@ def parse_csproj_file(filepath, logger):
     return dependencies
 
 
-def parse_nuget_files(filepath, logger):
+def parse_nuget_files(filepath, logger, document_cache=None):
 
     dependencies = list()
 
     if filepath.endswith('packages.config'):
-        dependencies = parse_packages_config_file(filepath=filepath, logger=logger)
+        dependencies = parse_packages_config_file(filepath=filepath, logger=logger, document_cache=document_cache)
     elif filepath.endswith('.nuspec'):
-        dependencies = parse_nuspec_file(filepath=filepath, logger=logger)
+        dependencies = parse_nuspec_file(filepath=filepath, logger=logger, document_cache=document_cache)
     elif filepath.endswith('.csproj'):
-        dependencies = parse_csproj_file(filepath=filepath, logger=logger)
+        dependencies = parse_csproj_file(filepath=filepath, logger=logger, document_cache=document_cache)
 
     return dependencies
 
@@ -0,0 +1,242 @@
+import os
+import ast
+import sys
+import json
+import time
+import hashlib
+import tempfile
+import importlib.util
+
+from core.dep_graph import DependencyList
+from core.document_cache import hash_file
+
+CACHE_FORMAT_VERSION = 2
+# 解析结果依赖的本项目模块的包名, 其源码参与缓存键的计算
+SOURCE_PACKAGE = 'core'
+
+
+def get_module_file(module_name):
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return getattr(module, '__file__', None)
+    try:
+        spec = importlib.util.find_spec(module_name)
+    except (ImportError, ValueError):
+        return None
+    return spec.origin if spec and spec.has_location else None
+
+
+def get_source_imports(module_file):
+    """
+    The names of the core.* modules imported anywhere in module_file, including the imports inside functions.
+    """
+    with open(module_file, mode='rb') as f:
+        tree = ast.parse(f.read(), filename=module_file)
+    module_names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            module_names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            module_names.add(node.module)
+            # from core.file_parsers import x 导入的可能是子模块
+            module_names.update(node.module + '.' + alias.name for alias in node.names)
+    return set(name for name in module_names
+               if name.split('.', 1)[0] == SOURCE_PACKAGE and get_module_file(name))
+
+
+class ErrorTrackingLogger(object):
+    """
+    Logger proxy remembering whether a parser reported an error, failed parses are not cached.
+    """
+    def __init__(self, logger):
+        self.logger = logger
+        self.has_error = False
+
+    def error(self, message, **fields):
+        self.has_error = True
+        self.logger.error(message, **fields)
+
+    def __getattr__(self, name):
+        return getattr(self.logger, name)
+
+
+class ParseCache(object):
+    """
+    On-disk cache of parse results keyed by sha256(file content, parser identity, source of the parser module
+    and of the core.* modules it imports, options).
+    Entries are JSON files under cache_dir, their mtime is refreshed on every hit so that eviction
+    drops entries unused for max_age seconds first, then the least recently used ones above max_size bytes.
+    """
+    def __init__(self, cache_dir, max_size=512 * 1024 * 1024, max_age=7 * 24 * 3600):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.writable = True
+        self._parser_versions = dict()
+        self._source_hashes = dict()
+
+    def source_hash(self, module_name):
+        # (文件内容的hash, 导入的本项目模块), 每个模块只读取一次
+        if module_name not in self._source_hashes:
+            module_file = get_module_file(module_name)
+            if module_file and module_file.endswith('.py'):
+                self._source_hashes[module_name] = hash_file(module_file), get_source_imports(module_file)
+            else:
+                self._source_hashes[module_name] = '', set()
+        return self._source_hashes[module_name]
+
+    def parser_version(self, function):
+        """
+        Hash of the source of the parser module and of the core.* modules it imports, directly or through other
+        core.* modules (e.g. core.json_stream, core.dep_graph), so that editing a parser or one of the helpers
+        producing its result invalidates its entries.
+        """
+        module_name = function.__module__
+        if module_name not in self._parser_versions:
+            source_hashes = dict()
+            pending = [module_name]
+            while pending:
+                name = pending.pop()
+                if name in source_hashes:
+                    continue
+                source_hashes[name], imports = self.source_hash(name)
+                pending.extend(imports)
+            self._parser_versions[module_name] = hashlib.sha256(
+                json.dumps(sorted(source_hashes.items())).encode('utf-8')).hexdigest()
+        return self._parser_versions[module_name]
+
+    def make_key(self, parser_spec, filepath, context):
+        function = parser_spec.function
+        key_data = [
+            CACHE_FORMAT_VERSION,
+            function.__module__ + '.' + function.__qualname__,
+            self.parser_version(function),
+            [(option, context[option]) for option in parser_spec.options],
+            # 文件内容经由本次扫描的文档缓存读取, e.g. 压缩包中的文件
+            context['document_cache'].hash(filepath) if context.get('document_cache') else hash_file(filepath)
+        ]
+        return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + '.json')
+
+    def get(self, key):
+        entry_path = self.entry_path(key)
+        try:
+            with open(entry_path, mode='r', encoding='utf-8') as f:
+                dep_result = json.load(f)
+            os.utime(entry_path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        if isinstance(dep_result, dict):
+            # 带依赖结构的结果, 见core.dep_graph.DependencyList
+            return DependencyList(dep_result['dep_result'], graph=dep_result['graph'])
+        return dep_result
+
+    def put(self, key, dep_result):
+        entry_path = self.entry_path(key)
+        entry_dir = os.path.split(entry_path)[0]
+        os.makedirs(entry_dir, exist_ok=True)
+        # 先写临时文件再原子替换, 并发扫描不会读到写了一半的缓存项
+        fd, temp_path = tempfile.mkstemp(dir=entry_dir, suffix='.tmp')
+        try:
+            graph = getattr(dep_result, 'graph', None)
+            if graph:
+                dep_result = {'dep_result': list(dep_result), 'graph': graph}
+            with os.fdopen(fd, mode='w', encoding='utf-8') as f:
+                json.dump(dep_result, f)
+            os.replace(temp_path, entry_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def parse(self, parser_spec, filepath, context, logger):
+        """
+        Return the cached result of parser_spec on filepath, or run the parser and cache a clean result.
+        """
+        if not parser_spec.cacheable:
+            return parser_spec(filepath=filepath, context=context, logger=logger)
+
+        try:
+            key = self.make_key(parser_spec=parser_spec, filepath=filepath, context=context)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warn('Parse cache disabled for {}: {}'.format(filepath, str(e)))
+            return parser_spec(filepath=filepath, context=context, logger=logger)
+
+        dep_result = self.get(key)
+        if dep_result is not None:
+            return dep_result
+
+        tracking_logger = ErrorTrackingLogger(logger)
+        dep_result = parser_spec(filepath=filepath, context=context, logger=tracking_logger)
+        if self.writable and isinstance(dep_result, list) and not tracking_logger.has_error:
+            try:
+                self.put(key, dep_result)
+            except (OSError, TypeError, ValueError) as e:
+                # e.g. a read-only cache_dir, warn once and keep parsing without writing
+                self.writable = False
+                logger.warn('Exception occurs when writing parse cache entry for {}: {}'.format(filepath, str(e)))
+        return dep_result
+
+    @property
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def pop_stats(self):
+        stats = self.stats
+        self.hits = 0
+        self.misses = 0
+        return stats
+
+    def merge_stats(self, stats):
+        if stats:
+            self.hits += stats['hits']
+            self.misses += stats['misses']
+
+    def evict(self, logger):
+        """
+        Remove entries unused for max_age seconds, then the least recently used ones until under max_size bytes.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return 0
+
+        now = time.time()
+        entries = list()
+        removed = 0
+        for entry_dir in os.scandir(self.cache_dir):
+            if not entry_dir.is_dir():
+                continue
+            try:
+                dir_entries = list(os.scandir(entry_dir.path))
+            except OSError as e:
+                logger.warn('Exception occurs when evicting parse cache entries in {}: {}'.format(entry_dir.path,
+                                                                                                  str(e)))
+                continue
+            for entry in dir_entries:
+                try:
+                    stat = entry.stat()
+                    if self.max_age is not None and now - stat.st_mtime > self.max_age:
+                        os.remove(entry.path)
+                        removed += 1
+                    else:
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+                except OSError as e:
+                    logger.warn('Exception occurs when evicting parse cache entry {}: {}'.format(entry.path, str(e)))
+
+        if self.max_size is not None:
+            total_size = sum(size for _, size, _ in entries)
+            for _, size, entry_path in sorted(entries):
+                if total_size <= self.max_size:
+                    break
+                try:
+                    os.remove(entry_path)
+                    removed += 1
+                    total_size -= size
+                except OSError as e:
+                    logger.warn('Exception occurs when evicting parse cache entry {}: {}'.format(entry_path, str(e)))
+        return removed
@@ -5,6 +5,8 @@ import pip_requirements_parser
 from packaging.requirements import Requirement
 from packaging.utils import canonicalize_name
 
+from core.document_cache import local_path, open_document
+
 
 def is_setup(filepath):
     if filepath.endswith('setup.py'):
@@ -13,14 +15,14 @@ def is_setup(filepath):
         return False
 
 
-def get_setup_args(filepath, logger):
+def get_setup_args(filepath, logger, document_cache=None):
     """
     Return a mapping of arguments passed to a setup.py setup() function.
     """
     setup_args = {}
 
     try:
-        with open(file=filepath, mode='r') as inp:
+        with open_document(filepath=filepath, document_cache=document_cache) as inp:
             setup_text = inp.read()
 
         # parse setup.py and traverse the AST
@@ -223,7 +225,7 @@ def parse_setup(setup_args):
     return dependencies
 
 
-def parse_requirements(filepath, logger):
+def parse_requirements(filepath, logger, document_cache=None):
     """
         Return a list of DependentPackage found in a requirements file at
         ``filepath`` or an empty list.
@@ -231,7 +233,9 @@ def parse_requirements(filepath, logger):
     dependencies = list()
 
     try:
-        req_file = pip_requirements_parser.RequirementsFile.from_file(filename=filepath, include_nested=False)
+        # pip_requirements_parser只接受文件路径
+        with local_path(filepath=filepath, document_cache=document_cache) as path:
+            req_file = pip_requirements_parser.RequirementsFile.from_file(filename=path, include_nested=False)
     except Exception as e:
         logger.error('Exception occurs when loading requirements.txt file {}: {}'.format(filepath, str(e)))
         return dependencies
@@ -276,13 +280,13 @@ def parse_requirements(filepath, logger):
     return dependencies
 
 
-def parse_pip_files(filepath, logger):
+def parse_pip_files(filepath, logger, document_cache=None):
 
     if is_setup(filepath=filepath):
-        setup_args = get_setup_args(filepath=filepath, logger=logger)
+        setup_args = get_setup_args(filepath=filepath, logger=logger, document_cache=document_cache)
         dependencies = parse_setup(setup_args=setup_args)
     else:
-        dependencies = parse_requirements(filepath=filepath, logger=logger)
+        dependencies = parse_requirements(filepath=filepath, logger=logger, document_cache=document_cache)
 
     return dependencies
 
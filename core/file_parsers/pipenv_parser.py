@@ -4,6 +4,7 @@ from packaging.utils import canonicalize_name
 from packaging.specifiers import SpecifierSet
 
 from core.util import read_json_file
+from core.document_cache import open_document
 
 
 def is_pipfile_lock(filepath):
@@ -13,12 +14,12 @@ def is_pipfile_lock(filepath):
         return False
 
 
-def parse_pipfile(filepath, logger):
+def parse_pipfile(filepath, logger, document_cache=None):
 
     dependencies = list()
 
     try:
-        with open(file=filepath, mode='r', encoding='utf-8') as file:
+        with open_document(filepath=filepath, document_cache=document_cache) as file:
             content = file.read()
         dep_file = dparse2.parse(content=content, file_name='Pipfile')
     except Exception as e:
@@ -66,9 +67,9 @@ def parse_pipfile(filepath, logger):
     return dependencies
 
 
-def parse_pipfile_lock(filepath, logger):
+def parse_pipfile_lock(filepath, logger, document_cache=None):
 
-    json_result = read_json_file(filepath=filepath, logger=logger)
+    json_result = read_json_file(filepath=filepath, logger=logger, document_cache=document_cache)
     dependencies = list()
 
     if json_result:
@@ -117,12 +118,12 @@ def parse_pipfile_lock(filepath, logger):
     return dependencies
 
 
-def parse_pipenv_files(filepath, logger):
+def parse_pipenv_files(filepath, logger, document_cache=None):
 
     if is_pipfile_lock(filepath=filepath):
-        dependencies = parse_pipfile_lock(filepath=filepath, logger=logger)
+        dependencies = parse_pipfile_lock(filepath=filepath, logger=logger, document_cache=document_cache)
     else:
-        dependencies = parse_pipfile(filepath=filepath, logger=logger)
+        dependencies = parse_pipfile(filepath=filepath, logger=logger, document_cache=document_cache)
 
     return dependencies
 
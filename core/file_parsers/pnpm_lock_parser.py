@@ -1,17 +1,15 @@
-import yaml
-from yaml.loader import SafeLoader
+from core.dedup import remove_duplicate_components
+from core.document_cache import load_document
 
-from core.util import remove_duplicate_dict_items
 
-
-def parse_pnpm_lock_file(filepath, is_skip, logger):
+def parse_pnpm_lock_file(filepath, is_skip, logger, document_cache=None):
 
     dependencies = list()
     dev_dependencies = list()
 
     try:
-        with open(file=filepath, mode='r', encoding='utf-8') as file:
-            data = yaml.load(file.read(), SafeLoader)
+        # 只用到packages, 跳过importers/snapshots等其它顶层段
+        data = load_document(filepath=filepath, kind='yaml', document_cache=document_cache, keys=('packages',))
     except Exception as e:
         logger.error('Exception occurs when loading pnpm-lock.yaml file {}: {}'.format(filepath, str(e)))
         return dependencies
@@ -46,9 +44,8 @@ def parse_pnpm_lock_file(filepath, is_skip, logger):
         dependencies.extend(dev_dependencies)
 
     # 结果去重
-    dependencies = remove_duplicate_dict_items(data_list=dependencies)
+    dependencies = remove_duplicate_components(data_list=dependencies)
 
-    file.close()
     return dependencies
 
 
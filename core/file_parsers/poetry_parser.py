@@ -1,8 +1,8 @@
-import toml
-
 from packaging.requirements import Requirement
 from packaging.utils import canonicalize_name
 
+from core.document_cache import load_document
+
 
 def is_poetry_lock(filepath):
     if filepath.endswith('poetry.lock'):
@@ -11,19 +11,17 @@ def is_poetry_lock(filepath):
         return False
 
 
-def parse_pyproject(filepath, logger):
+def parse_pyproject(filepath, logger, document_cache=None):
 
     dependencies = list()
 
     try:
-        with open(file=filepath, mode='r', encoding='utf-8') as file:
-            content = toml.load(f=file)
+        content = load_document(filepath=filepath, kind='toml', document_cache=document_cache)
     except Exception as e:
         logger.error('Exception occurs when loading pyproject.toml file {}: {}'.format(filepath, str(e)))
         return dependencies
 
     if not content:
-        file.close()
         return dependencies
 
     try:
@@ -72,23 +70,20 @@ def parse_pyproject(filepath, logger):
     except KeyError:
         pass
 
-    file.close()
     return dependencies
 
 
-def parse_poetry_lock(filepath, logger):
+def parse_poetry_lock(filepath, logger, document_cache=None):
 
     dependencies = list()
 
     try:
-        with open(file=filepath, mode='r', encoding='utf-8') as file:
-            content = toml.load(f=file)
+        content = load_document(filepath=filepath, kind='toml', document_cache=document_cache)
     except Exception as e:
         logger.error('Exception occurs when loading poetry.lock file {}: {}'.format(filepath, str(e)))
         return dependencies
 
     if not content:
-        file.close()
         return dependencies
 
     try:
@@ -114,16 +109,15 @@ def parse_poetry_lock(filepath, logger):
     except KeyError:
         pass
 
-    file.close()
     return dependencies
 
 
-def parse_poetry_files(filepath, logger):
+def parse_poetry_files(filepath, logger, document_cache=None):
 
     if is_poetry_lock(filepath=filepath):
-        dependencies = parse_poetry_lock(filepath=filepath, logger=logger)
+        dependencies = parse_poetry_lock(filepath=filepath, logger=logger, document_cache=document_cache)
     else:
-        dependencies = parse_pyproject(filepath=filepath, logger=logger)
+        dependencies = parse_pyproject(filepath=filepath, logger=logger, document_cache=document_cache)
 
     return dependencies
 
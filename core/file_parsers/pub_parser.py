@@ -1,5 +1,4 @@
-import yaml
-from yaml.loader import SafeLoader
+from core.document_cache import load_document
 
 
 def is_pubspec_lock(filepath):
@@ -39,13 +38,12 @@ def parse_version_str(version_str):
     return version_str
 
 
-def parse_pubspec_yaml(filepath, is_skip, logger):
+def parse_pubspec_yaml(filepath, is_skip, logger, document_cache=None):
 
     dependencies = list()
 
     try:
-        with open(file=filepath, mode='r', encoding='utf-8') as file:
-            data = yaml.load(file.read(), SafeLoader)
+        data = load_document(filepath=filepath, kind='yaml', document_cache=document_cache)
     except Exception as e:
         logger.error('Exception occurs when loading pubspec.yaml file {}: {}'.format(filepath, str(e)))
         return dependencies
@@ -133,18 +131,16 @@ def parse_pubspec_yaml(filepath, is_skip, logger):
         except KeyError:
             pass
 
-    file.close()
     return dependencies
 
 
-def parse_pubspec_lock(filepath, is_skip, logger):
+def parse_pubspec_lock(filepath, is_skip, logger, document_cache=None):
 
     dependencies = list()
     dev_dependencies = list()
 
     try:
-        with open(file=filepath, mode='r', encoding='utf-8') as file:
-            data = yaml.load(file.read(), SafeLoader)
+        data = load_document(filepath=filepath, kind='yaml', document_cache=document_cache, keys=('packages',))
     except Exception as e:
         logger.error('Exception occurs when loading pubspec.lock file {}: {}'.format(filepath, str(e)))
         return dependencies
@@ -168,16 +164,17 @@ def parse_pubspec_lock(filepath, is_skip, logger):
     if not is_skip and dev_dependencies:
         dependencies.extend(dev_dependencies)
 
-    file.close()
     return dependencies
 
 
-def parse_pubspec_files(filepath, is_skip, logger):
+def parse_pubspec_files(filepath, is_skip, logger, document_cache=None):
 
     if is_pubspec_lock(filepath=filepath):
-        dependencies = parse_pubspec_lock(filepath=filepath, is_skip=is_skip, logger=logger)
+        dependencies = parse_pubspec_lock(filepath=filepath, is_skip=is_skip, logger=logger,
+                                          document_cache=document_cache)
     else:
-        dependencies = parse_pubspec_yaml(filepath=filepath, is_skip=is_skip, logger=logger)
+        dependencies = parse_pubspec_yaml(filepath=filepath, is_skip=is_skip, logger=logger,
+                                          document_cache=document_cache)
 
     return dependencies
 
@@ -1,5 +1,9 @@
 import re
 
+from core.document_cache import open_document
+from core.dep_graph import GraphBuilder
+from core.file_parsers.maven_tree_parser import get_tree_parent
+
 
 def parse_version_str(version_str):
     version_list = list()
@@ -49,7 +53,7 @@ def parse_version_str(version_str):
     return version_str
 
 
-def parse_rebar_config_file(filepath, logger):
+def parse_rebar_config_file(filepath, logger, document_cache=None):
 
     dependencies = list()
     candidates = list()
@@ -62,7 +66,7 @@ def parse_rebar_config_file(filepath, logger):
     version_str_pattern = r'"(?P<version_str>[0-9.v]+)"'
 
     try:
-        with open(file=filepath, mode='r', encoding='utf-8') as raw_file:
+        with open_document(filepath=filepath, document_cache=document_cache) as raw_file:
             lines = raw_file.readlines()
     except Exception as e:
         logger.error('Exception occurs when loading raw rebar.config file {}: {}'.format(filepath, str(e)))
@@ -72,19 +76,8 @@ def parse_rebar_config_file(filepath, logger):
     for line in lines:
         if line != '\n' and not line.strip().startswith('%'):
             new_lines.append(line)
-    raw_file.close()
-
-    new_file = open(file=filepath + '.processed', mode='w', encoding='utf-8')
-    for new_line in new_lines:
-        new_file.write(new_line)
-
-    try:
-        with open(file=filepath + '.processed', mode='r', encoding='utf-8') as new_file:
-            data = new_file.read()
-    except Exception as e:
-        logger.error('Exception occurs when loading processed rebar.config file {}: {}'.format(filepath + '.processed',
-                                                                                               str(e)))
-        return dependencies
+    # 去掉空行与注释后的内容, 不写回扫描目录
+    data = ''.join(new_lines)
 
     try:
         # 只匹配rebar.config文件中出现的第一个dep_block, 有可能不是真正的deps列表而是profiles之类
@@ -145,13 +138,12 @@ def parse_rebar_config_file(filepath, logger):
     except AttributeError:
         pass
 
-    new_file.close()
     return dependencies
 
 
 def parse_rebar_tree_file(filepath, logger):
 
-    dependencies = list()
+    builder = GraphBuilder()
     in_dependency_block = False
     github_url_pattern = r'\((?P<github_url>.+)\)'
 
@@ -160,12 +152,15 @@ def parse_rebar_tree_file(filepath, logger):
             lines = file.readlines()
     except Exception as e:
         logger.error('Exception occurs when loading rebar_tree.txt file {}: {}'.format(filepath, str(e)))
-        return dependencies
+        return builder.result()
 
+    # 每行依赖的列位置即其层级, (project app)的子节点为直接依赖
+    stack = list()
     for line in lines:
         if line != '\n':
             # process raw line
             processed_line = line.strip()
+            position = max(line.find('└─'), line.find('├─'))
             if '└─' in processed_line:
                 processed_line = processed_line.split('└─')[-1].strip()
             elif '├─' in processed_line:
@@ -173,6 +168,7 @@ def parse_rebar_tree_file(filepath, logger):
 
             if processed_line.endswith('(project app)'):
                 in_dependency_block = True
+                stack = [(position, None)]
                 continue
             if in_dependency_block:
                 type = 'hex'
@@ -192,10 +188,12 @@ def parse_rebar_tree_file(filepath, logger):
                 temp['name'] = name
                 temp['version'] = version
                 temp['language'] = 'Erlang'
-                dependencies.append(temp)
+                parent = get_tree_parent(stack=stack, position=position)
+                node = builder.add(temp)
+                builder.add_dependency(parent, node)
+                stack.append((position, node))
 
-    file.close()
-    return dependencies
+    return builder.result()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,360 @@
+import os
+import re
+import fnmatch
+import importlib
+
+# 解析函数以'<模块>.<函数>'注册, 模块(及其依赖的pygments, packaging, toml等)在首次解析该类文件时才导入
+PARSER_PACKAGE = 'core.file_parsers'
+
+
+class ParserSpec(object):
+    """
+    A parse function plus the names of the scan options it takes besides ``filepath`` and ``logger``,
+    e.g. ParserSpec('composer_parser.parse_composer_files', 'is_skip').
+    The function is given as '<module under core.file_parsers>.<function name>' and imported on first use,
+    or as a callable.
+    cacheable is False for parsers whose result depends on files other than ``filepath``.
+    documents is True for parsers taking the scan's ``document_cache``, which is not part of their cache key.
+    """
+    def __init__(self, function, *options, cacheable=True, documents=False):
+        if callable(function):
+            self.module_name = function.__module__
+            self._function = function
+        else:
+            module_name, self.function_name = function.rsplit('.', 1)
+            self.module_name = PARSER_PACKAGE + '.' + module_name
+            self._function = None
+        self.options = options
+        self.cacheable = cacheable
+        self.documents = documents
+
+    @property
+    def function(self):
+        if self._function is None:
+            self._function = getattr(importlib.import_module(self.module_name), self.function_name)
+        return self._function
+
+    def __call__(self, filepath, context, logger):
+        kwargs = dict()
+        for option in self.options:
+            kwargs[option] = context[option]
+        if self.documents:
+            kwargs['document_cache'] = context.get('document_cache')
+        return self.function(filepath=filepath, logger=logger, **kwargs)
+
+
+class ParserHandler(object):
+    """
+    Declares how one kind of candidate config file is detected, built and parsed.
+
+    name:             ecosystem key, e.g. 'Cargo'
+    result_type:      parse_result bucket the components are merged into
+    label:            file description used in log messages
+    file_names:       exact file names handled
+    extensions:       lower-cased file extensions checked by ``match`` (for files not matched by name)
+    match:            function(file_name, parent_name) -> bool
+    manifest_parser:  ParserSpec applied to the candidate file itself, None to skip it
+    lock_files:       [(sibling file name, ParserSpec or None)], the first existing one is parsed instead of the
+                      candidate file, a None parser means the sibling is handled by another handler
+    build_lock_files: lock_files preference in build mode, defaults to lock_files
+    build_executable: directory name of the build script under core/executables, None if not buildable
+    build_type:       build_type whose success switches the handler to ``build_artifact``
+    build_artifact:   (file name, ParserSpec) written by a successful build, None to skip the candidate
+    build_hook:       function(handler, file_item, context, logger) -> dep_result or None, overrides build mode
+    """
+    def __init__(self, name, result_type, label=None, file_names=(), extensions=(), match=None,
+                 manifest_parser=None, lock_files=(), build_lock_files=None, build_executable=None,
+                 build_type=None, build_artifact=None, build_hook=None):
+        self.name = name
+        self.result_type = result_type
+        self.label = label if label else (file_names[0] if file_names else name)
+        self.file_names = tuple(file_names)
+        self.extensions = tuple(extensions)
+        self.match = match
+        self.manifest_parser = manifest_parser
+        self.lock_files = tuple(lock_files)
+        self.build_lock_files = tuple(build_lock_files) if build_lock_files is not None else self.lock_files
+        self.build_executable = build_executable
+        self.build_type = build_type
+        self.build_artifact = build_artifact
+        self.build_hook = build_hook
+
+
+class ParserRegistry(object):
+    """
+    Classifies candidate files in O(1): an exact file name dict first,
+    then only the matchers registered for the file's extension, in registration order.
+    """
+    def __init__(self):
+        self.handlers = list()
+        self.name_index = dict()
+        self.extension_index = dict()
+
+    def register(self, handler):
+        self.handlers.append(handler)
+        for file_name in handler.file_names:
+            self.name_index[file_name] = handler
+        for extension in handler.extensions:
+            self.extension_index.setdefault(extension, list()).append(handler)
+        return handler
+
+    def match(self, file_name, parent_name):
+        handler = self.name_index.get(file_name)
+        if handler:
+            return handler
+        for handler in self.extension_index.get(os.path.splitext(file_name)[-1].lower(), ()):
+            if handler.match(file_name, parent_name):
+                return handler
+        return None
+
+    def match_path(self, filepath):
+        parent_dir, file_name = os.path.split(filepath)
+        return self.match(file_name=file_name, parent_name=os.path.split(parent_dir)[-1])
+
+    @property
+    def file_names(self):
+        return list(self.name_index.keys())
+
+    @property
+    def build_types(self):
+        return sorted(set(handler.build_type for handler in self.handlers if handler.build_type))
+
+    @property
+    def parser_modules(self):
+        """
+        Names of the modules of every registered parser, e.g. to import them all ahead of time.
+        """
+        modules = set()
+        for handler in self.handlers:
+            parser_specs = [handler.manifest_parser] + [parser_spec for _, parser_spec in handler.lock_files]
+            parser_specs += [parser_spec for _, parser_spec in handler.build_lock_files]
+            if handler.build_artifact:
+                parser_specs.append(handler.build_artifact[1])
+            modules.update(parser_spec.module_name for parser_spec in parser_specs if parser_spec)
+        return sorted(modules)
+
+
+def compile_globs(patterns):
+    return re.compile('|'.join(fnmatch.translate(pattern) for pattern in patterns))
+
+
+REQUIREMENTS_FILES = compile_globs(('*requirement*.txt', 'requires.txt'))
+ENVIRONMENT_FILES = compile_globs(('*environment*.yml', '*environment*.yaml', '*env*.yml', '*env*.yaml', 'conda.yml'))
+
+
+def is_podspec_file(file_name, parent_name):
+    return file_name.lower().endswith('.podspec')
+
+
+def is_gemspec_file(file_name, parent_name):
+    return file_name.lower().endswith('.gemspec')
+
+
+def is_build_gradle_file(file_name, parent_name):
+    # Kotlin DSL: build.gradle.kts
+    if file_name.endswith('.kts'):
+        file_name = file_name[:-len('.kts')]
+    return file_name == 'build.gradle' or file_name.lower() == (parent_name + '.gradle').lower()
+
+
+def is_package_file(file_name, parent_name):
+    file_name = file_name.lower()
+    if file_name == 'package.yaml':
+        return True
+    return file_name.endswith('.cabal') and parent_name.lower() in file_name[:-len('.cabal')]
+
+
+def is_project_file(file_name, parent_name):
+    return file_name.endswith('.csproj') or file_name.endswith('.nuspec')
+
+
+def is_requirements_file(file_name, parent_name):
+    if REQUIREMENTS_FILES.match(file_name):
+        return True
+    return parent_name == 'requirements' and file_name.endswith('.txt')
+
+
+def is_environment_file(file_name, parent_name):
+    return bool(ENVIRONMENT_FILES.match(file_name))
+
+
+def is_dependencies_scala_file(file_name, parent_name):
+    return parent_name.lower() == 'project' and file_name.lower() == 'dependencies.scala'
+
+
+def parse_sbt_tree_files(handler, file_item, context, logger):
+    # sbt-dependency-graph writes one tree.json per module, parse all of them instead of build.sbt
+    from core.file_parsers.sbt_parser import construct_tree_file_list, parse_tree_json_file
+    filepath_list = construct_tree_file_list(scan_dir=context['scan_dir'])
+    if filepath_list:
+        return parse_tree_json_file(root_name=context['root_name'], filepath_list=filepath_list, logger=logger)
+    return None
+
+
+def skip_if_sbt_tree_files(handler, file_item, context, logger):
+    from core.file_parsers.sbt_parser import construct_tree_file_list
+    if construct_tree_file_list(scan_dir=context['scan_dir']):
+        return list()
+    return None
+
+
+registry = ParserRegistry()
+
+registry.register(ParserHandler(
+    name='Cargo', result_type='cargo_result', file_names=['Cargo.toml'],
+    manifest_parser=ParserSpec('cargo_parser.parse_cargo_files', documents=True),
+    lock_files=[('Cargo.lock', ParserSpec('cargo_parser.parse_cargo_files', documents=True))],
+    build_executable='Cargo'))
+registry.register(ParserHandler(
+    name='Carthage', result_type='cocoa_result', file_names=['Cartfile'],
+    manifest_parser=ParserSpec('carthage_parser.parse_carthage_files', documents=True),
+    lock_files=[('Cartfile.resolved', ParserSpec('carthage_parser.parse_carthage_files', documents=True))]))
+registry.register(ParserHandler(
+    name='Cocoapods', result_type='cocoa_result', file_names=['Podfile'],
+    manifest_parser=ParserSpec('cocoapods_parser.parse_cocoa_files', documents=True),
+    lock_files=[('Podfile.lock', ParserSpec('cocoapods_parser.parse_cocoa_files', documents=True))]))
+registry.register(ParserHandler(
+    name='Composer', result_type='composer_result', file_names=['composer.json'],
+    manifest_parser=ParserSpec('composer_parser.parse_composer_files', 'is_skip', documents=True),
+    lock_files=[('composer.lock', ParserSpec('composer_parser.parse_composer_files', 'is_skip', documents=True))],
+    build_executable='Composer'))
+registry.register(ParserHandler(
+    name='Conan', result_type='conan_result', file_names=['conanfile.py'],
+    lock_files=[('conan.lock', ParserSpec('conan_parser.parse_conan_lock', documents=True))],
+    build_executable='Conan'))
+registry.register(ParserHandler(
+    name='Cpan_Cli', result_type='cpan_result', file_names=['Makefile.PL', 'Build.PL'],
+    build_executable='Cpan_Cli', build_type='Cpan_Cli',
+    build_artifact=('cpan_deps.txt', ParserSpec('cpan_parser.parse_cpandeps'))))
+registry.register(ParserHandler(
+    name='Cpan_Deps', result_type='cpan_result', file_names=['cpanfile'],
+    manifest_parser=ParserSpec('cpan_parser.parse_cpanfile', documents=True),
+    build_type='Cpan_Cli'))
+registry.register(ParserHandler(
+    name='Cran_Deps', result_type='cran_result', file_names=['DESCRIPTION'],
+    manifest_parser=ParserSpec('cran_parser.parse_cran_files', documents=True)))
+registry.register(ParserHandler(
+    name='Dart_Pub', result_type='pub_result', file_names=['pubspec.yaml'],
+    manifest_parser=ParserSpec('pub_parser.parse_pubspec_files', 'is_skip', documents=True),
+    lock_files=[('pubspec.lock', ParserSpec('pub_parser.parse_pubspec_files', 'is_skip', documents=True))],
+    build_executable='Dart_Pub'))
+registry.register(ParserHandler(
+    name='Dep', result_type='go_result', file_names=['Gopkg.lock'],
+    manifest_parser=ParserSpec('go_dep_parser.parse_dep_file', documents=True)))
+registry.register(ParserHandler(
+    name='Gemlock', result_type='gem_result', file_names=['Gemfile'],
+    manifest_parser=ParserSpec('rubygem_parser.parse_rubygem_files', documents=True),
+    lock_files=[('Gemfile.lock', ParserSpec('gemfile_lock_parser.parse_gemfile_lock_file', 'root_name',
+                                            documents=True))],
+    build_executable='Gemlock'))
+registry.register(ParserHandler(
+    name='Go_Dep', result_type='go_result', file_names=['Godeps.json'],
+    manifest_parser=ParserSpec('go_dep_parser.parse_godep_file', documents=True)))
+registry.register(ParserHandler(
+    name='Go_Mod_Cli', result_type='go_result', file_names=['go.mod'],
+    manifest_parser=ParserSpec('go_mod_parser.parse_gomod_files', documents=True),
+    lock_files=[('go.sum', ParserSpec('go_mod_parser.parse_gomod_files', documents=True))],
+    build_executable='Go_Mod_Cli', build_type='Go_Mod_Cli',
+    build_artifact=('gomod_list.txt', ParserSpec('go_mod_list_parser.parse_gomod_list_file'))))
+registry.register(ParserHandler(
+    name='Leiningen', result_type='lein_result', file_names=['project.clj'],
+    manifest_parser=ParserSpec('leiningen_parser.parse_project_clj_file', documents=True),
+    build_executable='Leiningen', build_type='Leiningen',
+    build_artifact=('lein_maven_tree.txt', ParserSpec('leiningen_parser.parse_lein_tree_file'))))
+registry.register(ParserHandler(
+    name='Maven_Pom', result_type='maven_result', file_names=['pom.xml'],
+    manifest_parser=ParserSpec('maven_pom_parser.parse_maven_pom_file', 'search_result', 'pom_cache',
+                               'maven_resolver', cacheable=False),
+    build_executable='Maven_Pom', build_type='Maven_Pom',
+    build_artifact=('maven_tree.txt', ParserSpec('maven_tree_parser.parse_maven_tree_file'))))
+registry.register(ParserHandler(
+    name='Mix', result_type='hex_result', file_names=['mix.exs'],
+    manifest_parser=ParserSpec('mix_parser.parse_mix_files', documents=True),
+    lock_files=[('mix.lock', ParserSpec('mix_parser.parse_mix_files', documents=True))],
+    build_executable='Mix'))
+registry.register(ParserHandler(
+    name='NPM_Cli', result_type='npm_result', file_names=['package.json'],
+    manifest_parser=ParserSpec('npm_package_parser.parse_package_json_file', 'is_skip', documents=True),
+    lock_files=[('npm-shrinkwrap.json', ParserSpec('npm_lock_parser.parse_lock_json_file', 'is_skip', documents=True)),
+                ('package-lock.json', ParserSpec('npm_lock_parser.parse_lock_json_file', 'is_skip', documents=True)),
+                ('yarn.lock', ParserSpec('yarn_lock_parser.parse_yarn_lock_file', documents=True)),
+                ('pnpm-lock.yaml', ParserSpec('pnpm_lock_parser.parse_pnpm_lock_file', 'is_skip', documents=True))],
+    # npm install always writes package-lock.json
+    build_lock_files=[('package-lock.json', ParserSpec('npm_lock_parser.parse_lock_json_file', 'is_skip',
+                                                       documents=True)),
+                      ('yarn.lock', ParserSpec('yarn_lock_parser.parse_yarn_lock_file', documents=True)),
+                      ('pnpm-lock.yaml', ParserSpec('pnpm_lock_parser.parse_pnpm_lock_file', 'is_skip', documents=True))],
+    build_executable='NPM_Cli'))
+registry.register(ParserHandler(
+    name='Nugetconf', result_type='nuget_result', file_names=['packages.config'],
+    manifest_parser=ParserSpec('nuget_parser.parse_nuget_files', documents=True)))
+registry.register(ParserHandler(
+    name='Packrat_Lock', result_type='cran_result', file_names=['packrat.lock'],
+    manifest_parser=ParserSpec('cran_parser.parse_cran_files', documents=True)))
+registry.register(ParserHandler(
+    name='Pip_Env', result_type='pypi_result', file_names=['Pipfile'],
+    manifest_parser=ParserSpec('pipenv_parser.parse_pipenv_files', documents=True),
+    lock_files=[('Pipfile.lock', ParserSpec('pipenv_parser.parse_pipenv_files', documents=True))]))
+registry.register(ParserHandler(
+    name='Pip_Inspector', result_type='pypi_result', file_names=['setup.py'],
+    manifest_parser=ParserSpec('pip_parser.parse_pip_files', documents=True)))
+registry.register(ParserHandler(
+    name='Poetry', result_type='pypi_result', file_names=['pyproject.toml'],
+    manifest_parser=ParserSpec('poetry_parser.parse_poetry_files', documents=True),
+    lock_files=[('poetry.lock', ParserSpec('poetry_parser.parse_poetry_files', documents=True))]))
+registry.register(ParserHandler(
+    name='Rebar', result_type='hex_result', file_names=['rebar.config'],
+    manifest_parser=ParserSpec('rebar_parser.parse_rebar_config_file', documents=True),
+    build_executable='Rebar', build_type='Rebar',
+    build_artifact=('rebar_tree.txt', ParserSpec('rebar_parser.parse_rebar_tree_file'))))
+registry.register(ParserHandler(
+    name='Sbt', result_type='maven_result', file_names=['build.sbt'],
+    manifest_parser=ParserSpec('sbt_parser.parse_build_config_files', 'scala_version', documents=True),
+    build_executable='Sbt', build_hook=parse_sbt_tree_files))
+registry.register(ParserHandler(
+    name='Stack', result_type='hackage_result', file_names=['stack.yaml'],
+    build_executable='Stack', build_type='Stack',
+    build_artifact=('stack_deps.json', ParserSpec('stack_parser.parse_stack_json_file'))))
+registry.register(ParserHandler(
+    name='Swift', result_type='swift_result', file_names=['Package.swift'],
+    manifest_parser=ParserSpec('swift_parser.parse_swift_files', documents=True),
+    lock_files=[('Package.resolved', ParserSpec('swift_parser.parse_swift_files', documents=True))],
+    build_executable='Swift'))
+
+registry.register(ParserHandler(
+    name='Podspec', result_type='cocoa_result', label='.podspec', extensions=['.podspec'], match=is_podspec_file,
+    manifest_parser=ParserSpec('cocoapods_parser.parse_podspec', documents=True),
+    lock_files=[('Podfile.lock', None)]))
+registry.register(ParserHandler(
+    name='Gemspec', result_type='gem_result', label='.gemspec', extensions=['.gemspec'], match=is_gemspec_file,
+    manifest_parser=ParserSpec('rubygem_parser.parse_rubygem_files', documents=True),
+    lock_files=[('Gemfile.lock', None)]))
+registry.register(ParserHandler(
+    name='Gradle', result_type='maven_result', label='build.gradle', extensions=['.gradle', '.kts'],
+    match=is_build_gradle_file,
+    manifest_parser=ParserSpec('gradle_parser.parse_build_gradle_file', cacheable=False, documents=True),
+    build_executable='Gradle', build_type='Gradle',
+    build_artifact=('gradle_tree.txt', ParserSpec('gradle_parser.parse_gradle_tree_file'))))
+registry.register(ParserHandler(
+    name='Stack_Package', result_type='hackage_result', label='package.yaml or *.cabal',
+    extensions=['.yaml', '.cabal'], match=is_package_file,
+    manifest_parser=ParserSpec('stack_parser.parse_stack_files', documents=True),
+    build_type='Stack'))
+registry.register(ParserHandler(
+    name='Nuget_Project', result_type='nuget_result', label='.csproj or .nuspec', extensions=['.csproj', '.nuspec'],
+    match=is_project_file,
+    manifest_parser=ParserSpec('nuget_parser.parse_nuget_files', documents=True),
+    lock_files=[('packages.config', None)]))
+registry.register(ParserHandler(
+    name='Pip_Requirements', result_type='pypi_result', label='requirements.txt', extensions=['.txt'],
+    match=is_requirements_file,
+    manifest_parser=ParserSpec('pip_parser.parse_pip_files', documents=True)))
+registry.register(ParserHandler(
+    name='Conda_Env', result_type='pypi_result', label='environment.yml', extensions=['.yml', '.yaml'],
+    match=is_environment_file,
+    manifest_parser=ParserSpec('conda_parser.parse_environment_file', documents=True)))
+registry.register(ParserHandler(
+    name='Sbt_Dependencies', result_type='maven_result', label='dependencies.scala', extensions=['.scala'],
+    match=is_dependencies_scala_file,
+    manifest_parser=ParserSpec('sbt_parser.parse_build_config_files', 'scala_version', documents=True),
+    build_hook=skip_if_sbt_tree_files))
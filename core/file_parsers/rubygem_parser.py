@@ -1,5 +1,7 @@
 from gemfileparser import GemfileParser
 
+from core.document_cache import local_path
+
 
 def parse_version_list(requirement):
 
@@ -37,7 +39,7 @@ def parse_version_list(requirement):
     return ' && '.join(requirement)
 
 
-def parse_rubygem_files(filepath, logger):
+def parse_rubygem_files(filepath, logger, document_cache=None):
     """
     Parse Ruby .gemspec and Gemfile.
     Return a mapping of dependency data parsed from a gemspec/Gemfile file at ``location``.
@@ -45,7 +47,9 @@ def parse_rubygem_files(filepath, logger):
     dependencies = list()
 
     try:
-        parser = GemfileParser(filepath=filepath)
+        # GemfileParser只接受文件路径
+        with local_path(filepath=filepath, document_cache=document_cache) as path:
+            parser = GemfileParser(filepath=path)
     except Exception as e:
         logger.error('Exception occurs when loading gemspec or Gemfile {}: {}'.format(filepath, str(e)))
         return dependencies
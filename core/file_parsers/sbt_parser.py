@@ -1,7 +1,8 @@
 import os
 import re
 
-from core.util import remove_duplicate_dict_items
+from core.dedup import remove_duplicate_components
+from core.document_cache import load_document
 
 
 def extract_candidate_build_config_files(search_result):
@@ -72,7 +73,7 @@ def extract_scala_version(line):
     return scala_version
 
 
-def parse_scala_version(search_result, logger):
+def parse_scala_version(search_result, logger, document_cache=None):
 
     scala_version = str()
     scala_pattern_1 = r'.*scalaVersions?.*\:='
@@ -83,32 +84,29 @@ def parse_scala_version(search_result, logger):
     if candidate_config_files:
         for file_item in candidate_config_files:
             try:
-                with open(file=file_item['file_path_absolute'], mode='r', encoding='utf-8') as file:
-                    lines = file.readlines()
-                    for line in lines:
-                        if line:
-                            line = line.strip()
-                            if file_item['config_file_type'] == 1:
-                                scala_result = re.match(scala_pattern_1, line)
-                                cross_scala_result = re.match(cross_scala_pattern_1, line)
-                            elif file_item['config_file_type'] == 2:
-                                scala_result = re.match(scala_pattern_2, line)
-                                cross_scala_result = re.match(cross_scala_pattern_2, line)
-                            if scala_result:
-                                line = line.split('=')[-1].strip()
-                                scala_version = extract_scala_version(line)
-                                if scala_version:
-                                    # print(scala_version)
-                                    file.close()
-                                    return scala_version
-                            if cross_scala_result:
-                                line = line.split('=')[-1].strip()
-                                scala_version = extract_scala_version(line)
-                                if scala_version:
-                                    # print(scala_version)
-                                    file.close()
-                                    return scala_version
-                file.close()
+                lines = load_document(filepath=file_item['file_path_absolute'], kind='lines',
+                                      document_cache=document_cache)
+                for line in lines:
+                    if line:
+                        line = line.strip()
+                        if file_item['config_file_type'] == 1:
+                            scala_result = re.match(scala_pattern_1, line)
+                            cross_scala_result = re.match(cross_scala_pattern_1, line)
+                        elif file_item['config_file_type'] == 2:
+                            scala_result = re.match(scala_pattern_2, line)
+                            cross_scala_result = re.match(cross_scala_pattern_2, line)
+                        if scala_result:
+                            line = line.split('=')[-1].strip()
+                            scala_version = extract_scala_version(line)
+                            if scala_version:
+                                # print(scala_version)
+                                return scala_version
+                        if cross_scala_result:
+                            line = line.split('=')[-1].strip()
+                            scala_version = extract_scala_version(line)
+                            if scala_version:
+                                # print(scala_version)
+                                return scala_version
             except Exception as e:
                 logger.error('Exception occurs when loading build.sbt or dependencies.scala file '
                              'to extract scala version'.format(file_item['file_path_absolute'], str(e)))
@@ -164,7 +162,7 @@ def parse_version_str(version):
         return version
 
 
-def parse_build_config_files(filepath, scala_version, logger):
+def parse_build_config_files(filepath, scala_version, logger, document_cache=None):
 
     dependencies = list()
     # TODO: cannot handle version value in variable, such as: ' "org.slf4j" % "slf4j-log4j12" % slf4jVersion '
@@ -172,8 +170,7 @@ def parse_build_config_files(filepath, scala_version, logger):
     version_filter = ['early-semver', 'semver-spec', 'pvp', 'always', 'strict']
 
     try:
-        with open(file=filepath, mode='r', encoding='utf-8') as file:
-            lines = file.readlines()
+        lines = load_document(filepath=filepath, kind='lines', document_cache=document_cache)
     except Exception as e:
         logger.error('Exception occurs when loading build.sbt or dependencies.scala file {}: {}'
                      .format(filepath, str(e)))
@@ -218,7 +215,6 @@ def parse_build_config_files(filepath, scala_version, logger):
                         temp['language'] = 'Scala'
                         dependencies.append(temp)
 
-    file.close()
     return dependencies
 
 
@@ -282,7 +278,7 @@ def parse_tree_json_file(root_name, filepath_list, logger):
         file.close()
 
     # remove duplicate items
-    dependencies = remove_duplicate_dict_items(data_list=dependencies)
+    dependencies = remove_duplicate_components(data_list=dependencies)
 
     return dependencies
 
@@ -1,7 +1,5 @@
-import yaml
-from yaml.loader import SafeLoader
-
 from core.util import read_temp_json_file
+from core.document_cache import load_document
 
 
 def is_package_yaml(filepath):
@@ -143,13 +141,12 @@ def construct_dependency_list(packages, filepath, logger):
     return dependencies
 
 
-def parse_package_yaml(filepath, logger):
+def parse_package_yaml(filepath, logger, document_cache=None):
 
     dependencies = list()
 
     try:
-        with open(file=filepath, mode='r', encoding='utf-8') as file:
-            data = yaml.load(file.read(), SafeLoader)
+        data = load_document(filepath=filepath, kind='yaml', document_cache=document_cache)
     except Exception as e:
         logger.error('Exception occurs when loading package.yaml file {}: {}'.format(filepath, str(e)))
         return dependencies
@@ -168,7 +165,6 @@ def parse_package_yaml(filepath, logger):
     except KeyError:
         pass
 
-    file.close()
     return dependencies
 
 
@@ -286,10 +282,10 @@ def parse_package_cabal(filepath, logger):
     return dependencies
 
 
-def parse_stack_files(filepath, logger):
+def parse_stack_files(filepath, logger, document_cache=None):
 
     if is_package_yaml(filepath=filepath):
-        dependencies = parse_package_yaml(filepath=filepath, logger=logger)
+        dependencies = parse_package_yaml(filepath=filepath, logger=logger, document_cache=document_cache)
     else:
         dependencies = parse_package_cabal(filepath=filepath, logger=logger)
 
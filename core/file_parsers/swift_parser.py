@@ -1,5 +1,6 @@
 import re
 from core.util import read_json_file
+from core.document_cache import open_document
 
 
 def is_package_resolved(filepath):
@@ -70,7 +71,7 @@ def parse_package_list(candidate_list):
     return dependencies
 
 
-def parse_package_swift(filepath, logger):
+def parse_package_swift(filepath, logger, document_cache=None):
 
     dependencies = list()
     in_dependency_block = False
@@ -80,7 +81,7 @@ def parse_package_swift(filepath, logger):
     candidate_lines = list()
 
     try:
-        with open(file=filepath, mode='r', encoding='utf-8') as file:
+        with open_document(filepath=filepath, document_cache=document_cache) as file:
             lines = file.readlines()
     except Exception as e:
         logger.error('Exception occurs when loading Package.swift file {}: {}'.format(filepath, str(e)))
@@ -124,9 +125,9 @@ def parse_package_swift(filepath, logger):
     return dependencies
 
 
-def parse_package_resolved(filepath, logger):
+def parse_package_resolved(filepath, logger, document_cache=None):
 
-    json_result = read_json_file(filepath=filepath, logger=logger)
+    json_result = read_json_file(filepath=filepath, logger=logger, document_cache=document_cache)
     dependencies = list()
 
     if json_result:
@@ -166,12 +167,12 @@ def parse_package_resolved(filepath, logger):
     return dependencies
 
 
-def parse_swift_files(filepath, logger):
+def parse_swift_files(filepath, logger, document_cache=None):
 
     if is_package_resolved(filepath=filepath):
-        dependencies = parse_package_resolved(filepath=filepath, logger=logger)
+        dependencies = parse_package_resolved(filepath=filepath, logger=logger, document_cache=document_cache)
     else:
-        dependencies = parse_package_swift(filepath=filepath, logger=logger)
+        dependencies = parse_package_swift(filepath=filepath, logger=logger, document_cache=document_cache)
 
     return dependencies
 
@@ -5,10 +5,9 @@ import statistics
 import logging
 from core.log import Logger
 from core.parse import parse_temp_file
-from core.util import remove_duplicate_dict_items
+from core.dedup import remove_duplicate_components
 
-from core.util import is_podspec_file, is_gemspec_file, is_build_gradle_file, is_package_file, is_project_file, \
-    is_requirements_file, is_environment_file, is_dependencies_scala_file
+from core.file_parsers.registry import registry
 from core.file_parsers.cargo_parser import parse_cargo_files
 from core.file_parsers.carthage_parser import parse_carthage_files
 from core.file_parsers.cocoapods_parser import parse_podspec, parse_cocoa_files
@@ -175,10 +174,11 @@ if __name__ == "__main__":
     #
     # print('file: ')
     # for file in file_list:
-    #     print(file)
+    #     # 文件类型的匹配规则只在registry.py中维护
+    #     print(file, registry.match_path(file).name)
     #     res = parse_gomod_files(filepath=file, logger=log)
     #     dep_result.extend(res)
-    # dep_result = remove_duplicate_dict_items(data_list=dep_result)
+    # dep_result = remove_duplicate_components(data_list=dep_result)
     # if dep_result:
     #     print('nums: ' + str(len(dep_result)))
     #     for item in dep_result:
@@ -207,7 +207,7 @@ if __name__ == "__main__":
     #         dep_result_list = list()
     #         for _, dep_result in dep_result_dict.items():
     #             dep_result_list.append(dep_result)
-    #         dep_result_list = remove_duplicate_dict_items(data_list=dep_result_list)
+    #         dep_result_list = remove_duplicate_components(data_list=dep_result_list)
     #         data = {
     #             'dep_nums': len(dep_result_list) if dep_result_list else 0,
     #             'dep_result': dep_result_list if dep_result_list else list()
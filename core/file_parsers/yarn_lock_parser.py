@@ -1,47 +1,129 @@
-from core.util import remove_duplicate_dict_items
+import re
+from core.document_cache import open_document
 
+# yarn >= 2 (Berry) 的元数据块, 不是依赖
+BERRY_METADATA = '__metadata'
+# Berry中resolution为以下协议的条目是本地工作区/补丁包, 其registry版本另有独立条目
+LOCAL_PROTOCOLS = ('workspace:', 'link:', 'portal:', 'patch:')
+# npm别名协议, e.g. 'string-width-cjs@npm:string-width@^4.2.0'
+NPM_PROTOCOL = 'npm:'
+# 顶层行(条目头), 或第一层的version/resolution字段; 其余行(注释, 嵌套的dependencies等)不匹配.
+# 以'\n'而非re.M的'^'锚定行首, 正则引擎可直接跳到下一个换行符, 快得多
+ENTRY_LINE = re.compile(r'\n(?:([^\s#][^\r\n]*)|  (version|resolution)(?::| )[ ]*"?([^"\r\n]*))')
 
-def parse_yarn_lock_file(filepath, logger):
 
-    dependencies = list()
+def construct_dep_item(name, version):
+    temp = dict()
+    temp['type'] = 'npm'
+    temp['namespace'] = ''
+    temp['name'] = name
+    temp['version'] = version
+    temp['language'] = 'Node JS'
+    return temp
+
+
+def split_descriptor(descriptor):
+    """
+       desc: 拆分依赖描述符, e.g. '@babel/core@^7.0.0' -> ('@babel/core', '^7.0.0'),
+             'lodash@npm:4.17.21' -> ('lodash', 'npm:4.17.21')
+       return: (name, range), 无法拆分时range为''
+    """
+    descriptor = descriptor.strip().strip('"')
+    # scoped包名以'@'开头, 从第二个字符开始查找分隔符
+    index = descriptor.find('@', 1)
+    if index == -1:
+        return descriptor, ''
+    return descriptor[:index], descriptor[index + 1:]
+
+
+def get_package_name(descriptor):
+    """
+       desc: 依赖描述符对应的真实包名, npm别名取别名指向的包,
+             e.g. 'string-width-cjs@npm:string-width@^4.2.0' -> 'string-width', 'lodash@npm:4.17.21' -> 'lodash'
+    """
+    name, reference = split_descriptor(descriptor)
+    if reference.startswith(NPM_PROTOCOL):
+        alias_name, alias_range = split_descriptor(reference[len(NPM_PROTOCOL):])
+        # 'npm:'后只有版本范围时不是别名
+        if alias_range:
+            return alias_name
+    return name
+
+
+def iter_lines_chunks(fileobj, chunk_size=1024 * 1024):
+    """
+    Read fileobj in chunks of complete lines, only one chunk is held in memory at a time.
+    Every chunk starts with '\n', so that each of its lines follows a newline.
+    """
+    remainder = '\n'
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        chunk = remainder + chunk
+        index = chunk.rfind('\n')
+        remainder = chunk[index:]
+        if index > 0:
+            yield chunk[:index]
+    if remainder != '\n':
+        yield remainder
+
+
+def iter_yarn_lock_entries(fileobj, chunk_size=1024 * 1024):
+    """
+       desc: 分块流式遍历yarn.lock (v1与Berry格式), 每个条目只保留首个描述符/version/resolution, 不缓存整个文件;
+             正则只匹配顶层条目头与第一层version/resolution字段, dependencies等嵌套内容直接跳过
+       params: fileobj: 打开的文本文件对象
+       return: (descriptor, version, resolution) 生成器, resolution仅Berry格式存在, 否则为None
+    """
+    descriptor = version = resolution = None
+    for chunk in iter_lines_chunks(fileobj=fileobj, chunk_size=chunk_size):
+        for match in ENTRY_LINE.finditer(chunk):
+            header, field, value = match.groups()
+            if header is None:
+                if descriptor is None:
+                    continue
+                # v1: version "1.0.0", Berry: version: 1.0.0 / resolution: "lodash@npm:4.17.21"
+                if field == 'version':
+                    version = value
+                else:
+                    resolution = value
+                continue
+            # 顶层条目头: 一个或多个以', '分隔的描述符, 以':'结尾
+            if descriptor is not None:
+                yield descriptor, version, resolution
+            descriptor = version = resolution = None
+            header = header.rstrip()
+            if header.endswith(':') and not header.startswith(BERRY_METADATA):
+                descriptor = header[:-1].split(',', 1)[0]
+    if descriptor is not None:
+        yield descriptor, version, resolution
+
+
+def parse_yarn_lock_file(filepath, logger, document_cache=None):
+
+    # 同一文件中其它字段均相同, 按(name, version)去重
+    dependencies = dict()
 
     try:
-        with open(file=filepath, mode='r', encoding='utf-8') as file:
-            lines = file.readlines()
+        with open_document(filepath=filepath, document_cache=document_cache) as file:
+            for descriptor, version, resolution in iter_yarn_lock_entries(file):
+                if not version:
+                    continue
+                if resolution is not None:
+                    # Berry: 包名以resolution为准 (npm别名条目的真实包名)
+                    name, reference = split_descriptor(resolution)
+                    if reference.startswith(LOCAL_PROTOCOLS):
+                        continue
+                else:
+                    # v1: npm别名条目没有resolution字段, 由描述符取真实包名
+                    name = get_package_name(descriptor)
+                if name and (name, version) not in dependencies:
+                    dependencies[(name, version)] = construct_dep_item(name=name, version=version)
     except Exception as e:
         logger.error('Exception occurs when loading yarn.lock file {}: {}'.format(filepath, str(e)))
-        return dependencies
-
-    item = list()
-    for line in lines:
-        if line != '\n':
-            item.append(line.strip())
-        else:
-            if item:
-                # print(item)
-                temp = dict()
-                temp['type'] = 'npm'
-                temp['namespace'] = ''
-                temp['name'] = ''
-                temp['version'] = ''
-                temp['language'] = 'Node JS'
-                for text in item:
-                    if text.endswith(':') and text != 'dependencies:':
-                        split_text = text.split(',')[0].split('@')
-                        if len(split_text) > 2:
-                            temp['name'] = '@' + split_text[1]
-                        else:
-                            temp['name'] = split_text[0].strip('"')
-                    elif 'version' in text:
-                        temp['version'] = text.split(' ')[-1].strip('"')
-                if temp['name'] and temp['version']:
-                    dependencies.append(temp)
-            item = list()
-    # 结果去重
-    dependencies = remove_duplicate_dict_items(data_list=dependencies)
-
-    file.close()
-    return dependencies
+
+    return list(dependencies.values())
 
 
 if __name__ == "__main__":
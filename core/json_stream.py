@@ -0,0 +1,148 @@
+import re
+import json
+from json.decoder import scanstring
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+NUMBER = re.compile(r'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?')
+LITERALS = {'true': True, 'false': False, 'null': None}
+PUNCTUATION = '{}[]:,'
+# a number is only complete once this many characters follow it, e.g. '12' may still continue as '12.5' or '12e+3'
+NUMBER_LOOKAHEAD = 3
+
+
+class JsonTokenizer(object):
+    """
+    Incremental JSON tokenizer over a text file object. Only a chunk of the file plus the value
+    being decoded is held in memory, so arbitrarily large documents can be walked in bounded memory.
+
+    next_token() returns (token, value): token is one of '{', '}', '[', ']', ':', ',' (value None),
+    'string', 'number' or 'literal'. read_value() decodes the complete value at the current position
+    with the C json decoder, skip_value() consumes it without building it.
+    """
+    def __init__(self, fileobj, chunk_size=1024 * 1024):
+        self.fileobj = fileobj
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, min_size=0):
+        if self.eof:
+            return False
+        chunk = self.fileobj.read(max(self.chunk_size, min_size))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _skip_whitespace(self):
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or not self._fill():
+                return
+
+    def _error(self, message):
+        return ValueError('{} at offset {} of the current buffer'.format(message, self.pos))
+
+    def peek(self):
+        self._skip_whitespace()
+        if self.pos >= len(self.buffer):
+            return ''
+        return self.buffer[self.pos]
+
+    def next_token(self):
+        char = self.peek()
+        if not char:
+            raise self._error('Unexpected end of JSON document')
+        if char in PUNCTUATION:
+            self.pos += 1
+            return char, None
+        while True:
+            eof = self.eof
+            try:
+                if char == '"':
+                    value, end = scanstring(self.buffer, self.pos + 1)
+                    token = 'string'
+                elif char == '-' or char.isdigit():
+                    match = NUMBER.match(self.buffer, self.pos)
+                    if not match:
+                        raise self._error('Invalid number')
+                    text, end = match.group(), match.end()
+                    if len(self.buffer) - end < NUMBER_LOOKAHEAD and not self.eof:
+                        # the fraction or exponent may continue in the next chunk
+                        raise ValueError('Truncated number')
+                    value = float(text) if any(c in text for c in '.eE') else int(text)
+                    token = 'number'
+                else:
+                    for literal, literal_value in LITERALS.items():
+                        if self.buffer.startswith(literal, self.pos):
+                            value, end = literal_value, self.pos + len(literal)
+                            break
+                    else:
+                        if len(self.buffer) - self.pos < 5 and not self.eof:
+                            raise ValueError('Truncated literal')
+                        raise self._error('Unexpected character {!r}'.format(char))
+                    token = 'literal'
+            except ValueError:
+                # retry once more when this read hit the end of the file: a number or literal may end the document
+                if self._fill(min_size=len(self.buffer)) or self.eof != eof:
+                    continue
+                raise
+            self.pos = end
+            return token, value
+
+    def expect(self, expected):
+        token, _ = self.next_token()
+        if token != expected:
+            raise self._error('Expected {!r} but found {!r}'.format(expected, token))
+
+    def read_value(self):
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+                if self.eof or len(self.buffer) - end >= (NUMBER_LOOKAHEAD if is_number else 1):
+                    self.pos = end
+                    return value
+            except ValueError:
+                if self.eof:
+                    raise
+            # grow the buffer geometrically so that large values are decoded in O(size)
+            if not self._fill(min_size=len(self.buffer)):
+                self.eof = True
+
+    def skip_value(self):
+        depth = 0
+        while True:
+            token, _ = self.next_token()
+            if token in '{[':
+                depth += 1
+            elif token in '}]':
+                depth -= 1
+            if depth == 0 and token not in ',:':
+                return
+
+    def iter_object(self):
+        """
+        Iterate over the keys of the object at the current position. The caller must consume
+        (read_value, skip_value, or walk) the value of each key before asking for the next one.
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            token, key = self.next_token()
+            if token != 'string':
+                raise self._error('Expected an object key but found {!r}'.format(token))
+            self.expect(':')
+            yield key
+            token, _ = self.next_token()
+            if token == '}':
+                return
+            if token != ',':
+                raise self._error('Expected \',\' or \'}\' but found {!r}'.format(token))
@@ -1,36 +1,130 @@
+import sys
 import logging
 
+LOG_FORMAT = '[%(asctime)s] [%(levelname)s] %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+# 由调用方提供的诊断字段, 见Logger.bind; code默认为所在的扫描阶段
+DIAGNOSTIC_FIELDS = ('code', 'file', 'parser')
+
+
+class DiagnosticsHandler(logging.Handler):
+    """
+    Keeps the records of a scan in memory as structured diagnostics:
+    {'time', 'level', 'code', 'file', 'parser', 'exception', 'message'}.
+    """
+    def __init__(self, level=logging.NOTSET):
+        logging.Handler.__init__(self, level=level)
+        self.setFormatter(logging.Formatter(LOG_FORMAT, DATE_FORMAT))
+        self.records = list()
+
+    def emit(self, record):
+        diagnostic = {
+            'time': self.formatter.formatTime(record, DATE_FORMAT),
+            'level': record.levelname
+        }
+        for field in DIAGNOSTIC_FIELDS:
+            diagnostic[field] = getattr(record, field, None)
+        diagnostic['exception'] = getattr(record, 'exception', None)
+        diagnostic['message'] = record.getMessage()
+        self.records.append(diagnostic)
+
+    def pop_records(self):
+        records = self.records
+        self.records = list()
+        return records
+
 
 class Logger:
-    def __init__(self, path, cmd_level=logging.DEBUG, file_level=logging.DEBUG):
-        self.logger = logging.getLogger(path)
-        self.logger.setLevel(logging.DEBUG)
-        fmt = logging.Formatter('[%(asctime)s] [%(levelname)s] %(message)s', '%Y-%m-%d %H:%M:%S')
+    """
+    Per-scan logger: records at cmd_level and above go to the console, records at file_level and above are kept
+    in memory as diagnostics (see DiagnosticsHandler) and, when path is given, written to that file.
+    The underlying logging.Logger is private to the instance, nothing is registered in the logging module,
+    and close() releases the file.
+    """
+    def __init__(self, path=None, cmd_level=logging.DEBUG, file_level=logging.DEBUG, name='scan'):
+        self.path = path
+        self.cmd_level = cmd_level
+        self.file_level = file_level
+        self.fields = dict()
+        self.logger = logging.Logger(name, level=logging.DEBUG)
+        fmt = logging.Formatter(LOG_FORMAT, DATE_FORMAT)
         # 设置CMD日志
         sh = logging.StreamHandler()
         sh.setFormatter(fmt)
         sh.setLevel(cmd_level)
-        # 设置文件日志
-        fh = logging.FileHandler(path)
-        fh.setFormatter(fmt)
-        fh.setLevel(file_level)
         self.logger.addHandler(sh)
-        self.logger.addHandler(fh)
+        # 诊断信息
+        self.diagnostics = DiagnosticsHandler(level=file_level)
+        self.logger.addHandler(self.diagnostics)
+        # 设置文件日志(可选)
+        if path:
+            fh = logging.FileHandler(path)
+            fh.setFormatter(fmt)
+            fh.setLevel(file_level)
+            self.logger.addHandler(fh)
+
+    def __getstate__(self):
+        # 传给子进程(如spawn方式的进程池)时不携带处理器, 在子进程中重新创建, 文件以追加方式写入
+        return {'path': self.path, 'cmd_level': self.cmd_level, 'file_level': self.file_level,
+                'fields': self.fields, 'name': self.logger.name}
+
+    def __setstate__(self, state):
+        self.__init__(path=state['path'], cmd_level=state['cmd_level'], file_level=state['file_level'],
+                      name=state['name'])
+        self.fields = state['fields']
+
+    def bind(self, **fields):
+        """
+        A logger sharing this one's handlers and diagnostics whose records carry fields (code, file, parser)
+        by default.
+        """
+        # 不经copy.copy: 其使用__getstate__, 会重新创建处理器
+        logger = object.__new__(Logger)
+        logger.__dict__.update(self.__dict__)
+        logger.fields = dict(self.fields, **fields)
+        return logger
+
+    def log(self, level, message, **fields):
+        extra = dict(self.fields)
+        extra.update((field, value) for field, value in fields.items() if value is not None)
+        # 在except块中记录时附带当前异常
+        exception = sys.exc_info()[1]
+        if exception is not None:
+            extra['exception'] = '{}: {}'.format(type(exception).__name__, str(exception))
+        self.logger.log(level, message, extra=extra)
+
+    def debug(self, message, **fields):
+        self.log(logging.DEBUG, message, **fields)
+
+    def info(self, message, **fields):
+        self.log(logging.INFO, message, **fields)
+
+    def warn(self, message, **fields):
+        self.log(logging.WARNING, message, **fields)
+
+    def error(self, message, **fields):
+        self.log(logging.ERROR, message, **fields)
 
-    def debug(self, message):
-        self.logger.debug(message)
+    def critical(self, message, **fields):
+        self.log(logging.CRITICAL, message, **fields)
 
-    def info(self, message):
-        self.logger.info(message)
+    def pop_diagnostics(self):
+        return self.diagnostics.pop_records()
 
-    def warn(self, message):
-        self.logger.warning(message)
+    def merge_diagnostics(self, records):
+        # 子进程中记录的诊断信息
+        if records:
+            self.diagnostics.records.extend(records)
 
-    def error(self, message):
-        self.logger.error(message)
+    def format_diagnostics(self):
+        return '\n'.join('[{}] [{}] {}'.format(diagnostic['time'], diagnostic['level'], diagnostic['message'])
+                         for diagnostic in self.diagnostics.records)
 
-    def critical(self, message):
-        self.logger.critical(message)
+    def close(self):
+        # 关闭并移除处理器, 长期运行的进程(如scan_many工作进程)中不泄漏文件句柄
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+            handler.close()
 
 
 if __name__ == '__main__':
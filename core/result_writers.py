@@ -0,0 +1,302 @@
+import os
+import re
+import json
+import uuid
+import tempfile
+from datetime import datetime, timezone
+from itertools import islice
+from contextlib import contextmanager
+from urllib.parse import quote
+
+TOOL_NAME = 'component_detection'
+# 写文件的缓冲区大小, 以及每次拼接写入的数组元素个数
+WRITE_BUFFER = 1024 * 1024
+WRITE_BATCH = 1000
+# 组件类型与purl类型不同的映射, 其余相同
+PURL_TYPES = {
+    'clojars': 'maven',
+    'pubspec': 'pub'
+}
+PURL_QUALIFIERS = {
+    'clojars': 'repository_url=repo.clojars.org'
+}
+# 依赖范围在CycloneDX中的对应
+CYCLONEDX_SCOPES = {
+    'compile': 'required',
+    'runtime': 'required',
+    'test': 'optional',
+    'dev': 'optional'
+}
+# ndjson的component记录中, 组件字段之外的键
+NDJSON_COMPONENT_KEYS = ('record', 'purl', 'direct', 'scope', 'depth', 'dependencies')
+# 确定的版本号, 版本范围(e.g. '>=1.0, <2.0', '~> 4.0')不写入purl
+EXACT_VERSION = re.compile(r'^[A-Za-z0-9][A-Za-z0-9.+_\-]*$')
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+NDJSON_HEADER = '{"record":"scan"'
+
+
+@contextmanager
+def atomic_open(path):
+    """
+    Open a temporary file next to path for writing, renamed onto path when the block completes, so that readers
+    never see a partially written result; the temporary file is removed when the block raises.
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix='.' + name + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, mode='w', encoding='utf-8', buffering=WRITE_BUFFER) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def write_json_array(f, items, encode=_encoder.encode):
+    # 逐批编码写入, 不在内存中生成整个数组的字符串
+    f.write('[')
+    items = iter(items)
+    batch = ','.join(encode(item) for item in islice(items, WRITE_BATCH))
+    while batch:
+        f.write(batch)
+        batch = ','.join(encode(item) for item in islice(items, WRITE_BATCH))
+        if batch:
+            f.write(',')
+    f.write(']')
+
+
+def write_lines(f, records, encode=_encoder.encode):
+    batch = list()
+    for record in records:
+        batch.append(encode(record))
+        if len(batch) >= WRITE_BATCH:
+            f.write('\n'.join(batch) + '\n')
+            batch = list()
+    if batch:
+        f.write('\n'.join(batch) + '\n')
+
+
+def split_name(item):
+    namespace = item.get('namespace') or ''
+    name = item['name']
+    # maven, composer等组件的name以namespace开头, e.g. 'org.slf4j/slf4j-api'
+    if namespace and name.startswith(namespace + '/'):
+        name = name[len(namespace) + 1:]
+    elif not namespace and '/' in name:
+        namespace, name = name.rsplit('/', 1)
+    return namespace, name
+
+
+def component_purl(item):
+    """
+    Package URL of a component, e.g. pkg:maven/org.slf4j/slf4j-api@1.7.36. The version is left out when it is a
+    range rather than an exact version.
+    """
+    purl_type = PURL_TYPES.get(item['type'], item['type'])
+    namespace, name = split_name(item)
+    if purl_type == 'pypi':
+        name = name.lower().replace('_', '-')
+    segments = [quote(segment, safe='') for segment in namespace.split('/') if segment]
+    purl = 'pkg:{}/{}'.format(purl_type, '/'.join(segments + [quote(name, safe='')]))
+    version = item.get('version') or ''
+    if EXACT_VERSION.match(version):
+        purl += '@' + quote(version, safe='')
+    if item['type'] in PURL_QUALIFIERS:
+        purl += '?' + PURL_QUALIFIERS[item['type']]
+    return purl
+
+
+def graph_dependencies(dep_graph, node):
+    if not dep_graph or not dep_graph['offsets']:
+        return list()
+    return dep_graph['targets'][dep_graph['offsets'][node]:dep_graph['offsets'][node + 1]]
+
+
+def write_json_result(f, data, project):
+    """
+    Compact JSON object of the result sections, in the order of data, lists encoded in batches.
+    """
+    f.write('{')
+    for index, (key, value) in enumerate(data.items()):
+        if index:
+            f.write(',')
+        f.write(_encoder.encode(key) + ':')
+        if isinstance(value, list):
+            write_json_array(f, value)
+        else:
+            f.write(_encoder.encode(value))
+    f.write('}')
+
+
+def iter_ndjson_records(data, project):
+    dep_graph = data.get('dep_graph')
+    yield {'record': 'scan', 'project': project, 'dep_nums': data['dep_nums']}
+    for node, item in enumerate(data['dep_result']):
+        record = dict(item, record='component', purl=component_purl(item))
+        if dep_graph and node < dep_graph['nodes']:
+            record['direct'] = dep_graph['direct'][node]
+            record['scope'] = dep_graph['scope'][node]
+            record['depth'] = dep_graph['depth'][node]
+            record['dependencies'] = graph_dependencies(dep_graph, node)
+        yield record
+    # 依赖图已写入各component记录
+    for key, value in data.items():
+        if key not in ('dep_nums', 'dep_result', 'dep_graph'):
+            yield {'record': key, 'data': value}
+
+
+def write_ndjson_result(f, data, project):
+    """
+    One JSON record per line: a 'scan' header, a 'component' record per item of dep_result in order (with its
+    purl and, when the dependency graph is known, direct/scope/depth and the indices of its dependencies), then
+    one record per other section of the result file with the section in 'data'.
+    """
+    write_lines(f, iter_ndjson_records(data=data, project=project))
+
+
+def write_cyclonedx_result(f, data, project):
+    """
+    CycloneDX 1.5 JSON SBOM of dep_result, with the dependency relations of the graph.
+    """
+    dep_graph = data.get('dep_graph')
+    header = {
+        'bomFormat': 'CycloneDX',
+        'specVersion': '1.5',
+        'serialNumber': 'urn:uuid:' + str(uuid.uuid4()),
+        'version': 1,
+        'metadata': {
+            'timestamp': utc_timestamp(),
+            'tools': {'components': [{'type': 'application', 'name': TOOL_NAME}]},
+            'component': {'type': 'application', 'bom-ref': 'project', 'name': project}
+        }
+    }
+    f.write(_encoder.encode(header)[:-1] + ',"components":')
+
+    def encode_component(node):
+        item = data['dep_result'][node]
+        namespace, name = split_name(item)
+        component = {'type': 'library', 'bom-ref': 'component-{}'.format(node), 'name': name,
+                     'version': item.get('version') or '', 'purl': component_purl(item)}
+        if namespace:
+            component['group'] = namespace
+        if dep_graph and node < dep_graph['nodes'] and dep_graph['scope'][node] in CYCLONEDX_SCOPES:
+            component['scope'] = CYCLONEDX_SCOPES[dep_graph['scope'][node]]
+        component['properties'] = [{'name': 'language', 'value': item.get('language') or ''}]
+        return _encoder.encode(component)
+
+    write_json_array(f, range(0, len(data['dep_result'])), encode=encode_component)
+    if dep_graph and dep_graph['nodes']:
+        def encode_dependency(node):
+            if node < 0:
+                # 项目本身依赖于直接依赖
+                return _encoder.encode({'ref': 'project', 'dependsOn': ['component-{}'.format(direct) for direct
+                                                                       in range(0, dep_graph['nodes'])
+                                                                       if dep_graph['direct'][direct]]})
+            return _encoder.encode({'ref': 'component-{}'.format(node),
+                                    'dependsOn': ['component-{}'.format(target)
+                                                  for target in graph_dependencies(dep_graph, node)]})
+        f.write(',"dependencies":')
+        write_json_array(f, range(-1, dep_graph['nodes']), encode=encode_dependency)
+    f.write('}')
+
+
+def write_spdx_result(f, data, project):
+    """
+    SPDX 2.3 JSON document of dep_result, one package per component with its purl as external reference.
+    """
+    dep_graph = data.get('dep_graph')
+    header = {
+        'spdxVersion': 'SPDX-2.3',
+        'dataLicense': 'CC0-1.0',
+        'SPDXID': 'SPDXRef-DOCUMENT',
+        'name': project,
+        'documentNamespace': 'https://spdx.org/spdxdocs/{}-{}'.format(quote(project, safe=''), uuid.uuid4()),
+        'creationInfo': {'created': utc_timestamp(), 'creators': ['Tool: ' + TOOL_NAME]},
+        'documentDescribes': ['SPDXRef-Project']
+    }
+    f.write(_encoder.encode(header)[:-1] + ',"packages":')
+
+    def encode_package(node):
+        if node < 0:
+            return _encoder.encode({'name': project, 'SPDXID': 'SPDXRef-Project', 'downloadLocation': 'NOASSERTION',
+                                    'filesAnalyzed': False})
+        item = data['dep_result'][node]
+        package = {'name': item['name'], 'SPDXID': 'SPDXRef-Package-{}'.format(node),
+                   'downloadLocation': 'NOASSERTION', 'filesAnalyzed': False,
+                   'externalRefs': [{'referenceCategory': 'PACKAGE-MANAGER', 'referenceType': 'purl',
+                                     'referenceLocator': component_purl(item)}]}
+        if item.get('version'):
+            package['versionInfo'] = item['version']
+        return _encoder.encode(package)
+
+    write_json_array(f, range(-1, len(data['dep_result'])), encode=encode_package)
+
+    def iter_relationships():
+        yield 'SPDXRef-DOCUMENT', 'DESCRIBES', 'SPDXRef-Project'
+        for node in range(0, len(data['dep_result'])):
+            # 依赖结构未知时, 所有组件都视为项目的依赖
+            if not dep_graph or node >= dep_graph['nodes'] or dep_graph['direct'][node] is not False:
+                yield 'SPDXRef-Project', 'DEPENDS_ON', 'SPDXRef-Package-{}'.format(node)
+            for target in graph_dependencies(dep_graph, node) if dep_graph and node < dep_graph['nodes'] else ():
+                yield 'SPDXRef-Package-{}'.format(node), 'DEPENDS_ON', 'SPDXRef-Package-{}'.format(target)
+
+    f.write(',"relationships":')
+    write_json_array(f, ({'spdxElementId': element, 'relationshipType': relationship, 'relatedSpdxElement': related}
+                         for element, relationship, related in iter_relationships()))
+    f.write('}')
+
+
+def utc_timestamp():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+# 输出格式 -> (写入函数, 结果文件扩展名)
+RESULT_WRITERS = {
+    'json': (write_json_result, '.json'),
+    'ndjson': (write_ndjson_result, '.ndjson'),
+    'cyclonedx': (write_cyclonedx_result, '.cdx.json'),
+    'spdx': (write_spdx_result, '.spdx.json')
+}
+OUTPUT_FORMATS = tuple(RESULT_WRITERS)
+
+
+def result_file_extension(output_format):
+    return RESULT_WRITERS[output_format][1]
+
+
+def write_result(result_file_path, data, project, output_format='json'):
+    """
+    Write the result sections in data (see util.write_check_result) to result_file_path in output_format,
+    atomically.
+    """
+    if output_format not in RESULT_WRITERS:
+        raise ValueError('unknown output format: {}, available: {}'.format(output_format, ', '.join(OUTPUT_FORMATS)))
+    with atomic_open(result_file_path) as f:
+        RESULT_WRITERS[output_format][0](f, data, project)
+
+
+def load_result(result_file_path):
+    """
+    Read back a result file written in the json or ndjson format, as the dict of its sections.
+    """
+    with open(result_file_path, mode='r', encoding='utf-8') as f:
+        if not f.read(len(NDJSON_HEADER)) == NDJSON_HEADER:
+            f.seek(0)
+            return json.load(f)
+        f.seek(0)
+        data = {'dep_result': list()}
+        for line in f:
+            record = json.loads(line)
+            if record['record'] == 'scan':
+                data['dep_nums'] = record['dep_nums']
+            elif record['record'] == 'component':
+                data['dep_result'].append(dict((key, value) for key, value in record.items()
+                                               if key not in NDJSON_COMPONENT_KEYS))
+            else:
+                data[record['record']] = record['data']
+        return data
@@ -1,18 +1,30 @@
 import os
 import sys
+import uuid
+import shutil
+import tempfile
 import subprocess
 import argparse
 import logging
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 sys.path.append('.')
 sys.path.append('..')
-from config import Config as cf
-from detect import construct_candidate_file_list
+from config import Config as cf, ScanOptions
+from detect import construct_candidate_file_list, scan_directory, DirectoryIndex
 from build import build_with_scripts
 from parse import parse_temp_file
 from core.file_parsers.file_parsers import parse_config_files
-from util import parse_check_result, write_check_result, read_log
+from core.file_parsers.parse_cache import ParseCache
+from core.document_cache import DocumentCache
+from core.archive import ARCHIVE_EXTENSIONS, Archive, ArchiveDocumentCache, is_archive, archive_root_name
+from core.dep_graph import DependencyGraph
+from core.file_parsers.incremental import load_baseline, get_file_delta
+from core.dedup import compute_component_delta
+from core.timing import ScanTimer
+from util import parse_check_result, write_check_result
+from core.result_writers import OUTPUT_FORMATS, result_file_extension, write_lines
 from log import Logger
 
 
@@ -27,52 +39,106 @@ def str2bool(v):
         raise argparse.ArgumentTypeError('invalid boolean value: \'' + str(v) + '\'')
 
 
-def set_config(is_build, is_skip, search_depth, is_output, output_dir):
-    cf.is_build = is_build
-    cf.is_skip = is_skip
-    cf.search_depth = search_depth
-    cf.is_output = is_output
-    cf.output_dir = output_dir
+def new_scan_time():
+    # 秒级时间戳加随机后缀: 同一秒内开始的扫描(如并发的scan_api调用)的日志与结果文件名互不相同
+    return '{}__{}'.format(datetime.now().strftime('%Y_%m_%d_%H_%M_%S'), uuid.uuid4().hex[:8])
 
 
 class Scanning(object):
-    def __init__(self, check_dir, config, curr_time):
-
-        # self._tool_dir = os.path.join(config.scanning_dir, 'dependency-check', 'bin', 'dependency-check.sh')
+    def __init__(self, check_dir, options, curr_time, parse_cache=None):
+        """
+        options: the config.ScanOptions of this scan. curr_time identifies the scan in its log and result file names
+        (see new_scan_time), it must be unique among the scans of the same directory.
+        check_dir may also be an archive (see core.archive.ARCHIVE_EXTENSIONS), scanned without extracting it
+        unless the project is built.
+        """
+
+        # self._tool_dir = os.path.join(cf.scanning_dir, 'dependency-check', 'bin', 'dependency-check.sh')
         self._scan_dir = os.path.abspath(path=check_dir)
         self._root_name = os.path.split(check_dir)[-1]
-
-        self._is_build = config.is_build
-        self._is_skip = config.is_skip
-        self._search_depth = config.search_depth
-        self._is_output = config.is_output
-        self._output_dir = config.output_dir
-
-        self._log_dir = config.log_dir
-        self._log_file_name = self._root_name + '__' + curr_time + '.log'
+        # 归档文件: 扫描目录在打开归档后确定, 见_open_archive
+        self._archive_path = None
+        self._extract_dir = None
+        self._list_directory = scan_directory
+        self._directory_index = None
+        if is_archive(check_dir):
+            self._archive_path = self._scan_dir
+            self._root_name = archive_root_name(check_dir)
+        self.scan_id = self._root_name + '__' + curr_time
+
+        self._is_build = options.is_build
+        self._is_skip = options.is_skip
+        self._search_depth = options.search_depth
+        self._is_output = options.is_output
+        self._output_dir = options.output_dir
+        self._workers = options.workers
+        self._build_workers = options.build_workers
+        self._build_timeout = options.build_timeout
+        self._ignore_dirs = options.ignore_dirs
+        self._baseline = options.baseline
+        # parse_cache: 由scan_many在多个项目间共享的实例, 其淘汰在整批扫描结束后统一进行
+        self._shared_parse_cache = parse_cache is not None
+        self._parse_cache = parse_cache
+        if self._shared_parse_cache:
+            self._parse_cache.pop_stats()
+        elif options.use_cache:
+            self._parse_cache = ParseCache(cache_dir=cf.cache_dir, max_size=cf.cache_max_size,
+                                           max_age=cf.cache_max_age)
+        # 本次扫描内各阶段共享的文件内容缓存, 每个配置文件只读取与解码一次
+        self._document_cache = DocumentCache()
+        # 本地Maven仓库中pom的解析结果与解析缓存存放在同一目录, 一并淘汰
+        self._maven_resolver = None
+        if options.maven_repo:
+            from core.file_parsers.maven_resolver import MavenResolver
+            self._maven_resolver = MavenResolver(repo=options.maven_repo,
+                                                 cache_dir=cf.cache_dir if options.use_cache else None)
+
+        self._log_to_file = options.log_to_file
+        self._log_dir = cf.log_dir
+        self._log_file_name = self.scan_id + '.log'
         self._log_file_path = os.path.join(self._log_dir, self._log_file_name)
 
-        # self._temp_dir = config.temp_dir
+        # self._temp_dir = cf.temp_dir
         # self._temp_file_name = self._root_name + '__' + curr_time + '.json'
         # self._temp_file_path = os.path.join(self._temp_dir, self._temp_file_name)
 
+        if options.output_format not in OUTPUT_FORMATS:
+            raise ValueError('unknown output format: {}, available: {}'.format(options.output_format,
+                                                                               ', '.join(OUTPUT_FORMATS)))
+        self._output_format = options.output_format
         if self._is_output:
             self._check_result_dir = os.path.abspath(path=self._output_dir)
-            if self._is_build:
-                self._check_result_file_name = 'dep-check__' + self._root_name + '__build' + '__' + curr_time + '.json'
-            else:
-                self._check_result_file_name = 'dep-check__' + self._root_name + '__buildless' + '__' + curr_time + '.json'
+            self._check_result_file_name = 'dep-check__' + self._root_name + \
+                ('__build' if self._is_build else '__buildless') + '__' + curr_time + \
+                result_file_extension(self._output_format)
             self._check_result_file_path = os.path.join(self._check_result_dir, self._check_result_file_name)
 
         self._search_result = None
         self._build_result = None
         self._dep_result = None
+        self._file_records = None
+        self._delta = None
+        self._dep_graph = None
+        # 各阶段、各解析器与各文件的耗时, 见core.timing.ScanTimer
+        self.timer = ScanTimer()
+        self._timing = None
+        self._timing_summary = options.timing_summary
         # self._parse_result = None
         self._init_dirs()
-        self.logger = Logger(path=self._log_file_path, cmd_level=logging.INFO, file_level=logging.WARN)
+        # WARN及以上的记录作为本次扫描的诊断信息保存在内存中, log_to_file时另写入log_dir下的日志文件
+        self.logger = Logger(path=self._log_file_path if self._log_to_file else None, cmd_level=logging.INFO,
+                             file_level=logging.WARN).bind(code='SCAN')
+
+    @property
+    def diagnostics(self):
+        return self.logger.diagnostics.records
+
+    @property
+    def timing(self):
+        return self._timing
 
     def _init_dirs(self):
-        if not os.path.exists(self._log_dir):
+        if self._log_to_file and not os.path.exists(self._log_dir):
             os.makedirs(self._log_dir)
         # if not os.path.exists(self._temp_dir):
         #     os.makedirs(self._temp_dir)
@@ -83,18 +149,73 @@ class Scanning(object):
         if os.path.exists(self._temp_file_path):
             os.remove(self._temp_file_path)
 
+    def _open_archive(self):
+        """
+        Index the archive to scan: its members are read from memory in buildless mode, and extracted to a scratch
+        directory under temp_dir for the build scripts in build mode. Returns False when it cannot be read.
+        """
+        self.logger.info('[+] Start reading archive: ' + self._archive_path)
+        try:
+            with self.timer.stage('archive'):
+                archive = Archive(path=self._archive_path, search_depth=self._search_depth,
+                                  ignore_dirs=self._ignore_dirs, preload=not self._is_build)
+                if self._is_build:
+                    os.makedirs(cf.temp_dir, exist_ok=True)
+                    self._extract_dir = tempfile.mkdtemp(prefix=self.scan_id + '__', dir=cf.temp_dir)
+                    self._scan_dir = os.path.join(self._extract_dir, archive.root_name)
+                    archive.extract(target_dir=self._scan_dir)
+                else:
+                    self._scan_dir = archive.scan_dir
+                    self._document_cache = ArchiveDocumentCache(archive=archive)
+                    self._list_directory = archive.list_directory
+        except Exception as e:
+            self.logger.error('Exception occurs when reading archive {}: {}'.format(self._archive_path, str(e)))
+            return False
+        return True
+
     def scan(self):
+        try:
+            return self._scan()
+        finally:
+            if self._extract_dir:
+                shutil.rmtree(self._extract_dir, ignore_errors=True)
+            # 扫描异常退出时同样关闭日志处理器
+            self.logger.close()
+
+    def _scan(self):
         self.logger.info('[+] Start the scanning process...')
-        if os.path.exists(self._scan_dir):
+        if self._archive_path:
+            is_ready = self._open_archive()
+        else:
+            is_ready = os.path.exists(self._scan_dir)
+            if not is_ready:
+                self.logger.error('Subprocess failure: project directory: {} does not exist!'.format(self._scan_dir))
+        if is_ready:
             self.logger.info('[+] Start detecting candidate config files...')
-            self._search_result = construct_candidate_file_list(scan_dir=self._scan_dir, root_name=self._root_name,
-                                                                search_depth=self._search_depth, logger=self.logger)
+            # 检测阶段列出的各目录的文件名, 后续阶段据此查找锁文件, 不再逐个stat
+            self._directory_index = DirectoryIndex(list_directory=self._list_directory)
+            with self.timer.stage('detect'):
+                self._search_result = construct_candidate_file_list(scan_dir=self._scan_dir,
+                                                                    root_name=self._root_name,
+                                                                    search_depth=self._search_depth,
+                                                                    logger=self.logger.bind(code='DETECT'),
+                                                                    ignore_dirs=self._ignore_dirs,
+                                                                    list_directory=self._list_directory,
+                                                                    directory_index=self._directory_index)
 
             # STEP 1: build the project --> build_result
             if self._search_result and self._is_build:
                 self.logger.info('[+] Start building the project using scripts...')
-                self._build_result = build_with_scripts(scan_dir=self._scan_dir, search_result=self._search_result,
-                                                        logger=self.logger)
+                with self.timer.stage('build'):
+                    self._build_result = build_with_scripts(scan_dir=self._scan_dir,
+                                                            search_result=self._search_result,
+                                                            logger=self.logger.bind(code='BUILD'),
+                                                            workers=self._build_workers,
+                                                            timeout=self._build_timeout,
+                                                            document_cache=self._document_cache,
+                                                            directory_index=self._directory_index)
+                # 构建脚本生成的锁文件与依赖树文件不在检测阶段的目录索引中, 解析时重新列出
+                self._directory_index.clear()
 
             # STEP 2: Dependency Check toolkit --> dep_result
             # TODO:  删除Dependency Check工具调用
@@ -107,16 +228,76 @@ class Scanning(object):
             #     self.logger.error('Subprocess failure: dependency-check toolkit execution failed!')
 
             # STEP 3: parse config files --> dep_result
+            baseline = None
+            if self._baseline:
+                if self._is_build:
+                    self.logger.warn('Incremental scan is not supported in build mode, ignore baseline: '
+                                     + self._baseline)
+                else:
+                    self.logger.info('[+] Start loading baseline result file: ' + self._baseline)
+                    with self.timer.stage('baseline'):
+                        baseline = load_baseline(baseline_path=self._baseline,
+                                                 logger=self.logger.bind(code='BASELINE'))
+            if self._is_output or baseline:
+                self._file_records = list()
             if self._search_result:
                 self.logger.info('[+] Start parsing config files...')
-                self._dep_result = parse_config_files(scan_dir=self._scan_dir, root_name=self._root_name,
-                                                      is_skip=self._is_skip, is_build=self._is_build,
-                                                      build_result=self._build_result,
-                                                      search_result=self._search_result, logger=self.logger)
+                self._dep_graph = DependencyGraph()
+                with self.timer.stage('parse'):
+                    self._dep_result = parse_config_files(scan_dir=self._scan_dir, root_name=self._root_name,
+                                                          is_skip=self._is_skip, is_build=self._is_build,
+                                                          build_result=self._build_result,
+                                                          search_result=self._search_result,
+                                                          logger=self.logger.bind(code='PARSE'),
+                                                          workers=self._workers, parse_cache=self._parse_cache,
+                                                          baseline=baseline, file_records=self._file_records,
+                                                          document_cache=self._document_cache,
+                                                          dep_graph=self._dep_graph, timer=self.timer,
+                                                          directory_index=self._directory_index,
+                                                          maven_resolver=self._maven_resolver)
+                self.logger.info('[+] Dependency graph: {} nodes, {} edges'.format(len(self._dep_graph),
+                                                                                 self._dep_graph.edge_count))
+                if self._parse_cache:
+                    self.logger.info('[+] Parse cache: {} hits, {} misses'.format(self._parse_cache.hits,
+                                                                                  self._parse_cache.misses))
+                    if not self._shared_parse_cache:
+                        with self.timer.stage('cache.evict'):
+                            self._parse_cache.evict(logger=self.logger.bind(code='CACHE'))
+                document_stats = self._document_cache.stats
+                self.logger.info('[+] Document cache: {} hits, {} misses, {} files read ({:.1%} hit rate), '
+                                 '{} stat calls'.format(document_stats['hits'], document_stats['misses'],
+                                                        document_stats['reads'], document_stats['hit_rate'],
+                                                        document_stats['stat_calls']))
+                index_stats = self._directory_index.stats
+                self.logger.info('[+] Directory index: {} lookups, {} directories listed'
+                                 .format(index_stats['lookups'], index_stats['listings']))
+                if self._maven_resolver:
+                    resolver_stats = self._maven_resolver.stats
+                    self.logger.info('[+] Maven resolver: {} index hits, {} POMs parsed'
+                                     .format(resolver_stats['index_hits'], resolver_stats['index_misses']))
+            self.timer.set_counts('parse_cache', self._parse_cache.stats if self._parse_cache else None)
+            self.timer.set_counts('document_cache', self._document_cache.stats)
+            self.timer.set_counts('directory_index', self._directory_index.stats)
+            self.timer.set_counts('maven_resolver', self._maven_resolver.stats if self._maven_resolver else None)
 
             # STEP 4: parse dep_result
             self.logger.info('[+] Start parsing dep result...')
-            self._dep_result = parse_check_result(dep_result=self._dep_result)
+            with self.timer.stage('dedup'):
+                self._dep_result = parse_check_result(dep_result=self._dep_result)
+            if baseline:
+                with self.timer.stage('delta'):
+                    self._delta = {
+                        'files': get_file_delta(baseline=baseline, file_records=self._file_records),
+                        'components': compute_component_delta(old_data_list=baseline['dep_result'],
+                                                              new_data_list=self._dep_result)
+                    }
+                self.logger.info('[+] Baseline delta: {} files added, {} changed, {} removed, {} reused; '
+                                 '{} components added, {} removed, {} changed'
+                                 .format(len(self._delta['files']['added']), len(self._delta['files']['changed']),
+                                         len(self._delta['files']['removed']), self._delta['files']['unchanged'],
+                                         len(self._delta['components']['added']),
+                                         len(self._delta['components']['removed']),
+                                         len(self._delta['components']['changed'])))
 
             # STEP 5: delete temp result files
             # self.logger.info('[+] Start deleting temp result file: ' + self._temp_file_path)
@@ -125,14 +306,21 @@ class Scanning(object):
             # STEP 6: write search_result, build_result, dep_result to json file (optional)
             if self._is_output:
                 self.logger.info('[+] Start writing result to file: ' + self._check_result_file_path)
+                # 写入文件的timing不包含写文件本身
                 write_check_result(result_file_path=self._check_result_file_path, search_result=self._search_result,
-                                   build_result=self._build_result, dep_result=self._dep_result)
-
-        else:
-            self.logger.error('Subprocess failure: project directory: {} does not exist!'.format(self._scan_dir))
+                                   build_result=self._build_result, dep_result=self._dep_result,
+                                   parse_cache_stats=self._parse_cache.stats if self._parse_cache else None,
+                                   file_results=self._file_records, delta=self._delta,
+                                   document_cache_stats=self._document_cache.stats, dep_graph=self._dep_graph,
+                                   diagnostics=self.diagnostics, timing=self.timer.to_dict(),
+                                   project=self._root_name, output_format=self._output_format)
 
         # Final step: return check result
         success, result, message = self.get_dep_check_result()
+        self._timing = self.timer.to_dict()
+        if self._timing_summary:
+            for line in self.timer.summary():
+                self.logger.info(line)
         self.logger.info('[+] Scanning process done.')
         return success, result, message
 
@@ -163,7 +351,7 @@ class Scanning(object):
     def get_dep_check_result(self):
 
         result = self._dep_result if self._dep_result else list()
-        error_info = read_log(log_file_path=self._log_file_path)
+        error_info = self.logger.format_diagnostics()
         if not error_info:
             success = True
             message = '[INFO] Succeed.'
@@ -178,32 +366,178 @@ class Scanning(object):
         return success, result, message
 
 
-def scan_api(check_dir, output_dir, search_depth=3, is_build=False, is_skip=False, is_output=False):
+def scan_api(check_dir, output_dir, search_depth=3, is_build=False, is_skip=False, is_output=False, workers=1,
+             build_workers=1, build_timeout=3600, ignore_dirs=None, use_cache=True, baseline=None, log_to_file=False,
+             timing_summary=False, with_timing=False, output_format='json', maven_repo=None):
+    """
+    Returns (success, result, message), or (success, result, message, timing) with with_timing=True,
+    timing being core.timing.ScanTimer.to_dict() (None when the scan failed before finishing).
+    maven_repo: a local Maven repository (~/.m2/repository layout), resolving the transitive dependencies of
+    pom.xml files without building them (see core.file_parsers.maven_resolver).
+    """
+    timing = None
     try:
-        set_config(search_depth=search_depth, is_build=is_build, is_skip=is_skip,
-                   is_output=is_output, output_dir=output_dir)
-        current_time = datetime.now().strftime('%Y_%m_%d_%H_%M_%S').__str__()
-        scanning = Scanning(check_dir=check_dir, config=cf, curr_time=current_time)
+        # 每次调用独立的参数与标识, 可在多个线程中并发调用
+        options = ScanOptions.create(search_depth=search_depth, is_build=is_build, is_skip=is_skip,
+                                     is_output=is_output, output_dir=output_dir, workers=workers,
+                                     build_workers=build_workers, build_timeout=build_timeout,
+                                     ignore_dirs=ignore_dirs, use_cache=use_cache, baseline=baseline,
+                                     log_to_file=log_to_file, timing_summary=timing_summary,
+                                     output_format=output_format, maven_repo=maven_repo)
+        scanning = Scanning(check_dir=check_dir, options=options, curr_time=new_scan_time())
         success, result, message = scanning.scan()
+        timing = scanning.timing
     except Exception as e:
         success, result, message = False, list(), str(e)
+    if with_timing:
+        return success, result, message, timing
     return success, result, message
 
 
+# scan_many工作进程的扫描参数, 及进程内跨项目复用的解析缓存
+_worker_options = None
+_worker_parse_cache = None
+
+
+def open_parse_cache(options):
+    if options.use_cache:
+        return ParseCache(cache_dir=cf.cache_dir, max_size=cf.cache_max_size, max_age=cf.cache_max_age)
+    return None
+
+
+def init_scan_worker(options):
+    global _worker_options, _worker_parse_cache
+    _worker_options = options
+    _worker_parse_cache = open_parse_cache(options)
+
+
+def scan_project(check_dir, curr_time, options=None, parse_cache=None):
+    # 进程池中options与parse_cache取自init_scan_worker
+    if options is None:
+        options, parse_cache = _worker_options, _worker_parse_cache
+    try:
+        scanning = Scanning(check_dir=check_dir, options=options, curr_time=curr_time, parse_cache=parse_cache)
+        success, result, message = scanning.scan()
+    except Exception as e:
+        success, result, message = False, list(), str(e)
+    return check_dir, success, result, message
+
+
+def scan_many(check_dirs, output_dir, workers=1, search_depth=3, is_build=False, is_skip=False, is_output=False,
+              build_workers=1, build_timeout=3600, ignore_dirs=None, use_cache=True, log_to_file=False,
+              timing_summary=False, output_format='json', maven_repo=None):
+    """
+    Scan several projects, up to workers of them at a time in a process pool. The parsers are imported and the
+    parse cache is opened once per worker process, and reused by every project that process scans.
+    Yields (check_dir, success, result, message) for each project as soon as it is done, in completion order;
+    a project failing, or crashing its worker process, only fails that project.
+    """
+    # 项目之间并行, 单个项目内部串行解析
+    options = ScanOptions.create(search_depth=search_depth, is_build=is_build, is_skip=is_skip,
+                                 is_output=is_output, output_dir=output_dir, workers=1, build_workers=build_workers,
+                                 build_timeout=build_timeout, ignore_dirs=ignore_dirs, use_cache=use_cache,
+                                 log_to_file=log_to_file, timing_summary=timing_summary,
+                                 output_format=output_format, maven_repo=maven_repo)
+    # 同一批次内项目目录名可能相同, 批次标识后加序号使各项目的日志与结果文件名唯一
+    batch_time = new_scan_time()
+    check_dirs = list(check_dirs)
+    curr_times = ['{}__{}'.format(batch_time, index) for index in range(0, len(check_dirs))]
+
+    if workers <= 1:
+        parse_cache = open_parse_cache(options)
+        for check_dir, curr_time in zip(check_dirs, curr_times):
+            yield scan_project(check_dir=check_dir, curr_time=curr_time, options=options, parse_cache=parse_cache)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=init_scan_worker, initargs=(options,))
+        try:
+            futures = dict()
+            for check_dir, curr_time in zip(check_dirs, curr_times):
+                futures[executor.submit(scan_project, check_dir, curr_time)] = check_dir
+            for future in as_completed(futures):
+                try:
+                    yield future.result()
+                except Exception as e:
+                    # e.g. BrokenProcessPool when a worker process was killed
+                    yield futures[future], False, list(), str(e)
+        finally:
+            # 调用方提前停止迭代时, 取消尚未开始的项目
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    if use_cache:
+        # 淘汰过程的警告输出到控制台
+        logger = Logger(cmd_level=logging.INFO, file_level=logging.WARN).bind(code='CACHE')
+        ParseCache(cache_dir=cf.cache_dir, max_size=cf.cache_max_size, max_age=cf.cache_max_age).evict(logger=logger)
+        logger.close()
+
+
 if __name__ == "__main__":
 
     parser = argparse.ArgumentParser()
-    parser.add_argument('-check_dir', required=True, type=str)
+    parser.add_argument('-check_dir', default=None, required=False, type=str)
+    parser.add_argument('-check_list', default=None, required=False, type=str)
+    parser.add_argument('-check_archive', default=None, required=False, type=str)
+    parser.add_argument('-scan_workers', default=1, required=False, type=int)
     parser.add_argument('-is_build', default=False, required=False, type=str2bool)
     parser.add_argument('-is_skip', default=False, required=False, type=str2bool)
     parser.add_argument('-search_depth', default=3, required=False, type=int)
     parser.add_argument('-is_output', default=False, required=False, type=str2bool)
     parser.add_argument('-output_dir', default='../check_result', required=False, type=str)
+    parser.add_argument('-workers', default=1, required=False, type=int)
+    parser.add_argument('-build_workers', default=1, required=False, type=int)
+    parser.add_argument('-build_timeout', default=3600, required=False, type=int)
+    parser.add_argument('-ignore_dirs', default=None, required=False, type=str)
+    parser.add_argument('-use_cache', default=True, required=False, type=str2bool)
+    parser.add_argument('-baseline', default=None, required=False, type=str)
+    parser.add_argument('-log_to_file', default=False, required=False, type=str2bool)
+    parser.add_argument('-timing_summary', default=False, required=False, type=str2bool)
+    parser.add_argument('-output_format', default='json', required=False, choices=OUTPUT_FORMATS)
+    parser.add_argument('-maven_repo', default=None, required=False, type=str)
     args_cmd = parser.parse_args()
+    if [args_cmd.check_dir, args_cmd.check_list, args_cmd.check_archive].count(None) != 2:
+        parser.error('exactly one of -check_dir, -check_list and -check_archive is required')
+    if args_cmd.check_archive is not None:
+        # 归档文件直接扫描, 不解压到check_dir
+        if not is_archive(args_cmd.check_archive):
+            parser.error('-check_archive must be an existing {} file'.format(', '.join(ARCHIVE_EXTENSIONS)))
+        args_cmd.check_dir = args_cmd.check_archive
+    ignore_dirs = None
+    if args_cmd.ignore_dirs is not None:
+        ignore_dirs = [pattern.strip() for pattern in args_cmd.ignore_dirs.split(',') if pattern.strip()]
+
+    if args_cmd.check_list is not None:
+        # 批量扫描: check_list每行一个项目目录, 每个项目完成后立即输出一行结果
+        with open(args_cmd.check_list, mode='r', encoding='utf-8') as f:
+            check_dirs = [line.strip() for line in f if line.strip()]
+        success_nums = 0
+        print('------------------------------------------------------------')
+        for check_dir, success, result, message in scan_many(check_dirs=check_dirs, output_dir=args_cmd.output_dir,
+                                                             workers=args_cmd.scan_workers,
+                                                             search_depth=args_cmd.search_depth,
+                                                             is_build=args_cmd.is_build, is_skip=args_cmd.is_skip,
+                                                             is_output=args_cmd.is_output,
+                                                             build_workers=args_cmd.build_workers,
+                                                             build_timeout=args_cmd.build_timeout,
+                                                             ignore_dirs=ignore_dirs, use_cache=args_cmd.use_cache,
+                                                             log_to_file=args_cmd.log_to_file,
+                                                             timing_summary=args_cmd.timing_summary,
+                                                             output_format=args_cmd.output_format,
+                                                             maven_repo=args_cmd.maven_repo):
+            success_nums += 1 if success else 0
+            print('Success: {}, Dep item nums: {}, Project: {}'.format(success, len(result), check_dir))
+            if not success:
+                print(message)
+        print('Projects: {}, Succeeded: {}'.format(len(check_dirs), success_nums))
+        print('------------------------------------------------------------')
+        sys.exit(0)
 
     success, result, message = scan_api(check_dir=args_cmd.check_dir, search_depth=args_cmd.search_depth,
                                         is_build=args_cmd.is_build, is_skip=args_cmd.is_skip,
-                                        is_output=args_cmd.is_output, output_dir=args_cmd.output_dir)
+                                        is_output=args_cmd.is_output, output_dir=args_cmd.output_dir,
+                                        workers=args_cmd.workers, build_workers=args_cmd.build_workers,
+                                        build_timeout=args_cmd.build_timeout, ignore_dirs=ignore_dirs,
+                                        use_cache=args_cmd.use_cache, baseline=args_cmd.baseline,
+                                        log_to_file=args_cmd.log_to_file, timing_summary=args_cmd.timing_summary,
+                                        output_format=args_cmd.output_format, maven_repo=args_cmd.maven_repo)
 
     if args_cmd.is_output:
         print('------------------------------------------------------------')
@@ -216,7 +550,6 @@ if __name__ == "__main__":
         print('Success: ' + str(success))
         print(message)
         print('Dep item nums: ' + str(len(result)))
-        if result:
-            for item in result:
-                print(item)
+        # 每个组件输出一行JSON, 分批写入
+        write_lines(sys.stdout, result)
         print('------------------------------------------------------------')
@@ -0,0 +1,156 @@
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import http.client
+
+sys.path.append('.')
+sys.path.append('..')
+from config import Config as cf
+from core.result_writers import OUTPUT_FORMATS, write_lines
+
+
+def str2bool(v):
+    if isinstance(v, bool):
+        return v
+    if v.lower() in ('yes', 'true', 't', 'y', '1'):
+        return True
+    elif v.lower() in ('no', 'false', 'f', 'n', '0'):
+        return False
+    else:
+        raise argparse.ArgumentTypeError('invalid boolean value: \'' + str(v) + '\'')
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+
+    def __init__(self, socket_path, timeout=None):
+        http.client.HTTPConnection.__init__(self, 'localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class ScanClientError(Exception):
+    pass
+
+
+class ScanClient(object):
+    """
+    Client of scan_daemon, over its Unix socket or, when port is given, localhost HTTP.
+    Only imports the standard library, so that it starts much faster than scan.py.
+    """
+    def __init__(self, socket_path=cf.daemon_socket, host='127.0.0.1', port=None, timeout=90):
+        self.socket_path = socket_path
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    def request(self, method, path, data=None):
+        if self.port is None:
+            conn = UnixHTTPConnection(self.socket_path, timeout=self.timeout)
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            body = json.dumps(data).encode('utf-8') if data is not None else None
+            conn.request(method, path, body=body, headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            result = json.loads(response.read().decode('utf-8'))
+        finally:
+            conn.close()
+        if response.status >= 400:
+            raise ScanClientError('{} {}: {}'.format(response.status, path, result.get('error')))
+        return result
+
+    def health(self):
+        return self.request('GET', '/health')
+
+    def submit(self, check_dir, **options):
+        return self.request('POST', '/scan', dict(options, check_dir=check_dir))
+
+    def status(self, job_id, wait=0):
+        return self.request('GET', '/scan/{}?wait={}'.format(job_id, wait))
+
+    def cancel(self, job_id):
+        return self.request('DELETE', '/scan/{}'.format(job_id))
+
+    def scan(self, check_dir, timeout=None, poll_interval=30, **options):
+        """
+        Same as scan.scan_api, run by the daemon: returns (success, result, message). The job is cancelled
+        if it is not done within timeout seconds.
+        """
+        job = self.submit(check_dir=check_dir, **options)
+        start_time = time.time()
+        while job['status'] in ('queued', 'running'):
+            wait = poll_interval
+            if timeout is not None:
+                wait = min(wait, timeout - (time.time() - start_time))
+                if wait <= 0:
+                    self.cancel(job['job_id'])
+                    return False, list(), '[INFO] Failure.\nScan timed out after {}s'.format(timeout)
+            job = self.status(job['job_id'], wait=wait)
+        return job['success'], job['result'], job['message']
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-check_dir', default=None, required=False, type=str)
+    parser.add_argument('-health', default=False, required=False, type=str2bool)
+    parser.add_argument('-socket', default=cf.daemon_socket, required=False, type=str)
+    parser.add_argument('-host', default='127.0.0.1', required=False, type=str)
+    parser.add_argument('-port', default=None, required=False, type=int)
+    parser.add_argument('-timeout', default=None, required=False, type=float)
+    parser.add_argument('-is_build', default=False, required=False, type=str2bool)
+    parser.add_argument('-is_skip', default=False, required=False, type=str2bool)
+    parser.add_argument('-search_depth', default=3, required=False, type=int)
+    parser.add_argument('-is_output', default=False, required=False, type=str2bool)
+    parser.add_argument('-output_dir', default='../check_result', required=False, type=str)
+    parser.add_argument('-workers', default=1, required=False, type=int)
+    parser.add_argument('-build_workers', default=1, required=False, type=int)
+    parser.add_argument('-build_timeout', default=3600, required=False, type=int)
+    parser.add_argument('-ignore_dirs', default=None, required=False, type=str)
+    parser.add_argument('-use_cache', default=True, required=False, type=str2bool)
+    parser.add_argument('-baseline', default=None, required=False, type=str)
+    parser.add_argument('-log_to_file', default=False, required=False, type=str2bool)
+    parser.add_argument('-timing_summary', default=False, required=False, type=str2bool)
+    parser.add_argument('-output_format', default='json', required=False, choices=OUTPUT_FORMATS)
+    parser.add_argument('-maven_repo', default=None, required=False, type=str)
+    args_cmd = parser.parse_args()
+
+    client = ScanClient(socket_path=args_cmd.socket, host=args_cmd.host, port=args_cmd.port)
+    if args_cmd.health:
+        print(json.dumps(client.health(), indent=4))
+        sys.exit(0)
+    if args_cmd.check_dir is None:
+        parser.error('-check_dir is required')
+    ignore_dirs = None
+    if args_cmd.ignore_dirs is not None:
+        ignore_dirs = [pattern.strip() for pattern in args_cmd.ignore_dirs.split(',') if pattern.strip()]
+
+    # 守护进程的工作目录可能不同, 传绝对路径
+    success, result, message = client.scan(check_dir=os.path.abspath(args_cmd.check_dir), timeout=args_cmd.timeout,
+                                           search_depth=args_cmd.search_depth, is_build=args_cmd.is_build,
+                                           is_skip=args_cmd.is_skip, is_output=args_cmd.is_output,
+                                           output_dir=os.path.abspath(args_cmd.output_dir), workers=args_cmd.workers,
+                                           build_workers=args_cmd.build_workers,
+                                           build_timeout=args_cmd.build_timeout, ignore_dirs=ignore_dirs,
+                                           use_cache=args_cmd.use_cache, log_to_file=args_cmd.log_to_file,
+                                           timing_summary=args_cmd.timing_summary,
+                                           output_format=args_cmd.output_format,
+                                           baseline=os.path.abspath(args_cmd.baseline) if args_cmd.baseline else None,
+                                           maven_repo=os.path.abspath(os.path.expanduser(args_cmd.maven_repo))
+                                           if args_cmd.maven_repo else None)
+
+    print('------------------------------------------------------------')
+    print('Success: ' + str(success))
+    print(message)
+    print('Dep item nums: ' + str(len(result)))
+    if not args_cmd.is_output:
+        write_lines(sys.stdout, result)
+    print('------------------------------------------------------------')
@@ -0,0 +1,386 @@
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import argparse
+import logging
+import threading
+import socketserver
+import multiprocessing
+from collections import deque
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+sys.path.append('.')
+sys.path.append('..')
+from config import Config as cf, ScanOptions
+from log import Logger
+from scan import new_scan_time, Scanning
+from core.file_parsers.parse_cache import ParseCache
+from core.file_parsers.registry import registry
+from core.result_writers import OUTPUT_FORMATS
+
+FINISHED_STATUS = ('done', 'failed', 'cancelled')
+KILL_GRACE_PERIOD = 5
+# GET /scan/<job_id>?wait=的最长等待秒数
+MAX_WAIT = 60
+
+
+def run_scan_job(check_dir, options, curr_time, conn):
+    """
+    Entry point of the job process, forked from the forkserver where scan and the parsers are already imported.
+    """
+    # 取消任务时以SystemExit结束扫描, 构建阶段会先结束仍在运行的构建脚本
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(1))
+    scanning = None
+    timing = None
+    try:
+        # 由守护进程统一定期淘汰, 单个任务结束时不淘汰
+        parse_cache = None
+        if options.use_cache:
+            parse_cache = ParseCache(cache_dir=cf.cache_dir, max_size=cf.cache_max_size, max_age=cf.cache_max_age)
+        scanning = Scanning(check_dir=check_dir, options=options, curr_time=curr_time, parse_cache=parse_cache)
+        success, result, message = scanning.scan()
+        timing = scanning.timing
+    except Exception as e:
+        success, result, message = False, list(), str(e)
+    except SystemExit:
+        # 任务被取消: 关闭日志文件(log_to_file)
+        if scanning is not None:
+            scanning.logger.close()
+        raise
+    conn.send((success, result, message, timing))
+    conn.close()
+
+
+class ScanJob(object):
+
+    def __init__(self, job_id, check_dir, options):
+        self.job_id = job_id
+        self.check_dir = check_dir
+        self.options = options
+        self.status = 'queued'
+        self.submit_time = time.time()
+        self.start_time = None
+        self.end_time = None
+        self.process = None
+        self.cancel_requested = False
+        self.result = None
+        self.finished = threading.Event()
+
+    def to_dict(self):
+        data = {
+            'job_id': self.job_id,
+            'check_dir': self.check_dir,
+            'status': self.status,
+            'queue_time': round((self.start_time or self.end_time or time.time()) - self.submit_time, 3),
+            'scan_time': round((self.end_time or time.time()) - self.start_time, 3) if self.start_time else None
+        }
+        if self.result is not None:
+            data['success'], data['result'], data['message'], data['timing'] = self.result
+        return data
+
+
+class ScanDaemon(object):
+    """
+    Resident scanner: scan and all the parsers are imported once into a forkserver, every job runs in a process
+    forked from it, at most ``workers`` at a time; up to ``max_queue`` more jobs wait in a FIFO queue.
+    A queued job is cancelled by dropping it, a running one by terminating its process.
+    """
+    def __init__(self, workers=1, max_queue=100, keep_jobs=1000, evict_interval=3600, logger=None):
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.keep_jobs = keep_jobs
+        self.evict_interval = evict_interval
+        self.logger = logger
+        self.start_time = time.time()
+        self.jobs = dict()
+        self.queue = deque()
+        self.finished_jobs = deque()
+        self.counts = {'submitted': 0, 'done': 0, 'failed': 0, 'cancelled': 0}
+        self.last_evict_time = 0
+        self.closed = False
+        self.condition = threading.Condition()
+        self.job_counter = 0
+        self.start_time_str = new_scan_time()
+
+        # forkserver在启动任何线程之前创建, 预先导入扫描模块与全部解析模块(平时按需导入)
+        self.context = multiprocessing.get_context('forkserver')
+        self.context.set_forkserver_preload(['scan', 'toml', 'core.yaml_loader'] + registry.parser_modules)
+        self.threads = [threading.Thread(target=self._run_worker, daemon=True) for _ in range(0, self.workers)]
+
+    def start(self):
+        # 启动forkserver并完成预导入, 首个任务无需等待
+        process = self.context.Process(target=time.sleep, args=(0,))
+        process.start()
+        process.join()
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, check_dir, options):
+        """
+        Queue a scan of check_dir, options being overrides of the config.ScanOptions defaults. Raises ValueError on
+        invalid options, OverflowError when the queue is full.
+        """
+        unknown_options = set(options) - set(ScanOptions._fields)
+        if unknown_options:
+            raise ValueError('unknown options: {}'.format(', '.join(sorted(unknown_options))))
+        job_options = ScanOptions.create(**options)
+        if job_options.output_format not in OUTPUT_FORMATS:
+            raise ValueError('unknown output format: {}, available: {}'.format(job_options.output_format,
+                                                                               ', '.join(OUTPUT_FORMATS)))
+        with self.condition:
+            if self.closed:
+                raise OverflowError('daemon is shutting down')
+            if len(self.queue) >= self.max_queue:
+                raise OverflowError('queue is full ({} jobs)'.format(self.max_queue))
+            self.job_counter += 1
+            job = ScanJob(job_id=str(self.job_counter), check_dir=check_dir, options=job_options)
+            self.jobs[job.job_id] = job
+            self.queue.append(job)
+            self.counts['submitted'] += 1
+            self.condition.notify()
+        self.logger.info('[+] Job {} queued: {}'.format(job.job_id, check_dir))
+        return job
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if job is None or job.status in FINISHED_STATUS:
+                return job
+            job.cancel_requested = True
+            if job.status == 'queued':
+                self.queue.remove(job)
+                self._finish(job, status='cancelled', result=(False, list(), '[INFO] Cancelled.', None))
+                return job
+            process = job.process
+        self.logger.info('[+] Cancelling job {}: {}'.format(job.job_id, job.check_dir))
+        if process is not None:
+            process.terminate()
+        return job
+
+    def stats(self):
+        with self.condition:
+            return {
+                'status': 'closing' if self.closed else 'ok',
+                'pid': os.getpid(),
+                'uptime': round(time.time() - self.start_time, 3),
+                'workers': self.workers,
+                'running': sum(1 for job in self.jobs.values() if job.status == 'running'),
+                'queued': len(self.queue),
+                'max_queue': self.max_queue,
+                'jobs': dict(self.counts)
+            }
+
+    def close(self):
+        """
+        Stop accepting jobs, cancel the queued and running ones and wait for the workers.
+        """
+        with self.condition:
+            self.closed = True
+            job_ids = [job.job_id for job in self.jobs.values() if job.status not in FINISHED_STATUS]
+            self.condition.notify_all()
+        for job_id in job_ids:
+            self.cancel(job_id)
+        for thread in self.threads:
+            thread.join()
+
+    def _finish(self, job, status, result):
+        # 调用方持有self.condition
+        job.status = status
+        job.result = result
+        job.end_time = time.time()
+        job.process = None
+        self.counts[status] += 1
+        job.finished.set()
+        self.finished_jobs.append(job.job_id)
+        while len(self.finished_jobs) > self.keep_jobs:
+            self.jobs.pop(self.finished_jobs.popleft(), None)
+
+    def _run_worker(self):
+        while True:
+            with self.condition:
+                while not self.queue and not self.closed:
+                    self.condition.wait()
+                if self.closed:
+                    return
+                job = self.queue.popleft()
+                job.status = 'running'
+                job.start_time = time.time()
+                reader, writer = self.context.Pipe(duplex=False)
+                curr_time = '{}__{}'.format(self.start_time_str, job.job_id)
+                job.process = self.context.Process(target=run_scan_job,
+                                                   args=(job.check_dir, job.options, curr_time, writer))
+                job.process.start()
+                process = job.process
+            writer.close()
+            self.logger.info('[+] Job {} started: {}'.format(job.job_id, job.check_dir))
+
+            try:
+                result = reader.recv()
+            except EOFError:
+                result = None
+            reader.close()
+            process.join(timeout=KILL_GRACE_PERIOD)
+            if process.is_alive():
+                process.kill()
+                process.join()
+
+            with self.condition:
+                if job.cancel_requested:
+                    self._finish(job, status='cancelled', result=(False, list(), '[INFO] Cancelled.', None))
+                elif result is None:
+                    message = '[INFO] Failure.\nScan process exited with code {}'.format(process.exitcode)
+                    self._finish(job, status='failed', result=(False, list(), message, None))
+                else:
+                    self._finish(job, status='done' if result[0] else 'failed', result=result)
+            self.logger.info('[+] Job {} {} in {:.3f}s: {}'.format(job.job_id, job.status,
+                                                                   job.end_time - job.start_time, job.check_dir))
+            self._evict_cache()
+
+    def _evict_cache(self):
+        with self.condition:
+            if time.time() - self.last_evict_time < self.evict_interval:
+                return
+            self.last_evict_time = time.time()
+        parse_cache = ParseCache(cache_dir=cf.cache_dir, max_size=cf.cache_max_size, max_age=cf.cache_max_age)
+        parse_cache.evict(logger=self.logger)
+
+
+class ScanRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON over HTTP:
+        GET    /health                      daemon and queue stats
+        POST   /scan                        {"check_dir": ..., <scan_api options>} -> 202, the queued job
+        GET    /scan/<job_id>[?wait=<s>]    the job, waiting up to wait seconds for it to finish
+        DELETE /scan/<job_id>               cancel the job
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def send_json(self, status, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def get_job_id(self):
+        parts = urlparse(self.path).path.strip('/').split('/')
+        if len(parts) == 2 and parts[0] == 'scan':
+            return parts[1]
+        return None
+
+    def do_GET(self):
+        daemon = self.server.scan_daemon
+        url = urlparse(self.path)
+        if url.path == '/health':
+            self.send_json(200, daemon.stats())
+            return
+        job_id = self.get_job_id()
+        job = daemon.get(job_id) if job_id else None
+        if job is None:
+            self.send_json(404, {'error': 'unknown job: {}'.format(job_id)})
+            return
+        try:
+            wait = float(parse_qs(url.query).get('wait', ['0'])[0])
+        except ValueError:
+            self.send_json(400, {'error': 'invalid wait value'})
+            return
+        if wait > 0:
+            job.finished.wait(timeout=min(wait, MAX_WAIT))
+        self.send_json(200, job.to_dict())
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/scan':
+            self.send_json(404, {'error': 'unknown path: {}'.format(self.path)})
+            return
+        try:
+            data = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8'))
+            check_dir = data.pop('check_dir')
+            job = self.server.scan_daemon.submit(check_dir=check_dir, options=data)
+        except OverflowError as e:
+            self.send_json(503, {'error': str(e)})
+            return
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            self.send_json(400, {'error': 'invalid scan request: {}'.format(str(e))})
+            return
+        self.send_json(202, job.to_dict())
+
+    def do_DELETE(self):
+        job_id = self.get_job_id()
+        job = self.server.scan_daemon.cancel(job_id) if job_id else None
+        if job is None:
+            self.send_json(404, {'error': 'unknown job: {}'.format(job_id)})
+            return
+        self.send_json(200, job.to_dict())
+
+    def address_string(self):
+        # Unix socket的客户端地址为空字符串
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        self.server.scan_daemon.logger.debug('{} - {}'.format(self.address_string(), format % args))
+
+
+class UnixHTTPServer(ThreadingHTTPServer):
+    address_family = socket.AF_UNIX
+
+    def server_bind(self):
+        # HTTPServer.server_bind按(host, port)解析地址, Unix socket只需绑定路径
+        socketserver.TCPServer.server_bind(self)
+        self.server_name = 'localhost'
+        self.server_port = 0
+
+
+def serve(daemon, socket_path=None, host='127.0.0.1', port=None):
+    if port is None:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = UnixHTTPServer(socket_path, ScanRequestHandler)
+        address = socket_path
+    else:
+        server = ThreadingHTTPServer((host, port), ScanRequestHandler)
+        address = 'http://{}:{}'.format(host, server.server_port)
+    server.scan_daemon = daemon
+
+    # SIGTERM与Ctrl+C一样优雅退出: 停止接受请求, 取消未完成的任务
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    daemon.logger.info('[+] Scan daemon listening on {}'.format(address))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        daemon.close()
+        if port is None and os.path.exists(socket_path):
+            os.remove(socket_path)
+        daemon.logger.info('[+] Scan daemon stopped.')
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-socket', default=cf.daemon_socket, required=False, type=str)
+    parser.add_argument('-host', default='127.0.0.1', required=False, type=str)
+    parser.add_argument('-port', default=None, required=False, type=int)
+    parser.add_argument('-workers', default=2, required=False, type=int)
+    parser.add_argument('-max_queue', default=100, required=False, type=int)
+    args_cmd = parser.parse_args()
+
+    if not os.path.exists(cf.log_dir):
+        os.makedirs(cf.log_dir)
+    current_time = datetime.now().strftime('%Y_%m_%d_%H_%M_%S').__str__()
+    log = Logger(path=os.path.join(cf.log_dir, 'scan_daemon__' + current_time + '.log'), cmd_level=logging.INFO,
+                 file_level=logging.WARN)
+    scan_daemon = ScanDaemon(workers=args_cmd.workers, max_queue=args_cmd.max_queue, logger=log)
+    scan_daemon.start()
+    serve(daemon=scan_daemon, socket_path=args_cmd.socket, host=args_cmd.host, port=args_cmd.port)
+    log.close()
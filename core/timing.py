@@ -0,0 +1,92 @@
+import os
+import time
+from contextlib import contextmanager
+
+
+def cpu_time():
+    # 本进程与已结束的子进程(解析进程池、构建脚本)的CPU时间之和
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+class ScanTimer(object):
+    """
+    Wall and CPU seconds of the stages of a scan ('parse.files' being a part of 'parse'), the cost of each parsed
+    config file (see file_parsers.profile_config_file) and the cache hit/miss counts.
+    to_dict() is written to the result file as 'timing', summary() aggregates it per stage, parser and file.
+    """
+    def __init__(self):
+        self.stages = list()
+        self.files = list()
+        self.counts = dict()
+        self._wall_start = time.perf_counter()
+        self._cpu_start = cpu_time()
+
+    @contextmanager
+    def stage(self, name):
+        wall_start, cpu_start = time.perf_counter(), cpu_time()
+        try:
+            yield
+        finally:
+            self.stages.append({
+                'stage': name,
+                'wall_seconds': round(time.perf_counter() - wall_start, 6),
+                'cpu_seconds': round(cpu_time() - cpu_start, 6)
+            })
+
+    def add_file(self, profile):
+        if profile:
+            self.files.append(profile)
+
+    def set_counts(self, name, counts):
+        if counts is not None:
+            self.counts[name] = dict(counts)
+
+    @property
+    def parsers(self):
+        parsers = dict()
+        for profile in self.files:
+            parser = parsers.setdefault(profile['parser'], {'parser': profile['parser'], 'files': 0,
+                                                            'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'bytes': 0,
+                                                            'components': 0, 'cache_hits': 0})
+            parser['files'] += 1
+            parser['wall_seconds'] += profile['wall_seconds']
+            parser['cpu_seconds'] += profile['cpu_seconds']
+            parser['bytes'] += profile['bytes']
+            parser['components'] += profile['components']
+            parser['cache_hits'] += 1 if profile['cache_hit'] else 0
+        for parser in parsers.values():
+            parser['wall_seconds'] = round(parser['wall_seconds'], 6)
+            parser['cpu_seconds'] = round(parser['cpu_seconds'], 6)
+        return sorted(parsers.values(), key=lambda parser: parser['wall_seconds'], reverse=True)
+
+    def to_dict(self):
+        return {
+            'wall_seconds': round(time.perf_counter() - self._wall_start, 6),
+            'cpu_seconds': round(cpu_time() - self._cpu_start, 6),
+            'stages': list(self.stages),
+            'parsers': self.parsers,
+            'files': list(self.files),
+            'counts': dict(self.counts)
+        }
+
+    def summary(self, top=5):
+        """
+        Lines of the aggregated timing: total, each stage, each parser and the top slowest files.
+        """
+        timing = self.to_dict()
+        lines = ['[+] Timing: {:.3f}s wall, {:.3f}s CPU'.format(timing['wall_seconds'], timing['cpu_seconds'])]
+        for stage in timing['stages']:
+            lines.append('    stage {:<19} {:>9.3f}s wall {:>9.3f}s CPU'
+                         .format(stage['stage'], stage['wall_seconds'], stage['cpu_seconds']))
+        for parser in timing['parsers']:
+            lines.append('    parser {:<18} {:>9.3f}s wall {:>9.3f}s CPU, {} files, {} bytes, {} components, '
+                         '{} cache hits'.format(parser['parser'], parser['wall_seconds'], parser['cpu_seconds'],
+                                                parser['files'], parser['bytes'], parser['components'],
+                                                parser['cache_hits']))
+        for profile in sorted(self.files, key=lambda item: item['wall_seconds'], reverse=True)[:top]:
+            lines.append('    file {:.3f}s: {}'.format(profile['wall_seconds'], profile['file_path_relative']))
+        for name, counts in sorted(timing['counts'].items()):
+            lines.append('    {}: {}'.format(name, ', '.join('{} {}'.format(value, key)
+                                                           for key, value in counts.items())))
+        return lines
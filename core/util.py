@@ -1,148 +1,66 @@
-import os
 import json
-import yaml
-from yaml.loader import SafeLoader
-import fnmatch
-from functools import reduce
 
+from core.dedup import ComponentIndex
+from core.document_cache import load_document
+from core.result_writers import write_result
 
-def is_podspec_file(filepath):
-    filename = os.path.split(filepath)[-1]
 
-    return filename.lower().endswith('.podspec')
-
-
-def is_gemspec_file(filepath):
-    filename = os.path.split(filepath)[-1]
-
-    return filename.lower().endswith('.gemspec')
-
-
-def is_build_gradle_file(filepath):
-    filename = os.path.split(filepath)[-1]
-    if filename == 'build.gradle':
-        return True
-
-    parent_dir = os.path.split(filepath)[0]
-    parent_dir_name = os.path.split(parent_dir)[-1]
-    return filename.lower() == (parent_dir_name + '.gradle').lower()
-
-
-def is_package_file(filepath):
-    filename = os.path.split(filepath)[-1].lower()
-    parent_dir = os.path.split(filepath)[0]
-    parent_dir_name = os.path.split(parent_dir)[-1].lower()
-    package_files = (
-        '*' + parent_dir_name + '*' + '.cabal',
-        'package.yaml'
-    )
-    is_package = any(fnmatch.fnmatchcase(filename, pf) for pf in package_files)
-    if is_package:
-        return True
-    else:
-        return False
-
-
-def is_project_file(filepath):
-    filename = os.path.split(filepath)[-1]
-    if filename.endswith('.csproj') or filename.endswith('.nuspec'):
-        return True
-    else:
-        return False
-
-
-def is_requirements_file(filepath):
-    filename = os.path.split(filepath)[-1]
-    req_files = (
-        '*requirement*.txt',
-        'requires.txt',
-    )
-    is_req = any(fnmatch.fnmatchcase(filename, rf) for rf in req_files)
-    if is_req:
-        return True
-
-    parent_dir = os.path.split(filepath)[0]
-    parent_dir_name = os.path.split(parent_dir)[-1]
-    pip_extensions = ('.txt',)
-    return parent_dir_name == 'requirements' and filename.endswith(pip_extensions)
-
-
-def is_environment_file(filepath):
-    filename = os.path.split(filepath)[-1]
-    env_files = (
-        '*environment*.yml',
-        '*environment*.yaml',
-        '*env*.yml',
-        '*env*.yaml',
-        'conda.yml',
-    )
-    is_env = any(fnmatch.fnmatchcase(filename, env) for env in env_files)
-    return True if is_env else False
-
-
-def is_dependencies_scala_file(filepath):
-    filename = os.path.split(filepath)[-1].lower()
-    parent_dir = os.path.split(filepath)[0]
-    parent_dir_name = os.path.split(parent_dir)[-1].lower()
-
-    return parent_dir_name == 'project' and filename == 'dependencies.scala'
-
-
-def check_pubspec_type(filepath, logger):
+def check_pubspec_type(filepath, logger, document_cache=None):
 
     filetype = 'Dart'
     try:
-        with open(file=filepath, mode='r', encoding='utf-8') as f:
-            yaml_data = yaml.load(f.read(), SafeLoader)
-            try:
-                if 'flutter' in yaml_data['environment']:
-                    filetype = 'Flutter'
-            except KeyError:
-                pass
+        # 完整加载, 与解析阶段的pub_parser共享同一份缓存文档
+        yaml_data = load_document(filepath=filepath, kind='yaml', document_cache=document_cache)
+        try:
+            if 'flutter' in yaml_data['environment']:
+                filetype = 'Flutter'
+        except KeyError:
+            pass
     except Exception as e:
         logger.error('Subprocess exception: exception occurs in function check_pubspec_type '
                      'when loading pubspec.yaml on {}: {}'.format(filepath, str(e)))
         return filetype
 
-    f.close()
     return filetype
 
 
-def config_stack_programs_location(filepath, ghc_location, logger):
+def config_stack_programs_location(filepath, ghc_location, logger, document_cache=None):
     try:
-        with open(file=filepath, mode='r', encoding='utf-8') as f:
-            yaml_data = yaml.load(f.read(), SafeLoader)
-            yaml_data['local-programs-path'] = ghc_location
+        # 缓存中的文档是只读的, 修改其副本
+        yaml_data = dict(load_document(filepath=filepath, kind='yaml', document_cache=document_cache))
+        yaml_data['local-programs-path'] = ghc_location
     except Exception as e:
         logger.error('Subprocess exception: exception occurs in function config_stack_programs_location '
                      'when loading stack.yaml on {}: {}'.format(filepath, str(e)))
         return 0
 
     try:
+        # 仅构建Stack项目时需要yaml
+        import yaml
+
         with open(file=filepath, mode='w', encoding='utf-8') as f:
             yaml.dump(yaml_data, f)
     except Exception as e:
         logger.error('Subprocess exception: exception occurs in function config_stack_programs_location '
                      'when dumping stack.yaml on {}: {}'.format(filepath, str(e)))
         return 0
+    finally:
+        if document_cache is not None:
+            document_cache.invalidate(filepath)
 
-    f.close()
     return 1
 
 
-def read_json_file(filepath, logger):
+def read_json_file(filepath, logger, document_cache=None):
     try:
-        with open(filepath, mode='r', encoding='utf-8') as f:
-            json_data = json.load(f)
+        json_data = load_document(filepath=filepath, kind='json', document_cache=document_cache)
     except FileNotFoundError as e:
         logger.error('Error occurs in function read_json_file: {}'.format(str(e)))
         return None
     except Exception as e:
         logger.error('Exception occurs in function read_json_file on {}: {}'.format(filepath, str(e)))
-        f.close()
         return None
 
-    f.close()
     return json_data
 
 
@@ -167,49 +85,46 @@ def read_temp_json_file(filepath, logger):
     return json_data
 
 
-def remove_duplicate_dict_items(data_list):
-    run_function = lambda x, y: x if y in x else x + [y]
-    return reduce(run_function, [[], ] + data_list)
-
-
 def parse_check_result(dep_result):
-    parse_result = list()
+    parse_result = ComponentIndex()
     if dep_result:
         for _, dep_item in dep_result.items():
             parse_result.extend(dep_item)
-    parse_result = remove_duplicate_dict_items(data_list=parse_result)
-    return parse_result
+    return parse_result.items()
 
 
-def write_check_result(result_file_path, search_result, build_result, dep_result):
+def write_check_result(result_file_path, search_result, build_result, dep_result, parse_cache_stats=None,
+                       file_results=None, delta=None, document_cache_stats=None, dep_graph=None, diagnostics=None,
+                       timing=None, project=None, output_format='json'):
+    """
+    Write the result file in output_format (see core.result_writers.RESULT_WRITERS), atomically. project names the
+    scanned project in the ndjson header and the SBOM documents.
+    """
     data = {
         'search_result': search_result if search_result else list(),
         'build_result': build_result if build_result else list(),
         'dep_nums': len(dep_result) if dep_result else 0,
         'dep_result': dep_result if dep_result else list()
     }
-    with open(result_file_path, mode='w', encoding='utf-8') as json_file_to_write:
-        json_file_to_write.write(json.dumps(data, indent=4))
-    json_file_to_write.close()
-
-
-def read_log(log_file_path):
-
-    try:
-        # get error info
-        with open(file=log_file_path, mode='r', encoding='utf-8') as log_file:
-            error_info = log_file.read().strip('\n')
-    except FileNotFoundError:
-        error_info = '[ERROR] Log file: {} does not exist!'.format(log_file_path)
-        return error_info
-    except Exception:
-        error_info = '[ERROR] Exception occurs when loading log file: {}'.format(log_file_path)
-
-    # delete log file
-    if os.path.exists(log_file_path):
-        os.remove(log_file_path)
-    log_file.close()
-    return error_info
+    if parse_cache_stats is not None:
+        data['parse_cache'] = parse_cache_stats
+    if document_cache_stats is not None:
+        data['document_cache'] = document_cache_stats
+    if delta is not None:
+        data['delta'] = delta
+    # 依赖图, 节点i即dep_result[i], 见core.dep_graph.DependencyGraph.to_dict
+    if dep_graph is not None:
+        data['dep_graph'] = dep_graph.to_dict()
+    # 扫描过程中WARN及以上的诊断信息, 见core.log.DiagnosticsHandler
+    if diagnostics is not None:
+        data['diagnostics'] = diagnostics
+    # 各阶段、各解析器与各文件的耗时及缓存命中数, 见core.timing.ScanTimer
+    if timing is not None:
+        data['timing'] = timing
+    # 各候选文件的指纹与解析结果, 作为下一次增量扫描(-baseline)的输入
+    if file_results is not None:
+        data['file_results'] = file_results
+    write_result(result_file_path=result_file_path, data=data, project=project, output_format=output_format)
 
 
 if __name__ == "__main__":
@@ -221,11 +136,3 @@ if __name__ == "__main__":
     #     print('config succeed')
     # else:
     #     print('config failure')
-
-    log_file = './test.log'
-    error_info = read_log(log_file_path=log_file)
-    if error_info:
-        print('error info: ')
-        print(error_info)
-    else:
-        print('no error info!')
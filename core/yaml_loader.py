@@ -0,0 +1,78 @@
+import re
+import yaml
+
+try:
+    # libyaml绑定, 比纯Python的SafeLoader快一个数量级
+    from yaml import CSafeLoader as SafeLoader
+    HAS_LIBYAML = True
+except ImportError:
+    from yaml import SafeLoader
+    HAS_LIBYAML = False
+
+# 顶层(无缩进)且非注释的行, 即根映射的键; 文本前补'\n'后以换行符锚定
+TOP_LEVEL_LINE = re.compile(r'\n([^\s#][^\n]*)')
+DOCUMENT_MARKERS = ('---', '...')
+
+
+def is_sequence_entry(line):
+    return line[0] == '-' and (len(line) == 1 or line[1] in ' \t')
+
+
+def get_top_level_key(line):
+    if line.startswith(DOCUMENT_MARKERS) or line[0] in '[{':
+        return None
+    key = line.split(':', 1)[0].strip()
+    if len(key) > 1 and key[0] == key[-1] and key[0] in '"\'':
+        key = key[1:-1]
+    return key
+
+
+def filter_top_level_keys(text, keys):
+    """
+       desc: 删除根映射中不在keys内的顶层键及其内容, 只需扫描顶层行, 嵌套内容按片段整体保留/丢弃
+       params: text: str, YAML文本; keys: 需要保留的顶层键
+       return: (filtered_text, is_dropped), is_dropped表示是否删除了任何顶层键
+    """
+    text = '\n' + text
+    segments = list()
+    is_dropped = False
+    start = 0
+    keep = True
+    for match in TOP_LEVEL_LINE.finditer(text):
+        # 无缩进的'- '行是前一个顶层键的块序列元素(e.g. PyYAML默认的输出), 随该键一并保留或删除
+        if is_sequence_entry(match.group(1)):
+            continue
+        if keep:
+            segments.append(text[start:match.start()])
+        start = match.start()
+        key = get_top_level_key(match.group(1))
+        # 文档标记/根为序列等情况无法按键过滤, 照常保留
+        keep = key is None or key in keys
+        if not keep:
+            is_dropped = True
+    if keep:
+        segments.append(text[start:])
+    return ''.join(segments), is_dropped
+
+
+def load_yaml(text, keys=None):
+    """
+    Load a YAML document with the libyaml loader when available, the pure Python SafeLoader otherwise.
+    keys: if given, only these top level keys of the root mapping are loaded, the text of the other
+    sections is dropped before parsing. Falls back to loading the whole document when the kept sections
+    refer to an anchor defined in a dropped one.
+    """
+    if keys:
+        filtered_text, is_dropped = filter_top_level_keys(text=text, keys=keys)
+        if is_dropped:
+            try:
+                data = yaml.load(filtered_text, Loader=SafeLoader)
+                return dict() if data is None else data
+            except yaml.YAMLError:
+                pass
+    return yaml.load(text, Loader=SafeLoader)
+
+
+def load_yaml_file(filepath, keys=None):
+    with open(file=filepath, mode='r', encoding='utf-8') as f:
+        return load_yaml(text=f.read(), keys=keys)
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# 与scan.py相同的导入方式: 项目根目录(core.*)与core目录(config, log等)
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT_DIR, os.path.join(ROOT_DIR, 'core')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
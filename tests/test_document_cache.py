@@ -0,0 +1,48 @@
+import os
+import hashlib
+
+from core.document_cache import DocumentCache, hash_file
+
+
+def write(path, data):
+    with open(path, mode='wb') as f:
+        f.write(data)
+    return str(path)
+
+
+def test_hash_then_load_reads_once(tmp_path):
+    filepath = write(tmp_path / 'package.json', b'{"name": "demo"}')
+    cache = DocumentCache()
+    digest = cache.hash(filepath)
+    assert digest == hashlib.sha256(b'{"name": "demo"}').hexdigest()
+    assert cache.load(filepath, kind='json') == {'name': 'demo'}
+    assert cache.hash(filepath) == digest
+    assert cache.reads == 1
+
+
+def test_hash_uses_loaded_bytes(tmp_path):
+    filepath = write(tmp_path / 'requirements.txt', b'six==1.16.0\n')
+    cache = DocumentCache()
+    cache.load(filepath, kind='lines')
+    assert cache.hash(filepath) == hash_file(filepath)
+    assert cache.reads == 1
+
+
+def test_hash_follows_the_stat_signature(tmp_path):
+    filepath = write(tmp_path / 'go.mod', b'module a\n')
+    cache = DocumentCache()
+    first = cache.hash(filepath)
+    write(filepath, b'module bb\n')
+    os.utime(filepath, ns=(0, 10 ** 9))
+    assert cache.hash(filepath) == hash_file(filepath) != first
+
+
+def test_hash_of_unretained_file_is_memoized(tmp_path):
+    filepath = write(tmp_path / 'yarn.lock', b'x' * 64)
+    cache = DocumentCache(max_file_size=16)
+    digest = cache.hash(filepath)
+    assert digest == hash_file(filepath)
+    assert cache.hash(filepath) == digest
+    assert cache.size == 0
+    assert cache.load(filepath, kind='text') == 'x' * 64
+    assert cache.reads == 1
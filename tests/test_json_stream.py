@@ -0,0 +1,85 @@
+import io
+import json
+
+import pytest
+
+from core.json_stream import JsonTokenizer
+
+DOCUMENT = r'''{
+    "escapes": "quote \" backslash \\ slash \/ tab \t newline \n unicode \u00e9\u4E2D",
+    "surrogates": ["\ud83d\ude00", "\ud834\udd1e\ud83d\ude00 pairs", "😀 raw", "\u00e9\u4e2d"],
+    "numbers": [0, -0, 7, -12, 1234567890123456789012, 12.5, -0.001, 1e10, 6.02E+23, -3.25e-2, 0.1],
+    "literals": [true, false, null],
+    "nested": [[], [[]], [1, [2, [3, [4, []]]]], [{"a": [{}]}, {"b": [[null]]}]],
+    "empty": {"object": {}, "array": [], "string": ""},
+    "é key": {"deep": {"deeper": {"deepest": [-1.5e-3, "\\u0041"]}}}
+}'''
+
+
+def walk(tokenizer):
+    """
+    Rebuild the value at the current position from the tokens only.
+    """
+    if tokenizer.peek() == '{':
+        return {key: walk(tokenizer) for key in tokenizer.iter_object()}
+    token, value = tokenizer.next_token()
+    if token == '[':
+        items = list()
+        if tokenizer.peek() == ']':
+            tokenizer.next_token()
+            return items
+        while True:
+            items.append(walk(tokenizer))
+            token, _ = tokenizer.next_token()
+            if token == ']':
+                return items
+    return value
+
+
+def chunk_sizes(text):
+    return range(1, len(text) + 2)
+
+
+def test_tokens_match_json_load_on_every_chunk_boundary():
+    expected = json.loads(DOCUMENT)
+    for chunk_size in chunk_sizes(DOCUMENT):
+        tokenizer = JsonTokenizer(io.StringIO(DOCUMENT), chunk_size=chunk_size)
+        assert walk(tokenizer) == expected, chunk_size
+        assert tokenizer.peek() == ''
+
+
+def test_read_value_matches_json_load_on_every_chunk_boundary():
+    expected = json.loads(DOCUMENT)
+    for chunk_size in chunk_sizes(DOCUMENT):
+        tokenizer = JsonTokenizer(io.StringIO(DOCUMENT), chunk_size=chunk_size)
+        result = dict()
+        for key in tokenizer.iter_object():
+            result[key] = tokenizer.read_value()
+        assert result == expected, chunk_size
+
+
+def test_skip_value_on_every_chunk_boundary():
+    expected = json.loads(DOCUMENT)
+    for chunk_size in chunk_sizes(DOCUMENT):
+        tokenizer = JsonTokenizer(io.StringIO(DOCUMENT), chunk_size=chunk_size)
+        result = dict()
+        for key in tokenizer.iter_object():
+            if key in ('nested', 'surrogates'):
+                tokenizer.skip_value()
+            else:
+                result[key] = tokenizer.read_value()
+        assert result == {key: value for key, value in expected.items() if key not in ('nested', 'surrogates')}
+
+
+@pytest.mark.parametrize('text', ['12', '-0.5', '1e-7', '6.02E+23', '123456789.25e10', '"\\ud83d\\ude00"', 'null',
+                                  '[1]', '{"a": 1}', '[[1.5e3]]'])
+def test_numbers_and_literals_at_end_of_document(text):
+    for chunk_size in chunk_sizes(text):
+        assert JsonTokenizer(io.StringIO(text), chunk_size=chunk_size).read_value() == json.loads(text)
+        assert walk(JsonTokenizer(io.StringIO(text), chunk_size=chunk_size)) == json.loads(text)
+
+
+def test_truncated_document_raises():
+    text = DOCUMENT[:len(DOCUMENT) // 2]
+    with pytest.raises(ValueError):
+        walk(JsonTokenizer(io.StringIO(text), chunk_size=16))
@@ -0,0 +1,68 @@
+import logging
+
+from core.log import Logger
+from core.document_cache import DocumentCache
+from core.file_parsers.maven_pom_parser import PomModelCache, parse_maven_pom_file
+
+PARENT_POM = '''<project xmlns="http://maven.apache.org/POM/4.0.0">
+    <groupId>org.example</groupId>
+    <artifactId>parent</artifactId>
+    <version>1.0</version>
+    <properties>
+        <slf4j.version>1.7.36</slf4j.version>
+        <junit.version>4.12</junit.version>
+    </properties>
+</project>
+'''
+CHILD_POM = '''<project xmlns="http://maven.apache.org/POM/4.0.0">
+    <parent>
+        <groupId>org.example</groupId>
+        <artifactId>parent</artifactId>
+        <version>1.0</version>
+    </parent>
+    <artifactId>child</artifactId>
+    <properties>
+        <junit.version>4.13.2</junit.version>
+    </properties>
+    <dependencies>
+        <dependency>
+            <groupId>org.slf4j</groupId>
+            <artifactId>slf4j-api</artifactId>
+            <version>${slf4j.version}</version>
+        </dependency>
+        <dependency>
+            <groupId>junit</groupId>
+            <artifactId>junit</artifactId>
+            <version>${junit.version}</version>
+        </dependency>
+    </dependencies>
+</project>
+'''
+
+
+def write_project(tmp_path):
+    (tmp_path / 'pom.xml').write_text(PARENT_POM)
+    (tmp_path / 'child').mkdir()
+    (tmp_path / 'child' / 'pom.xml').write_text(CHILD_POM)
+    return str(tmp_path / 'child' / 'pom.xml')
+
+
+def test_child_properties_override_inherited_ones(tmp_path):
+    filepath = write_project(tmp_path)
+    dep_result = parse_maven_pom_file(filepath=filepath, search_result=list(), logger=Logger(cmd_level=logging.ERROR))
+    assert [(item['name'], item['version']) for item in dep_result] == [('org.slf4j/slf4j-api', '1.7.36'),
+                                                                        ('junit/junit', '4.13.2')]
+
+
+def test_property_map_is_built_once(tmp_path):
+    filepath = write_project(tmp_path)
+    logger = Logger(cmd_level=logging.ERROR)
+    document_cache = DocumentCache()
+    pom_cache = PomModelCache(document_cache=document_cache)
+    properties = pom_cache.get_properties(filepath=filepath, logger=logger)
+    stat_calls = document_cache.stats['stat_calls']
+    for _ in range(0, 10):
+        assert pom_cache.get_properties(filepath=filepath, logger=logger) is properties
+        assert pom_cache.get_property(filepath=filepath, tag='${junit.version}', logger=logger) == '4.13.2'
+    # 每个pom在一次扫描中只读取一次
+    assert document_cache.stats['stat_calls'] == stat_calls
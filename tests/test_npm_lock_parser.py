@@ -0,0 +1,101 @@
+import io
+import os
+import logging
+
+import pytest
+
+from core.log import Logger
+from core.json_stream import JsonTokenizer
+from core.file_parsers.npm_lock_parser import iter_v1_dependencies, iter_v2_packages, iter_lock_json_packages, \
+    resolve_package, parse_lock_json_file
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+# 三个版本的fixture是同一棵依赖树: c@1提升到顶层, b的c@2嵌套安装, c@2的依赖d提升到顶层, e嵌套在c@2之下
+PATHS = [
+    'node_modules/a',
+    'node_modules/b',
+    'node_modules/b/node_modules/c',
+    'node_modules/b/node_modules/c/node_modules/e',
+    'node_modules/c',
+    'node_modules/d',
+]
+COMPONENTS = {('a', '1.0.0'), ('b', '2.0.0'), ('c', '2.0.0'), ('c', '1.0.0'), ('d', '3.0.0'), ('e', '1.1.0')}
+DIRECT = {'a@1.0.0', 'b@2.0.0'}
+EDGES = {('a@1.0.0', 'c@1.0.0'), ('b@2.0.0', 'c@2.0.0'), ('c@2.0.0', 'd@3.0.0'), ('c@2.0.0', 'e@1.1.0')}
+
+
+def fixture_path(version):
+    return os.path.join(FIXTURE_DIR, 'npm_lock_' + version, 'package-lock.json')
+
+
+def read_fixture(version):
+    with open(fixture_path(version), mode='r', encoding='utf-8') as f:
+        return f.read()
+
+
+def iter_section(text, section, iterator, chunk_size):
+    tokenizer = JsonTokenizer(io.StringIO(text), chunk_size=chunk_size)
+    for key in tokenizer.iter_object():
+        if key == section:
+            return list(iterator(tokenizer))
+        tokenizer.skip_value()
+    return list()
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, 1024 * 1024])
+def test_iter_v1_dependencies(chunk_size):
+    packages = iter_section(read_fixture('v1'), 'dependencies', iter_v1_dependencies, chunk_size)
+    # 父依赖先于其子依赖产出, 嵌套路径按v2格式表示
+    assert [package['path'] for package in packages] == PATHS
+    by_path = {package['path']: package for package in packages}
+    assert by_path['node_modules/b/node_modules/c']['requires'] == ('d', 'e')
+    assert by_path['node_modules/b/node_modules/c']['dev'] is True
+    assert by_path['node_modules/c']['version'] == '1.0.0'
+    assert by_path['node_modules/c']['dev'] is False
+
+
+@pytest.mark.parametrize('version', ['v2', 'v3'])
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, 1024 * 1024])
+def test_iter_v2_packages(version, chunk_size):
+    packages = iter_section(read_fixture(version), 'packages', iter_v2_packages, chunk_size)
+    assert [package['path'] for package in packages] == [''] + PATHS
+    assert packages[0]['version'] is None
+    assert packages[0]['requires'] == ('a', 'b')
+    assert packages[3]['requires'] == ('d', 'e')
+
+
+@pytest.mark.parametrize('version', ['v1', 'v2', 'v3'])
+def test_iter_lock_json_packages_uses_one_layout(version):
+    tokenizer = JsonTokenizer(io.StringIO(read_fixture(version)), chunk_size=16)
+    paths = [package['path'] for package in iter_lock_json_packages(tokenizer)]
+    # v2同时包含packages与兼容v1的dependencies, 只遍历packages
+    assert paths == (PATHS if version == 'v1' else [''] + PATHS)
+
+
+def test_resolve_package():
+    paths = set([''] + PATHS)
+    assert resolve_package(paths=paths, path='', name='a') == 'node_modules/a'
+    assert resolve_package(paths=paths, path='node_modules/a', name='c') == 'node_modules/c'
+    assert resolve_package(paths=paths, path='node_modules/b', name='c') == 'node_modules/b/node_modules/c'
+    assert resolve_package(paths=paths, path='node_modules/b/node_modules/c', name='e') == \
+        'node_modules/b/node_modules/c/node_modules/e'
+    assert resolve_package(paths=paths, path='node_modules/b/node_modules/c', name='d') == 'node_modules/d'
+    assert resolve_package(paths=paths, path='node_modules/b/node_modules/c', name='x') is None
+
+
+@pytest.mark.parametrize('version', ['v1', 'v2', 'v3'])
+def test_parse_lock_json_file(version):
+    dep_result = parse_lock_json_file(filepath=fixture_path(version), is_skip=False,
+                                      logger=Logger(cmd_level=logging.ERROR))
+    names = ['{}@{}'.format(item['name'], item['version']) for item in dep_result]
+    assert {(item['name'], item['version']) for item in dep_result} == COMPONENTS
+    assert len(dep_result) == len(COMPONENTS)
+    assert {names[node] for node in dep_result.graph['direct']} == DIRECT
+    assert {(names[parent], names[child]) for parent, child in dep_result.graph['edges']} == EDGES
+
+
+@pytest.mark.parametrize('version', ['v1', 'v2', 'v3'])
+def test_parse_lock_json_file_skips_dev_dependencies(version):
+    dep_result = parse_lock_json_file(filepath=fixture_path(version), is_skip=True,
+                                      logger=Logger(cmd_level=logging.ERROR))
+    assert {(item['name'], item['version']) for item in dep_result} == {('a', '1.0.0'), ('c', '1.0.0')}
@@ -0,0 +1,41 @@
+import yaml
+
+from core.yaml_loader import load_yaml, filter_top_level_keys
+
+
+def test_column_zero_sequence_of_dropped_key_is_dropped():
+    assert load_yaml('keep:\n- a\ndrop:\n- b\n', keys=('keep',)) == {'keep': ['a']}
+
+
+def test_column_zero_sequence_of_kept_key_is_kept():
+    assert load_yaml('drop:\n- b\nkeep:\n- a\n- c\n', keys=('keep',)) == {'keep': ['a', 'c']}
+
+
+def test_filtered_load_matches_full_load_of_pyyaml_dump():
+    # PyYAML的默认输出中, 映射下的序列不缩进
+    data = {
+        'PODS': ['Alamofire (5.4.0)', {'Firebase/Core (8.0.0)': ['FirebaseCore (8.0.0)']}],
+        'DEPENDENCIES': ['Alamofire', 'Firebase/Core'],
+        'SPEC REPOS': {'trunk': ['Alamofire', 'Firebase']},
+        'COCOAPODS': '1.11.2'
+    }
+    text = yaml.dump(data, default_flow_style=False)
+    assert '\n- ' in text
+    for keys in (('PODS',), ('DEPENDENCIES',), ('PODS', 'COCOAPODS'), ('SPEC REPOS',)):
+        assert load_yaml(text, keys=keys) == dict((key, data[key]) for key in keys)
+
+
+def test_nested_content_follows_its_top_level_key():
+    text = 'a:\n  x: 1\n  y:\n  - 2\nb:\n  z: 3\n'
+    filtered_text, is_dropped = filter_top_level_keys(text=text, keys=('b',))
+    assert is_dropped
+    assert yaml.safe_load(filtered_text) == {'b': {'z': 3}}
+
+
+def test_root_sequence_is_loaded_whole():
+    assert load_yaml('- a\n- b\n', keys=('keep',)) == ['a', 'b']
+
+
+def test_anchor_in_dropped_section_falls_back_to_full_load():
+    text = 'defaults: &defaults\n  a: 1\nkeep:\n  <<: *defaults\n  b: 2\n'
+    assert load_yaml(text, keys=('keep',)) == yaml.safe_load(text)
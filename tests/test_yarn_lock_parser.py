@@ -0,0 +1,26 @@
+import os
+import logging
+
+from core.log import Logger
+from core.file_parsers.yarn_lock_parser import get_package_name, parse_yarn_lock_file
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def test_get_package_name():
+    assert get_package_name('"string-width-cjs@npm:string-width@^4.2.0"') == 'string-width'
+    assert get_package_name('"@isaacs/cliui@npm:@isaacs/cliui@^8.0.2"') == '@isaacs/cliui'
+    assert get_package_name('lodash@npm:4.17.21') == 'lodash'
+    assert get_package_name('"@babel/core@^7.0.0"') == '@babel/core'
+
+
+def test_v1_npm_aliases_report_the_real_name():
+    filepath = os.path.join(FIXTURE_DIR, 'yarn_v1', 'yarn.lock')
+    dep_result = parse_yarn_lock_file(filepath=filepath, logger=Logger(cmd_level=logging.ERROR))
+    assert [(item['name'], item['version']) for item in dep_result] == [
+        ('@isaacs/cliui', '8.0.2'),
+        ('string-width', '4.2.3'),
+        ('string-width', '5.1.2'),
+        ('strip-ansi', '6.0.1'),
+        ('@types/node', '18.19.3'),
+    ]